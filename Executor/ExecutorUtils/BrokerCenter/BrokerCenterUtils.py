@@ -19,6 +19,7 @@ from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
 logger = LoggerSetup()
 
 import Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter as firebase_utils
+from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_cache import document_cache
 import Executor.ExecutorUtils.BrokerCenter.Brokers.AliceBlue.alice_adapter as alice_adapter
 import Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter as zerodha_adapter
 import Executor.ExecutorUtils.BrokerCenter.Brokers.Firstock.firstock_adapter as firstock_adapter
@@ -101,7 +102,7 @@ def fetch_active_users_from_firebase():
     """
     try:
         active_users = []
-        account_details = firebase_utils.fetch_collection_data_firebase(CLIENTS_USER_FB_DB)
+        account_details = document_cache.get_collection(CLIENTS_USER_FB_DB)
         for account in account_details:
             if account_details[account]["Active"] == True:
                 active_users.append(account_details[account])
@@ -155,10 +156,7 @@ def fetch_users_for_strategies_from_firebase(strategy_name):
 def fetch_primary_accounts_from_firebase(primary_account):
     # fetch the tr_no from .env file and fetch the primary account from firebase
     try:
-        account_details = firebase_utils.fetch_collection_data_firebase(CLIENTS_USER_FB_DB)
-        for account in account_details:
-            if account_details[account]["Tr_No"] == primary_account:
-                return account_details[account]
+        return document_cache.find_document(CLIENTS_USER_FB_DB, "Tr_No", primary_account)
     except Exception as e:
         logger.error(f"Error while fetching primary account from Firebase: {e}")
 
@@ -201,25 +199,23 @@ def fetch_holdings_value_for_user_broker(user):
 
 def fetch_user_credentials_firebase(broker_user_name):
     try:
-        user_credentials = firebase_utils.fetch_collection_data_firebase(CLIENTS_USER_FB_DB)
-        for user in user_credentials:
-            if user_credentials[user]["Broker"]["BrokerUsername"] == broker_user_name:
-                return user_credentials[user]["Broker"]
+        user = document_cache.find_document(CLIENTS_USER_FB_DB, "Broker/BrokerUsername", broker_user_name)
+        if user is not None:
+            return user["Broker"]
     except Exception as e:
         logger.error(f"Error while fetching user credentials from Firebase: {e}")
 
 def fetch_strategy_details_for_user(username):
     try:
-        user_details = firebase_utils.fetch_collection_data_firebase(CLIENTS_USER_FB_DB)
-        for user in user_details:
-            if user_details[user]["Broker"]["BrokerUsername"] == username:
-                return user_details[user]["Strategies"]
+        user = document_cache.find_document(CLIENTS_USER_FB_DB, "Broker/BrokerUsername", username)
+        if user is not None:
+            return user["Strategies"]
     except Exception as e:
         logger.error(f"Error while fetching strategy details for user {username}: {e}")
         
 def fetch_active_strategies_all_users():
     try:
-        user_details = firebase_utils.fetch_collection_data_firebase(CLIENTS_USER_FB_DB)
+        user_details = document_cache.get_collection(CLIENTS_USER_FB_DB)
         strategies = []
         for user in user_details:
             if user_details[user]["Active"] == True:
@@ -500,15 +496,7 @@ def calculate_user_net_values(user, categorized_df):
         return firstock_adapter.calculate_firstock_net_values(user, categorized_df)
 
 def get_primary_account_obj():
-    zerodha_primary = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
-    primary_account_session_id = fetch_primary_accounts_from_firebase(
-        zerodha_primary
-    )
-    obj = zerodha_adapter.create_kite_obj(
-        api_key=primary_account_session_id["Broker"]["ApiKey"],
-        access_token=primary_account_session_id["Broker"]["SessionId"],
-    )
-    return obj
+    return zerodha_adapter.get_primary_kite_obj()
 
 def get_broker_pnl(user):
     try:
@@ -534,6 +522,10 @@ def get_orders_tax(orders_to_place,user_credentials):
     else:
         return None
     
+def get_orders_tax_for_basket(orders_to_place):
+    # Kite's basket margins price the charges for every broker, see get_orders_tax
+    return zerodha_adapter.get_orders_tax_batch(orders_to_place)
+    
 def get_order_margin(orders_to_place,user_credentials):
     #TODO As of now passing all the brokers to zerodha adapter
     if user_credentials['BrokerName'] == ZERODHA:
@@ -20,8 +20,12 @@ from Executor.Strategies.StrategiesUtil import (
     calculate_transaction_type_sl,
 )
 
+from Executor.ExecutorUtils.BrokerCenter.session_pool import session_pool
+
 logger = LoggerSetup()
 
+ALICE_POOL_KEY = "aliceblue"
+
 # This function fetches the available free cash balance for a user from the Aliceblue trading platform.
 def alice_fetch_free_cash(user_details):
     """
@@ -36,11 +40,7 @@ def alice_fetch_free_cash(user_details):
     account.
     """
     logger.debug(f"Fetching free cash for {user_details['BrokerUsername']}")
-    alice = Aliceblue(
-        user_details["BrokerUsername"],
-        user_details["ApiKey"],
-        session_id=user_details["SessionId"],
-    )
+    alice = create_alice_obj(user_details)
     try:
         cash_margin_available = alice.get_balance()
         for item in cash_margin_available:
@@ -121,11 +121,7 @@ def get_ins_csv_alice(user_details):
     during the process, it will return `None`.
     """
     logger.debug(f"Fetching instruments for ALICE using {user_details['Broker']['BrokerUsername']}")
-    alice = Aliceblue(
-        user_id=user_details["Broker"]["BrokerUsername"],
-        api_key=user_details["Broker"]["ApiKey"],
-        session_id=user_details["Broker"]["SessionId"],
-    )
+    alice = create_alice_obj(user_details["Broker"])
     try:
         alice.get_contract_master("NFO")
         alice.get_contract_master("BFO")
@@ -148,7 +144,7 @@ def fetch_aliceblue_holdings_value(user):
     0.0.
     """
     try:
-        alice = Aliceblue(user["Broker"]["BrokerUsername"], user["Broker"]["ApiKey"], session_id=user["Broker"]["SessionId"])
+        alice = create_alice_obj(user["Broker"])
         holdings = alice.get_holding_positions()
 
         invested_value = 0
@@ -212,18 +208,24 @@ def simplify_aliceblue_order(detail):
 
 def create_alice_obj(user_details):
     """
-    The function `create_alice_obj` creates an instance of the Aliceblue class using user details such
-    as BrokerUsername, ApiKey, and SessionId.
+    The function `create_alice_obj` returns the pooled instance of the Aliceblue class for the user
+    details such as BrokerUsername, ApiKey, and SessionId. The instance is reused for the trading day
+    until the SessionId changes or the session is invalidated.
     
     :param user_details: The `user_details` parameter is expected to be a dictionary containing the
     following keys:
     :return: An Aliceblue object with the user details provided, including BrokerUsername, ApiKey, and
     SessionId.
     """
-    return Aliceblue(
-        user_id=user_details["BrokerUsername"],
-        api_key=user_details["ApiKey"],
-        session_id=user_details["SessionId"],
+    return session_pool.get_client(
+        ALICE_POOL_KEY,
+        user_details["BrokerUsername"],
+        user_details["SessionId"],
+        lambda: Aliceblue(
+            user_id=user_details["BrokerUsername"],
+            api_key=user_details["ApiKey"],
+            session_id=user_details["SessionId"],
+        ),
     )
 
 
@@ -244,6 +246,7 @@ def aliceblue_todays_tradebook(user):
         orders = alice.get_order_history("")
         if isinstance(orders, dict):
             if orders.get("stat") == "Not_Ok":
+                session_pool.invalidate(ALICE_POOL_KEY, user["BrokerUsername"])
                 return None
         return orders
     except Exception as e:
@@ -1,4 +1,5 @@
 import datetime
+import threading
 
 import pandas as pd
 from kiteconnect import KiteConnect
@@ -16,19 +17,34 @@ from Executor.ExecutorUtils.NotificationCenter.Discord.discord_adapter import (
     discord_bot,
 )
 from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+from Executor.ExecutorUtils.BrokerCenter.session_pool import session_pool
 
 logger = LoggerSetup()
 
+KITE_POOL_KEY = "kite"
 
-def create_kite_obj(user_details=None, api_key=None, access_token=None):
+
+def _new_kite_obj(api_key, access_token, username):
+    kite = KiteConnect(api_key=api_key, access_token=access_token)
+    # Called by KiteConnect on a TokenException before it raises
+    kite.set_session_expiry_hook(
+        lambda: session_pool.invalidate(KITE_POOL_KEY, username)
+    )
+    return kite
+
+
+def create_kite_obj(user_details=None, api_key=None, access_token=None, username=None):
     """
-    Creates a KiteConnect object either with directly provided API key and access token, or
-    via a user details dictionary.
+    Returns the pooled KiteConnect object for the given credentials, either with directly
+    provided API key and access token, or via a user details dictionary. The object and its
+    HTTP connection are reused for the trading day until its session is rejected. Objects are
+    pooled per BrokerUsername, accounts sharing an API key keep separate sessions.
 
     Parameters:
         user_details (dict, optional): Dictionary containing 'ApiKey' and 'SessionId' for the user.
         api_key (str, optional): API key for KiteConnect.
         access_token (str, optional): Access token for KiteConnect.
+        username (str, optional): BrokerUsername of the credentials, read from user_details if not given.
 
     Returns:
         KiteConnect: An instance of the KiteConnect class.
@@ -37,15 +53,39 @@ def create_kite_obj(user_details=None, api_key=None, access_token=None):
         ValueError: If neither user details nor API key and access token are provided.
     """
     if api_key and access_token:
-        return KiteConnect(api_key=api_key, access_token=access_token)
+        pass
     elif user_details:
-        return KiteConnect(
-            api_key=user_details["ApiKey"], access_token=user_details["SessionId"]
-        )
+        api_key = user_details["ApiKey"]
+        access_token = user_details["SessionId"]
+        username = username or user_details.get("BrokerUsername")
     else:
         raise ValueError(
             "Either user_details or api_key and access_token must be provided"
         )
+    # Without a username the API key is the only identity left
+    username = username or api_key
+    return session_pool.get_client(
+        KITE_POOL_KEY,
+        username,
+        access_token,
+        lambda: _new_kite_obj(api_key, access_token, username),
+    )
+
+
+def get_primary_kite_obj():
+    """
+    Returns the pooled KiteConnect object of the Zerodha primary account. The primary
+    account document is fetched from Firebase once per trading day.
+    """
+    from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import (
+        fetch_primary_accounts_from_firebase,
+    )
+
+    zerodha_primary = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
+    primary_account = session_pool.get_account(
+        zerodha_primary, lambda: fetch_primary_accounts_from_firebase(zerodha_primary)
+    )
+    return create_kite_obj(user_details=primary_account["Broker"])
 
 
 def zerodha_fetch_free_cash(user_details):
@@ -62,8 +102,7 @@ def zerodha_fetch_free_cash(user_details):
         Exception: If there is an issue fetching the balance.
     """
     logger.debug(f"Fetching free cash for {user_details['BrokerUsername']}")
-    kite = KiteConnect(api_key=user_details["ApiKey"])
-    kite.set_access_token(user_details["SessionId"])
+    kite = create_kite_obj(user_details=user_details)
     try:
         # Fetch the account balance details
         balance_details = kite.margins(segment="equity")
@@ -99,8 +138,7 @@ def get_csv_kite(user_details):
     """
     logger.debug(f"Fetching instruments for KITE using {user_details['Broker']['BrokerUsername']}")
     try:
-        kite = KiteConnect(api_key=user_details["Broker"]["ApiKey"])
-        kite.set_access_token(user_details["Broker"]["SessionId"])
+        kite = create_kite_obj(user_details=user_details["Broker"])
         instrument_dump = kite.instruments()
         instrument_df = pd.DataFrame(instrument_dump)
         instrument_df["exchange_token"] = instrument_df["exchange_token"].astype(str)
@@ -123,7 +161,7 @@ def fetch_zerodha_holdings_value(user):
         Exception: If fetching holdings fails.
     """
     try:
-        kite = KiteConnect(api_key=user['Broker']['ApiKey'], access_token=user['Broker']['SessionId'])
+        kite = create_kite_obj(user_details=user["Broker"])
         holdings = kite.holdings()
         return sum(stock['average_price'] * stock['quantity'] for stock in holdings)
     except Exception as e:
@@ -191,7 +229,11 @@ def zerodha_todays_tradebook(user):
         Exception: If there is an error fetching the tradebook.
     """
     try:
-        kite = create_kite_obj(api_key=user["ApiKey"], access_token=user["SessionId"])
+        kite = create_kite_obj(
+            api_key=user["ApiKey"],
+            access_token=user["SessionId"],
+            username=user.get("BrokerUsername"),
+        )
         orders = kite.orders()
         if not orders:
             return None
@@ -436,14 +478,15 @@ def kite_place_orders_for_users(orders_to_place, users_credentials):
     )
     order_type = calculate_order_type(kite, orders_to_place.get("order_type"))
     product_type = calculate_product_type(kite, product)
+    instrument = Instrument()
     if product == "CNC":
         segment_type = kite.EXCHANGE_NSE
-        trading_symbol = Instrument().get_trading_symbol_by_exchange_token(
+        trading_symbol = instrument.get_trading_symbol_by_exchange_token(
             exchange_token, "NSE"
         )
     else:
-        segment_type = Instrument().get_exchange_by_exchange_token(str(exchange_token))
-        trading_symbol = Instrument().get_trading_symbol_by_exchange_token(
+        segment_type = instrument.get_exchange_by_exchange_token(str(exchange_token))
+        trading_symbol = instrument.get_trading_symbol_by_exchange_token(
             str(exchange_token)
         )
 
@@ -807,33 +850,26 @@ def get_zerodha_pnl(user):
         logger.error(f"Error fetching pnl for user: {user['Broker']['BrokerUsername']}: {e}")
         return None
 
-def get_order_tax(order,user_credentials,broker):
+# Charges per (tradingsymbol, qty, product, side), valid for the trading day.
+# Dispatch threads price their baskets concurrently, so every access holds the lock.
+_order_tax_cache = {}
+_order_tax_cache_day = None
+_order_tax_cache_lock = threading.Lock()
+TAX_BASKET_SIZE = 50
+
+
+def _build_tax_order(kite, order, instrument):
     """
-    Calculates the required tax for an order based on the order details and user credentials.
+    Converts an order into the basket margins order format, leaving the price unresolved.
 
     Args:
+        kite (KiteConnect): The KiteConnect instance.
         order (dict): Details of the order for which tax needs to be calculated.
-        user_credentials (dict): Credentials required for accessing the user's trading account.
-        broker (str): Name of the broker to apply specific adjustments if needed.
+        instrument (Instrument): Instrument lookup used to resolve the trading symbol.
 
     Returns:
-        float: The calculated tax for the order.
-
-    Raises:
-        Exception: If there is an error in calculating the tax.
+        dict: The basket order without the "price" key.
     """
-    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import Instrument
-    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import get_single_ltp
-    from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import fetch_primary_accounts_from_firebase
-    zerodha_primary = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
-    basket_order = []
-    primary_account_session_id = fetch_primary_accounts_from_firebase(zerodha_primary)
-
-    kite = create_kite_obj(
-    api_key=primary_account_session_id["Broker"]["ApiKey"],
-    access_token=primary_account_session_id["Broker"]["SessionId"],
-    )
-    strategy = order["strategy"]
     exchange_token = order["exchange_token"]
     product = order.get("product_type")
     transaction_type = order.get("transaction_type")
@@ -854,49 +890,166 @@ def get_order_tax(order,user_credentials,broker):
     product_type = calculate_product_type(kite, product)
     if product == "CNC":
         segment_type = kite.EXCHANGE_NSE
-        trading_symbol = Instrument().get_trading_symbol_by_exchange_token(
+        trading_symbol = instrument.get_trading_symbol_by_exchange_token(
             exchange_token, "NSE"
         )
     else:
-        segment_type = Instrument().get_exchange_by_exchange_token(str(exchange_token))
-        trading_symbol = Instrument().get_trading_symbol_by_exchange_token(
+        segment_type = instrument.get_exchange_by_exchange_token(str(exchange_token))
+        trading_symbol = instrument.get_trading_symbol_by_exchange_token(
             str(exchange_token)
         )
 
-    limit_prc = order.get("limit_prc", None)
     trigger_price = order.get("trigger_prc", None)
+    if trigger_price is not None:
+        trigger_price = round(float(trigger_price), 2)
+        if trigger_price < 0:
+            trigger_price = 1.5
 
+    return {
+        "variety": kite.VARIETY_REGULAR,
+        "exchange": segment_type,
+        "tradingsymbol": trading_symbol,
+        "transaction_type": transaction_type,
+        "quantity": order["qty"],
+        "trigger_price": trigger_price,
+        "product": product_type,
+        "order_type": order_type,
+    }
+
+
+def _resolve_tax_order_price(order, tax_order):
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import get_single_ltp
+
+    limit_prc = order.get("limit_prc", None)
     if limit_prc is not None:
         limit_prc = round(float(limit_prc), 2)
         if limit_prc < 0:
             limit_prc = 1.0
-    elif product == "CNC":
-        limit_prc = get_single_ltp(exchange_token=exchange_token, segment="NSE")
+    elif tax_order["product"] == "CNC":
+        limit_prc = get_single_ltp(exchange_token=order["exchange_token"], segment="NSE")
     else:
         limit_prc = 0.0
+    tax_order["price"] = limit_prc
+    return tax_order
+
+
+def _tax_cache_key(tax_order):
+    return (
+        tax_order["tradingsymbol"],
+        tax_order["quantity"],
+        tax_order["product"],
+        tax_order["transaction_type"],
+    )
+
+
+def _cached_order_tax(key):
+    with _order_tax_cache_lock:
+        return _order_tax_cache.get(key)
 
-    if trigger_price is not None:
-        trigger_price = round(float(trigger_price), 2)
-        if trigger_price < 0:
-            trigger_price = 1.5
 
-    tax_order = {
-                        "variety":kite.VARIETY_REGULAR,
-                        "exchange":segment_type,
-                        "price":limit_prc,
-                        "tradingsymbol":trading_symbol,
-                        "transaction_type":transaction_type,
-                        "quantity":order["qty"],
-                        "trigger_price":trigger_price,
-                        "product":product_type,
-                        "order_type":order_type}
-    basket_order.append(tax_order)
-    tax_details = kite.basket_order_margins(basket_order,mode="compact")
-    tax = tax_details["orders"][0]['charges']['total']
-    tax = round(tax,2)
-    if broker.lower() == "aliceblue":
-        tax = float(tax)  - 5
-    return tax
+def _store_order_taxes(day, taxes):
+    with _order_tax_cache_lock:
+        # Charges fetched before a day rollover must not land in the new day's cache
+        if _order_tax_cache_day == day:
+            _order_tax_cache.update(taxes)
+
+
+def get_orders_tax_batch(orders, brokers=None):
+    """
+    Calculates the tax for a basket of orders, e.g. every leg of every user for one signal.
+
+    Orders are grouped by the parameters deciding their charges and only the combinations
+    not already cached for the day are sent to Kite, in as few basket_order_margins calls
+    as possible.
+
+    Args:
+        orders (list): Order dicts as passed to get_order_tax.
+        brokers (list, optional): Broker name per order, defaults to each order's "broker" key.
+
+    Returns:
+        list: The calculated tax for each order, in the order given.
+
+    Raises:
+        Exception: If there is an error in calculating the tax.
+    """
+    global _order_tax_cache_day
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import Instrument
+
+    today = datetime.date.today()
+    with _order_tax_cache_lock:
+        if _order_tax_cache_day != today:
+            _order_tax_cache.clear()
+            _order_tax_cache_day = today
+        cached_keys = set(_order_tax_cache)
+
+    kite = get_primary_kite_obj()
+    instrument = Instrument()
+    keys = []
+    tax_orders = []
+    missing = {}
+    for order in orders:
+        tax_order = _build_tax_order(kite, order, instrument)
+        key = _tax_cache_key(tax_order)
+        keys.append(key)
+        tax_orders.append(tax_order)
+        if key not in cached_keys and key not in missing:
+            missing[key] = _resolve_tax_order_price(order, tax_order)
+
+    fetched = {}
+    missing_keys = list(missing.keys())
+    for start in range(0, len(missing_keys), TAX_BASKET_SIZE):
+        chunk = missing_keys[start : start + TAX_BASKET_SIZE]
+        try:
+            tax_details = kite.basket_order_margins(
+                [missing[key] for key in chunk], mode="compact"
+            )
+        except Exception as e:
+            logger.error(f"Error fetching charges for a basket of {len(chunk)} orders: {e}")
+            continue
+        for key, order_margin in zip(chunk, tax_details["orders"]):
+            fetched[key] = round(order_margin["charges"]["total"], 2)
+    _store_order_taxes(today, fetched)
+    if missing_keys:
+        logger.debug(f"Fetched charges for {len(fetched)} of {len(orders)} orders")
+
+    if brokers is None:
+        brokers = [order.get("broker") or "" for order in orders]
+    taxes = []
+    for order, tax_order, key, broker in zip(orders, tax_orders, keys, brokers):
+        tax = fetched.get(key)
+        if tax is None:
+            tax = _cached_order_tax(key)
+        if tax is None:
+            # Failed or short basket, or the cache rolled over meanwhile: price the order alone
+            if "price" not in tax_order:
+                _resolve_tax_order_price(order, tax_order)
+            tax_details = kite.basket_order_margins([tax_order], mode="compact")
+            tax = round(tax_details["orders"][0]["charges"]["total"], 2)
+            fetched[key] = tax
+            _store_order_taxes(today, {key: tax})
+        if broker.lower() == "aliceblue":
+            tax = float(tax)  - 5
+        taxes.append(tax)
+    return taxes
+
+
+def get_order_tax(order,user_credentials,broker):
+    """
+    Calculates the required tax for an order based on the order details and user credentials.
+    Charges already fetched for the day, e.g. by get_orders_tax_batch, are served from cache.
+
+    Args:
+        order (dict): Details of the order for which tax needs to be calculated.
+        user_credentials (dict): Credentials required for accessing the user's trading account.
+        broker (str): Name of the broker to apply specific adjustments if needed.
+
+    Returns:
+        float: The calculated tax for the order.
+
+    Raises:
+        Exception: If there is an error in calculating the tax.
+    """
+    return get_orders_tax_batch([order], [broker])[0]
 
 def get_margin_utilized(user_credentials):
     kite = create_kite_obj(user_details=user_credentials)
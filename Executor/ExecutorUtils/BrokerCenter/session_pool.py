@@ -0,0 +1,98 @@
+import datetime as dt
+import os
+import sys
+import threading
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+
+class BrokerSessionPool:
+    """
+    Keeps the authenticated broker client objects for the trading day.
+
+    Clients are keyed by ``(broker, username)`` and remember the session id
+    they were built with, so a fresh daily login (new session id) transparently
+    replaces the old client. Entries are dropped at the day roll-over or when
+    :meth:`invalidate` is called after an authentication error.
+
+    Account documents fetched from Firebase (for example the primary account)
+    are cached alongside for the same lifetime.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._instance_lock:
+                if not cls._instance:
+                    cls._instance = super(BrokerSessionPool, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, "_initialized"):
+            self.lock = threading.RLock()
+            self.sessions = {}
+            self.accounts = {}
+            self.trading_day = dt.date.today()
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    def _roll_trading_day(self):
+        today = dt.date.today()
+        if today != self.trading_day:
+            self.sessions.clear()
+            self.accounts.clear()
+            self.trading_day = today
+
+    def get_client(self, broker, username, session_id, factory):
+        """Return the pooled client for the user, building it with ``factory`` on a miss."""
+        with self.lock:
+            self._roll_trading_day()
+            key = (broker, username)
+            entry = self.sessions.get(key)
+            if entry is not None and entry[0] == session_id:
+                self.hits += 1
+                return entry[1]
+            client = factory()
+            self.sessions[key] = (session_id, client)
+            self.misses += 1
+            return client
+
+    def get_account(self, account_key, loader):
+        """Return a cached account document, loading it with ``loader`` on a miss."""
+        with self.lock:
+            self._roll_trading_day()
+            account = self.accounts.get(account_key)
+            if account is None:
+                account = loader()
+                if account is not None:
+                    self.accounts[account_key] = account
+            return account
+
+    def invalidate(self, broker, username):
+        """Drop the client of one user, e.g. after the broker rejected its session."""
+        with self.lock:
+            if self.sessions.pop((broker, username), None) is not None:
+                logger.warning(f"Invalidated {broker} session for {username}")
+            # The user's cached account document holds the same stale session id
+            for account_key, account in list(self.accounts.items()):
+                broker_details = account.get("Broker") if isinstance(account, dict) else None
+                if account_key == username or (
+                    isinstance(broker_details, dict) and broker_details.get("BrokerUsername") == username
+                ):
+                    del self.accounts[account_key]
+
+    def clear(self):
+        with self.lock:
+            self.sessions.clear()
+            self.accounts.clear()
+
+
+session_pool = BrokerSessionPool()
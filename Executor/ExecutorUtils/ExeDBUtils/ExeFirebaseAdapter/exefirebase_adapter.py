@@ -18,6 +18,8 @@ CLIENTS_DB = os.getenv("FIREBASE_USER_COLLECTION")
 STRATEGIES_DB = os.getenv("FIREBASE_STRATEGY_COLLECTION")
 ADMIN_DB = os.getenv("FIREBASE_ADMIN_COLLECTION")
 
+from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_cache import document_cache
+
 cred = credentials.Certificate(cred_filepath)
 firebase_admin.initialize_app(cred, {"databaseURL": firebase_db_url})
 
@@ -38,6 +40,7 @@ def delete_fields_firebase(collection, document, field_key=None):
     else:
         ref = db.reference(f"{collection}/{document}/{field_key}")
     ref.delete()
+    document_cache.invalidate(collection, document)
 
 
 def update_fields_firebase(collection, document, data, field_key=None):
@@ -46,6 +49,7 @@ def update_fields_firebase(collection, document, data, field_key=None):
     else:
         ref = db.reference(f"{collection}/{document}/{field_key}")
     ref.update(data)
+    document_cache.invalidate(collection, document)
 
 
 def push_orders_firebase(collection, document, new_order, field_key=None):
@@ -73,24 +77,17 @@ def push_orders_firebase(collection, document, new_order, field_key=None):
 
     # Update Firebase with the modified list
     ref.set(orders)
+    document_cache.invalidate(collection, document)
 
 
 # New function to get client by 'Tr_No'
 def get_client_by_tr_no(tr_no):
-    clients = fetch_collection_data_firebase(CLIENTS_DB)
-    for client_key, client_data in clients.items():
-        if client_data.get("Tr_No") == tr_no:
-            return client_data
-    return None
+    return document_cache.find_document(CLIENTS_DB, "Tr_No", tr_no)
 
 
 # New function to get strategy by 'StrategyName'
 def get_strategy_by_name(strategy_name):
-    strategies = fetch_collection_data_firebase(STRATEGIES_DB)
-    for strategy_key, strategy_data in strategies.items():
-        if strategy_data.get("StrategyName") == strategy_name:
-            return strategy_data
-    return None
+    return document_cache.find_document(STRATEGIES_DB, "StrategyName", strategy_name)
 
 
 def download_client_as_json(tr_no, file_path):
@@ -139,17 +136,20 @@ def update_strategy_by_name_from_file(strategy_name, file_path):
 def upload_collection(collection, data):
     ref = db.reference(collection)
     ref.push(data)
+    document_cache.invalidate(collection)
     return "Data uploaded successfully"
 
 def update_collection(collection, data):
     ref = db.reference(collection)
     ref.update(data)
+    document_cache.invalidate(collection)
     return "Data updated successfully"
 
 def upload_new_client_data_to_firebase(trader_number, user_dict):
     ref = db.reference(CLIENTS_DB)
     new_ref = ref.child(trader_number) 
     new_ref.set(user_dict)
+    document_cache.invalidate(CLIENTS_DB, trader_number)
     # ref.push(user_dict)
     return "Data uploaded successfully"
 
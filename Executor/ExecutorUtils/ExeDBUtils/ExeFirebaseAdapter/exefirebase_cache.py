@@ -0,0 +1,314 @@
+import copy
+import os
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+FIREBASE_CACHE_TTL = float(os.getenv("FIREBASE_CACHE_TTL", 60))
+FIREBASE_CACHE_LISTEN = os.getenv("FIREBASE_CACHE_LISTEN", "false").lower() == "true"
+
+
+def _split_path(path):
+    return [part for part in path.split("/") if part]
+
+
+class FirebaseCacheBackend:
+    """Reads documents from the Firebase realtime database."""
+
+    def __init__(self):
+        # Importing the adapter initializes the Firebase app
+        from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter import db
+
+        self.db = db
+
+    def get(self, path):
+        return self.db.reference(path).get()
+
+    def listen(self, path, callback):
+        """Calls ``callback(event_type, path, data)`` for every change below ``path``."""
+        return self.db.reference(path).listen(
+            lambda event: callback(event.event_type, event.path, event.data)
+        )
+
+
+class FakeCacheBackend:
+    """In-memory stand in for Firebase, for offline tests.
+
+    ``write`` changes the stored data and notifies the listeners the way the
+    Firebase streaming API does, with a ``put`` event relative to the
+    listened path.
+    """
+
+    def __init__(self, data=None):
+        self.data = data if data is not None else {}
+        self.get_calls = 0
+        self.listeners = []
+
+    def _node(self, parts):
+        node = self.data
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def get(self, path):
+        self.get_calls += 1
+        return copy.deepcopy(self._node(_split_path(path)))
+
+    def listen(self, path, callback):
+        self.listeners.append((_split_path(path), callback))
+        callback("put", "/", self.get(path))
+        return self
+
+    def close(self):
+        self.listeners.clear()
+
+    def write(self, path, value):
+        parts = _split_path(path)
+        node = self.data
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = copy.deepcopy(value)
+        for listen_parts, callback in self.listeners:
+            if parts[: len(listen_parts)] == listen_parts:
+                relative = "/" + "/".join(parts[len(listen_parts) :])
+                callback("put", relative, copy.deepcopy(value))
+
+
+class FirebaseDocumentCache:
+    """
+    Read-through cache of whole Firebase collections.
+
+    The first read of a collection takes one snapshot of it; keyed lookups
+    are then served from memory. A snapshot is refetched after ``ttl``
+    seconds, unless a listener keeps it up to date. Writes made through the
+    Firebase adapter call :meth:`invalidate` for the document they touched,
+    and only that document is fetched again on the next read.
+
+    Callers get deep copies, so mutating a returned document never changes
+    the cache.
+    """
+
+    def __init__(self, backend=None, ttl=FIREBASE_CACHE_TTL, use_listeners=FIREBASE_CACHE_LISTEN):
+        self.backend = backend
+        self.ttl = ttl
+        self.use_listeners = use_listeners
+        self.lock = threading.RLock()
+        self.snapshots = {}
+        self.fetched_at = {}
+        self.dirty = {}
+        self.indexes = {}
+        self.listeners = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get_backend(self):
+        if self.backend is None:
+            self.backend = FirebaseCacheBackend()
+        return self.backend
+
+    def _is_fresh(self, collection):
+        if collection not in self.snapshots:
+            return False
+        if collection in self.listeners:
+            return True
+        return time.monotonic() - self.fetched_at[collection] < self.ttl
+
+    def _load(self, collection):
+        backend = self._get_backend()
+        if self.use_listeners and collection not in self.listeners:
+            self.snapshots.pop(collection, None)
+            try:
+                # The first event of a listener carries the full snapshot
+                self.listeners[collection] = backend.listen(
+                    collection, lambda *event: self._apply_event(collection, *event)
+                )
+                if collection in self.snapshots:
+                    self.fetched_at[collection] = time.monotonic()
+                    self.dirty[collection] = set()
+                    return
+            except Exception as e:
+                logger.error(f"Error listening to {collection}, falling back to TTL refresh: {e}")
+                self.listeners.pop(collection, None)
+        self.snapshots[collection] = backend.get(collection) or {}
+        self.fetched_at[collection] = time.monotonic()
+        self.dirty[collection] = set()
+        self.indexes.pop(collection, None)
+
+    def _refresh_dirty(self, collection):
+        backend = self._get_backend()
+        for document in self.dirty[collection]:
+            data = backend.get(f"{collection}/{document}")
+            if data is None:
+                self.snapshots[collection].pop(document, None)
+            else:
+                self.snapshots[collection][document] = data
+            self.misses += 1
+        self.dirty[collection] = set()
+        self.indexes.pop(collection, None)
+
+    def _snapshot(self, collection):
+        if not self._is_fresh(collection):
+            self._load(collection)
+            self.misses += 1
+        elif self.dirty.get(collection):
+            self._refresh_dirty(collection)
+        else:
+            self.hits += 1
+        return self.snapshots[collection]
+
+    def _apply_event(self, collection, event_type, path, data):
+        with self.lock:
+            parts = _split_path(path)
+            try:
+                if not parts:
+                    if event_type == "put":
+                        self.snapshots[collection] = data or {}
+                    else:
+                        self.snapshots.setdefault(collection, {}).update(data or {})
+                else:
+                    node = self.snapshots.setdefault(collection, {})
+                    for part in parts[:-1]:
+                        node = node.setdefault(part, {})
+                    if event_type == "patch":
+                        node = node.setdefault(parts[-1], {})
+                        for key, value in (data or {}).items():
+                            if value is None:
+                                node.pop(key, None)
+                            else:
+                                node[key] = value
+                    elif data is None:
+                        node.pop(parts[-1], None)
+                    else:
+                        node[parts[-1]] = data
+            except (AttributeError, TypeError):
+                # The change landed inside a list node; take a fresh snapshot instead
+                self.snapshots.pop(collection, None)
+            self.indexes.pop(collection, None)
+
+    def get_collection(self, collection):
+        """Returns all documents of ``collection`` keyed by their document key."""
+        with self.lock:
+            return copy.deepcopy(self._snapshot(collection))
+
+    def get_document(self, collection, document):
+        """Returns one document of ``collection`` or None."""
+        with self.lock:
+            return copy.deepcopy(self._snapshot(collection).get(document))
+
+    def find_document(self, collection, field_path, value):
+        """
+        Returns the first document whose nested field equals ``value``.
+
+        Args:
+            collection (str): The collection to search.
+            field_path (str): Slash separated path of the field, e.g. "Broker/BrokerUsername".
+            value: The value to match.
+
+        Returns:
+            dict: A copy of the matching document or None.
+        """
+        with self.lock:
+            snapshot = self._snapshot(collection)
+            collection_indexes = self.indexes.setdefault(collection, {})
+            index = collection_indexes.get(field_path)
+            if index is None:
+                index = {}
+                parts = _split_path(field_path)
+                for key, document in snapshot.items():
+                    field = document
+                    for part in parts:
+                        field = field.get(part) if isinstance(field, dict) else None
+                    try:
+                        index.setdefault(field, key)
+                    except TypeError:
+                        continue
+                collection_indexes[field_path] = index
+            key = index.get(value)
+            return copy.deepcopy(snapshot[key]) if key is not None else None
+
+    def invalidate(self, collection=None, document=None):
+        """
+        Marks cached data as stale.
+
+        Without arguments every collection is dropped; with a collection only
+        that one, and with a document only that document is refetched.
+        """
+        with self.lock:
+            if collection is None:
+                self.snapshots.clear()
+                self.indexes.clear()
+            elif document is None or collection not in self.snapshots:
+                self.snapshots.pop(collection, None)
+                self.indexes.pop(collection, None)
+            elif collection not in self.listeners:
+                self.dirty.setdefault(collection, set()).add(_split_path(str(document))[0])
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "collections": list(self.snapshots.keys()),
+            }
+
+    def close(self):
+        with self.lock:
+            for registration in self.listeners.values():
+                try:
+                    registration.close()
+                except Exception as e:
+                    logger.error(f"Error closing Firebase listener: {e}")
+            self.listeners.clear()
+
+
+document_cache = FirebaseDocumentCache()
+
+
+if __name__ == "__main__":
+    users = {
+        f"Tr{number:02d}": {
+            "Tr_No": f"Tr{number:02d}",
+            "Active": True,
+            "Broker": {"BrokerName": "zerodha", "BrokerUsername": f"user{number}"},
+            "Strategies": {"Demo": {"Qty": 25}},
+        }
+        for number in range(50)
+    }
+    backend = FakeCacheBackend({"new_clients": users})
+    cache = FirebaseDocumentCache(backend=backend, ttl=60)
+    start = time.perf_counter()
+    for _ in range(20):
+        for number in range(50):
+            cache.find_document("new_clients", "Broker/BrokerUsername", f"user{number}")
+    elapsed = time.perf_counter() - start
+    cache.invalidate("new_clients", "Tr07")
+    cache.get_document("new_clients", "Tr07")
+    print(f"1000 lookups in {elapsed * 1000:.1f} ms, backend reads: {backend.get_calls}, {cache.stats()}")
+
+    listening = FirebaseDocumentCache(backend=backend, use_listeners=True)
+    listening.get_collection("new_clients")
+    backend.write("new_clients/Tr01/Broker/SessionId", "abc")
+    print(
+        "Listener refresh:",
+        listening.get_document("new_clients", "Tr01")["Broker"].get("SessionId"),
+        f"backend reads: {backend.get_calls}",
+    )
@@ -1,6 +1,3 @@
-import firebase_admin
-from firebase_admin import credentials, initialize_app, get_app
-from firebase_admin import db
 import json,math
 import datetime
 import os,sys
@@ -13,21 +10,43 @@ ENV_PATH = os.path.join(DIR_PATH, "trademan.env")
 EOD_JSON_DIR = os.path.join(DIR_PATH, "Data/FBJsonData")
 load_dotenv(ENV_PATH)
 
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
 cred_filepath = os.getenv("FIREBASE_CRED_PATH")
 
 # Firebase database URL
 database_url = os.getenv("FIREBASE_DATABASE_URL")
 
-# Fetch the service account key JSON file contents
-cred = credentials.Certificate(cred_filepath)
-
 app_name = 'TradeManV1'
+firebase_app = None
+
+
+def get_firebase_db():
+    """Initializes the Firebase app on first use, so importing the helpers below stays offline."""
+    global firebase_app
+    import firebase_admin
+    from firebase_admin import credentials, db
+
+    if firebase_app is None:
+        try:
+            firebase_app = firebase_admin.get_app(app_name)
+        except ValueError:
+            # Fetch the service account key JSON file contents
+            cred = credentials.Certificate(cred_filepath)
+            firebase_app = firebase_admin.initialize_app(cred, {"databaseURL": database_url}, name=app_name)
+    return db
 
-try:
-    firebase_app = firebase_admin.get_app(app_name)
-except ValueError:
-    firebase_app = firebase_admin.initialize_app(cred, {"databaseURL": database_url}, name=app_name)
 
+def iter_strategy_orders(strategy_orders):
+    """Yields ``(key, order)`` of a TradeState orders node, which Firebase returns as a list or a dict."""
+    if isinstance(strategy_orders, dict):
+        yield from strategy_orders.items()
+    elif isinstance(strategy_orders, list):
+        yield from enumerate(strategy_orders)
+    elif strategy_orders:
+        logger.error("Unexpected data structure for strategy_orders.")
 
 
 def file_upload(json_path,collection_name):
@@ -35,16 +54,16 @@ def file_upload(json_path,collection_name):
         data = json.load(file)
 
     # Set the reference for the data upload
-    ref = db.reference(collection_name)# Replace with your desired reference path
+    ref = get_firebase_db().reference(collection_name)# Replace with your desired reference path
 
     #upload the data
     ref.set(data)
 
 def update_fields_firebase(collection, document, data, field_key=None):
     if field_key is None:
-        ref = db.reference(f"{collection}/{document}")
+        ref = get_firebase_db().reference(f"{collection}/{document}")
     else:
-        ref = db.reference(f"{collection}/{document}/{field_key}")
+        ref = get_firebase_db().reference(f"{collection}/{document}/{field_key}")
     ref.update(data)
 
 def download_json(path, status):
@@ -53,7 +72,7 @@ def download_json(path, status):
     date_time = now.strftime("%d%b")
 
     # Set the reference for the data download
-    ref = db.reference(path)  # Replace with your desired reference path
+    ref = get_firebase_db().reference(path)  # Replace with your desired reference path
 
     # Download the data
     data = ref.get()
@@ -0,0 +1,313 @@
+import contextlib
+import fcntl
+import glob
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+# Every process journals to its own order_journal.<pid>.jsonl in this directory
+ORDER_JOURNAL_DIR = os.getenv("ORDER_JOURNAL_DIR") or os.path.join(
+    os.getenv("DB_DIR") or DIR, "order_journal"
+)
+
+
+def _is_list_like(keys):
+    return all(str(key).isdigit() for key in keys) and sorted(int(key) for key in keys) == list(
+        range(len(keys))
+    )
+
+
+def appended_orders(current, orders):
+    """
+    Returns the orders node ``current`` with ``orders`` appended.
+
+    Existing keys are never renumbered: a list grows at its end, and a
+    sparse or push id keyed node stays a dict whose new orders get the
+    integer keys after its largest one.
+    """
+    if not current:
+        return list(orders)
+    if isinstance(current, list):
+        return current + list(orders)
+    next_key = max((int(key) for key in current if str(key).isdigit()), default=-1) + 1
+    appended = dict(current)
+    for offset, order in enumerate(orders):
+        appended[str(next_key + offset)] = order
+    return appended
+
+
+class FirebaseJournalBackend:
+    """Writes journal batches to the Firebase realtime database."""
+
+    def __init__(self):
+        # Importing the adapter initializes the Firebase app
+        from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter import db
+
+        self.db = db
+
+    def append(self, path, orders):
+        """
+        Appends ``orders`` to the orders node at ``path`` in one transaction.
+
+        Firebase retries the transaction whenever the node changed between
+        its read and write, so processes flushing to the same node never
+        pick the same index and overwrite each other.
+        """
+        from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_cache import document_cache
+
+        self.db.reference(path).transaction(lambda current: appended_orders(current, orders))
+        collection, document = path.split("/", 2)[:2]
+        document_cache.invalidate(collection, document)
+
+
+class InMemoryJournalBackend:
+    """Offline backend keeping the documents in a nested dict, for tests and dry runs."""
+
+    def __init__(self, data=None):
+        self.data = data if data is not None else {}
+        self.append_calls = 0
+        self.lock = threading.Lock()
+
+    def _node(self, path, create=False):
+        node = self.data
+        for part in [part for part in path.split("/") if part]:
+            if part not in node:
+                if not create:
+                    return None
+                node[part] = {}
+            node = node[part]
+        return node
+
+    def append(self, path, orders):
+        with self.lock:
+            self.append_calls += 1
+            *parents, leaf = [part for part in path.split("/") if part]
+            parent = self._node("/".join(parents), create=True)
+            node = appended_orders(self._as_firebase(parent.get(leaf)), orders)
+            if isinstance(node, list):
+                node = dict(enumerate(node))
+            parent[leaf] = {str(key): value for key, value in node.items()}
+
+    @staticmethod
+    def _as_firebase(node):
+        if isinstance(node, dict) and node and _is_list_like(node.keys()):
+            return [node[key] for key in sorted(node, key=int)]
+        return node
+
+    def get(self, path):
+        """Returns the node at ``path`` with list-like children as a list, like Firebase does."""
+        with self.lock:
+            return self._as_firebase(self._node(path))
+
+
+class OrderJournal:
+    """
+    Append-only journal for order statuses.
+
+    ``append`` writes the status to a local JSON lines log and buffers it in
+    memory; ``flush`` appends everything buffered for an orders node in one
+    transaction, so concurrent writers never collide on an index and
+    readers keep seeing ``TradeState/orders`` as a list. The local log is
+    truncated once all entries have been flushed.
+
+    Each process owns one log, ``order_journal.<pid>.jsonl`` in
+    ``journal_dir``, and holds an exclusive lock on its ``.lock`` file for
+    as long as it lives, so no other process ever rewrites it. On start up
+    the logs whose lock can be taken, i.e. whose process is gone, are taken
+    over: their entries are replayed here and the dead files removed. The
+    logs of live processes are never touched.
+
+    Args:
+        backend: Object with ``append(path, orders)``, Firebase by default.
+        journal_dir (str): Directory of the logs, None to keep no log.
+        pid (int): Owner of the log, this process by default.
+    """
+
+    def __init__(self, backend=None, journal_dir=ORDER_JOURNAL_DIR, pid=None):
+        self.backend = backend
+        self.pid = pid or os.getpid()
+        self.lock = threading.RLock()
+        self.pending = []
+        self.flushed_count = 0
+        self.log_path = None
+        self._lock_file = None
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+            self.log_path = os.path.join(journal_dir, f"order_journal.{self.pid}.jsonl")
+            self._lock_file = self._try_lock(self.log_path)
+            if self._lock_file is None:
+                raise RuntimeError(f"Order journal {self.log_path} is owned by a live process")
+            self._recover(journal_dir)
+
+    def _get_backend(self):
+        if self.backend is None:
+            self.backend = FirebaseJournalBackend()
+        return self.backend
+
+    @staticmethod
+    def _try_lock(log_path):
+        """Returns the locked lock file of ``log_path``, None while its owner is alive."""
+        lock_file = open(f"{log_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    @staticmethod
+    def _read_log(log_path):
+        entries = []
+        with open(log_path, "r") as file:
+            for line in file:
+                if line.strip():
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.error(f"Skipping corrupt order journal line: {line.strip()}")
+        return entries
+
+    def _recover(self, journal_dir):
+        """Takes over our own leftover log (a reused pid) and the logs of dead processes."""
+        if os.path.exists(self.log_path):
+            self.pending.extend(self._read_log(self.log_path))
+        for log_path in sorted(glob.glob(os.path.join(journal_dir, "order_journal.*.jsonl"))):
+            if log_path == self.log_path:
+                continue
+            lock_file = self._try_lock(log_path)
+            if lock_file is None:
+                continue
+            try:
+                # Another process may have taken the log over while we waited for the lock
+                if not os.path.exists(log_path):
+                    continue
+                entries = self._read_log(log_path)
+                self.pending.extend(entries)
+                # Make the entries ours before the dead log goes away
+                self._rewrite_log()
+                os.remove(log_path)
+                if entries:
+                    logger.warning(f"Recovered {len(entries)} unflushed order statuses from {log_path}")
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(f"{log_path}.lock")
+                lock_file.close()
+        if self.pending:
+            logger.warning(f"{len(self.pending)} unflushed order statuses pending in {self.log_path}")
+
+    def _write_log(self, entry):
+        if not self.log_path:
+            return
+        with open(self.log_path, "a") as file:
+            file.write(json.dumps(entry, default=str) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def append(self, collection, document, order, field_key=None):
+        """Records an order status for ``collection/document/field_key``."""
+        entry = {
+            "collection": collection,
+            "document": document,
+            "field_key": field_key,
+            "order": order,
+        }
+        with self.lock:
+            self._write_log(entry)
+            self.pending.append(entry)
+
+    def flush(self):
+        """
+        Sends the buffered statuses, one transaction per orders node.
+
+        Returns:
+            int: The number of statuses written.
+        """
+        with self.lock:
+            if not self.pending:
+                return 0
+            backend = self._get_backend()
+
+            grouped = defaultdict(list)
+            for entry in self.pending:
+                grouped[(entry["collection"], entry["document"], entry["field_key"])].append(entry)
+
+            written = []
+            for (collection, document, field_key), entries in grouped.items():
+                node_path = f"{collection}/{document}/{field_key}" if field_key else f"{collection}/{document}"
+                try:
+                    backend.append(node_path, [entry["order"] for entry in entries])
+                    written.extend(entries)
+                except Exception as e:
+                    logger.error(f"Error flushing {len(entries)} order statuses to {node_path}: {e}")
+
+            written_ids = {id(entry) for entry in written}
+            self.pending = [entry for entry in self.pending if id(entry) not in written_ids]
+            self.flushed_count += len(written)
+            self._rewrite_log()
+            return len(written)
+
+    def _rewrite_log(self):
+        if not self.log_path:
+            return
+        if not self.pending:
+            if os.path.exists(self.log_path):
+                open(self.log_path, "w").close()
+            return
+        # Only this process writes its log, the swap cannot drop anyone else's entries
+        temp_path = f"{self.log_path}.tmp"
+        with open(temp_path, "w") as file:
+            for entry in self.pending:
+                file.write(json.dumps(entry, default=str) + "\n")
+        os.replace(temp_path, self.log_path)
+
+
+_order_journal = None
+_order_journal_lock = threading.Lock()
+
+
+def get_order_journal():
+    """Returns the process wide journal backed by Firebase."""
+    global _order_journal
+    with _order_journal_lock:
+        # A forked worker must not share the log of its parent
+        if _order_journal is None or _order_journal.pid != os.getpid():
+            _order_journal = OrderJournal()
+        return _order_journal
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    backend = InMemoryJournalBackend()
+    journal = OrderJournal(backend=backend, journal_dir=tempfile.mkdtemp())
+    start = time.perf_counter()
+    for user in range(20):
+        for order in range(50):
+            journal.append(
+                "new_clients",
+                f"Tr{user:02d}",
+                {"order_id": f"{user}-{order}", "qty": 25},
+                "Strategies/Demo/TradeState/orders",
+            )
+        journal.flush()
+    elapsed = time.perf_counter() - start
+    orders = backend.get("new_clients/Tr00/Strategies/Demo/TradeState/orders")
+    print(
+        f"{journal.flushed_count} statuses in {backend.append_calls} appends, "
+        f"{len(orders)} orders for Tr00, {elapsed * 1000:.0f} ms"
+    )
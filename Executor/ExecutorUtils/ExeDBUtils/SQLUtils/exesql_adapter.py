@@ -1,6 +1,8 @@
 import os
 import sqlite3
 import sys
+import threading
+from contextlib import contextmanager
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -14,15 +16,100 @@ from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
 
 logger = LoggerSetup()
 
-def get_db_connection(db_path):
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16000"))
+SQLITE_STATEMENT_CACHE = 256
+
+def configure_connection(conn):
+    """WAL journal, relaxed fsync (safe with WAL), in memory temp tables and a busy timeout."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    return conn
+
+def get_db_connection(db_path, check_same_thread=True):
     """Create a database connection to the SQLite database specified by db_path."""
     conn = None
     try:
-        conn = sqlite3.connect(db_path)
+        conn = configure_connection(
+            sqlite3.connect(
+                db_path, cached_statements=SQLITE_STATEMENT_CACHE, check_same_thread=check_same_thread
+            )
+        )
     except sqlite3.Error as e:
         logger.error(f"An error occurred while connecting to the database: {e}")
     return conn
 
+class SQLiteConnectionCache:
+    """
+    Long lived SQLite connections, one per database path.
+
+    Each connection is opened with ``check_same_thread=False`` and guarded
+    by its own lock, so any thread can use it through :meth:`connection`
+    and the number of open files stays at one per database, however many
+    short lived worker threads come and go. A cached connection keeps its
+    prepared statements between calls; callers must not close it, use
+    :meth:`close_all` at shutdown instead.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = {}
+
+    def _entry(self, db_path):
+        with self.lock:
+            entry = self.connections.get(db_path)
+            if entry is None:
+                conn = get_db_connection(db_path, check_same_thread=False)
+                if conn is None:
+                    raise sqlite3.OperationalError(f"Unable to open {db_path}")
+                entry = self.connections[db_path] = (conn, threading.Lock())
+            return entry
+
+    @contextmanager
+    def connection(self, db_path):
+        """Yields the cached connection of ``db_path``, held by this thread until the block ends."""
+        conn, conn_lock = self._entry(db_path)
+        with conn_lock:
+            yield conn
+
+    def close_all(self):
+        with self.lock:
+            for conn, conn_lock in self.connections.values():
+                with conn_lock:
+                    conn.close()
+            self.connections = {}
+
+connection_cache = SQLiteConnectionCache()
+
+def user_db_path(Tr_No):
+    return os.path.join(os.getenv("DB_DIR"), f"{Tr_No}.db")
+
+def quote_identifier(name):
+    """Quotes a table or column name; identifiers cannot be passed as query parameters."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+@contextmanager
+def transaction(conn):
+    """
+    Runs the block in one transaction, committed on success and rolled back on error.
+
+    Inside an already open transaction the block simply joins it.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
 def format_decimal_values(df, decimal_columns):
     """Format specified columns of a DataFrame to show two decimal places."""
     for col in decimal_columns:
@@ -35,67 +122,149 @@ def format_decimal_values(df, decimal_columns):
 # append the data from df to sqlite db
 def append_df_to_sqlite(conn, df, table_name, decimal_columns):
     if not df.empty:
-        formatted_df = format_decimal_values(df, decimal_columns)
-        # Cast decimal columns to text
-        for col in decimal_columns:
-            if col in formatted_df.columns:
-                formatted_df[col] = formatted_df[col].astype(str)
-        try:
-            formatted_df.to_sql(table_name, conn, if_exists="append", index=False)
-        except Exception as e:
-            logger.error(
-                f"An error occurred while appending to the table {table_name}: {e}"
-            )
-            
+        if not write_frames_to_sqlite(conn, {table_name: df}, decimal_columns):
+            logger.error(f"An error occurred while appending to the table {table_name}")
+
 # dump_df_to_sqlite
 def dump_df_to_sqlite(conn, df, table_name, decimal_columns):
     if not df.empty:
-        formatted_df = format_decimal_values(df, decimal_columns)
-        # Cast decimal columns to text
-        for col in decimal_columns:
-            if col in formatted_df.columns:
-                formatted_df[col] = formatted_df[col].astype(str)
-        try:
-            formatted_df.to_sql(table_name, conn, if_exists="replace", index=False)
-        except Exception as e:
-            logger.error(
-                f"An error occurred while dumping to the table {table_name}: {e}"
-            )
+        if not write_frames_to_sqlite(conn, {table_name: df}, decimal_columns, if_exists="replace"):
+            logger.error(f"An error occurred while dumping to the table {table_name}")
+
+def _sqlite_rows(df):
+    """Rows of ``df`` as plain Python tuples; datetimes become the text pandas' to_sql stores."""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+        # tolist() yields Python scalars, missing values become None for sqlite
+        values = series.tolist()
+        if series.hasnans:
+            values = [None if pd.isna(value) else value for value in values]
+        columns.append(values)
+    return list(zip(*columns))
+
+def write_frames_to_sqlite(conn, frames, decimal_columns, if_exists="append"):
+    """
+    Writes several DataFrames to their tables in a single transaction.
+
+    Unlike append_df_to_sqlite/dump_df_to_sqlite, which commit once per
+    table, either every frame is stored or none is.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        frames (dict): DataFrame per table name.
+        decimal_columns (list): Columns stored as two decimal text, like append_df_to_sqlite.
+        if_exists (str): "append" or "replace".
+
+    Returns:
+        bool: True if the transaction was committed.
+    """
+    if if_exists not in ("append", "replace"):
+        raise ValueError(f"Unsupported if_exists {if_exists}")
+    try:
+        with transaction(conn):
+            for table_name, df in frames.items():
+                if df.empty:
+                    continue
+                formatted_df = format_decimal_values(df.copy(), decimal_columns)
+                quoted_table = quote_identifier(table_name)
+                if if_exists == "replace":
+                    conn.execute(f"DROP TABLE IF EXISTS {quoted_table}")
+                table_exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+                ).fetchone()
+                if not table_exists:
+                    conn.execute(pd.io.sql.get_schema(formatted_df, table_name, con=conn))
+                columns = ", ".join(quote_identifier(col) for col in formatted_df.columns)
+                placeholders = ", ".join("?" for _ in formatted_df.columns)
+                conn.executemany(
+                    f"INSERT INTO {quoted_table} ({columns}) VALUES ({placeholders})",
+                    _sqlite_rows(formatted_df),
+                )
+        return True
+    except Exception as e:
+        logger.error(f"An error occurred while writing the tables {list(frames)}: {e}")
+        return False
 
 def read_strategy_table(conn, strategy_name):
     """Read the strategy table from the database and return a DataFrame."""
-    query = f"SELECT * FROM {strategy_name}"
+    query = f"SELECT * FROM {quote_identifier(strategy_name)}"
     df = pd.read_sql(query, conn)
     return df
 
 def fetch_qty_for_holdings_sqldb(Tr_No, trade_id):
-    # i want just the trade_id.split[0] to match the trade_id.split[0] in the db
+    """Fetch the quantity of the holding whose trade_id starts with the first part of ``trade_id``."""
     trade_id = trade_id.split("_")[0]
-    db_path = os.path.join(os.getenv("DB_DIR"), f"{Tr_No}.db")
-    conn = get_db_connection(db_path) 
-    """Fetch the quantity from the Holdings table from database which match the first part of the trade_id."""
-    query = f"SELECT * FROM Holdings WHERE trade_id LIKE '{trade_id}%'"
-    df = pd.read_sql(query, conn)
-    if not df.empty:
-        qty = df["qty"].values[0]
-    else:
-        qty = 0
-    return qty
+    with connection_cache.connection(user_db_path(Tr_No)) as conn:
+        row = conn.execute(
+            "SELECT qty FROM Holdings WHERE trade_id LIKE ? LIMIT 1", (f"{trade_id}%",)
+        ).fetchone()
+    return row[0] if row else 0
 
-def fetch_sql_table_from_db(Tr_no,table_name):
-    db_path = os.path.join(os.getenv("DB_DIR"), f"{Tr_no}.db")
-    conn = get_db_connection(db_path)
-    query = f"SELECT * FROM {table_name}"
-    df = pd.read_sql(query, conn)
+def fetch_sql_table_from_db(Tr_no, table_name):
+    query = f"SELECT * FROM {quote_identifier(table_name)}"
+    with connection_cache.connection(user_db_path(Tr_no)) as conn:
+        df = pd.read_sql(query, conn)
     return df
 
 def fetch_holdings_value_for_user_sqldb(user):
-    db_path = os.path.join(os.getenv("DB_DIR"), f"{user['Tr_No']}.db")
-    conn = get_db_connection(db_path) 
-    """Fetch the quantity from the Holdings table from database which match the first part of the trade_id."""
-    query = f"SELECT * FROM Holdings"
-    df = pd.read_sql(query, conn)
-    #the margin_utilized is str type convert it to float
-    df['margin_utilized'] = df['margin_utilized'].astype(float)
-    holdings_value = df['margin_utilized'].sum()
-    return holdings_value
\ No newline at end of file
+    """Sum of the margin utilized by the user's holdings (stored as text)."""
+    with connection_cache.connection(user_db_path(user['Tr_No'])) as conn:
+        (holdings_value,) = conn.execute(
+            "SELECT COALESCE(SUM(CAST(margin_utilized AS REAL)), 0.0) FROM Holdings"
+        ).fetchone()
+    return holdings_value
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    import numpy as np
+
+    def to_sql_append(conn, df, table_name, decimal_columns):
+        """The previous append path: pandas to_sql, one commit per call."""
+        formatted_df = format_decimal_values(df.copy(), decimal_columns)
+        formatted_df.to_sql(table_name, conn, if_exists="append", index=False)
+
+    rng = np.random.default_rng(7)
+    rows = 20000
+    trades = pd.DataFrame(
+        {
+            "trade_id": [f"AM{i}" for i in range(rows)],
+            "entry_time": pd.Timestamp("2024-01-01 09:15") + pd.to_timedelta(np.arange(rows), "min"),
+            "entry_price": rng.uniform(50, 500, rows),
+            "qty": rng.integers(1, 10, rows) * 25,
+            "margin_utilized": rng.uniform(1e4, 1e5, rows),
+        }
+    )
+    decimal_columns = ["entry_price", "margin_utilized"]
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        os.environ["DB_DIR"] = db_dir
+        for label, append in (("to_sql", to_sql_append), ("executemany", append_df_to_sqlite)):
+            conn = get_db_connection(os.path.join(db_dir, f"{label}.db"))
+            started = time.perf_counter()
+            append(conn, trades, "Holdings", decimal_columns)
+            bulk = time.perf_counter() - started
+            started = time.perf_counter()
+            for i in range(500):
+                append(conn, trades.iloc[i : i + 1], "Trades", decimal_columns)
+            single = time.perf_counter() - started
+            conn.close()
+            print(f"{label:>11}: {rows / bulk:>10,.0f} rows/s in one frame, {500 / single:>8,.0f} one row appends/s")
+
+        dump_df_to_sqlite(get_db_connection(user_db_path("BENCH")), trades, "Holdings", decimal_columns)
+        started = time.perf_counter()
+        for i in range(500):
+            conn = sqlite3.connect(user_db_path("BENCH"))
+            pd.read_sql(f"SELECT * FROM Holdings WHERE trade_id LIKE 'AM{i}%'", conn)["qty"].values[0]
+            conn.close()
+        per_call = time.perf_counter() - started
+        started = time.perf_counter()
+        for i in range(500):
+            fetch_qty_for_holdings_sqldb("BENCH", f"AM{i}_SH_MO_EN")
+        cached = time.perf_counter() - started
+        print(f"holdings qty lookups: {500 / per_call:,.0f}/s connecting per call, {500 / cached:,.0f}/s cached and prepared")
+        connection_cache.close_all()
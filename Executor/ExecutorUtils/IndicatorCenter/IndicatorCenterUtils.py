@@ -0,0 +1,311 @@
+import math
+
+import numpy as np
+
+# Array kernels for the indicators used by the live strategies and the backtests.
+# Element-wise parts are plain NumPy on shifted arrays; the recursive parts
+# (EWM, trend bands) run as one loop over Python floats taken from contiguous
+# arrays, which avoids the per-row Series indexing of the old implementations.
+
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _nan_min(a, b):
+    if math.isnan(a):
+        return b
+    return a if math.isnan(b) else min(a, b)
+
+
+def _nan_max(a, b):
+    if math.isnan(a):
+        return b
+    return a if math.isnan(b) else max(a, b)
+
+
+def ewm_alpha(span):
+    """Returns the smoothing factor pandas derives from ``span`` (via the center of mass)."""
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+def ewm_step(weighted, value, alpha):
+    """One step of ``Series.ewm(alpha=alpha, adjust=False).mean()`` computed the way pandas does."""
+    if math.isnan(weighted):
+        return value
+    if math.isnan(value) or weighted == value:
+        return weighted
+    old_wt = 1.0 - alpha
+    return (old_wt * weighted + alpha * value) / (old_wt + alpha)
+
+
+def ewm_mean(values, span):
+    """Equivalent of ``Series.ewm(span=span, adjust=False).mean()``."""
+    alpha = ewm_alpha(span)
+    old_wt = 1.0 - alpha
+    total_wt = old_wt + alpha
+    out = []
+    weighted = math.nan
+    # ewm_step inlined, this loop is the hot path of every ATR/EMA
+    for value in _as_array(values).tolist():
+        if weighted != weighted:
+            weighted = value
+        elif value == value and weighted != value:
+            weighted = (old_wt * weighted + alpha * value) / total_wt
+        out.append(weighted)
+    return np.array(out, dtype=np.float64)
+
+
+def rolling_mean(values, window):
+    """Equivalent of ``Series.rolling(window, min_periods=window).mean()``."""
+    values = _as_array(values)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1 :] = windows.sum(axis=1) / window
+    return out
+
+
+def true_range(high, low, close):
+    """True range from shifted arrays; the first bar has no previous close and is NaN."""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    if not len(close):
+        return np.empty(0)
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    ranges = np.maximum(high - low, np.abs(high - prev_close))
+    ranges = np.maximum(ranges, np.abs(low - prev_close))
+    ranges[0] = np.nan
+    return ranges
+
+
+def atr(high, low, close, period):
+    """Average true range smoothed with an EMA of ``period`` bars."""
+    return ewm_mean(true_range(high, low, close), period)
+
+
+def heikin_ashi_levels(open_, high, low, close):
+    """
+    Returns the Heikin-Ashi close and the mid point of the Heikin-Ashi high/low.
+
+    The high/low are taken over the bar's high, open and close, the way the
+    AmiPy supertrend builds its bands.
+    """
+    open_, high, low, close = _as_array(open_), _as_array(high), _as_array(low), _as_array(close)
+    ha_close = (open_ + high + low + close) / 4
+    # fmax/fmin skip NaNs like DataFrame.max(axis=1)
+    ha_high = np.fmax(np.fmax(high, open_), close)
+    ha_low = np.fmin(np.fmin(low, open_), close)
+    return ha_close, (ha_high + ha_low) / 2
+
+
+def amipy_supertrend_step(ha_close, mid, atr_value, multiplier, prev_trend, prev_up, prev_dn):
+    """
+    Advances the AmiPy supertrend by one bar.
+
+    Returns:
+        tuple: ``(trend, up, dn, change_of_trend)`` of the bar.
+    """
+    up = mid + multiplier * atr_value
+    dn = mid - multiplier * atr_value
+
+    change_of_trend = False
+    if ha_close > prev_up:
+        trend = 1
+        change_of_trend = prev_trend == -1
+    elif ha_close < prev_dn:
+        trend = -1
+        change_of_trend = prev_trend == 1
+    else:
+        trend = prev_trend
+
+    if trend > 0 and dn < prev_dn:
+        dn = prev_dn
+    if trend < 0 and up > prev_up:
+        up = prev_up
+    # A flip restarts the band on the new side
+    if trend < 0 and prev_trend > 0:
+        up = mid + multiplier * atr_value
+    if trend > 0 and prev_trend < 0:
+        dn = mid - multiplier * atr_value
+    return trend, up, dn, change_of_trend
+
+
+def amipy_supertrend(open_, high, low, close, period, multiplier):
+    """
+    Supertrend over Heikin-Ashi bands as used by AmiPy.
+
+    Returns:
+        dict: ``ATR``, ``Up``, ``Dn``, ``Trend``, ``TrendUp`` and ``TrendDown`` arrays.
+    """
+    size = len(close)
+    average_true_range = atr(high, low, close, period)
+    ha_close, mid = heikin_ashi_levels(open_, high, low, close)
+
+    up = (mid + multiplier * average_true_range).tolist()
+    dn = (mid - multiplier * average_true_range).tolist()
+    trend = [1.0] * size
+    trend_up = [math.nan] * size
+    trend_down = [math.nan] * size
+
+    ha_close_values = ha_close.tolist()
+    mid_values = mid.tolist()
+    atr_values = average_true_range.tolist()
+    for i in range(1, size):
+        current_trend, up[i], dn[i], change_of_trend = amipy_supertrend_step(
+            ha_close_values[i], mid_values[i], atr_values[i], multiplier, trend[i - 1], up[i - 1], dn[i - 1]
+        )
+        trend[i] = current_trend
+        if current_trend > 0:
+            trend_up[i] = dn[i]
+        if current_trend < 0:
+            trend_down[i] = up[i]
+        if change_of_trend:
+            if current_trend == 1:
+                trend_up[i - 1] = trend_down[i - 1]
+            elif current_trend == -1:
+                trend_down[i - 1] = trend_up[i - 1]
+
+    return {
+        "ATR": average_true_range,
+        "Up": np.array(up, dtype=np.float64),
+        "Dn": np.array(dn, dtype=np.float64),
+        "Trend": np.array(trend, dtype=np.float64),
+        "TrendUp": np.array(trend_up, dtype=np.float64),
+        "TrendDown": np.array(trend_down, dtype=np.float64),
+    }
+
+
+def clamped_supertrend(ha_close, up, dn):
+    """
+    Supertrend whose bands only ever tighten (``StrategyTools.supertrend_new``).
+
+    Returns:
+        tuple: ``(up, dn, trend, trend_up, trend_down)`` with the trend lines forward filled.
+    """
+    ha_close = _as_array(ha_close).tolist()
+    up = _as_array(up).copy()
+    dn = _as_array(dn).copy()
+    size = len(ha_close)
+    trend = np.zeros(size)
+    trend_up = np.full(size, np.nan)
+    trend_down = np.full(size, np.nan)
+    if not size:
+        return up, dn, trend, trend_up, trend_down
+    trend[0] = 1
+
+    up_values = up.tolist()
+    dn_values = dn.tolist()
+    prev_trend = 1
+    last_up = last_down = math.nan
+    for i in range(1, size):
+        if ha_close[i] > up_values[i - 1]:
+            current_trend = 1
+        elif ha_close[i] < dn_values[i - 1]:
+            current_trend = -1
+        else:
+            current_trend = prev_trend
+        if dn_values[i] < dn_values[i - 1]:
+            dn_values[i] = dn_values[i - 1]
+        if up_values[i] > up_values[i - 1]:
+            up_values[i] = up_values[i - 1]
+        # Bars on the other side (or without a band yet) carry the last line forward
+        if current_trend > 0 and dn_values[i] == dn_values[i]:
+            last_up = dn_values[i]
+        if current_trend < 0 and up_values[i] == up_values[i]:
+            last_down = up_values[i]
+        trend[i] = current_trend
+        trend_up[i] = last_up
+        trend_down[i] = last_down
+        prev_trend = current_trend
+
+    return np.array(up_values), np.array(dn_values), trend, trend_up, trend_down
+
+
+def band_supertrend(ha_close, upper_band, lower_band, start):
+    """
+    Supertrend that switches to the previous bar's band on a breakout (``StrategyTools.super_trend``).
+
+    Returns:
+        numpy.ndarray: The supertrend line, NaN before ``start``.
+    """
+    ha_close = _as_array(ha_close).tolist()
+    upper_band = _as_array(upper_band).tolist()
+    lower_band = _as_array(lower_band).tolist()
+    size = len(ha_close)
+    out = np.full(size, np.nan)
+    previous_value = math.nan
+    in_uptrend = True
+    for current in range(start, size):
+        previous = current - 1
+        if ha_close[current] > upper_band[previous]:
+            value = upper_band[previous]
+            in_uptrend = True
+        elif ha_close[current] < lower_band[previous]:
+            value = lower_band[previous]
+            in_uptrend = False
+        else:
+            value = previous_value
+            if in_uptrend and ha_close[current] < previous_value:
+                value = lower_band[previous]
+                in_uptrend = False
+            elif not in_uptrend and ha_close[current] > previous_value:
+                value = upper_band[previous]
+                in_uptrend = True
+        out[current] = value
+        previous_value = value
+    return out
+
+
+def flip_supertrend(close, upper_band, lower_band):
+    """
+    Trend and stop line that follows the tighter of the band and the previous stop.
+
+    Returns:
+        tuple: ``(trend, supertrend)`` arrays, NaN on the first bar.
+    """
+    close = _as_array(close).tolist()
+    upper_band = _as_array(upper_band).tolist()
+    lower_band = _as_array(lower_band).tolist()
+    size = len(close)
+    trend = np.full(size, np.nan)
+    line = np.full(size, np.nan)
+    prev_trend = prev_line = math.nan
+    for i in range(1, size):
+        if close[i] > upper_band[i - 1]:
+            current_trend = 1
+        elif close[i] < lower_band[i - 1]:
+            current_trend = -1
+        else:
+            current_trend = prev_trend
+        # NaN aware like np.fmin/np.fmax, the first stop is the band itself
+        if current_trend == 1:
+            current_line = _nan_min(upper_band[i], prev_line)
+        else:
+            current_line = _nan_max(lower_band[i], prev_line)
+        trend[i] = current_trend
+        line[i] = current_line
+        prev_trend, prev_line = current_trend, current_line
+    return trend, line
+
+
+if __name__ == "__main__":
+    import time
+
+    bars = 375 * 250
+    rng = np.random.default_rng(11)
+    close = 200 + np.cumsum(rng.normal(0, 0.5, bars))
+    open_ = close + rng.normal(0, 0.2, bars)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.3, bars))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.3, bars))
+
+    for name, kernel in (
+        ("rolling_mean", lambda: rolling_mean(close, 13)),
+        ("atr", lambda: atr(high, low, close, 9)),
+        ("ewm_mean", lambda: ewm_mean(close, 256)),
+        ("amipy_supertrend", lambda: amipy_supertrend(open_, high, low, close, 9, 7)),
+    ):
+        started = time.perf_counter()
+        kernel()
+        print(f"{name:>18}: {(time.perf_counter() - started) * 1000:7.1f} ms for {bars} minute bars")
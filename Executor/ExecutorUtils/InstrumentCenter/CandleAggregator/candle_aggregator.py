@@ -0,0 +1,261 @@
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_SECONDS = {
+    "minute": 60,
+    "1minute": 60,
+    "3minute": 180,
+    "5minute": 300,
+    "10minute": 600,
+    "15minute": 900,
+    "30minute": 1800,
+    "60minute": 3600,
+    "1m": 60,
+    "3m": 180,
+    "5m": 300,
+}
+MARKET_TZ = "Asia/Kolkata"
+# Bars are counted from the session open, like Kite's historical candles
+SESSION_OPEN = "09:15"
+
+Candles = namedtuple("Candles", ["start", "open", "high", "low", "close", "volume"])
+
+
+def interval_seconds(interval):
+    """Returns the bar length in seconds for a Kite style interval name or a number of seconds."""
+    if isinstance(interval, str):
+        return INTERVAL_SECONDS[interval]
+    return int(interval)
+
+
+def session_origin(session_open=SESSION_OPEN):
+    """Epoch seconds of the session open on 1970-01-01 in market time, the anchor of every bar bucket."""
+    return int(pd.Timestamp(f"1970-01-01 {session_open}", tz=MARKET_TZ).timestamp())
+
+
+class CandleBuffer:
+    """
+    Fixed size OHLCV history of one token.
+
+    Every bar is written twice, at ``slot`` and ``slot + capacity``, so the
+    latest ``capacity`` bars are always one contiguous slice and
+    :meth:`view` can return NumPy views without copying.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.start = np.zeros(2 * capacity, dtype=np.int64)
+        self.open = np.zeros(2 * capacity)
+        self.high = np.zeros(2 * capacity)
+        self.low = np.zeros(2 * capacity)
+        self.close = np.zeros(2 * capacity)
+        self.volume = np.zeros(2 * capacity)
+        self.count = 0
+        self.slot = -1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def last_start(self):
+        return int(self.start[self.slot]) if self.count else None
+
+    def _write(self, slot, start, open_, high, low, close, volume):
+        for position in (slot, slot + self.capacity):
+            self.start[position] = start
+            self.open[position] = open_
+            self.high[position] = high
+            self.low[position] = low
+            self.close[position] = close
+            self.volume[position] = volume
+
+    def append(self, start, open_, high, low, close, volume=0.0):
+        self.slot = (self.slot + 1) % self.capacity
+        self.count += 1
+        self._write(self.slot, start, open_, high, low, close, volume)
+
+    def apply(self, price, volume=0.0):
+        """Folds a trade into the current bar."""
+        slot = self.slot
+        mirror = slot + self.capacity
+        if price > self.high[slot]:
+            self.high[slot] = self.high[mirror] = price
+        elif price < self.low[slot]:
+            self.low[slot] = self.low[mirror] = price
+        self.close[slot] = self.close[mirror] = price
+        if volume:
+            self.volume[slot] = self.volume[mirror] = self.volume[slot] + volume
+
+    def view(self, count=None):
+        """Returns the latest ``count`` bars, oldest first, as views into the buffer."""
+        size = len(self)
+        count = size if count is None else min(count, size)
+        end = self.slot + 1
+        if end < count:
+            # Read through the mirrored half so the slice does not wrap
+            end += self.capacity
+        begin = end - count
+        return Candles(
+            self.start[begin:end],
+            self.open[begin:end],
+            self.high[begin:end],
+            self.low[begin:end],
+            self.close[begin:end],
+            self.volume[begin:end],
+        )
+
+
+class CandleAggregator:
+    """
+    Builds OHLC bars per instrument token from a tick stream.
+
+    Ticks are folded into the bar of their interval bucket with plain array
+    writes; when a tick falls into a later bucket the previous bar is closed
+    and a new one opened. Ticks without an exchange timestamp (LTP mode)
+    are stamped with the local clock.
+
+    Buckets are anchored at the session open rather than at UTC epoch
+    multiples, so with a 09:15 open the 10, 30 and 60 minute bars start at
+    09:15, 09:25 / 09:45 / 10:15 and so on, as Kite's historical bars do.
+    Intervals should divide a day for the anchor to hold on every day.
+
+    Args:
+        interval (str | int): "minute", "3minute", "5minute" or a bar length in seconds.
+        capacity (int): Bars kept per token, the oldest are overwritten.
+        session_open (str): "HH:MM" market time the bars are counted from.
+    """
+
+    def __init__(self, interval="minute", capacity=1024, session_open=SESSION_OPEN):
+        self.interval = interval_seconds(interval)
+        self.origin = session_origin(session_open)
+        self.capacity = capacity
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def _buffer(self, token):
+        buffer = self.buffers.get(token)
+        if buffer is None:
+            buffer = self.buffers[token] = CandleBuffer(self.capacity)
+        return buffer
+
+    def bucket(self, timestamp):
+        return int((timestamp - self.origin) // self.interval) * self.interval + self.origin
+
+    def add_tick(self, token, price, timestamp=None, volume=0.0):
+        """
+        Folds one trade into the token's bars.
+
+        Returns:
+            bool: True when the tick opened a new bar.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        elif not isinstance(timestamp, (int, float)):
+            # KiteTicker hands out naive local datetimes
+            timestamp = timestamp.timestamp()
+        start = self.bucket(timestamp)
+
+        with self.lock:
+            buffer = self._buffer(token)
+            last_start = buffer.last_start
+            if last_start is not None and start < last_start:
+                # Late tick for an already closed bar
+                return False
+            if last_start == start:
+                buffer.apply(price, volume)
+                return False
+            buffer.append(start, price, price, price, price, volume)
+            return True
+
+    def on_ticks(self, ticks):
+        """
+        Folds a batch of KiteTicker ticks.
+
+        Returns:
+            list: The tokens that opened a new bar in this batch.
+        """
+        opened = []
+        for tick in ticks:
+            timestamp = tick.get("exchange_timestamp") or tick.get("last_trade_time")
+            if self.add_tick(tick["instrument_token"], tick["last_price"], timestamp):
+                opened.append(tick["instrument_token"])
+        return opened
+
+    def seed(self, token, df):
+        """Loads historical bars (a frame indexed by bar start with open/high/low/close) for a token."""
+        starts = pd.DatetimeIndex(df.index)
+        if starts.tz is None:
+            starts = starts.tz_localize(MARKET_TZ)
+        starts = starts.tz_convert("UTC").tz_localize(None).values.astype("datetime64[s]").astype(np.int64)
+        volumes = df["volume"].to_numpy(float) if "volume" in df else np.zeros(len(df))
+        with self.lock:
+            buffer = self._buffer(token)
+            for start, open_, high, low, close, volume in zip(
+                starts, df["open"].to_numpy(float), df["high"].to_numpy(float),
+                df["low"].to_numpy(float), df["close"].to_numpy(float), volumes,
+            ):
+                if buffer.last_start is not None and start <= buffer.last_start:
+                    continue
+                buffer.append(start, open_, high, low, close, volume)
+
+    def view(self, token, count=None):
+        """Returns zero-copy :class:`Candles` arrays of the latest bars; treat them as read only."""
+        buffer = self.buffers.get(token)
+        if buffer is None:
+            return None
+        return buffer.view(count)
+
+    def current(self, token):
+        """Returns the open bar of the token as a :class:`Candles` of scalars, or None."""
+        buffer = self.buffers.get(token)
+        if buffer is None or not buffer.count:
+            return None
+        slot = buffer.slot
+        return Candles(
+            int(buffer.start[slot]),
+            buffer.open[slot],
+            buffer.high[slot],
+            buffer.low[slot],
+            buffer.close[slot],
+            buffer.volume[slot],
+        )
+
+    def to_frame(self, token, count=None):
+        """Copies the latest bars into a DataFrame indexed by bar start in market time."""
+        candles = self.view(token, count)
+        if candles is None:
+            return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+        index = pd.to_datetime(candles.start, unit="s", utc=True).tz_convert(MARKET_TZ)
+        return pd.DataFrame(
+            {
+                "open": candles.open.copy(),
+                "high": candles.high.copy(),
+                "low": candles.low.copy(),
+                "close": candles.close.copy(),
+                "volume": candles.volume.copy(),
+            },
+            index=index.rename("date"),
+        )
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(7)
+    tokens = list(range(50))
+    aggregator = CandleAggregator("minute", capacity=400)
+    session_start = pd.Timestamp("2024-01-01 09:15", tz=MARKET_TZ).timestamp()
+    ticks_per_token = 375 * 60
+    prices = 100 + np.cumsum(rng.normal(0, 0.05, (ticks_per_token, len(tokens))), axis=0)
+
+    started = time.perf_counter()
+    for second in range(ticks_per_token):
+        timestamp = session_start + second
+        for token in tokens:
+            aggregator.add_tick(token, prices[second, token], timestamp)
+    elapsed = time.perf_counter() - started
+    ticks = ticks_per_token * len(tokens)
+    frame = aggregator.to_frame(0)
+    print(f"{ticks} ticks in {elapsed:.2f} s ({elapsed / ticks * 1e6:.2f} us/tick), {len(frame)} bars for token 0")
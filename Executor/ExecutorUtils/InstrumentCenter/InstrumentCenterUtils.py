@@ -1,10 +1,11 @@
 import pandas as pd
 import os, sys
+import threading
+import time
 from dotenv import load_dotenv
 from datetime import datetime
 from calendar import monthrange
 from datetime import timedelta  # Importing the missing timedelta
-from kiteconnect import KiteConnect
 
 DIR_PATH = os.getcwd()
 sys.path.append(DIR_PATH)
@@ -14,13 +15,17 @@ load_dotenv(ENV_PATH)
 from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
 import Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils as BrokerCenterUtils
 import Executor.ExecutorUtils.ExeDBUtils.SQLUtils.exesql_adapter as exesql_adapter
+from Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter import (
+    get_primary_kite_obj,
+)
 
 ins_db_path = os.getenv("SQLITE_INS_PATH")
 logger = LoggerSetup()
 
-def get_ins_df():
+def get_ins_df(db_path=None):
+    conn = None
     try:
-        conn = exesql_adapter.get_db_connection(ins_db_path)
+        conn = exesql_adapter.get_db_connection(db_path or ins_db_path)
         data = pd.read_sql_query("select * from instrument_master", conn)
         # data to dataframe
         ins_df = pd.DataFrame(data)
@@ -28,27 +33,144 @@ def get_ins_df():
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         return None
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+class InstrumentSnapshot:
+    """An immutable copy of the instrument master with hash indexes.
+
+    Each index maps a lookup key to the row positions holding that key, so a
+    lookup is a dict access followed by an ``iloc`` over a handful of rows
+    instead of a boolean mask over the whole table.
+    """
+
+    # index name -> columns making up the key
+    INDEX_COLUMNS = {
+        "exchange_token": ["exchange_token"],
+        "instrument_token": ["instrument_token"],
+        "symbol": ["Symbol"],
+        "symbol_segment": ["Symbol", "segment"],
+        "contract": ["name", "instrument_type", "strike"],
+        "contract_expiry": ["name", "instrument_type", "strike", "expiry"],
+    }
+
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+        self._empty = dataframe.iloc[0:0]
+        self._indexes = {}
+        for index_name, columns in self.INDEX_COLUMNS.items():
+            if all(column in dataframe.columns for column in columns):
+                key = columns[0] if len(columns) == 1 else columns
+                self._indexes[index_name] = dataframe.groupby(
+                    key, sort=False
+                ).indices
+
+    def lookup(self, index_name, key):
+        """Return the rows whose indexed columns equal ``key``."""
+        positions = self._indexes.get(index_name, {}).get(key)
+        if positions is None:
+            return self._empty
+        return self.dataframe.iloc[positions]
+
+
+class InstrumentStore:
+    """Process-wide, load-once store for the instrument master.
+
+    The table at SQLITE_INS_PATH is read once and shared by every
+    :class:`Instrument`. The file's modification time is checked at most once
+    every ``reload_check_interval`` seconds and a changed file is reloaded, so
+    a fresh aggregation is picked up without restarting the process.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            with cls._instance_lock:
+                if not cls._instance:
+                    cls._instance = super(InstrumentStore, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, db_path=None, reload_check_interval=1.0):
+        if not hasattr(self, "_initialized"):
+            self.db_path = db_path or ins_db_path
+            self.reload_check_interval = reload_check_interval
+            self.lock = threading.Lock()
+            self._snapshot = None
+            self._file_signature = None
+            self._last_checked = 0.0
+            self._initialized = True
+
+    def _get_file_signature(self):
+        try:
+            stat = os.stat(self.db_path)
+        except (OSError, TypeError) as e:
+            logger.error(f"Unable to stat instrument master {self.db_path}: {e}")
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature):
+        ins_df = get_ins_df(self.db_path)
+        if ins_df is None:
+            return
+        self._snapshot = InstrumentSnapshot(ins_df)
+        self._file_signature = signature
+        logger.debug(f"Loaded {len(ins_df)} instruments from {self.db_path}")
+
+    def snapshot(self):
+        """Return the current snapshot, reloading it if the file changed."""
+        now = time.monotonic()
+        if (
+            self._snapshot is not None
+            and now - self._last_checked < self.reload_check_interval
+        ):
+            return self._snapshot
+
+        with self.lock:
+            if (
+                self._snapshot is None
+                or now - self._last_checked >= self.reload_check_interval
+            ):
+                signature = self._get_file_signature()
+                if self._snapshot is None or (
+                    signature is not None and signature != self._file_signature
+                ):
+                    self._load(signature)
+                self._last_checked = now
+        return self._snapshot
+
+    def invalidate(self):
+        """Force a reload on the next access."""
+        with self.lock:
+            self._file_signature = None
+            self._last_checked = 0.0
+
 
 class Instrument:
     def __init__(self):
-        self._dataframe = get_ins_df()
+        self._snapshot = InstrumentStore().snapshot()
+        self._dataframe = self._snapshot.dataframe if self._snapshot else None
         self._instrument_token = None
         self._exchange_token = None
 
     def _filter_data(self, base_symbol, option_type, strike_price, expiry=None):
         """Filter the dataframe based on the given criteria."""
-        criteria = (
-            (self._dataframe["name"] == base_symbol)
-            & (self._dataframe["instrument_type"] == option_type)
-            & (self._dataframe["strike"] == strike_price)
-        )
         if expiry:
-            criteria &= self._dataframe["expiry"] == expiry
-        return self._dataframe[criteria].sort_values(by="expiry")
+            filtered_data = self._snapshot.lookup(
+                "contract_expiry", (base_symbol, option_type, strike_price, expiry)
+            )
+        else:
+            filtered_data = self._snapshot.lookup(
+                "contract", (base_symbol, option_type, strike_price)
+            )
+        return filtered_data.sort_values(by="expiry")
 
     def _filter_data_by_exchange_token(self, exchange_token):
         """Filter the dataframe based on the given exchange token."""
-        return self._dataframe[self._dataframe["exchange_token"] == exchange_token]
+        return self._snapshot.lookup("exchange_token", exchange_token)
 
     def _get_monthly_expiries(self, filtered_data, option_type):
         """Identify and return monthly expiry dates from the filtered data."""
@@ -222,7 +344,7 @@ class Instrument:
             return None
 
     def _filter_data_by_token(self, token):
-        return self._dataframe[self._dataframe["instrument_token"] == token]
+        return self._snapshot.lookup("instrument_token", token)
 
     def get_exchange_token_by_token(self, token):
         filtered_data = self._filter_data_by_token(token)
@@ -231,13 +353,14 @@ class Instrument:
         else:
             return None
 
-    def _filter_data_by_name(self, name):
-        return self._dataframe[self._dataframe["Symbol"] == name]
+    def _filter_data_by_name(self, name, segment=None):
+        if segment:
+            return self._snapshot.lookup("symbol_segment", (name, segment))
+        return self._snapshot.lookup("symbol", name)
 
     def get_exchange_token_by_name(self, name, segment=None):
         if segment:
-            filtered_data = self._filter_data_by_name(name)
-            filtered_data = filtered_data[filtered_data["segment"] == segment]
+            filtered_data = self._filter_data_by_name(name, segment)
             return filtered_data.iloc[0]["exchange_token"]
         elif segment is None:
             filtered_data = self._filter_data_by_name(name)
@@ -312,14 +435,7 @@ class Instrument:
         return 546
 
 def get_single_ltp(kite_token=None, exchange_token=None, segment=None):
-    zerodha_primary = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
-    primary_account_session_id = BrokerCenterUtils.fetch_primary_accounts_from_firebase(
-        zerodha_primary
-    )
-    kite = KiteConnect(api_key=primary_account_session_id["Broker"]["ApiKey"])
-    kite.set_access_token(
-        access_token=primary_account_session_id["Broker"]["SessionId"]
-    )
+    kite = get_primary_kite_obj()
     
     if exchange_token:
         if segment:
@@ -333,14 +449,7 @@ def get_single_ltp(kite_token=None, exchange_token=None, segment=None):
         return ltp[str(kite_token)]["last_price"]
 
 def get_single_quote(kite_token=None, exchange_token=None, segment=None):
-    zerodha_primary = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
-    primary_account_session_id = BrokerCenterUtils.fetch_primary_accounts_from_firebase(
-        zerodha_primary
-    )
-    kite = KiteConnect(api_key=primary_account_session_id["Broker"]["ApiKey"])
-    kite.set_access_token(
-        access_token=primary_account_session_id["Broker"]["SessionId"]
-    )
+    kite = get_primary_kite_obj()
     
     if exchange_token:
         if segment:
@@ -1,31 +1,35 @@
+import queue
 import threading
-from time import sleep
+import time
+from collections import deque
 from typing import Any, Callable, Dict
 import os, sys
 
 DIR = os.getcwd()
 sys.path.append(DIR)
-zerodha_primary = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
 
 from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.quote_sources import (
+    FakeQuoteSource,
+    KiteQuoteSource,
+)
+from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.tick_sources import (
+    KiteTickerSource,
+)
+from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.trigger_book import (
+    TriggerBook,
+)
 
 logger = LoggerSetup()
 
 
-from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import (
-    fetch_primary_accounts_from_firebase,
-)
-from Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter import (
-    create_kite_obj,
-)
-from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import Instrument
-
-primary_account_session_id = fetch_primary_accounts_from_firebase(zerodha_primary)
+def get_primary_kite():
+    """Return the primary account's pooled KiteConnect object."""
+    from Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter import (
+        get_primary_kite_obj,
+    )
 
-kite = create_kite_obj(
-    api_key=primary_account_session_id["Broker"]["ApiKey"],
-    access_token=primary_account_session_id["Broker"]["SessionId"],
-)
+    return get_primary_kite_obj()
 
 
 def monitor():
@@ -40,6 +44,9 @@ class InstrumentMonitor:
             cls._instance = super(InstrumentMonitor, cls).__new__(cls)
         return cls._instance
 
+    POLLING_MODES = ("batch", "sequential")
+    BACKENDS = ("poll", "ticker")
+
     def __init__(self):
         if not hasattr(
             self, "_initialized"
@@ -48,14 +55,95 @@ class InstrumentMonitor:
             self.tokens_to_monitor = {}
             self.callback = None
             self.monitor_thread = None
+            self.quote_source = None
+            self.poll_interval = 10
+            self.polling_mode = "batch"
+            self.backend = os.getenv("INSTRUMENT_MONITOR_BACKEND", "poll")
+            self.tick_source = None
+            self.trigger_book = TriggerBook()
+            self._book_dirty = True
+            self._ticker_running = False
+            # Ticker events are fired from a worker so callbacks never block the websocket thread
+            self.trigger_queue = queue.Queue()
+            self.trigger_thread = None
+            self._pending_events = set()
+            self.cycle_stats = deque(maxlen=500)
+            self._stop_event = threading.Event()
             self._initialized = True  # Set the initialized flag
 
+    def configure(
+        self,
+        quote_source=None,
+        poll_interval=None,
+        polling_mode=None,
+        backend=None,
+        tick_source=None,
+    ):
+        """Configure how the monitor receives prices.
+
+        Args:
+        quote_source: Object with a ``fetch_ltps(tokens)`` method. Defaults to
+            a :class:`KiteQuoteSource` on the primary account.
+        poll_interval (float, optional): Seconds between the start of two cycles.
+        polling_mode (str, optional): "batch" fetches every token in one call
+            per cycle, "sequential" makes one call per token.
+        backend (str, optional): "poll" runs the REST poll loop, "ticker"
+            evaluates triggers on every websocket tick batch.
+        tick_source: Object with ``start``/``subscribe``/``stop`` methods used
+            by the ticker backend. Defaults to a :class:`KiteTickerSource`.
+        """
+        if polling_mode is not None and polling_mode not in self.POLLING_MODES:
+            raise ValueError(f"Invalid polling_mode '{polling_mode}'")
+        if backend is not None and backend not in self.BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}'")
+        if backend is not None:
+            self.backend = backend
+        if tick_source is not None:
+            self.tick_source = tick_source
+        if quote_source is not None:
+            self.quote_source = quote_source
+        if poll_interval is not None:
+            self.poll_interval = poll_interval
+        if polling_mode is not None:
+            self.polling_mode = polling_mode
+
+    def _get_quote_source(self):
+        if self.quote_source is None:
+            self.quote_source = KiteQuoteSource(get_primary_kite())
+        return self.quote_source
+
+    def _get_tick_source(self):
+        if self.tick_source is None:
+            kite = get_primary_kite()
+            self.tick_source = KiteTickerSource(kite.api_key, kite.access_token)
+        return self.tick_source
+
     def start_monitoring(self):
+        if self.backend == "ticker":
+            if self._ticker_running:
+                return
+            self._ticker_running = True
+            self._start_trigger_worker()
+            self._get_tick_source().start(
+                list(self.tokens_to_monitor.keys()), self.on_ticks
+            )
+            return
+
         if self.monitor_thread is None or not self.monitor_thread.is_alive():
+            self._stop_event.clear()
             self.monitor_thread = threading.Thread(target=self.monitor)
             self.monitor_thread.daemon = False
             self.monitor_thread.start()
 
+    def stop_monitoring(self):
+        self._stop_event.set()
+        if self._ticker_running:
+            self._get_tick_source().stop()
+            self._ticker_running = False
+        self._stop_trigger_worker()
+        if self.monitor_thread is not None:
+            self.monitor_thread.join()
+
     def add_token(
         self,
         token: str = None,
@@ -72,6 +160,10 @@ class InstrumentMonitor:
         limit (float, optional): The limit price.
         """
         if order_details:
+            from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import (
+                Instrument,
+            )
+
             instrument_obj = Instrument()
             token = str(
                 instrument_obj.get_kite_token_by_exchange_token(
@@ -88,12 +180,16 @@ class InstrumentMonitor:
             logger.error("Token already present:", token)
             return
 
-        self.tokens_to_monitor[token] = {
-            "trigger_points": trigger_points or {},
-            "ltp": None,  # Last Traded Price
-            "order_details": order_details,
-            "ib_level": ib_level,
-        }
+        with self.lock:
+            self.tokens_to_monitor[token] = {
+                "trigger_points": trigger_points or {},
+                "ltp": None,  # Last Traded Price
+                "order_details": order_details,
+                "ib_level": ib_level,
+            }
+            self._book_dirty = True
+        if self._ticker_running:
+            self._get_tick_source().subscribe([token])
 
     def remove_token(self, token: str):
         """Remove a token from monitoring.
@@ -101,8 +197,10 @@ class InstrumentMonitor:
         Args:
         token (str): The token of the instrument.
         """
-        if token in self.tokens_to_monitor:
-            del self.tokens_to_monitor[token]
+        with self.lock:
+            if token in self.tokens_to_monitor:
+                del self.tokens_to_monitor[token]
+                self._book_dirty = True
 
     def set_callback(self, callback: Callable[[str, Any], None]):
         """Set the callback function to be called on trigger events.
@@ -114,24 +212,166 @@ class InstrumentMonitor:
 
     def fetch_ltp(self, token):
         """Fetch the LTP for a given token."""
-        ltp = kite.ltp(
-            token
-        )  # assuming 'kite' is accessible here or you may need to pass it
-        return ltp[str(token)]["last_price"]
+        if self.backend == "ticker":
+            data = self.tokens_to_monitor.get(str(token))
+            if data is not None and data["ltp"] is not None:
+                return data["ltp"]
+        ltp = self._get_quote_source().fetch_ltps([token])
+        return ltp[str(token)]
+
+    def _fetch_cycle_ltps(self, tokens):
+        """Fetch the LTPs of all tokens for one cycle."""
+        if self.polling_mode == "batch":
+            try:
+                return self._get_quote_source().fetch_ltps(tokens)
+            except Exception as e:
+                logger.error(f"Error fetching LTPs for tokens {tokens}: {e}")
+                return {}
+
+        ltps = {}
+        for token in tokens:
+            try:
+                ltps[token] = self.fetch_ltp(token)
+            except Exception as e:
+                logger.error(f"Error fetching LTP for token {token}: {e}")
+        return ltps
+
+    def run_cycle(self):
+        """Fetch prices for every monitored token once and evaluate triggers.
+
+        Returns:
+        dict: Timing metrics of the cycle in milliseconds.
+        """
+        cycle_start = time.perf_counter()
+        tokens = list(self.tokens_to_monitor.keys())
+        logger.debug(f"Monitoring tokens: {tokens}")
+        ltps = self._fetch_cycle_ltps(tokens)
+        fetch_done = time.perf_counter()
+
+        for token in tokens:
+            data = self.tokens_to_monitor.get(token)
+            ltp = ltps.get(token)
+            if data is None or ltp is None:
+                continue
+            try:
+                data["ltp"] = ltp
+                self._process_token(token, ltp, data)
+            except Exception as e:
+                logger.error(f"Error processing token {token}: {e}")
+        cycle_end = time.perf_counter()
+
+        stats = {
+            "tokens": len(tokens),
+            "fetch_ms": (fetch_done - cycle_start) * 1000,
+            "process_ms": (cycle_end - fetch_done) * 1000,
+            "cycle_ms": (cycle_end - cycle_start) * 1000,
+        }
+        self.cycle_stats.append(stats)
+        logger.debug(
+            f"Monitor cycle: {stats['tokens']} tokens, fetch {stats['fetch_ms']:.1f} ms, "
+            f"process {stats['process_ms']:.1f} ms"
+        )
+        return stats
 
     def monitor(self):
+        while not self._stop_event.is_set():
+            stats = self.run_cycle()
+            # Keep a fixed cadence instead of drifting by the cycle duration
+            wait = max(0.0, self.poll_interval - stats["cycle_ms"] / 1000)
+            self._stop_event.wait(wait)
+
+    def on_ticks(self, ticks):
+        """Evaluate every monitored level against one batch of websocket ticks.
+
+        The batch is written into the :class:`TriggerBook` arrays and the
+        crossings of all touched tokens are found with one vectorized pass.
+        The events are handed to the trigger worker, so the callbacks (which
+        may place orders) never run on the websocket thread. An event that
+        is still queued is not raised again by the following batches.
+        """
+        batch_start = time.perf_counter()
+        with self.lock:
+            if self._book_dirty:
+                self.trigger_book.rebuild(self.tokens_to_monitor)
+                self._book_dirty = False
+            rows = self.trigger_book.update(ticks)
+            events = self.trigger_book.evaluate(
+                rows, include_orders=self.callback is not None
+            )
+            for token, event, ltp in events:
+                if (token, event) in self._pending_events:
+                    continue
+                self._pending_events.add((token, event))
+                self.trigger_queue.put((token, event, ltp))
+
+        self.cycle_stats.append(
+            {
+                "tokens": int(rows.size),
+                "process_ms": (time.perf_counter() - batch_start) * 1000,
+            }
+        )
+
+    def _start_trigger_worker(self):
+        if self.trigger_thread is None or not self.trigger_thread.is_alive():
+            self.trigger_thread = threading.Thread(target=self._dispatch_triggers)
+            self.trigger_thread.daemon = True
+            self.trigger_thread.start()
+
+    def _stop_trigger_worker(self):
+        """Fires the events still queued, then stops the trigger worker."""
+        if self.trigger_thread is not None and self.trigger_thread.is_alive():
+            self.trigger_queue.put(None)
+            self.trigger_thread.join()
+        self.trigger_thread = None
+
+    def _dispatch_triggers(self):
         while True:
-            tokens = list(self.tokens_to_monitor.keys())
-            logger.info(f"Monitoring tokens: {tokens}")
-            for token in tokens:
-                try:
-                    ltp = self.fetch_ltp(token)
-                    logger.info(f"The LTP for {token} is {ltp}")
-                    data = self.tokens_to_monitor[token]
-                    self._process_token(token, ltp, data)
-                except Exception as e:
-                    logger.error(f"Error processing token {token}: {e}")
-            sleep(10)
+            item = self.trigger_queue.get()
+            if item is None:
+                return
+            token, event, ltp = item
+            data = self.tokens_to_monitor.get(token)
+            try:
+                if data is not None:
+                    self._fire_event(token, data, event, ltp)
+            except Exception as e:
+                logger.error(f"Error processing token {token}: {e}")
+            finally:
+                with self.lock:
+                    self._pending_events.discard((token, event))
+                    # Callbacks may move target/limit levels, so re-read them
+                    self._book_dirty = True
+
+    def _fire_event(self, token, data, event, ltp):
+        if event in ("IBHigh", "IBLow"):
+            if self.callback:
+                self.callback(
+                    token,
+                    {
+                        "type": "trigger",
+                        "name": event,
+                        "value": ltp,
+                        "ib_level": data["ib_level"],
+                    },
+                )
+            data[f"{event}_triggered"] = True
+
+        elif event == "target":
+            self.callback(
+                token,
+                {"type": "target", "value": ltp},
+                order_details=data["order_details"],
+            )
+            data["target_triggered"] = True
+
+        elif event == "limit":
+            self.callback(
+                token,
+                {"type": "limit", "value": ltp},
+                order_details=data["order_details"],
+            )
+            self.remove_token(token)
+            data["limit_triggered"] = True
 
     def _process_token(self, token, ltp, data):
         order_details = data.get("order_details")
@@ -146,31 +386,11 @@ class InstrumentMonitor:
 
             # Check for upward crossing of IBHigh
             if ltp >= data["trigger_points"]["IBHigh"] and not data["IBHigh_triggered"]:
-                if self.callback:
-                    self.callback(
-                        token,
-                        {
-                            "type": "trigger",
-                            "name": "IBHigh",
-                            "value": ltp,
-                            "ib_level": data["ib_level"],
-                        },
-                    )
-                data["IBHigh_triggered"] = True
+                self._fire_event(token, data, "IBHigh", ltp)
 
             # Check for downward crossing of IBLow
             if ltp <= data["trigger_points"]["IBLow"] and not data["IBLow_triggered"]:
-                if self.callback:
-                    self.callback(
-                        token,
-                        {
-                            "type": "trigger",
-                            "name": "IBLow",
-                            "value": ltp,
-                            "ib_level": data["ib_level"],
-                        },
-                    )
-                data["IBLow_triggered"] = True
+                self._fire_event(token, data, "IBLow", ltp)
 
         if "target_triggered" not in data:
             data["target_triggered"] = False
@@ -184,18 +404,57 @@ class InstrumentMonitor:
                 and ltp >= order_details["target"]
                 and self.callback
             ):
-                self.callback(
-                    token, {"type": "target", "value": ltp}, order_details=order_details
-                )
-                data["target_triggered"] = True
+                self._fire_event(token, data, "target", ltp)
 
             if (
                 order_details["limit_prc"]
                 and ltp <= order_details["limit_prc"]
                 and self.callback
             ):
-                self.callback(
-                    token, {"type": "limit", "value": ltp}, order_details=order_details
-                )
-                self.remove_token(token)
-                data["limit_triggered"] = True
+                self._fire_event(token, data, "limit", ltp)
+
+
+def benchmark_polling(num_tokens=500, cycles=5, call_latency=0.05):
+    """Compare batch and sequential polling against a fake quote source.
+
+    Args:
+    num_tokens (int): Number of tokens to monitor.
+    cycles (int): Number of cycles to run per mode.
+    call_latency (float): Simulated round trip of one quote call in seconds.
+
+    Returns:
+    dict: Mean cycle time in milliseconds for each polling mode.
+    """
+    instrument_monitor = InstrumentMonitor()
+    saved_state = (
+        instrument_monitor.tokens_to_monitor,
+        instrument_monitor.quote_source,
+        instrument_monitor.polling_mode,
+    )
+    instrument_monitor.tokens_to_monitor = {}
+    for token in range(num_tokens):
+        instrument_monitor.add_token(
+            token=str(token), trigger_points={"IBHigh": 1e9, "IBLow": 0.0}
+        )
+
+    results = {}
+    try:
+        for polling_mode in InstrumentMonitor.POLLING_MODES:
+            instrument_monitor.configure(
+                quote_source=FakeQuoteSource(call_latency=call_latency, seed=0),
+                polling_mode=polling_mode,
+            )
+            timings = [instrument_monitor.run_cycle()["cycle_ms"] for _ in range(cycles)]
+            results[polling_mode] = sum(timings) / len(timings)
+    finally:
+        (
+            instrument_monitor.tokens_to_monitor,
+            instrument_monitor.quote_source,
+            instrument_monitor.polling_mode,
+        ) = saved_state
+    return results
+
+
+if __name__ == "__main__":
+    for polling_mode, cycle_ms in benchmark_polling().items():
+        print(f"{polling_mode}: {cycle_ms:.1f} ms per cycle")
@@ -0,0 +1,66 @@
+import random
+import time
+from typing import Dict, Iterable, List
+
+
+class KiteQuoteSource:
+    """Fetches last traded prices from Kite, many tokens per REST call.
+
+    Kite accepts up to 1000 instruments in a single ``ltp`` request, so the
+    tokens are split into chunks of ``batch_size`` and each chunk costs one
+    round trip regardless of how many tokens it carries.
+    """
+
+    def __init__(self, kite, batch_size: int = 500):
+        self.kite = kite
+        self.batch_size = batch_size
+
+    def fetch_ltps(self, tokens: Iterable[str]) -> Dict[str, float]:
+        tokens = [str(token) for token in tokens]
+        ltps = {}
+        for start in range(0, len(tokens), self.batch_size):
+            chunk = tokens[start : start + self.batch_size]
+            quotes = self.kite.ltp(chunk)
+            for token in chunk:
+                quote = quotes.get(token)
+                if quote is not None:
+                    ltps[token] = quote["last_price"]
+        return ltps
+
+
+class FakeQuoteSource:
+    """Offline quote source producing a random walk for every token.
+
+    Used to benchmark the monitor without a broker session. ``call_latency``
+    simulates the round trip of one REST call and ``token_latency`` the extra
+    cost per token carried by that call.
+    """
+
+    def __init__(
+        self,
+        base_prices: Dict[str, float] = None,
+        volatility: float = 0.001,
+        call_latency: float = 0.0,
+        token_latency: float = 0.0,
+        seed: int = None,
+    ):
+        self.prices = {str(k): float(v) for k, v in (base_prices or {}).items()}
+        self.volatility = volatility
+        self.call_latency = call_latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _next_price(self, token: str) -> float:
+        price = self.prices.get(token, 100.0)
+        price *= 1 + self._random.gauss(0, self.volatility)
+        self.prices[token] = round(price, 2)
+        return self.prices[token]
+
+    def fetch_ltps(self, tokens: Iterable[str]) -> Dict[str, float]:
+        tokens: List[str] = [str(token) for token in tokens]
+        self.calls += 1
+        delay = self.call_latency + self.token_latency * len(tokens)
+        if delay:
+            time.sleep(delay)
+        return {token: self._next_price(token) for token in tokens}
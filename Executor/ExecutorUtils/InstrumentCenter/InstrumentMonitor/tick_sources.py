@@ -0,0 +1,89 @@
+import json
+import threading
+from typing import Callable, Iterable, List
+
+
+class KiteTickerSource:
+    """Streams LTP ticks for the subscribed tokens from the Kite websocket."""
+
+    def __init__(self, api_key: str, access_token: str):
+        self.api_key = api_key
+        self.access_token = access_token
+        self.tokens = set()
+        self.kws = None
+
+    def start(self, tokens: Iterable[str], on_ticks: Callable[[List[dict]], None]):
+        from kiteconnect import KiteTicker
+
+        self.tokens.update(int(token) for token in tokens)
+        self.kws = KiteTicker(api_key=self.api_key, access_token=self.access_token)
+
+        def _on_connect(ws, response):  # noqa
+            tokens = list(self.tokens)
+            ws.subscribe(tokens)
+            ws.set_mode(ws.MODE_LTP, tokens)
+
+        self.kws.on_ticks = lambda ws, ticks: on_ticks(ticks)
+        self.kws.on_connect = _on_connect
+        self.kws.connect(threaded=True)
+
+    def subscribe(self, tokens: Iterable[str]):
+        tokens = [int(token) for token in tokens]
+        self.tokens.update(tokens)
+        if self.kws is not None and self.kws.is_connected():
+            self.kws.subscribe(tokens)
+            self.kws.set_mode(self.kws.MODE_LTP, tokens)
+
+    def stop(self):
+        if self.kws is not None:
+            self.kws.close()
+
+
+class ReplayTickSource:
+    """Replays recorded tick batches in place of the live websocket.
+
+    Each batch is a list of tick dicts with at least ``instrument_token`` and
+    ``last_price``, as delivered to ``KiteTicker.on_ticks``. Only ticks for
+    subscribed tokens are passed on, like the live feed.
+    """
+
+    def __init__(self, batches, interval: float = 0.0, threaded: bool = False):
+        self.batches = batches
+        self.interval = interval
+        self.threaded = threaded
+        self.tokens = set()
+        self.replay_thread = None
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def from_file(cls, file_path, **kwargs):
+        """Load batches from a JSON lines file, one batch per line."""
+        with open(file_path, "r") as file:
+            batches = [json.loads(line) for line in file if line.strip()]
+        return cls(batches, **kwargs)
+
+    def start(self, tokens: Iterable[str], on_ticks: Callable[[List[dict]], None]):
+        self.subscribe(tokens)
+        self._stop_event.clear()
+        if self.threaded:
+            self.replay_thread = threading.Thread(target=self._replay, args=(on_ticks,))
+            self.replay_thread.daemon = True
+            self.replay_thread.start()
+        else:
+            self._replay(on_ticks)
+
+    def _replay(self, on_ticks):
+        for batch in self.batches:
+            if self._stop_event.is_set():
+                break
+            ticks = [tick for tick in batch if str(tick["instrument_token"]) in self.tokens]
+            if ticks:
+                on_ticks(ticks)
+            if self.interval:
+                self._stop_event.wait(self.interval)
+
+    def subscribe(self, tokens: Iterable[str]):
+        self.tokens.update(str(token) for token in tokens)
+
+    def stop(self):
+        self._stop_event.set()
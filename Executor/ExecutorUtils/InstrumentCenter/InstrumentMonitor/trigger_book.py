@@ -0,0 +1,101 @@
+import numpy as np
+
+
+def _price_or_nan(value):
+    return float(value) if value else np.nan
+
+
+class TriggerBook:
+    """Array view of the monitored tokens for vectorized trigger checks.
+
+    Every monitored token owns one row holding its last price and the
+    IBHigh/IBLow/target/limit levels. Missing levels are stored as NaN so the
+    comparisons for those rows are simply False. The per-token dicts of the
+    monitor remain the source of truth; the book is rebuilt from them
+    whenever tokens are added, removed or an event changed their levels.
+    """
+
+    EVENTS = ("IBHigh", "IBLow", "target", "limit")
+
+    def __init__(self):
+        self.tokens = []
+        self.rows = {}
+        self.entries = []
+        self.ltp = np.empty(0)
+        self.ib_high = np.empty(0)
+        self.ib_low = np.empty(0)
+        self.target = np.empty(0)
+        self.limit = np.empty(0)
+        self.ib_high_fired = np.empty(0, dtype=bool)
+        self.ib_low_fired = np.empty(0, dtype=bool)
+
+    def rebuild(self, tokens_to_monitor):
+        self.tokens = list(tokens_to_monitor.keys())
+        self.rows = {token: row for row, token in enumerate(self.tokens)}
+        self.entries = [tokens_to_monitor[token] for token in self.tokens]
+
+        size = len(self.tokens)
+        self.ltp = np.full(size, np.nan)
+        self.ib_high = np.full(size, np.nan)
+        self.ib_low = np.full(size, np.nan)
+        self.target = np.full(size, np.nan)
+        self.limit = np.full(size, np.nan)
+        self.ib_high_fired = np.zeros(size, dtype=bool)
+        self.ib_low_fired = np.zeros(size, dtype=bool)
+
+        for row, data in enumerate(self.entries):
+            if data.get("ltp") is not None:
+                self.ltp[row] = data["ltp"]
+            trigger_points = data.get("trigger_points")
+            if trigger_points:
+                self.ib_high[row] = trigger_points["IBHigh"]
+                self.ib_low[row] = trigger_points["IBLow"]
+                self.ib_high_fired[row] = data.get("IBHigh_triggered", False)
+                self.ib_low_fired[row] = data.get("IBLow_triggered", False)
+            order_details = data.get("order_details")
+            if order_details:
+                self.target[row] = _price_or_nan(order_details.get("target"))
+                self.limit[row] = _price_or_nan(order_details.get("limit_prc"))
+
+    def update(self, ticks):
+        """Apply a batch of ticks and return the rows they touched."""
+        rows = []
+        prices = []
+        for tick in ticks:
+            row = self.rows.get(str(tick["instrument_token"]))
+            if row is not None:
+                rows.append(row)
+                prices.append(tick["last_price"])
+        rows = np.asarray(rows, dtype=np.intp)
+        if rows.size:
+            # Later ticks for the same token overwrite earlier ones
+            self.ltp[rows] = prices
+            for row in np.unique(rows):
+                self.entries[row]["ltp"] = self.ltp[row]
+        return np.unique(rows)
+
+    def evaluate(self, rows, include_orders=True):
+        """Return ``(token, event, ltp)`` for every level crossed in ``rows``."""
+        if not rows.size:
+            return []
+
+        ltp = self.ltp[rows]
+        hits = {
+            "IBHigh": ~self.ib_high_fired[rows] & (ltp >= self.ib_high[rows]),
+            "IBLow": ~self.ib_low_fired[rows] & (ltp <= self.ib_low[rows]),
+        }
+        if include_orders:
+            hits["target"] = ltp >= self.target[rows]
+            hits["limit"] = ltp <= self.limit[rows]
+
+        any_hit = np.zeros(rows.size, dtype=bool)
+        for mask in hits.values():
+            any_hit |= mask
+
+        events = []
+        for position in np.flatnonzero(any_hit):
+            row = rows[position]
+            for event in self.EVENTS:
+                if event in hits and hits[event][position]:
+                    events.append((self.tokens[row], event, float(ltp[position])))
+        return events
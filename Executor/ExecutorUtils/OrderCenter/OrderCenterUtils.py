@@ -10,14 +10,17 @@ sys.path.append(DIR)
 
 load_dotenv(os.path.join(DIR, "trademan.env"))
 db_dir = os.getenv("DB_DIR")
+# "sequential" places orders user by user, "parallel" fans users out over a thread pool
+ORDER_DISPATCH_MODE = os.getenv("ORDER_DISPATCH_MODE", "sequential")
+ORDER_DISPATCH_WORKERS = int(os.getenv("ORDER_DISPATCH_WORKERS", 8))
 
 from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
 
 logger = LoggerSetup()
 
 
-from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter import (
-    push_orders_firebase,
+from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.order_journal import (
+    get_order_journal,
 )
 from Executor.ExecutorUtils.InstrumentCenter.FNOInfoBase import FNOInfo
 from Executor.ExecutorUtils.NotificationCenter.Discord.discord_adapter import (
@@ -29,11 +32,39 @@ from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import (
     modify_order_for_brokers,
     fetch_strategy_details_for_user,
     CLIENTS_USER_FB_DB,
-    get_orders_tax
+    ZERODHA,
+    ALICEBLUE,
+    FIRSTOCK,
+    get_orders_tax,
+    get_orders_tax_for_basket,
 )
 from Executor.ExecutorUtils.ExeDBUtils.SQLUtils.exesql_adapter import (
     fetch_qty_for_holdings_sqldb,
 )
+from Executor.ExecutorUtils.OrderCenter.order_dispatch import (
+    BrokerRateLimiters,
+    dispatch_users,
+)
+
+# Orders per second accepted by each broker's order API
+BROKER_ORDER_RATE_LIMITS = {
+    ZERODHA: 10,
+    ALICEBLUE: 10,
+    FIRSTOCK: 10,
+}
+DEFAULT_ORDER_RATE_LIMIT = 10
+
+order_rate_limiters = BrokerRateLimiters(BROKER_ORDER_RATE_LIMITS, DEFAULT_ORDER_RATE_LIMIT)
+
+
+def get_broker_rate_limiter(broker_name, username=None):
+    """Returns the bucket of one broker account; brokers limit orders per API key, not per broker."""
+    return order_rate_limiters.get(broker_name, username)
+
+
+def place_rate_limited_order(order_to_place, user_credentials):
+    get_broker_rate_limiter(order_to_place.get("broker"), order_to_place.get("username")).acquire()
+    return place_order_for_brokers(order_to_place, user_credentials)
 
 def calculate_qty_for_strategies(capital, risk, avg_sl_points, lot_size, qty_amplifier=None, strategy_amplifier=None):
     logger.info(f"Calculating quantity for strategy with capital: {capital}, risk: {risk}, avg_sl_points: {avg_sl_points}, lot_size: {lot_size}")
@@ -74,113 +105,200 @@ def calculate_qty_for_strategies(capital, risk, avg_sl_points, lot_size, qty_amp
         return 0
 
 
-def place_order_for_strategy(strategy_users, order_details, order_qty_mode:str=None):
-    for user in strategy_users:
-        logger.debug(f"Placing orders for user {user['Broker']['BrokerUsername']}")
-        all_order_statuses = []  # To store the status of all orders
+def place_order_for_strategy(strategy_users, order_details, order_qty_mode:str=None, dispatch_mode:str=None):
+    """
+    Places the orders for every user of a strategy.
 
-        for order in order_details:
-            order_with_user_and_broker = order.copy()
-            try:
-                if order_qty_mode == "Sweep":
-                    order_with_user_and_broker.update(
-                        {
-                            "broker": user["Broker"]["BrokerName"],
-                            "username": user["Broker"]["BrokerUsername"],
-                        }
-                    )
-                elif order_qty_mode == "Holdings":
-                    qty = fetch_qty_for_holdings_sqldb(user['Tr_No'], order.get("trade_id"))
-                    logger.debug(f"Qty for trade_id {order.get('trade_id')} is {qty}")
-                    order_with_user_and_broker.update(
-                        {
-                            "broker": user["Broker"]["BrokerName"],
-                            "username": user["Broker"]["BrokerUsername"],
-                            "qty": int(qty),
-                        }
-                    )
-                else:
-                    order_with_user_and_broker.update(
-                        {
-                            "broker": user["Broker"]["BrokerName"],
-                            "username": user["Broker"]["BrokerUsername"],
-                            "qty": user["Strategies"][order.get("strategy")]["Qty"],
-                        }
-                    )
-            except Exception as e:
-                logger.error(f"Error updating order with user and broker: {e}")
-                continue
+    In "parallel" dispatch mode users are handled concurrently on a bounded
+    thread pool while each user's legs are still placed in order, so hedges
+    keep going out before the main leg. Broker order calls are throttled by
+    a per-account rate limiter in both modes.
 
+    Returns:
+        list: The order statuses of the last user in ``strategy_users``.
+    """
+    # Built once for the tax prefetch and the placement, Holdings quantities come from SQLite
+    users_orders = {
+        user["Broker"]["BrokerUsername"]: build_user_orders(user, order_details, order_qty_mode)
+        for user in strategy_users
+    }
+    prefetch_orders_tax(users_orders.values())
+
+    def place_for_user(user):
+        return place_order_for_user(
+            user,
+            order_details,
+            order_qty_mode,
+            users_orders[user["Broker"]["BrokerUsername"]],
+        )
+
+    user_statuses, _ = dispatch_users(
+        strategy_users,
+        place_for_user,
+        dispatch_mode or ORDER_DISPATCH_MODE,
+        ORDER_DISPATCH_WORKERS,
+    )
+    return user_statuses[-1] if user_statuses else []
+
+
+def build_user_order(user, order, order_qty_mode:str=None):
+    """Returns a copy of the order carrying the user's broker, username and quantity."""
+    order_with_user_and_broker = order.copy()
+    if order_qty_mode == "Sweep":
+        order_with_user_and_broker.update(
+            {
+                "broker": user["Broker"]["BrokerName"],
+                "username": user["Broker"]["BrokerUsername"],
+            }
+        )
+    elif order_qty_mode == "Holdings":
+        qty = fetch_qty_for_holdings_sqldb(user['Tr_No'], order.get("trade_id"))
+        logger.debug(f"Qty for trade_id {order.get('trade_id')} is {qty}")
+        order_with_user_and_broker.update(
+            {
+                "broker": user["Broker"]["BrokerName"],
+                "username": user["Broker"]["BrokerUsername"],
+                "qty": int(qty),
+            }
+        )
+    else:
+        order_with_user_and_broker.update(
+            {
+                "broker": user["Broker"]["BrokerName"],
+                "username": user["Broker"]["BrokerUsername"],
+                "qty": user["Strategies"][order.get("strategy")]["Qty"],
+            }
+        )
+    return order_with_user_and_broker
+
+
+def build_user_orders(user, order_details, order_qty_mode:str=None):
+    """Returns build_user_order of each order for the user, None where it failed."""
+    user_orders = []
+    for order in order_details:
+        try:
+            user_orders.append(build_user_order(user, order, order_qty_mode))
+        except Exception as e:
+            logger.error(f"Error updating order with user and broker: {e}")
+            user_orders.append(None)
+    return user_orders
+
+
+def prefetch_orders_tax(users_orders):
+    """
+    Fetches the charges of every leg of every user in one basket pass before dispatch,
+    so get_orders_tax is served from cache on the order path.
+
+    Args:
+        users_orders (iterable): The build_user_orders result of each user.
+    """
+    fno_info = FNOInfo()
+    legs = []
+    for user_orders in users_orders:
+        for order_with_user_and_broker in user_orders:
+            if order_with_user_and_broker is None:
+                continue
             try:
-                # logger.debug(f"Order with user and broker: {order_with_user_and_broker}")
-                max_qty = FNOInfo().get_max_order_qty_by_base_symbol(
+                max_qty = fno_info.get_max_order_qty_by_base_symbol(
                     order_with_user_and_broker.get("base_symbol")
                 )
-                user_credentials = fetch_user_credentials_firebase(
-                    user["Broker"]["BrokerUsername"]
-                )
-
                 order_qty = int(order_with_user_and_broker["qty"])
             except Exception as e:
-                logger.error(f"Error fetching max qty for base symbol: {e}")
+                logger.debug(f"Skipping tax prefetch for user {order_with_user_and_broker.get('username')}: {e}")
                 continue
+            while order_qty > 0:
+                current_qty = min(order_qty, max_qty) if max_qty else order_qty
+                leg = order_with_user_and_broker.copy()
+                leg["qty"] = current_qty
+                legs.append(leg)
+                order_qty -= current_qty
 
-            if max_qty:
-                # logger.debug(f"Max qty for {order_with_user_and_broker.get('base_symbol')} is {max_qty} so splitting orders.")
-                # Split and place orders if necessary
-                try:
-                    while order_qty > 0:
-                        current_qty = min(order_qty, max_qty)
-                        order_to_place = order_with_user_and_broker.copy()
-                        order_to_place["qty"] = current_qty
-
-                        # logger.debug(f"Placing order for {order_to_place}")
-                        order_to_place["tax"] = get_orders_tax(order_to_place, user_credentials)
-                        order_status = place_order_for_brokers(order_to_place, user_credentials)
-                        all_order_statuses.append(order_status)
-
-                        if "Hedge" in order_to_place.get("order_mode", ""):
-                            time.sleep(1)
-                        order_qty -= current_qty
-                except Exception as e:
-                    logger.error(f"Error splitting orders and order not placed: {e}")
-            else:
-                # Place the order
-                # logger.debug(f"Placing order for {order_with_user_and_broker}")
-                try:
-                    order_with_user_and_broker["tax"] = get_orders_tax(order_with_user_and_broker, user_credentials)
-                    order_status = place_order_for_brokers(order_with_user_and_broker, user_credentials)
+    if not legs:
+        return
+    try:
+        get_orders_tax_for_basket(legs)
+    except Exception as e:
+        logger.error(f"Error prefetching order taxes, falling back to per order: {e}")
+
+
+def place_order_for_user(user, order_details, order_qty_mode:str=None, user_orders=None):
+    logger.debug(f"Placing orders for user {user['Broker']['BrokerUsername']}")
+    all_order_statuses = []  # To store the status of all orders
+    fno_info = FNOInfo()
+    order_journal = get_order_journal()
+    if user_orders is None:
+        user_orders = build_user_orders(user, order_details, order_qty_mode)
+    for order, order_with_user_and_broker in zip(order_details, user_orders):
+        if order_with_user_and_broker is None:
+            continue
+
+        try:
+            # logger.debug(f"Order with user and broker: {order_with_user_and_broker}")
+            max_qty = fno_info.get_max_order_qty_by_base_symbol(
+                order_with_user_and_broker.get("base_symbol")
+            )
+            user_credentials = fetch_user_credentials_firebase(
+                user["Broker"]["BrokerUsername"]
+            )
+
+            order_qty = int(order_with_user_and_broker["qty"])
+        except Exception as e:
+            logger.error(f"Error fetching max qty for base symbol: {e}")
+            continue
+
+        if max_qty:
+            # logger.debug(f"Max qty for {order_with_user_and_broker.get('base_symbol')} is {max_qty} so splitting orders.")
+            # Split and place orders if necessary
+            try:
+                while order_qty > 0:
+                    current_qty = min(order_qty, max_qty)
+                    order_to_place = order_with_user_and_broker.copy()
+                    order_to_place["qty"] = current_qty
+
+                    # logger.debug(f"Placing order for {order_to_place}")
+                    order_to_place["tax"] = get_orders_tax(order_to_place, user_credentials)
+                    order_status = place_rate_limited_order(order_to_place, user_credentials)
                     all_order_statuses.append(order_status)
-                except Exception as e:
-                    logger.error(f"Error placing order with no max_qty: {e}")
+
+                    if "Hedge" in order_to_place.get("order_mode", ""):
+                        time.sleep(1)
+                    order_qty -= current_qty
+            except Exception as e:
+                logger.error(f"Error splitting orders and order not placed: {e}")
+        else:
+            # Place the order
+            # logger.debug(f"Placing order for {order_with_user_and_broker}")
+            try:
+                order_with_user_and_broker["tax"] = get_orders_tax(order_with_user_and_broker, user_credentials)
+                order_status = place_rate_limited_order(order_with_user_and_broker, user_credentials)
+                all_order_statuses.append(order_status)
+            except Exception as e:
+                logger.error(f"Error placing order with no max_qty: {e}")
 
         # Update Firebase with order status
-            update_path = f"Strategies/{order.get('strategy')}/TradeState/orders"
-            logger.debug(f"update_path: {update_path}")
-
-            if order_qty_mode == "Sweep":
-                for data in all_order_statuses:
-                    try:
-                        push_orders_firebase(CLIENTS_USER_FB_DB, user["Tr_No"], data, update_path)
-                    except Exception as e:
-                        logger.error(f"Error updating firebase with order status: {e}")
-                all_order_statuses.clear() 
-
-        if order_qty_mode != "Sweep":
+        update_path = f"Strategies/{order.get('strategy')}/TradeState/orders"
+        logger.debug(f"update_path: {update_path}")
+
+        if order_qty_mode == "Sweep":
             for data in all_order_statuses:
-                try:
-                    push_orders_firebase(CLIENTS_USER_FB_DB, user["Tr_No"], data, update_path)
-                except Exception as e:
-                    logger.error(f"Error updating firebase with order status: {e}")
-            
-
-        # Send notification if any orders failed # TODO: check for Zerodha exact fail msgs and send notifications accordingly
-        for status in all_order_statuses:
-            if status.get("message", "") == "Order placement failed":
-                discord_bot(
-                    f"Order failed for user {user['Broker']['BrokerUsername']} in strategy {order.get('strategy')}",
-                    order.get("strategy"),
-                )
+                order_journal.append(CLIENTS_USER_FB_DB, user["Tr_No"], data, update_path)
+            order_journal.flush()
+            all_order_statuses.clear()
+
+    if order_qty_mode != "Sweep":
+        for data in all_order_statuses:
+            order_journal.append(CLIENTS_USER_FB_DB, user["Tr_No"], data, update_path)
+        # One batched update for all of the user's order statuses
+        order_journal.flush()
+
+
+    # Send notification if any orders failed # TODO: check for Zerodha exact fail msgs and send notifications accordingly
+    for status in all_order_statuses:
+        if status.get("message", "") == "Order placement failed":
+            discord_bot(
+                f"Order failed for user {user['Broker']['BrokerUsername']} in strategy {order.get('strategy')}",
+                order.get("strategy"),
+            )
     return all_order_statuses
 
 
@@ -213,7 +331,11 @@ def retrieve_order_id(account_name, strategy, exchange_token: int):
     for strategy_name in user_details:
         if strategy_name == strategy:
             try:
-                for trade in user_details[strategy_name]["TradeState"]["orders"]:
+                trades = user_details[strategy_name]["TradeState"]["orders"]
+                # A sparse orders node comes back from Firebase as a dict
+                if isinstance(trades, dict):
+                    trades = trades.values()
+                for trade in trades:
                     if trade is not None and trade["exchange_token"] == exchange_token and trade["trade_id"].endswith("EX"):
                         order_ids[trade["order_id"]] = trade["qty"]
             except Exception as e:
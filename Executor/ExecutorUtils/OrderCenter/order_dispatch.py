@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+from Executor.ExecutorUtils.rate_limiter import BrokerRateLimiter
+
+
+class BrokerRateLimiters:
+    """
+    Rate limiters of the broker accounts, created on first use.
+
+    Brokers limit orders per API key, not per broker, so every
+    (broker, username) pair gets its own bucket.
+
+    Args:
+        rate_limits (dict): Orders per second by broker name.
+        default_rate (int): Orders per second of brokers missing in ``rate_limits``.
+    """
+
+    def __init__(self, rate_limits, default_rate):
+        self.rate_limits = rate_limits
+        self.default_rate = default_rate
+        self.limiters = {}
+        self.lock = threading.Lock()
+
+    def get(self, broker_name, username=None):
+        key = (broker_name, username)
+        with self.lock:
+            if key not in self.limiters:
+                self.limiters[key] = BrokerRateLimiter(
+                    self.rate_limits.get(broker_name, self.default_rate)
+                )
+            return self.limiters[key]
+
+
+def dispatch_users(users, place_for_user, dispatch_mode="sequential", max_workers=8):
+    """
+    Calls ``place_for_user`` for every user, concurrently in "parallel" mode.
+
+    Each call places all legs of one user, so the legs of a user keep their
+    order whichever the mode.
+
+    Args:
+        users (list): User dicts carrying ``Broker.BrokerUsername``.
+        place_for_user (callable): Places the orders of one user and returns their statuses.
+        dispatch_mode (str): "sequential" or "parallel".
+        max_workers (int): Upper bound of the thread pool in "parallel" mode.
+
+    Returns:
+        tuple: The result of each user in the order of ``users``, and the seconds from
+        dispatch start until each user was done, keyed by BrokerUsername.
+    """
+    dispatch_start = time.perf_counter()
+    latencies = {}
+
+    def place_and_time(user):
+        statuses = place_for_user(user)
+        latency = time.perf_counter() - dispatch_start
+        latencies[user["Broker"]["BrokerUsername"]] = latency
+        logger.debug(f"Orders for user {user['Broker']['BrokerUsername']} done in {latency * 1000:.0f} ms")
+        return statuses
+
+    if dispatch_mode == "parallel" and len(users) > 1:
+        workers = min(max_workers, len(users))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(place_and_time, users))
+    else:
+        results = [place_and_time(user) for user in users]
+
+    if latencies:
+        logger.info(
+            f"Placed orders for {len(latencies)} users in {dispatch_mode} mode, "
+            f"first done at {min(latencies.values()) * 1000:.0f} ms, "
+            f"last at {max(latencies.values()) * 1000:.0f} ms"
+        )
+    return results, latencies
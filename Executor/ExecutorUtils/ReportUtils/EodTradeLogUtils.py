@@ -0,0 +1,205 @@
+import os
+import sys
+
+import pandas as pd
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+TRADE_DECIMAL_COLUMNS = [
+    "pnl",
+    "tax",
+    "entry_price",
+    "exit_price",
+    "hedge_entry_price",
+    "hedge_exit_price",
+    "trade_points",
+    "net_pnl",
+]
+TRADE_COLUMNS = [
+    "trade_id",
+    "trading_symbol",
+    "signal",
+    "entry_time",
+    "exit_time",
+    "entry_price",
+    "exit_price",
+    "hedge_entry_price",
+    "hedge_exit_price",
+    "trade_points",
+    "qty",
+    "pnl",
+    "tax",
+    "net_pnl",
+]
+TRADE_KEYS = ["Tr_No", "strategy", "trade_prefix"]
+TRADE_KEYS = ["Tr_No", "strategy", "trade_prefix"]
+
+
+ORDER_COLUMNS = [
+    "Tr_No", "strategy", "trade_prefix", "position", "kind", "order_id", "trade_id", "is_main",
+    "is_entry_leg", "is_exit_leg", "avg_prc", "qty", "tax", "time_stamp", "exchange_token",
+]
+
+
+def order_record(tr_no, strategy_name, position, order):
+    """
+    Flat record of one TradeState order, None for orders the trade log ignores.
+
+    Each order is classified once: entry ("EN" without "HO"), exit ("EX"
+    without "HO") or hedge ("HO"), the same rules the trade log always used.
+    """
+    if not order or "trade_id" not in order:
+        return None
+    trade_id = order["trade_id"]
+    if "HO" in trade_id:
+        kind = "hedge"
+    elif "EN" in trade_id:
+        kind = "entry"
+    elif "EX" in trade_id:
+        kind = "exit"
+    else:
+        return None
+    return {
+        "Tr_No": tr_no,
+        "strategy": strategy_name,
+        "trade_prefix": trade_id.split("_")[0],
+        "position": position,
+        "kind": kind,
+        "order_id": order.get("order_id"),
+        "trade_id": trade_id,
+        "is_main": "MO" in trade_id,
+        "is_entry_leg": "EN" in trade_id,
+        "is_exit_leg": "EX" in trade_id,
+        "avg_prc": order.get("avg_prc"),
+        "qty": order.get("qty"),
+        "tax": order.get("tax"),
+        "time_stamp": order.get("time_stamp"),
+        "exchange_token": order.get("exchange_token"),
+    }
+
+
+def orders_frame(records):
+    """DataFrame of :func:`order_record` records with numeric prices, quantities and taxes."""
+    orders = pd.DataFrame.from_records(records, columns=ORDER_COLUMNS)
+    orders["avg_prc"] = pd.to_numeric(orders["avg_prc"], errors="coerce")
+    orders["qty"] = pd.to_numeric(orders["qty"], errors="coerce")
+    orders["tax"] = pd.to_numeric(orders["tax"], errors="coerce")
+    return orders
+
+
+def aggregate_trades(orders, multileg_flags, trading_symbol_lookup):
+    """
+    Computes the trade log rows of every (user, strategy, trade prefix) in one pass.
+
+    Multileg strategies sum the leg prices, the others average them. A
+    trade needs entry and exit orders and a main entry leg ("MO"); trades
+    missing any of them, or with unusable prices or times, are skipped and
+    their orders stay in Firebase.
+
+    Args:
+        orders (pandas.DataFrame): See :func:`orders_frame`.
+        multileg_flags (dict): MultiLeg flag per strategy, see :func:`load_multileg_flags`.
+        trading_symbol_lookup (callable): Exchange token (str) to trading symbol.
+
+    Returns:
+        pandas.DataFrame: ``TRADE_KEYS`` followed by ``TRADE_COLUMNS``, one row per trade.
+    """
+    orders = orders[orders["strategy"].isin(list(multileg_flags))]
+    if orders.empty:
+        return pd.DataFrame(columns=TRADE_KEYS + TRADE_COLUMNS)
+
+    entry = orders["kind"] == "entry"
+    exit_ = orders["kind"] == "exit"
+    hedge = orders["kind"] == "hedge"
+    prices = orders["avg_prc"]
+    tokens = orders["exchange_token"].astype(object)
+    frame = orders.assign(
+        entry_prc=prices.where(entry, 0.0),
+        exit_prc=prices.where(exit_, 0.0),
+        hedge_entry_prc=prices.where(hedge & orders["is_entry_leg"]),
+        hedge_exit_prc=prices.where(hedge & orders["is_exit_leg"]),
+        entry_count=entry.astype(int),
+        exit_count=exit_.astype(int),
+        hedge_count=hedge.astype(int),
+        bad_values=(prices.isna() | orders["tax"].isna()).astype(int),
+        entry_time=orders["time_stamp"].where(entry),
+        exit_time=orders["time_stamp"].where(exit_),
+        entry_trade_id=orders["trade_id"].where(entry),
+        entry_qty=orders["qty"].where(entry),
+        entry_token=tokens.where(entry),
+        main_token=tokens.where(entry & orders["is_main"]),
+    )
+    grouped = frame.groupby(TRADE_KEYS, sort=False)
+    trades = grouped.agg(
+        entry_sum=("entry_prc", "sum"),
+        entry_count=("entry_count", "sum"),
+        exit_sum=("exit_prc", "sum"),
+        exit_count=("exit_count", "sum"),
+        hedge_entry_sum=("hedge_entry_prc", "sum"),
+        hedge_entry_count=("hedge_entry_prc", "count"),
+        hedge_exit_sum=("hedge_exit_prc", "sum"),
+        hedge_exit_count=("hedge_exit_prc", "count"),
+        hedge_count=("hedge_count", "sum"),
+        bad_values=("bad_values", "sum"),
+        entry_time=("entry_time", "min"),
+        exit_time=("exit_time", "max"),
+        first_trade_id=("entry_trade_id", "first"),
+        main_token=("main_token", "first"),
+        last_entry_qty=("entry_qty", "last"),
+        last_entry_token=("entry_token", "last"),
+        tax=("tax", "sum"),
+    )
+    trades = trades[(trades["entry_count"] > 0) & (trades["exit_count"] > 0)]
+
+    # Quantity of the main leg, all entries sharing its exchange token
+    main_token = frame[TRADE_KEYS].merge(
+        trades["main_token"].reset_index(), on=TRADE_KEYS, how="left"
+    )["main_token"].to_numpy()
+    is_main_leg = (frame["kind"].to_numpy() == "entry") & (frame["exchange_token"].to_numpy() == main_token)
+    main_qty = frame["qty"].where(is_main_leg).groupby([frame[key] for key in TRADE_KEYS], sort=False).sum()
+    trades["main_qty"] = main_qty.reindex(trades.index).to_numpy()
+
+    multileg = trades.index.get_level_values("strategy").map(multileg_flags).to_numpy(dtype=bool)
+    has_hedge = trades["hedge_count"] > 0
+
+    def leg_price(total, count, default=None):
+        price = total.where(multileg, total / count.where(count > 0))
+        return price if default is None else price.where(default, 0.0)
+
+    trades["entry_price"] = leg_price(trades["entry_sum"], trades["entry_count"])
+    trades["exit_price"] = leg_price(trades["exit_sum"], trades["exit_count"])
+    trades["hedge_entry_price"] = leg_price(trades["hedge_entry_sum"], trades["hedge_entry_count"], has_hedge)
+    trades["hedge_exit_price"] = leg_price(trades["hedge_exit_sum"], trades["hedge_exit_count"], has_hedge)
+
+    trades["signal"] = trades["first_trade_id"].str.contains("_SH_", regex=False).map({True: "Short", False: "Long"})
+    hedge_points = trades["hedge_exit_price"] - trades["hedge_entry_price"]
+    direction = trades["signal"].map({"Short": -1.0, "Long": 1.0})
+    trades["trade_points"] = direction * (trades["exit_price"] - trades["entry_price"]) + hedge_points
+    trades["qty"] = trades["main_qty"].where(
+        trades["last_entry_token"].to_numpy() == trades["main_token"].to_numpy(), trades["last_entry_qty"]
+    )
+    trades["pnl"] = trades["trade_points"] * trades["qty"]
+    trades["net_pnl"] = trades["pnl"] - trades["tax"]
+    trades["entry_time"] = pd.to_datetime(trades["entry_time"], format="%Y-%m-%d %H:%M", errors="coerce")
+    trades["exit_time"] = pd.to_datetime(trades["exit_time"], format="%Y-%m-%d %H:%M", errors="coerce")
+
+    valid = trades[["entry_price", "exit_price", "hedge_entry_price", "hedge_exit_price", "qty"]].notna().all(axis=1)
+    valid &= (trades["bad_values"] == 0) & trades["main_token"].notna() & trades["entry_time"].notna() & trades["exit_time"].notna()
+    for key in trades.index[~valid]:
+        logger.warning(f"Skipping trade {key} due to invalid trade details.")
+    trades = trades[valid]
+
+    symbols = {token: trading_symbol_lookup(str(token)) for token in trades["main_token"].unique()}
+    trades["trading_symbol"] = trades["main_token"].map(symbols)
+    trades["trade_id"] = trades.index.get_level_values("trade_prefix")
+    trades["qty"] = trades["qty"].astype("int64") if (trades["qty"] % 1 == 0).all() else trades["qty"]
+    return trades.reset_index()[TRADE_KEYS + TRADE_COLUMNS]
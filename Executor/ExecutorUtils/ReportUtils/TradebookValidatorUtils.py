@@ -0,0 +1,76 @@
+import os
+import sys
+
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_utils import (
+    iter_strategy_orders,
+)
+
+
+def build_order_index(user, strategies, today):
+    """
+    Maps the order id of every order placed today to its Firebase path.
+
+    Built once per user, so matching a trade of the tradebook is a dict
+    lookup instead of a scan over every strategy's orders.
+
+    Args:
+        user (dict): The user the strategies belong to.
+        strategies (dict): The user's Strategies node.
+        today (str): The date of the orders to index, as "%Y-%m-%d".
+
+    Returns:
+        dict: ``order_id -> (strategy_key, index)``; the first strategy wins
+        if an order id is listed twice.
+    """
+    order_index = {}
+    for strategy_key, strategy_data in strategies.items():
+        orders_from_firebase = (strategy_data or {}).get("TradeState", {}).get("orders", [])
+        if not orders_from_firebase:
+            logger.warning(f"No orders found for user: {user['Broker']['BrokerUsername']} for strategy: {strategy_key}")
+            continue
+        for index, order in iter_strategy_orders(orders_from_firebase):
+            if order is None or "order_id" not in order:
+                continue
+            if order.get("time_stamp", "").split(" ")[0] == today:
+                order_index.setdefault(str(order["order_id"]), (strategy_key, index))
+    return order_index
+
+
+def match_tradebook(user_tradebook, order_index, order_id_key, avg_price_key):
+    """
+    Matches the trades of a tradebook against an order index.
+
+    Args:
+        user_tradebook (list): The broker's trades of the day.
+        order_index (dict): See :func:`build_order_index`.
+        order_id_key (str): The broker's key of the order id in a trade.
+        avg_price_key (str): The broker's key of the average price in a trade.
+
+    Returns:
+        tuple: The multi-path Firebase update setting ``avg_prc`` of every
+        matched order, the matched order ids and the unmatched trades.
+    """
+    avg_prc_updates = {}
+    matched_orders = set()
+    unmatched_trades = []
+    for trade in user_tradebook:
+        trade_order_id = str(trade[order_id_key])
+        if trade_order_id in order_index:
+            strategy_key, index = order_index[trade_order_id]
+            avg_prc_updates[f"Strategies/{strategy_key}/TradeState/orders/{index}/avg_prc"] = trade[avg_price_key]
+            matched_orders.add(trade_order_id)
+        else:
+            unmatched_trades.append(trade)
+    return avg_prc_updates, matched_orders, unmatched_trades
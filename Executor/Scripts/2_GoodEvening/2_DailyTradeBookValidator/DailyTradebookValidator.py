@@ -1,6 +1,8 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from time import perf_counter
 
 import pandas as pd
 from dotenv import load_dotenv
@@ -17,6 +19,7 @@ logger = LoggerSetup()
 
 CLIENTS_TRADE_SQL_DB = os.getenv("DB_DIR")
 CLIENTS_USER_FB_DB = os.getenv("FIREBASE_USER_COLLECTION")
+TRADEBOOK_FETCH_WORKERS = int(os.getenv("TRADEBOOK_FETCH_WORKERS", "8"))
 
 from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_utils import (
     download_json
@@ -24,12 +27,15 @@ from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_utils impo
 import Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils as BrokerCenterUtils
 from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter import (
     update_fields_firebase,
-    delete_fields_firebase,
 )
 from Executor.ExecutorUtils.ExeDBUtils.SQLUtils.exesql_adapter import (
     append_df_to_sqlite,
     get_db_connection,
 )
+from Executor.ExecutorUtils.ReportUtils.TradebookValidatorUtils import (
+    build_order_index,
+    match_tradebook,
+)
 
 
 def get_todays_date():
@@ -65,106 +71,100 @@ def create_user_transaction_db_entry(trade, broker):
     }
 
 
-def get_update_path(order_id, strategies):
-    try:
-        for strategy_key, strategy_data in strategies.items():
-            trade_state = strategy_data.get("TradeState", {})
-            orders_from_firebase = trade_state.get("orders", [])
-            for i, order in enumerate(orders_from_firebase):
-                if str(order["order_id"]) == order_id:
-                    return f"Strategies/{strategy_key}/TradeState/orders/{i}"
-    except Exception as e:
-        logger.error(f"Error in get_update_path: {e}")
-
-def get_order_ids_from_strategies(user,strategies):
-    today = get_todays_date()
-    order_ids = set()
-    logger.debug(f"Getting order ids for user: {user['Broker']['BrokerUsername']}")
-    try:
-        for strategy_key, strategy_data in strategies.items():
-            trade_state = strategy_data.get("TradeState", {})
-            orders_from_firebase = trade_state.get("orders", [])
-
-            if not orders_from_firebase:
-                logger.warning(f"No orders found for user: {user['Broker']['BrokerUsername']} for strategy: {strategy_key}")
-                continue
-
-            for order in orders_from_firebase:
-                if order is not None:
-                    order_id_str = str(order["order_id"])
-                    order_date_timestamp = order.get("time_stamp", "").split(" ")[0]
-                    if order_date_timestamp == today:
-                        order_ids.add(order_id_str)
-        return order_ids
-    except Exception as e:
-        logger.error(f"Error in get_order_ids_from_strategies for user: {user['Broker']['BrokerUsername']}. Error: {e}")
+def fetch_tradebooks(active_users, workers=TRADEBOOK_FETCH_WORKERS):
+    """Fetches today's tradebook of every user concurrently, keyed by Tr_No."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            user["Tr_No"]: executor.submit(BrokerCenterUtils.get_today_orders_for_brokers, user)
+            for user in active_users
+        }
+        tradebooks = {}
+        for tr_no, future in futures.items():
+            try:
+                tradebooks[tr_no] = future.result() or []
+            except Exception as e:
+                logger.error(f"Error fetching the tradebook of {tr_no}: {e}")
+                tradebooks[tr_no] = []
+    return tradebooks
+
+
+def validate_user_tradebook(user, user_tradebook):
+    """
+    Matches one user's tradebook against the orders in Firebase.
+
+    Matched orders get the broker's average price in one Firebase update
+    and unmatched trades are appended to UserTransactions in one write.
+
+    Returns:
+        tuple: The matched and unmatched order ids.
+    """
+    broker_name = user["Broker"]["BrokerName"]
+    avg_price_key = BrokerCenterUtils.get_avg_prc_broker_key(broker_name)
+    order_id_key = BrokerCenterUtils.get_order_id_broker_key(broker_name)
+    order_index = build_order_index(user, user.get("Strategies", {}), get_todays_date())
+    avg_prc_updates, matched_orders, unmatched_trades = match_tradebook(
+        user_tradebook, order_index, order_id_key, avg_price_key
+    )
 
-
-def daily_tradebook_validator():
-    active_users = BrokerCenterUtils.fetch_active_users_from_firebase()
-    logger.debug(f"Validating tradebook for no of users: {len(active_users)}")
-    matched_orders = set()
     unmatched_orders = set()
-
-    for user in active_users:
-        logger.debug(f"Validating tradebook for user: {user['Broker']['BrokerUsername']}")
-        db_path = os.path.join(CLIENTS_TRADE_SQL_DB, f"{user['Tr_No']}.db")
-        conn = get_db_connection(db_path)
-        strategies = user.get("Strategies", {})
-
-        user_tradebook = BrokerCenterUtils.get_today_orders_for_brokers(user)
-        processed_order_ids = set()
-        order_ids = get_order_ids_from_strategies(user,strategies)
-
+    unmatched_rows = []
+    for trade in unmatched_trades:
+        trade_order_id = str(trade[order_id_key])
+        unmatched_details = create_user_transaction_db_entry(trade, broker_name)
         try:
-            for trade in user_tradebook:
-                avg_price_key = BrokerCenterUtils.get_avg_prc_broker_key(
-                    user["Broker"]["BrokerName"]
-                )
-                order_id_key = BrokerCenterUtils.get_order_id_broker_key(
-                    user["Broker"]["BrokerName"]
-                )
-                trade_order_id = str(trade[order_id_key])
-                processed_order_ids.add(trade_order_id)
-
-                if trade_order_id in order_ids:
-                    avg_prc = trade[avg_price_key]
-                    update_path = get_update_path(trade_order_id, strategies)
-                    update_fields_firebase(
-                        BrokerCenterUtils.CLIENTS_USER_FB_DB, user["Tr_No"], {"avg_prc": avg_prc}, update_path
-                    )
-                    matched_orders.add(trade_order_id)
-                else:
-                    unmatched_details = create_user_transaction_db_entry(
-                        trade, user["Broker"]["BrokerName"]
-                    )
-                    
-                    try:
-                        if unmatched_details["avg_prc"] is None or not unmatched_details["avg_prc"]:
-                            unmatched_details["avg_prc"] = 0.0
-                        else:
-                            unmatched_details["avg_prc"] = float(unmatched_details["avg_prc"])
-                    except ValueError:
-                        unmatched_details["avg_prc"] = 0.0
-                        continue
-
-                    unmatched_details = pd.DataFrame([unmatched_details])
-                    decimal_columns = ["avg_prc"]
-                    append_df_to_sqlite(
-                        conn, unmatched_details, "UserTransactions", decimal_columns
-                    )
-                    unmatched_orders.add(trade_order_id)
-
+            if unmatched_details["avg_prc"] is None or not unmatched_details["avg_prc"]:
+                unmatched_details["avg_prc"] = 0.0
+            else:
+                unmatched_details["avg_prc"] = float(unmatched_details["avg_prc"])
+        except ValueError:
+            continue
+        unmatched_rows.append(unmatched_details)
+        unmatched_orders.add(trade_order_id)
+
+    if avg_prc_updates:
+        update_fields_firebase(BrokerCenterUtils.CLIENTS_USER_FB_DB, user["Tr_No"], avg_prc_updates)
+    if unmatched_rows:
+        conn = get_db_connection(os.path.join(CLIENTS_TRADE_SQL_DB, f"{user['Tr_No']}.db"))
+        try:
+            append_df_to_sqlite(conn, pd.DataFrame(unmatched_rows), "UserTransactions", ["avg_prc"])
+        finally:
             conn.close()
 
-            logger.debug(f"Matched Orders: {matched_orders}")
-            logger.debug(f"Unmatched Orders: {unmatched_orders}")
-        except Exception as e:
-            logger.error(f"Error in daily_tradebook_validator for user: {user['Broker']['BrokerUsername']}. Error: {e}") 
+    logger.debug(f"Matched Orders: {matched_orders}")
+    logger.debug(f"Unmatched Orders: {unmatched_orders}")
+    return matched_orders, unmatched_orders
+
 
-        # clear the lists after iterating through each user
-        matched_orders.clear()
-        unmatched_orders.clear()
+def daily_tradebook_validator(workers=TRADEBOOK_FETCH_WORKERS):
+    """
+    Validates today's tradebook of every active user.
+
+    The tradebooks are fetched concurrently and each user is then matched
+    and written from the same pool, so the run time stays close to the
+    slowest broker instead of growing with the number of users.
+    """
+    started = perf_counter()
+    active_users = BrokerCenterUtils.fetch_active_users_from_firebase()
+    logger.debug(f"Validating tradebook for no of users: {len(active_users)}")
+    tradebooks = fetch_tradebooks(active_users, workers)
+    fetched = perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(validate_user_tradebook, user, tradebooks[user["Tr_No"]]): user
+            for user in active_users
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(
+                    f"Error in daily_tradebook_validator for user: {futures[future]['Broker']['BrokerUsername']}. Error: {e}"
+                )
+    logger.info(
+        f"Validated {len(active_users)} tradebooks, fetched in {fetched - started:.2f} s "
+        f"and matched in {perf_counter() - fetched:.2f} s"
+    )
 
 
 def clear_extra_orders_firebase():
@@ -172,19 +172,22 @@ def clear_extra_orders_firebase():
     for user in active_users:
         logger.debug(f"Clearing extra orders for user: {user['Broker']['BrokerUsername']}")
         strategies = user.get("Strategies", {})
-        if strategies:
-            for strategy_key, strategy_data in strategies.items():
-                    logger.debug(f"Clearing extra orders for strategy: {strategy_key}")
-                    trade_state = strategy_data.get("TradeState", {})
-                    orders_from_firebase = trade_state.get("orders", [])
-                    orders_to_delete = [i for i, order in enumerate(orders_from_firebase) if order is not None and not order.get("avg_prc")]
-                    for i in orders_to_delete:
-                        order_path = f"Strategies/{strategy_key}/TradeState/orders/{i}"
-                        logger.debug(f"Deleting order at path: {order_path}")
-                        try:
-                            delete_fields_firebase(BrokerCenterUtils.CLIENTS_USER_FB_DB, user["Tr_No"], order_path)
-                        except Exception as e:
-                            logger.error(f"Error deleting order at path: {order_path}. Error: {str(e)}")
+        # A None value deletes the path, so all extra orders of the user go in one update
+        deletions = {}
+        for strategy_key, strategy_data in strategies.items():
+            logger.debug(f"Clearing extra orders for strategy: {strategy_key}")
+            orders_from_firebase = (strategy_data or {}).get("TradeState", {}).get("orders", [])
+            for i, order in iter_strategy_orders(orders_from_firebase):
+                if order is not None and not order.get("avg_prc"):
+                    order_path = f"Strategies/{strategy_key}/TradeState/orders/{i}"
+                    logger.debug(f"Deleting order at path: {order_path}")
+                    deletions[order_path] = None
+        if not deletions:
+            continue
+        try:
+            update_fields_firebase(BrokerCenterUtils.CLIENTS_USER_FB_DB, user["Tr_No"], deletions)
+        except Exception as e:
+            logger.error(f"Error deleting the extra orders of {user['Tr_No']}. Error: {str(e)}")
 
 def main():
     download_json(CLIENTS_USER_FB_DB, "before_daily_tradebook_validator")
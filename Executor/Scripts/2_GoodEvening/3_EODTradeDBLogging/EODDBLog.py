@@ -1,8 +1,9 @@
 import os
 import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from time import sleep
+from time import perf_counter, sleep
 
 import pandas as pd
 from dotenv import load_dotenv
@@ -30,7 +31,7 @@ from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import (
 from Executor.ExecutorUtils.ExeDBUtils.SQLUtils.exesql_adapter import (
     append_df_to_sqlite,
     get_db_connection,
-    dump_df_to_sqlite
+    write_frames_to_sqlite
 )
 from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter import (
     delete_fields_firebase,
@@ -38,9 +39,18 @@ from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_adapter im
     update_fields_firebase
 )
 from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_utils import (
-    download_json
+    download_json,
+    iter_strategy_orders,
 )
 
+from Executor.ExecutorUtils.ReportUtils.EodTradeLogUtils import (
+    TRADE_COLUMNS,
+    TRADE_DECIMAL_COLUMNS,
+    TRADE_KEYS,
+    aggregate_trades,
+    order_record,
+    orders_frame,
+)
 from Executor.Strategies.StrategiesUtil import StrategyBase
 
 def update_signal_info():
@@ -139,328 +149,231 @@ def clear_today_orders_firebase():
     except Exception as e:
         logger.error(f'Error occurred while clearing today\'s orders from Firebase: {e}')
 
-def convert_trade_state_to_list(orders_firebase,user_TR_No):
-    strategies = orders_firebase.get("Strategies", {})
-    for strategy_name, strategy_details in strategies.items():
-        orders = strategy_details.get("TradeState", {}).get("orders", [])
-        if isinstance(orders, dict):
-            orders = list(orders.values())
-            update_path = f"Strategies/{strategy_name}/TradeState/"
-            try:
-                update_fields_firebase(CLIENTS_USER_FB_DB, user_TR_No, {"orders": orders}, update_path)
-            except Exception as e:
-                logger.error(f"Error updating trade state for strategy {strategy_name}: {e}")
-        else:
-            logger.warning(f"No orders to delete for {strategy_name} orders.")
-
-def get_keys_to_delete(strategy_orders, order_ids_to_delete):
-    keys_to_delete = []
-    if isinstance(strategy_orders, list):
-        for index, order_details in enumerate(strategy_orders):
-            if order_details and order_details.get("order_id") in order_ids_to_delete:
-                keys_to_delete.append(index)
-    elif isinstance(strategy_orders, dict):
-        for key, order_details in strategy_orders.items():
-            if order_details and order_details.get("order_id") in order_ids_to_delete:
-                keys_to_delete.append(key)
-    else:
-        logger.error("Unexpected data structure for strategy_orders.")
-    return keys_to_delete
-
-def delete_orders_from_firebase(orders, strategy_name, user):
-    try:
-        entry_orders = orders["entry_orders"]
-        exit_orders = orders["exit_orders"]
-        hedge_orders = orders["hedge_orders"]
-    except KeyError as e:
-        logger.error(f"Error fetching orders to delete the orders for {strategy_name}: {e}")
-        return
-    except Exception as e:
-        logger.error(f"Error occurred while fetching orders to delete the orders for {strategy_name}: {e}")
-        return
+HOLDINGS_DECIMAL_COLUMNS = ["entry_price", "hedge_entry_price", "margin_utilized", "tax"]
+EOD_LOG_WORKERS = int(os.getenv("EOD_LOG_WORKERS", "8"))
 
-    if not entry_orders or not exit_orders:
-        logger.info("Entry or exit orders missing, skipping deletion.")
-        return
 
-    combined_orders = entry_orders + exit_orders + hedge_orders
-
-    orders_firebase = fetch_collection_data_firebase(CLIENTS_USER_FB_DB, user["Tr_No"])
-
-    if "Strategies" in orders_firebase and strategy_name in orders_firebase["Strategies"] \
-            and "TradeState" in orders_firebase["Strategies"][strategy_name]:
-        strategy_orders = orders_firebase["Strategies"][strategy_name]["TradeState"]["orders"]
-    else:
-        logger.info(f"Strategy {strategy_name} not found or missing TradeState.")
-        return
+def build_orders_frame(active_users):
+    """Flattens the TradeState orders of every active user into one DataFrame, see :func:`order_record`."""
+    records = []
+    for user in active_users:
+        if not user.get("Active"):
+            continue
+        for strategy_name, strategy_details in user.get("Strategies", {}).items():
+            strategy_orders = (strategy_details or {}).get("TradeState", {}).get("orders", [])
+            for position, (_, order) in enumerate(iter_strategy_orders(strategy_orders)):
+                record = order_record(user["Tr_No"], strategy_name, position, order)
+                if record is not None:
+                    records.append(record)
+    return orders_frame(records)
+
+
+def load_multileg_flags(strategy_names):
+    """MultiLeg flag of each strategy, loaded once per strategy instead of once per trade."""
+    flags = {}
+    for strategy_name in strategy_names:
+        try:
+            flags[strategy_name] = bool(StrategyBase.load_from_db(strategy_name).ExtraInformation.MultiLeg)
+        except Exception as e:
+            logger.error(f"Error loading the MultiLeg flag of {strategy_name}: {e}")
+    return flags
+
+
+def remaining_orders_update(user, logged_order_ids):
+    """
+    Firebase update leaving only the orders of ``user`` that were not logged.
+
+    Every strategy with logged orders, or with its orders stored as a dict,
+    is written back as a renumbered list in the same multi-path update, so
+    the open holdings start again at index 0 and Firebase keeps returning
+    the orders as a list to ``retrieve_order_id`` and the other readers.
+    """
+    update = {}
+    for strategy_name, strategy_details in user.get("Strategies", {}).items():
+        strategy_orders = (strategy_details or {}).get("TradeState", {}).get("orders")
+        if not strategy_orders:
+            continue
+        logged = logged_order_ids.get(strategy_name, set())
+        if isinstance(strategy_orders, list) and not logged:
+            continue
+        update[f"Strategies/{strategy_name}/TradeState/orders"] = [
+            order
+            for _, order in iter_strategy_orders(strategy_orders)
+            if order and order.get("order_id") not in logged
+        ]
+    return update
+
+
+def log_user_trades(user, user_trades, user_orders):
+    """Stores the trades of one user in one transaction, then removes their orders from Firebase."""
+    tr_no = user["Tr_No"]
+    frames = {
+        strategy_name: strategy_trades[TRADE_COLUMNS].reset_index(drop=True)
+        for strategy_name, strategy_trades in user_trades.groupby("strategy", sort=False)
+    }
+    conn = get_db_connection(os.path.join(CLIENTS_TRADE_SQL_DB, f"{tr_no}.db"))
+    try:
+        if not write_frames_to_sqlite(conn, frames, TRADE_DECIMAL_COLUMNS):
+            return 0
+    finally:
+        conn.close()
 
-    order_ids_to_delete = {order["order_id"] for order in combined_orders}
+    logged = user_orders.merge(user_trades[TRADE_KEYS], on=TRADE_KEYS)
+    logged_order_ids = logged.groupby("strategy")["order_id"].agg(set).to_dict()
     try:
-        keys_to_delete = get_keys_to_delete(strategy_orders, order_ids_to_delete)
+        # The user was loaded from the document cache, the orders to keep come from a fresh read
+        fresh_user = fetch_collection_data_firebase(CLIENTS_USER_FB_DB, tr_no) or {}
+        update = remaining_orders_update(fresh_user, logged_order_ids)
+        if update:
+            update_fields_firebase(CLIENTS_USER_FB_DB, tr_no, update)
     except Exception as e:
-        logger.error(f"Error getting keys to delete for {strategy_name}: {e}")
-        return
+        logger.error(f"Error deleting the logged orders of {tr_no} from Firebase: {e}")
+    return len(user_trades)
 
-    if not keys_to_delete:
-        logger.info("No matching orders found for deletion.")
-        return
 
-    for key in keys_to_delete:
-        try:
-            delete_path = f"Strategies/{strategy_name}/TradeState/orders/{key}"
-            delete_fields_firebase(CLIENTS_USER_FB_DB, user["Tr_No"], delete_path)
-        except Exception as e:
-            logger.info(f"Error deleting order with key/index {key}: {e}")
+def process_n_log_trade():
+    """
+    Logs the closed trades of every active user and removes their orders from Firebase.
 
-    try:
-        pending_orders_firebase = fetch_collection_data_firebase(CLIENTS_USER_FB_DB, user["Tr_No"])
-    except Exception as e:
-        logger.error(f"Error fetching pending orders from Firebase for {strategy_name}: {e}")
-        return
-    convert_trade_state_to_list(pending_orders_firebase,user["Tr_No"])
+    Runs in stages, each one timed: load the users, aggregate all trades
+    in one pass, then write every user's DB (one transaction each) and
+    Firebase document from a thread pool.
+    """
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import (
+        Instrument as instru,
+    )
 
-    logger.success("Deletion process completed.")
+    started = perf_counter()
+    active_users = [user for user in fetch_active_users_from_firebase() if user.get("Active")]
+    orders = build_orders_frame(active_users)
+    loaded = perf_counter()
+    logger.info(f"Loaded {len(orders)} orders of {len(active_users)} users in {loaded - started:.2f} s")
+
+    multileg_flags = load_multileg_flags(orders["strategy"].unique())
+    trades = aggregate_trades(orders, multileg_flags, instru().get_trading_symbol_by_exchange_token)
+    aggregated = perf_counter()
+    logger.info(f"Aggregated {len(trades)} trades in {aggregated - loaded:.2f} s")
+
+    users_by_tr_no = {user["Tr_No"]: user for user in active_users}
+    orders_by_user = dict(list(orders.groupby("Tr_No", sort=False)))
+    logged_trades = 0
+    with ThreadPoolExecutor(max_workers=EOD_LOG_WORKERS) as executor:
+        futures = {
+            executor.submit(log_user_trades, users_by_tr_no[tr_no], user_trades, orders_by_user[tr_no]): tr_no
+            for tr_no, user_trades in trades.groupby("Tr_No", sort=False)
+        }
+        for future in as_completed(futures):
+            try:
+                logged_trades += future.result()
+            except Exception as e:
+                logger.error(f"Error processing and logging trade for {futures[future]}: {e}")
+    logger.info(f"Logged {logged_trades} trades in {perf_counter() - aggregated:.2f} s")
+    return logged_trades
 
-def calculate_tax_from_firebasedb(entry_orders, exit_orders, hedge_orders):
-    tax = sum(order['tax'] for order in entry_orders)
-    tax += sum(order['tax'] for order in exit_orders)
-    tax += sum(order['tax'] for order in hedge_orders)
-    return tax
 
-def seggregate_orders_by_type(orders):
-    try:
-        entry_orders = [o for o in orders if "trade_id" in o and "EN" in o["trade_id"] and "HO" not in o["trade_id"]]
-        exit_orders = [o for o in orders if "trade_id" in o and "EX" in o["trade_id"] and "HO" not in o["trade_id"]]
-        hedge_orders = [o for o in orders if "trade_id" in o and "HO" in o["trade_id"]]
-        return entry_orders, exit_orders, hedge_orders
-    except Exception as e:
-        logger.error(f"Error segregating orders: {e}")
-        return
+def prepare_user_holdings(user, trading_symbol_lookup, exchange_lookup):
+    """Holdings rows of one user: every open main order with the average price of its hedges."""
+    from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import get_order_margin
 
-def process_orders_for_strategy(strategy_orders):
-    processed_trades = {}
-    for order in strategy_orders:
-        try:
+    all_holdings = []
+    account_margin = None
+    for strategy_name, strategy_details in user.get("Strategies", {}).items():
+        logger.debug(f"Checking the holdings for : {strategy_name}")
+        strategy_orders = (strategy_details or {}).get("TradeState", {}).get("orders", [])
+        main_orders = []
+        hedge_prices = []
+        for _, order in iter_strategy_orders(strategy_orders):
             if order is None:
                 continue
-            logger.debug(f"order[trade_id] : {order['trade_id']}")
-            trade_prefix = order["trade_id"].split("_")[0]
-            if trade_prefix not in processed_trades:
-                processed_trades[trade_prefix] = {
-                    "entry_orders": [],
-                    "exit_orders": [],
-                    "hedge_orders": [],
+            trade_id = order.get("trade_id", "")
+            if "MO" in trade_id:
+                main_orders.append(order)
+            if "HO" in trade_id:
+                hedge_prices.append(float(order["avg_prc"]))
+        avg_hedge_order_price = sum(hedge_prices) / len(hedge_prices) if hedge_prices else 0
+
+        for order in main_orders:
+            exchange_token = str(order.get("exchange_token"))
+            exchange = exchange_lookup(exchange_token)
+            entry_price = float(order["avg_prc"])
+            qty = order.get("qty", 0)
+            if order.get("trade_id", "").startswith("PS"):
+                margin_utilized = entry_price * qty
+            else:
+                # The broker reports the margin of the whole account, so it is fetched once per user
+                if account_margin is None:
+                    account_margin = get_order_margin([order], user["Broker"])
+                margin_utilized = account_margin
+            all_holdings.append(
+                {
+                    "trade_id": order.get("trade_id"),
+                    "signal": "Short" if "_SH_" in order.get("trade_id") else "Long",
+                    "trading_symbol": trading_symbol_lookup(exchange_token, exchange),
+                    "entry_time": datetime.strptime(order.get("time_stamp"), "%Y-%m-%d %H:%M"),
+                    "entry_price": entry_price,
+                    "qty": qty,
+                    "margin_utilized": margin_utilized,
+                    "tax": 0.0,
+                    "hedge_entry_price": avg_hedge_order_price,
                 }
-            if "EN" in order["trade_id"] and "HO" not in order["trade_id"]:
-                processed_trades[trade_prefix]["entry_orders"].append(order)
-            elif "EX" in order["trade_id"] and "HO" not in order["trade_id"]:
-                processed_trades[trade_prefix]["exit_orders"].append(order)
-            elif "HO" in order["trade_id"] :
-                processed_trades[trade_prefix]["hedge_orders"].append(order)
-        except Exception as e:
-            logger.error(f"Error processing order: {e}")
-            continue
-    logger.debug(f"processed_trades: {processed_trades}")
-    return processed_trades
+            )
+    return pd.DataFrame(all_holdings)
 
-def calculate_trade_details(trade_data, strategy_name, user, multileg=False):
-    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import (
-        Instrument as instru,
-    )
-    logger.debug(f"Calculating trade details for {strategy_name}")
+
+def dump_user_holdings(user, trading_symbol_lookup, exchange_lookup):
+    holdings_df = prepare_user_holdings(user, trading_symbol_lookup, exchange_lookup)
+    if holdings_df.empty:
+        return 0
+    conn = get_db_connection(os.path.join(CLIENTS_TRADE_SQL_DB, f"{user['Tr_No']}.db"))
     try:
-        entry_orders = trade_data["entry_orders"]
-        exit_orders = trade_data["exit_orders"]
-        if not entry_orders or not exit_orders:
-            logger.warning("Invalid trade data: entry_orders or exit_orders is empty")
-            return None
-        
-        hedge_orders = trade_data["hedge_orders"]
-
-        if multileg:
-            entry_price = sum([float(o["avg_prc"]) for o in entry_orders]) if entry_orders else 0
-            exit_price = sum([float(o["avg_prc"]) for o in exit_orders]) if exit_orders else 0
-            hedge_entry_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EN" in o["trade_id"]]) if hedge_orders else 0
-            hedge_exit_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EX" in o["trade_id"]]) if hedge_orders else 0
-        else:
-            entry_price = sum([float(o["avg_prc"]) for o in entry_orders]) / len(entry_orders) if entry_orders else 0
-            exit_price = sum([float(o["avg_prc"]) for o in exit_orders]) / len(exit_orders) if exit_orders else 0
-            hedge_entry_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EN" in o["trade_id"]]) / len([o for o in hedge_orders if "EN" in o["trade_id"]]) if hedge_orders else 0
-            hedge_exit_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EX" in o["trade_id"]]) / len([o for o in hedge_orders if "EX" in o["trade_id"]]) if hedge_orders else 0  
-
-        trade_id_prefix = entry_orders[0]["trade_id"].split("_")[0]
-        exchange_token = [o["exchange_token"] for o in entry_orders if "MO" in o["trade_id"]][0]
-
-        trading_symbol = instru().get_trading_symbol_by_exchange_token(str(exchange_token))
-        signal = "Short" if "_SH_" in entry_orders[0]["trade_id"] else "Long"
-        entry_time = min([o["time_stamp"] for o in entry_orders])
-        exit_time = max([o["time_stamp"] for o in exit_orders])
-        short_trade = (entry_price - exit_price) + (hedge_exit_price - hedge_entry_price)
-        long_trade = (exit_price - entry_price) + (hedge_exit_price - hedge_entry_price)
-        trade_points = short_trade if signal == "Short" else long_trade
-        for order in entry_orders:
-            if order["exchange_token"] == exchange_token:
-                qty = sum([o["qty"] for o in entry_orders if o["exchange_token"] == exchange_token])
-            else:
-                qty = order["qty"]
-
-        pnl = trade_points * qty
-
-        tax = calculate_tax_from_firebasedb(entry_orders,exit_orders,hedge_orders)
-
-        net_pnl = pnl - tax
-
-        trade_details = {
-                        "trade_id": trade_id_prefix,
-                        "trading_symbol": trading_symbol,
-                        "signal": signal,
-                        "entry_time": datetime.strptime(entry_time, "%Y-%m-%d %H:%M"),
-                        "exit_time": datetime.strptime(exit_time, "%Y-%m-%d %H:%M"),
-                        "entry_price": float(entry_price),
-                        "exit_price": float(exit_price),
-                        "hedge_entry_price": float(hedge_entry_price),
-                        "hedge_exit_price": float(hedge_exit_price),
-                        "trade_points": float(trade_points),
-                        "qty": qty,
-                        "pnl": float(pnl),
-                        "tax": float(tax),
-                        "net_pnl": float(net_pnl)
-        }
-        return trade_details
-    except Exception as e:
-        logger.error(f"Error calculating trade details for {strategy_name}: {e}")
-        return None
+        write_frames_to_sqlite(conn, {"Holdings": holdings_df}, HOLDINGS_DECIMAL_COLUMNS, if_exists="replace")
+    finally:
+        conn.close()
+    return len(holdings_df)
+
 
 def fetch_and_prepare_holdings_data():
+    """
+    Rewrites the Holdings table of every active user from the orders left open.
+
+    The users come from the document cache, so only the documents changed
+    by :func:`process_n_log_trade` are downloaded again.
+    """
     from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import (
         Instrument as instru,
     )
-    from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import get_order_margin
-    active_users = fetch_active_users_from_firebase()
-    
-    for user in active_users:
-        db_path = os.path.join(CLIENTS_TRADE_SQL_DB, f"{user['Tr_No']}.db")
-        conn = get_db_connection(db_path)
-        all_holdings = []  # Reset for each user
-        strategies = user.get("Strategies", {})
-        try:
-            for strategy_name, strategy_details in strategies.items():
-                logger.debug(f"Checking the holdings for : {strategy_name}")
-                strategy_orders = strategy_details.get("TradeState", {}).get("orders", [])
-                if isinstance(strategy_orders, dict):  # Convert dict to list if needed
-                    strategy_orders = list(strategy_orders.values())
-
-                #continue if any object in the list is none
-
-                # Separate main and hedge orders
-                main_orders = [order for order in strategy_orders if order is not None and "MO" in order.get("trade_id", "")]
-                hedge_orders = [order for order in strategy_orders if order is not None and "HO" in order.get("trade_id", "")]
-
-
-                # Calculate the average price of hedge orders
-                if hedge_orders:
-                    avg_hedge_order_price = sum(float(order["avg_prc"]) for order in hedge_orders) / len(hedge_orders)
-                else:
-                    avg_hedge_order_price = 0  # Default to 0 if no hedge orders
-                
-                # Process main orders
-                for order in main_orders:
-                    exchange = instru().get_exchange_by_exchange_token(str(order.get("exchange_token")))
-                    trading_symbol = instru().get_trading_symbol_by_exchange_token(str(order.get("exchange_token")),exchange)
-
-                    entry_price = float(order["avg_prc"])
-                    qty = order.get("qty", 0)
-
-                    # Initialize margin_utilized to 0
-                    option_margin_utilized = 0
-
-                    # Check if the trade ID starts with "PS"
-                    if order.get("trade_id", "").startswith("PS"):
-                        # Calculate margin utilized based on entry price and quantity
-                        option_margin_utilized = entry_price * qty
-                        margin_utilized = option_margin_utilized  # For PS, use this directly
-                    else:
-                        # For other trade IDs, fetch the order margin and adjust by subtracting the PS margin
-                        margin_utilized = get_order_margin([order], user['Broker']) - option_margin_utilized
-                    
-                    holding = {
-                        "trade_id": order.get("trade_id"),
-                        "signal": "Short" if "_SH_" in order.get("trade_id") else "Long",
-                        "trading_symbol": trading_symbol,
-                        "entry_time": datetime.strptime(order.get("time_stamp"), "%Y-%m-%d %H:%M"),
-                        "entry_price": entry_price,
-                        "qty": qty,
-                        "margin_utilized": margin_utilized,
-                        "tax": 0.0,
-                        "hedge_entry_price": avg_hedge_order_price
-                    }
-                    
-                    all_holdings.append(holding)
-
-            # Dump the holdings for the current user into the database
-            if all_holdings:
-                holdings_df = pd.DataFrame(all_holdings)
-                decimal_columns = ["entry_price", "hedge_entry_price", "margin_utilized", "tax"]
-                dump_df_to_sqlite(conn, holdings_df, "Holdings", decimal_columns)
-
-            # Optionally close the DB connection if it's not used later
-            conn.close()
-        except Exception as e:
-            logger.error(f"Error processing holdings data for {user['Tr_No']}: {e}")
-            continue
 
-def process_n_log_trade():
+    started = perf_counter()
+    instrument = instru()
+    exchanges = {}
+    symbols = {}
+
+    def exchange_lookup(exchange_token):
+        if exchange_token not in exchanges:
+            exchanges[exchange_token] = instrument.get_exchange_by_exchange_token(exchange_token)
+        return exchanges[exchange_token]
+
+    def trading_symbol_lookup(exchange_token, exchange):
+        if (exchange_token, exchange) not in symbols:
+            symbols[exchange_token, exchange] = instrument.get_trading_symbol_by_exchange_token(
+                exchange_token, exchange
+            )
+        return symbols[exchange_token, exchange]
+
     active_users = fetch_active_users_from_firebase()
+    holdings = 0
+    with ThreadPoolExecutor(max_workers=EOD_LOG_WORKERS) as executor:
+        futures = {
+            executor.submit(dump_user_holdings, user, trading_symbol_lookup, exchange_lookup): user["Tr_No"]
+            for user in active_users
+        }
+        for future in as_completed(futures):
+            try:
+                holdings += future.result()
+            except Exception as e:
+                logger.error(f"Error processing holdings data for {futures[future]}: {e}")
+    logger.info(f"Stored {holdings} holdings of {len(active_users)} users in {perf_counter() - started:.2f} s")
 
-    for user in active_users:
-        logger.debug(f"Processing trade for user: {user['Tr_No']}")
-        db_path = os.path.join(CLIENTS_TRADE_SQL_DB, f"{user['Tr_No']}.db")  # Ensure db_dir is defined
-        conn = get_db_connection(db_path)
-        if not user.get("Active"):
-            continue
-        
-        try:
-            strategies = user.get("Strategies", {})
-            for strategy_name, strategy_details in strategies.items():
-                strategy_orders = strategy_details.get("TradeState", {}).get("orders", [])
-                if not strategy_orders:
-                    logger.debug(f"No orders found for strategy: {strategy_name}")
-                    continue
-
-                segregated_orders = process_orders_for_strategy(strategy_orders)
-                for trade_prefix, orders_group in segregated_orders.items():
-                    multileg = StrategyBase.load_from_db(strategy_name).ExtraInformation.MultiLeg
-                    trade_details = calculate_trade_details(orders_group, strategy_name, user, multileg)
-                    # Check if trade_details is None or empty before proceeding
-                    if trade_details is None or not any(trade_details.values()):
-                        logger.debug(f"Skipping trade {trade_prefix} due to invalid trade details.")
-                        continue  # Skip this trade if trade_details is invalid
-
-                    # Proceed with valid trade_details
-                    df = pd.DataFrame([trade_details])
-                    decimal_columns = [
-                        "pnl",
-                        "tax",
-                        "entry_price",
-                        "exit_price",
-                        "hedge_entry_price",
-                        "hedge_exit_price",
-                        "trade_points",
-                        "net_pnl",
-                    ]
-
-                    # Check if DataFrame is properly formatted with expected columns
-                    if not set(decimal_columns).issubset(df.columns):
-                        logger.warning(f"DataFrame for {trade_prefix} does not have the expected structure, skipping...")
-                        continue  # Skip appending this DataFrame to the database
-                    
-                    append_df_to_sqlite(conn, df, strategy_name, decimal_columns)
-                    # Delete orders from Firebase
-                    delete_orders_from_firebase(orders_group, strategy_name, user)
-            conn.close()
-        except Exception as e:
-            logger.error(f"Error processing and logging trade for {user['Tr_No']}: {e}")
-            continue
 
 def main():
     download_json(CLIENTS_USER_FB_DB, "before_eod_db_log")
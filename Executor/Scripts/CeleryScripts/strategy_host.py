@@ -0,0 +1,238 @@
+import contextlib
+import importlib
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+# Libraries every strategy imports; loading them once is most of the start up cost
+WARM_MODULES = [
+    "numpy",
+    "pandas",
+    "requests",
+    "kiteconnect",
+    "firebase_admin",
+    "Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils",
+    "Executor.ExecutorUtils.OrderCenter.OrderCenterUtils",
+    "Executor.Strategies.StrategiesUtil",
+]
+
+JobResult = namedtuple(
+    "JobResult", ["script_path", "status", "started_at", "seconds", "new_modules", "error"]
+)
+
+
+def _warm_imports():
+    for module_name in WARM_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            # Optional for the host, a strategy that needs it fails on its own
+            pass
+
+
+def _warm_firebase():
+    from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_cache import document_cache
+
+    for collection in (os.getenv("FIREBASE_USER_COLLECTION"), os.getenv("FIREBASE_STRATEGY_COLLECTION")):
+        if collection:
+            document_cache.get_collection(collection)
+
+
+def _warm_instruments():
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import InstrumentStore
+
+    InstrumentStore().snapshot()
+
+
+def _warm_broker_sessions():
+    from Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter import get_primary_kite_obj
+
+    get_primary_kite_obj()
+
+
+DEFAULT_WARM_UP_STEPS = [
+    ("imports", _warm_imports),
+    ("firebase_cache", _warm_firebase),
+    ("instrument_store", _warm_instruments),
+    ("broker_sessions", _warm_broker_sessions),
+]
+
+
+class StrategyHost:
+    """
+    A resident process that runs strategy scripts in process.
+
+    :meth:`warm_up` loads what every strategy needs once: the heavy imports,
+    the Firebase document cache, the instrument store and the pooled broker
+    sessions. :meth:`run_job` then executes a script as ``__main__`` with
+    :mod:`runpy`, exactly like ``python <script>`` but in a fresh namespace
+    that reuses the warm modules, so a strategy starts in milliseconds
+    instead of seconds.
+
+    Jobs are isolated from each other and from the host: every run gets its
+    own globals, and any exception (``SystemExit`` included) ends only that
+    job and is reported in its :class:`JobResult`. Many repo modules build
+    state at import time (strategy params, ``NextTradeId``, Kite objects),
+    so every repo module a job imported on top of the warm ones is evicted
+    from ``sys.modules`` when the job ends and the next job imports it
+    afresh. Third party libraries stay loaded: they hold no trading state
+    and some C extensions cannot be loaded twice in a process.
+
+    Args:
+        warm_up_steps (list): ``(name, callable)`` pairs run by :meth:`warm_up`.
+        logger: Logger of the host, a LoggerSetup logger by default.
+        code_root (str): Modules loaded from below this directory are evicted
+            after each job, the working directory by default.
+    """
+
+    def __init__(self, warm_up_steps=None, logger=None, code_root=DIR):
+        if logger is None:
+            from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+            logger = LoggerSetup()
+        self.logger = logger
+        self.warm_up_steps = DEFAULT_WARM_UP_STEPS if warm_up_steps is None else warm_up_steps
+        self.code_root = os.path.realpath(code_root)
+        self.warm_up_seconds = {}
+        self.resident_modules = set()
+        self.history = []
+        self.lock = threading.Lock()
+
+    @property
+    def is_warm(self):
+        return bool(self.warm_up_seconds)
+
+    def warm_up(self):
+        """Runs every warm up step once; a failing step is logged and skipped."""
+        with self.lock:
+            if self.is_warm:
+                return self.warm_up_seconds
+            for name, step in self.warm_up_steps:
+                started = time.perf_counter()
+                try:
+                    step()
+                except Exception as e:
+                    self.logger.error(f"Strategy host warm up step {name} failed: {e}")
+                self.warm_up_seconds[name] = time.perf_counter() - started
+            # What is loaded now stays for the life of the host
+            self.resident_modules = set(sys.modules)
+            self.logger.info(
+                "Strategy host warm: "
+                + ", ".join(f"{name} {seconds:.2f} s" for name, seconds in self.warm_up_seconds.items())
+            )
+            return self.warm_up_seconds
+
+    def run_job(self, script_path, stdout=None, stderr=None):
+        """
+        Runs ``script_path`` (relative to the working directory) as ``__main__``.
+
+        Args:
+            script_path (str): The strategy script.
+            stdout, stderr: Streams the script's prints go to, the host's own by default.
+
+        Returns:
+            JobResult: Status ("success" or "failed"), run time and the
+            number of modules the job still had to import.
+        """
+        if not self.is_warm:
+            self.warm_up()
+        started_at = datetime.now()
+        modules_before = len(sys.modules)
+        started = time.perf_counter()
+        status, error = "success", None
+        with contextlib.ExitStack() as stack:
+            if stdout is not None:
+                stack.enter_context(contextlib.redirect_stdout(stdout))
+            if stderr is not None:
+                stack.enter_context(contextlib.redirect_stderr(stderr))
+            try:
+                runpy.run_path(os.path.join(DIR, script_path), run_name="__main__")
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    status, error = "failed", f"exit code {e.code}"
+            except BaseException as e:
+                status, error = "failed", f"{type(e).__name__}: {e}"
+            finally:
+                new_modules = len(sys.modules) - modules_before
+                self._evict_job_modules()
+        result = JobResult(
+            script_path,
+            status,
+            started_at,
+            time.perf_counter() - started,
+            new_modules,
+            error,
+        )
+        with self.lock:
+            self.history.append(result)
+        log = self.logger.info if status == "success" else self.logger.error
+        log(
+            f"Job {script_path} {status} in {result.seconds:.2f} s "
+            f"({result.new_modules} new modules){': ' + error if error else ''}"
+        )
+        return result
+
+    def _is_repo_module(self, module):
+        paths = [getattr(module, "__file__", None)] + list(getattr(module, "__path__", None) or [])
+        return any(
+            path and os.path.realpath(path).startswith(self.code_root + os.sep) for path in paths
+        )
+
+    def _evict_job_modules(self):
+        """Drops the repo modules the last job imported, so the next job imports them afresh."""
+        for name in [name for name in sys.modules if name not in self.resident_modules]:
+            module = sys.modules[name]
+            if not self._is_repo_module(module):
+                continue
+            del sys.modules[name]
+            # "from package import module" would still find the old module on its package
+            parent_name, _, child = name.rpartition(".")
+            parent = sys.modules.get(parent_name)
+            if parent is not None and getattr(parent, child, None) is module:
+                delattr(parent, child)
+
+
+# One host per process, warmed by the Celery worker when its pool process starts
+host = StrategyHost()
+
+
+if __name__ == "__main__":
+    import argparse
+    import subprocess
+    import tempfile
+
+    cmdLineParser = argparse.ArgumentParser("Run strategy scripts in a warm strategy host - ")
+    cmdLineParser.add_argument("scripts", nargs="*", help="Scripts to run, a start up benchmark if omitted")
+    args = cmdLineParser.parse_args()
+
+    if args.scripts:
+        for script in args.scripts:
+            host.run_job(script)
+        sys.exit(0)
+
+    # Start up cost of a script importing the usual stack, cold subprocess vs warm host
+    with tempfile.NamedTemporaryFile("w", suffix=".py", dir=DIR, delete=False) as script:
+        script.write("import numpy, pandas\nif __name__ == '__main__':\n    pandas.DataFrame({'a': [1]})\n")
+    script_path = os.path.basename(script.name)
+    try:
+        started = time.perf_counter()
+        subprocess.run([sys.executable, script_path], check=True, cwd=DIR)
+        cold = time.perf_counter() - started
+        benchmark_host = StrategyHost(warm_up_steps=[("imports", _warm_imports)])
+        warm_up = sum(benchmark_host.warm_up().values())
+        warm = benchmark_host.run_job(script_path).seconds
+        print(f"Subprocess start {cold * 1000:.0f} ms, warm host job {warm * 1000:.1f} ms (one off warm up {warm_up:.2f} s)")
+    finally:
+        os.unlink(script.name)
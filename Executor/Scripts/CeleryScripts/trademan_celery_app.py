@@ -1,5 +1,6 @@
 # celery_app.py
 from celery import Celery
+from celery.signals import worker_process_init
 import subprocess
 from datetime import datetime
 import requests
@@ -17,11 +18,22 @@ sys.path.append(DIR)  # Add the current directory to the system path
 ENV_PATH = os.path.join(DIR, "trademan.env")
 load_dotenv(ENV_PATH)
 
+from Executor.Scripts.CeleryScripts.strategy_host import host as strategy_host
+
+# "host" runs the scripts inside the warm worker process, "subprocess" starts a fresh python per script
+STRATEGY_RUN_MODE = os.getenv("STRATEGY_RUN_MODE", "host")
 
 # Create a Celery instance
 app = Celery("tasks")
 app.config_from_object("celeryconfig")
 
+
+@worker_process_init.connect
+def warm_strategy_host(**kwargs):
+    # Every pool process becomes a resident strategy host before its first task
+    if STRATEGY_RUN_MODE == "host":
+        strategy_host.warm_up()
+
 # redis client
 redis_client = redis.StrictRedis(host="localhost", port=6379, db=0)
 
@@ -76,6 +88,8 @@ def run_script(script_path, retry_hour, logger):
     """
     This is the replacement for the old sh files.
     In this function, we are running the script and handling the retry logic.
+    With STRATEGY_RUN_MODE "host" the script runs inside this warm worker
+    process (see strategy_host.py), otherwise in a fresh python subprocess.
     This function is called by the celery task.
     This function stores the output of the files in a log file.
     """
@@ -95,6 +109,19 @@ def run_script(script_path, retry_hour, logger):
         attempt += 1
         logger.info(f"Attempt: {attempt}")
 
+        if STRATEGY_RUN_MODE == "host":
+            logger.debug(f"Running script {script_path} in the strategy host")
+            # stdout and stderr already go to the logger
+            result = strategy_host.run_job(script_path)
+            if result.status == "success":
+                logger.info(f"Program {script_path} completed successfully in {result.seconds:.2f} s")
+                return "success"
+            logger.error(f"Script {script_path} failed: {result.error}")
+            if attempt == max_attempts:
+                return notify_script_failure(script_path, retry_hour, logger)
+            sleep(5)
+            continue
+
         try:
             logger.debug(f"Running script {script_path}")
             with subprocess.Popen(
@@ -126,26 +153,30 @@ def run_script(script_path, retry_hour, logger):
         except subprocess.CalledProcessError as e:
             logger.error(f"Error running script {script_path}: {e}")
             if attempt == max_attempts:
-                current_hour = datetime.now().hour
-                if current_hour <= retry_hour:
-                    logger.error(
-                        f"The script {script_path} has some errors. Please Check !!!"
-                    )
-                    message = f"{script_path} errors. Please Check !!!"
-                    requests.post(
-                        f"https://api.telegram.org/bot{telegram_bot_token}/sendMessage",
-                        data={"chat_id": chat_id, "text": message},
-                    )
-                    return "failed"
-                else:
-                    logger.error(
-                        f"Script {script_path} failed after retry_hour, exiting without notification."
-                    )
-                    return "failed after retry_hour"
+                return notify_script_failure(script_path, retry_hour, logger)
 
         sleep(5)
 
 
+def notify_script_failure(script_path, retry_hour, logger):
+    current_hour = datetime.now().hour
+    if current_hour <= retry_hour:
+        logger.error(
+            f"The script {script_path} has some errors. Please Check !!!"
+        )
+        message = f"{script_path} errors. Please Check !!!"
+        requests.post(
+            f"https://api.telegram.org/bot{telegram_bot_token}/sendMessage",
+            data={"chat_id": chat_id, "text": message},
+        )
+        return "failed"
+    else:
+        logger.error(
+            f"Script {script_path} failed after retry_hour, exiting without notification."
+        )
+        return "failed after retry_hour"
+
+
 def run_multiple_scripts(script_paths, logger):
     # here we are running a set of scripts and logging the output in a log file
     for script_path in script_paths:
@@ -1,6 +1,6 @@
 import pandas as pd
-import numpy as np
 import os, sys
+import threading
 
 from datetime import timedelta, datetime, date
 from time import sleep
@@ -15,6 +15,7 @@ from dash import html, dcc
 import plotly.graph_objs as go
 
 from straddlecalculation import *
+from streaming_indicators import AmiPyIndicatorEngine, AmiPySignalEngine, SIGNAL_COLUMNS
 from chart import plotly_plot
 
 from dotenv import load_dotenv
@@ -53,6 +54,9 @@ from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import (
 from Executor.ExecutorUtils.NotificationCenter.Discord.discord_adapter import (
     discord_bot,
 )
+from Executor.ExecutorUtils.InstrumentCenter.CandleAggregator.candle_aggregator import (
+    CandleAggregator,
+)
 
 strategy_obj = StrategyBase.load_from_db("AmiPy")
 strategy_name = strategy_obj.StrategyName
@@ -83,69 +87,10 @@ primary_account_session_id = fetch_primary_accounts_from_firebase(zerodha_primar
 kite = create_kite_obj(
     api_key=primary_account_session_id["Broker"]["ApiKey"],
     access_token=primary_account_session_id["Broker"]["SessionId"],
+    username=primary_account_session_id["Broker"]["BrokerUsername"],
 )
 
 
-# Define your global DataFrame
-signalsdf = pd.DataFrame(
-    columns=[
-        "date",
-        "close",
-        "MA_open",
-        "MA_close",
-        "MA_high",
-        "MA_low",
-        "ATR",
-        "Up",
-        "Dn",
-        "Trend",
-        "TrendUp",
-        "TrendDown",
-        "TrendSL",
-        "EMA",
-        "open",
-        "high",
-        "low",
-        "instrument_token",
-        "LongSignal",
-        "ShortSignal",
-        "LongCoverSignal",
-        "ShortCoverSignal",
-    ],
-    dtype=object,
-)  # generic data type for initial creation
-
-# Define specific data types for each column
-column_types = {
-    "date": "datetime64[ns]",
-    "close": np.float64,
-    "MA_open": np.float64,
-    "MA_close": np.float64,
-    "MA_high": np.float64,
-    "MA_low": np.float64,
-    "ATR": np.float64,
-    "Up": np.float64,
-    "Dn": np.float64,
-    "Trend": np.float64,
-    "TrendUp": np.float64,
-    "TrendDown": np.float64,
-    "TrendSL": np.float64,
-    "EMA": np.float64,
-    "open": np.float64,
-    "high": np.float64,
-    "low": np.float64,
-    "instrument_token": "Int64",
-    "LongSignal": "Int64",
-    "ShortSignal": "Int64",
-    "LongCoverSignal": "Int64",
-    "ShortCoverSignal": "Int64",
-}
-
-# Convert column types
-for column, dtype in column_types.items():
-    signalsdf[column] = signalsdf[column].astype(dtype)
-
-
 # Setting StrikePrc at 09.20 a.m.
 def job():
     global strike_prc, nifty_token
@@ -217,169 +162,35 @@ for token in trading_tokens:
     hist_data[token]["instrument_token"] = token
     hist_data[token] = hist_data[token].drop(["volume"], axis=1)
 
-
-long_indices = []
-longcover_indices = []
-short_indices = []
-shortcover_indices = []
-last_signal_minute = None
-trade_state_df = pd.DataFrame(
-    columns=[
-        "in_trade",
-        "strike_price",
-        "trade_type",
-        "trade_points",
-        "TrendSL",
-        "close",
-        "TradeEntryPrice",
-        "SL_points",
-    ]
+# Seed the incremental indicators with the history, ticks only revise the open bar
+indicator_engine = AmiPyIndicatorEngine(
+    Heikin_Ashi_MA_period, Supertrend_period, Supertrend_multiplier, EMA_period
 )
+straddle_history = callputmergeddf(hist_data, trading_tokens)
+indicator_engine.extend(straddle_history)
 
-def genSignals(resultdf):
-    counter = 0
-    signals = []
-    trade_no = 1
-    current_position = None
-    global last_signal_minute, trading_tokens, trade_state_df, strike_prc
-    trade_state = {
-        "in_trade": False,
-        "strike_price": strike_prc,
-        "trade_type": None,
-        "trade_points": 0,
-        "TrendSL": 0,
-        "close": 0,
-        "TradeEntryPrice": 0,
-        "SL_points": 0,
-    }
-
-    # trade_state_path = os.path.join("LiveCSV","trade_state.csv")
-    script_dir = os.path.dirname(os.path.realpath(__file__))
-    trade_state_path = os.path.join(script_dir, "LiveCSV", "trade_state.csv")
-
-    long_indices = []
-    longcover_indices = []
-    short_indices = []
-    shortcover_indices = []
-
-    def long(df, i):
-        return (
-            (df.loc[df.index[i], "Trend"] == 1)
-            & (df.loc[df.index[i], "close"] > df.loc[df.index[i], "EMA"])
-            & (df.index[i].time() > entry_time)
-            & (df.index[i].time() < sqroff_time)
-            & (df.index[i].time() < last_buy_time)
-        )
-
-    def short(df, i):
-        return (
-            (df.loc[df.index[i], "Trend"] == -1)
-            & (df.loc[df.index[i], "close"] < df.loc[df.index[i], "EMA"])
-            & (df.index[i].time() > entry_time)
-            & (df.index[i].time() < sqroff_time)
-            & (df.index[i].time() < last_buy_time)
-        )
-
-    def longcover(df, i):
-        current_minute = df.index[i].floor("T")
-        return (current_minute not in longcover_indices) and (
-            (df.loc[df.index[i], "Trend"] == -1).any()
-            or (df.index[i].time() > sqroff_time)
-        )
-
-    def shortcover(df, i):
-        current_minute = df.index[i].floor("T")
-        return (current_minute not in shortcover_indices) and (
-            (df.loc[df.index[i], "Trend"] == 1).any()
-            or (df.index[i].time() > sqroff_time)
-        )
-
-    cover_position_check = None
-
-    for i in range(1, len(resultdf)):
-        current_time = resultdf.index[i]
-        current_minute = current_time.floor("T")
-        current_close = resultdf.loc[current_time, "close"]
-        trend_sl = resultdf.loc[current_time, "TrendSL"]
-
-        if current_time.date() != datetime.datetime.today().date():
-            continue
-
-        if current_position is None:
-            cover_position_check = None
-            if long(resultdf, i):
-                counter += 1
-                current_position = "Long"
-                long_indices.append(resultdf.index[i])
-
-                trade_state["in_trade"] = True
-                trade_state["strike_price"] = strike_prc
-                trade_state["trade_type"] = "Long"
-                trade_state["trade_points"] = current_close - resultdf["close"].iloc[-1]
-                trade_state["TrendSL"] = trend_sl
-                trade_state["close"] = resultdf["close"].iloc[-1]
-                trade_state["TradeEntryPrice"] = current_close
-                trade_state["SL_points"] = resultdf["close"].iloc[-1] - trend_sl
-
-            elif short(resultdf, i):
-                current_position = "Short"
-                short_indices.append(resultdf.index[i])
-
-                trade_state["in_trade"] = True
-                trade_state["strike_price"] = strike_prc
-                trade_state["trade_type"] = "Short"
-                trade_state["trade_points"] = current_close - resultdf["close"].iloc[-1]
-                trade_state["TrendSL"] = trend_sl
-                trade_state["close"] = resultdf["close"].iloc[-1]
-                trade_state["TradeEntryPrice"] = current_close
-                trade_state["SL_points"] = trend_sl - resultdf["close"].iloc[-1]
+candle_aggregator = CandleAggregator(interval)
+for token in trading_tokens:
+    candle_aggregator.seed(token, hist_data[token])
 
-        else:
-            if current_position == "Long" and longcover(resultdf, i):
-                if cover_position_check != "LongCover":
-                    longcover_indices.append(resultdf.index[i])
-                    cover_position_check = "LongCover"
-                trade_no += 1
-                trade_state["in_trade"] = False
-                trade_state["strike_price"] = 0
-                trade_state["trade_type"] = None
-                trade_state["trade_points"] = 0
-                trade_state["TrendSL"] = 0
-                trade_state["SL_points"] = 0
-                trade_state["TradeEntryPrice"] = 0
-
-            elif current_position == "Short" and shortcover(resultdf, i):
-                if cover_position_check != "ShortCover":
-                    shortcover_indices.append(resultdf.index[i])
-                    cover_position_check = "ShortCover"
-
-                trade_no += 1
-                trade_state["in_trade"] = False
-                trade_state["strike_price"] = 0
-                trade_state["trade_type"] = None
-                trade_state["trade_points"] = 0
-                trade_state["TrendSL"] = 0
-                trade_state["SL_points"] = 0
-                trade_state["TradeEntryPrice"] = 0
-
-        trade_state_df = pd.DataFrame([trade_state])  # convert dictionary to DataFrame
-        trade_state_df.to_csv(trade_state_path, index=False)  # write DataFrame to CSV
-
-        resultdf["LongSignal"] = 0
-        resultdf["ShortSignal"] = 0
-        resultdf["LongCoverSignal"] = 0
-        resultdf["ShortCoverSignal"] = 0
-
-        resultdf.loc[long_indices, "LongSignal"] = 1
-        resultdf.loc[short_indices, "ShortSignal"] = 1
-        resultdf.loc[longcover_indices, "LongCoverSignal"] = 1
-        resultdf.loc[shortcover_indices, "ShortCoverSignal"] = 1
-
-    # genSignals_path = os.path.join("LiveCSV", "amipy_genSignals.csv")
+
+# Signals follow the bars incrementally, the open bar is the only one evaluated per tick
+signal_engine = AmiPySignalEngine(indicator_engine, entry_time, last_buy_time, sqroff_time)
+signal_engine.update()
+# Ticks arrive on the KiteTicker thread while the dashboard reads the engines
+engine_lock = threading.Lock()
+
+
+def write_live_csvs():
+    """Writes the supertrend, signal and trade state csvs; called when a bar closes."""
     script_dir = os.path.dirname(os.path.realpath(__file__))
-    genSignals_path = os.path.join(script_dir, "LiveCSV", "amipy_genSignals.csv")
-    resultdf.to_csv(genSignals_path, index=True)
-    return resultdf, trade_state
+    live_csv_dir = os.path.join(script_dir, "LiveCSV")
+    resultdf = signal_engine.frame()
+    resultdf.drop(columns=SIGNAL_COLUMNS).to_csv(os.path.join(live_csv_dir, "amipy_supertrend.csv"), index=True)
+    resultdf.to_csv(os.path.join(live_csv_dir, "amipy_genSignals.csv"), index=True)
+    pd.DataFrame([signal_engine.trade_state(strike_prc)]).to_csv(
+        os.path.join(live_csv_dir, "trade_state.csv"), index=False
+    )
 
 
 signals = []
@@ -387,7 +198,7 @@ signals = []
 
 def updateSignalDf(last_signal, trade_state):
     print("updateSignalDf")
-    global signalsdf, signals
+    global signals
 
     # trade_sig_path = os.path.join("LiveCSV", "amiNF_trd_sig_liv.csv")
     script_dir = os.path.dirname(os.path.realpath(__file__))
@@ -464,49 +275,29 @@ last_signal_t = None
 
 
 def on_ticks(ws, ticks):
-    global hist_data, signalsdf, last_signal_t
+    global last_signal_t
     # print('Received ticks:', ticks)
-    current_minute = (
-        datetime.datetime.now()
-        .replace(second=0, microsecond=0)
-        .astimezone()
-        .strftime("%Y-%m-%d %H:%M:%S%z")[:-2]
-        + ":"
-        + datetime.datetime.now().astimezone().strftime("%z")[-2:]
-    )
+    candle_aggregator.on_ticks(ticks)
+
+    # Call + put bar of the latest interval, same as callputmergeddf for one row
+    option_bars = {token: candle_aggregator.current(token) for token in trading_tokens[1:]}
+    option_bars = {token: bar for token, bar in option_bars.items() if bar is not None}
+    if not option_bars:
+        return
+    bar_start = max(bar.start for bar in option_bars.values())
+    option_bars = {token: bar for token, bar in option_bars.items() if bar.start == bar_start}
+    straddle_bar = [
+        sum(getattr(bar, field) for bar in option_bars.values())
+        for field in ("open", "high", "low", "close")
+    ]
+    bar_time = pd.Timestamp(bar_start, unit="s", tz="UTC").tz_convert(straddle_history.index.tz)
 
-    for tick in ticks:
-        # print('Processing tick:', tick)
-        token = tick["instrument_token"]
-        ltp = tick["last_price"]
-
-        # Check if the current_minute exists in the DataFrame's index
-        if current_minute not in hist_data[token].index:
-            # print("New minute")
-            # Create a new row for the current_minute
-            hist_data[token].loc[current_minute] = [ltp, ltp, ltp, ltp, int(token)]
-
-        # Update the high and low values
-        # print("Updating high and low")
-        hist_data[token].at[current_minute, "high"] = max(
-            ltp, hist_data[token].at[current_minute, "high"]
-        )
-        hist_data[token].at[current_minute, "low"] = min(
-            ltp, hist_data[token].at[current_minute, "low"]
-        )
-
-        # Update the close value
-        hist_data[token].at[current_minute, "close"] = ltp
-
-        hist_data[token]
-
-    resampleddf = callputmergeddf(hist_data, trading_tokens)
-    # resampleddf.to_csv(f'resample_ohlc_{trading_tokens[0]}.csv', index=True)
-    ma_df = moving_average(resampleddf)
-    # ma_df.to_csv(f'Dataframescsv/amipy_madf.csv', index=True)
-    resultdf = supertrend(ma_df)
-    # resultdf.to_csv(f'Dataframescsv/amipy_resultdf.csv', index=True)
-    signalsdf, trade_state = genSignals(resultdf)
+    with engine_lock:
+        bars_before = indicator_engine.size
+        indicator_engine.update(bar_time, *straddle_bar, sum(option_bars))
+        signal_engine.update()
+        if indicator_engine.size != bars_before:
+            write_live_csvs()
 
     current_time = datetime.datetime.now()
 
@@ -520,15 +311,11 @@ def on_ticks(ws, ticks):
 
         last_signal_t = current_time
 
-        new_signal = (
-            signalsdf[
-                ["LongSignal", "ShortSignal", "LongCoverSignal", "ShortCoverSignal"]
-            ]
-            .iloc[-1]
-            .any()
-        )
+        new_signal = signal_engine.last_signal() is not None
         if new_signal:
-            last_signal = signalsdf.iloc[-1]
+            with engine_lock:
+                last_signal = signal_engine.frame().iloc[-1]
+                trade_state = signal_engine.trade_state(strike_prc)
             updateSignalDf(last_signal, trade_state)
 
     # updateSignalDf(signalsdf, trade_state)
@@ -579,21 +366,10 @@ app.layout = html.Div(
 # Define callback to update chart and trade state
 @app.callback(Output("live-graph", "figure"), [Input("graph-update", "n_intervals")])
 def update_graph_scatter(n):
-    if trade_state_df.empty:
-        trade_state = {
-            "in_trade": 0,
-            "strike_price": 0,
-            "trade_type": "neutral",
-            "trade_points": 0,
-            "TrendSL": 0,
-            "close": 0,
-            "TradeEntryPrice": 0,
-            "SL_points": 0,
-        }
-    else:
-        # Call your genSignals function here to get the latest trade_state
-        trade_state = trade_state_df.iloc[-1].to_dict()
-    # trade_state = trade_state_df.iloc[-1].to_dict()
+    # Built once per refresh here rather than on every tick
+    with engine_lock:
+        signalsdf = signal_engine.frame()
+        trade_state = signal_engine.trade_state(strike_prc)
 
     # Format the trade_state as a string
     trade_state_text = (
@@ -10,6 +10,7 @@ DIR_PATH = os.getcwd()
 sys.path.append(DIR_PATH)
 
 from Executor.Strategies.StrategiesUtil import StrategyBase
+import Executor.ExecutorUtils.IndicatorCenter.IndicatorCenterUtils as IndicatorCenterUtils
 
 strategy_obj = StrategyBase.load_from_db("AmiPy")
 
@@ -110,100 +111,36 @@ def HeikinAshi(ma_df):
 
 
 def atr(df, period):
-    true_range = pd.Series(index=df.index, dtype="float64")
-    for i in range(1, len(df)):
-        high_low = df["high"][i] - df["low"][i]
-        high_prev_close = abs(df["high"][i] - df["close"][i - 1])
-        low_prev_close = abs(df["low"][i] - df["close"][i - 1])
-        true_range[i] = max(high_low, high_prev_close, low_prev_close)
-    return true_range.ewm(span=period, adjust=False).mean()
+    return pd.Series(
+        IndicatorCenterUtils.atr(df["high"], df["low"], df["close"], period),
+        index=df.index,
+    )
 
 
 def supertrend(ma_df):
 
-    # Calculate Average True Range (ATR)
-    average_true_range = atr(ma_df, Supertrend_period)
+    # Calculate the ATR and the Heikin-Ashi Up/Dn bands with the trend
+    bands = IndicatorCenterUtils.amipy_supertrend(
+        ma_df["open"],
+        ma_df["high"],
+        ma_df["low"],
+        ma_df["close"],
+        Supertrend_period,
+        Supertrend_multiplier,
+    )
+    average_true_range = pd.Series(bands["ATR"], index=ma_df.index)
     ma_df["ATR"] = average_true_range
 
-    # Calculate Heikin-Ashi values
-    ha_close = (ma_df["open"] + ma_df["high"] + ma_df["low"] + ma_df["close"]) / 4
-    ha_open = (ma_df["open"].shift(1) + ma_df["close"].shift(1)) / 2
-    ha_high = ma_df[["high", "open", "close"]].max(axis=1)
-    ha_low = ma_df[["low", "open", "close"]].min(axis=1)
-
-    # Calculate Up and Dn lines
-    up = (ha_high + ha_low) / 2 + Supertrend_multiplier * average_true_range
-    dn = (ha_high + ha_low) / 2 - Supertrend_multiplier * average_true_range
-
-    # Initialize variables
-    trend = np.zeros(len(ma_df))
-    trend[0] = 1
-    trend_up = pd.Series(index=ma_df.index, dtype="float64")
-    trend_down = pd.Series(index=ma_df.index, dtype="float64")
-
-    change_of_trend = 0
-    flag = flagh = 0
-
-    # calulating change of trend
-    for i in range(1, len(ma_df)):
-        change_of_trend = 0
-
-        if ha_close[i] > up[i - 1]:
-            trend[i] = 1
-            if trend[i - 1] == -1:
-                change_of_trend = 1
-        elif ha_close[i] < dn[i - 1]:
-            trend[i] = -1
-            if trend[i - 1] == 1:
-                change_of_trend = 1
-        else:
-            trend[i] = trend[i - 1]
-
-        if trend[i] < 0 and trend[i - 1] > 0:
-            flag = 1
-        else:
-            flag = 0
-
-        if trend[i] > 0 and trend[i - 1] < 0:
-            flagh = 1
-        else:
-            flagh = 0
-
-        if trend[i] > 0 and dn[i] < dn[i - 1]:
-            dn[i] = dn[i - 1]
-
-        if trend[i] < 0 and up[i] > up[i - 1]:
-            up[i] = up[i - 1]
-
-        if flag == 1:
-            up[i] = (
-                ha_high[i] + ha_low[i]
-            ) / 2 + Supertrend_multiplier * average_true_range[i]
-
-        if flagh == 1:
-            dn[i] = (
-                ha_high[i] + ha_low[i]
-            ) / 2 - Supertrend_multiplier * average_true_range[i]
-
-        trend_up[i] = dn[i] if trend[i] > 0 else np.nan
-        trend_down[i] = up[i] if trend[i] < 0 else np.nan
-
-        if change_of_trend == 1:
-            if trend[i] == 1:
-                trend_up[i - 1] = trend_down[i - 1]
-            elif trend[i] == -1:
-                trend_down[i - 1] = trend_up[i - 1]
-
     # Create a new DataFrame with calculated values
     result = ma_df.copy()
 
     result["ATR"] = average_true_range
-    result["EMA"] = result["close"].ewm(span=EMA_period, adjust=False).mean()
-    result["Up"] = up
-    result["Dn"] = dn
-    result["Trend"] = trend
-    result["TrendUp"] = trend_up
-    result["TrendDown"] = trend_down
+    result["EMA"] = IndicatorCenterUtils.ewm_mean(result["close"], EMA_period)
+    result["Up"] = bands["Up"]
+    result["Dn"] = bands["Dn"]
+    result["Trend"] = bands["Trend"]
+    result["TrendUp"] = bands["TrendUp"]
+    result["TrendDown"] = bands["TrendDown"]
     result["TrendSL"] = np.where(
         result["Trend"] == 1, result["TrendUp"], result["TrendDown"]
     )
@@ -0,0 +1,347 @@
+import datetime as dt
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+from Executor.ExecutorUtils.IndicatorCenter.IndicatorCenterUtils import (
+    amipy_supertrend,
+    amipy_supertrend_step,
+    ewm_alpha,
+    ewm_step,
+    ewm_mean,
+    rolling_mean,
+)
+
+OUTPUT_COLUMNS = [
+    "close",
+    "MA_open",
+    "MA_close",
+    "MA_high",
+    "MA_low",
+    "ATR",
+    "Up",
+    "Dn",
+    "Trend",
+    "TrendUp",
+    "TrendDown",
+    "TrendSL",
+    "EMA",
+    "open",
+    "high",
+    "low",
+    "instrument_token",
+]
+
+_ARRAYS = [column for column in OUTPUT_COLUMNS if column != "TrendSL"]
+
+
+class AmiPyIndicatorEngine:
+    """
+    Incremental version of ``moving_average`` + ``supertrend`` from straddlecalculation.
+
+    Bars are fed with :meth:`update`. A bar keeps being revised while ticks
+    arrive with the same timestamp; a new timestamp closes it and advances
+    the rolling state (MA windows, ATR/EMA averages, trend bands) in O(1).
+    Only the open bar is recomputed on every tick, so the per-tick cost does
+    not grow over the session. :meth:`frame` returns the same columns the
+    batch functions produce.
+    """
+
+    def __init__(self, ma_period, supertrend_period, supertrend_multiplier, ema_period, capacity=1024):
+        self.ma_period = ma_period
+        self.multiplier = supertrend_multiplier
+        self.supertrend_period = supertrend_period
+        self.ema_period = ema_period
+        self.atr_alpha = ewm_alpha(supertrend_period)
+        self.ema_alpha = ewm_alpha(ema_period)
+
+        self.size = 0
+        self.index = []
+        self.arrays = {column: np.full(capacity, np.nan) for column in _ARRAYS}
+
+        # State after the last closed bar
+        self.windows = {column: deque(maxlen=max(ma_period - 1, 0)) for column in ("open", "high", "low", "close")}
+        self.prev_close = np.nan
+        self.prev_atr = np.nan
+        self.prev_ema = np.nan
+        self.prev_trend = np.nan
+        self.prev_up = np.nan
+        self.prev_dn = np.nan
+        self.prev_trend_up = np.nan
+        self.prev_trend_down = np.nan
+
+    def _grow(self):
+        capacity = len(self.arrays["close"]) * 2
+        for column, values in self.arrays.items():
+            grown = np.full(capacity, np.nan)
+            grown[: self.size] = values[: self.size]
+            self.arrays[column] = grown
+
+    def _close_bar(self):
+        row = self.size - 1
+        arrays = self.arrays
+        for column, window in self.windows.items():
+            if window.maxlen:
+                window.append(arrays[column][row])
+        self.prev_close = arrays["close"][row]
+        self.prev_atr = arrays["ATR"][row]
+        self.prev_ema = arrays["EMA"][row]
+        self.prev_trend = arrays["Trend"][row]
+        self.prev_up = arrays["Up"][row]
+        self.prev_dn = arrays["Dn"][row]
+        self.prev_trend_up = arrays["TrendUp"][row]
+        self.prev_trend_down = arrays["TrendDown"][row]
+
+    def update(self, timestamp, open_, high, low, close, instrument_token=np.nan):
+        """Applies the latest values of the bar starting at ``timestamp``."""
+        if not self.size or timestamp != self.index[-1]:
+            if self.size:
+                self._close_bar()
+            if self.size == len(self.arrays["close"]):
+                self._grow()
+            self.index.append(timestamp)
+            self.size += 1
+        row = self.size - 1
+        arrays = self.arrays
+        arrays["open"][row] = open_
+        arrays["high"][row] = high
+        arrays["low"][row] = low
+        arrays["close"][row] = close
+        arrays["instrument_token"][row] = instrument_token
+        self._compute(row)
+
+    def extend(self, df):
+        """
+        Feeds every row of an OHLC frame, e.g. the history loaded at start up.
+
+        On an empty engine the history is computed with the batch kernels and
+        only the rolling state is taken over, the last row stays the open bar.
+        """
+        tokens = df["instrument_token"].to_numpy(float) if "instrument_token" in df else np.full(len(df), np.nan)
+        if self.size or len(df) < 2:
+            for timestamp, open_, high, low, close, token in zip(
+                df.index, df["open"], df["high"], df["low"], df["close"], tokens
+            ):
+                self.update(timestamp, open_, high, low, close, token)
+            return
+
+        # The closed bars go through the batch kernels, the open bar through update()
+        closed = len(df) - 1
+        while len(self.arrays["close"]) < closed + 1:
+            self._grow()
+        ohlc = {column: df[column].to_numpy(float)[:closed] for column in ("open", "high", "low", "close")}
+        bands = amipy_supertrend(
+            ohlc["open"], ohlc["high"], ohlc["low"], ohlc["close"], self.supertrend_period, self.multiplier
+        )
+        computed = {
+            "MA_open": rolling_mean(ohlc["open"], self.ma_period),
+            "MA_high": rolling_mean(ohlc["high"], self.ma_period),
+            "MA_low": rolling_mean(ohlc["low"], self.ma_period),
+            "MA_close": rolling_mean(ohlc["close"], self.ma_period),
+            "EMA": ewm_mean(ohlc["close"], self.ema_period),
+            "instrument_token": tokens[:closed],
+            **ohlc,
+            **bands,
+        }
+        for column, values in computed.items():
+            self.arrays[column][:closed] = values
+        self.index = list(df.index[:closed])
+        self.size = closed
+        for column, window in self.windows.items():
+            if window.maxlen:
+                window.extend(self.arrays[column][max(closed - window.maxlen - 1, 0) : closed - 1])
+
+        last = df.iloc[-1]
+        self.update(df.index[-1], last["open"], last["high"], last["low"], last["close"], tokens[-1])
+
+    def _moving_average(self, column, value):
+        window = self.windows[column]
+        if len(window) + 1 < self.ma_period:
+            return np.nan
+        return (sum(window) + value) / self.ma_period
+
+    def _compute(self, row):
+        arrays = self.arrays
+        open_ = arrays["open"][row]
+        high = arrays["high"][row]
+        low = arrays["low"][row]
+        close = arrays["close"][row]
+
+        arrays["MA_open"][row] = self._moving_average("open", open_)
+        arrays["MA_high"][row] = self._moving_average("high", high)
+        arrays["MA_low"][row] = self._moving_average("low", low)
+        arrays["MA_close"][row] = self._moving_average("close", close)
+
+        if row == 0:
+            true_range = np.nan
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        atr = ewm_step(self.prev_atr, true_range, self.atr_alpha)
+        arrays["ATR"][row] = atr
+        arrays["EMA"][row] = ewm_step(self.prev_ema, close, self.ema_alpha)
+
+        ha_close = (open_ + high + low + close) / 4
+        mid = (max(high, open_, close) + min(low, open_, close)) / 2
+
+        if row == 0:
+            arrays["Trend"][row] = 1
+            arrays["Up"][row] = mid + self.multiplier * atr
+            arrays["Dn"][row] = mid - self.multiplier * atr
+            arrays["TrendUp"][row] = np.nan
+            arrays["TrendDown"][row] = np.nan
+            return
+
+        trend, up, dn, change_of_trend = amipy_supertrend_step(
+            ha_close, mid, atr, self.multiplier, self.prev_trend, self.prev_up, self.prev_dn
+        )
+        arrays["Trend"][row] = trend
+        arrays["Up"][row] = up
+        arrays["Dn"][row] = dn
+        arrays["TrendUp"][row] = dn if trend > 0 else np.nan
+        arrays["TrendDown"][row] = up if trend < 0 else np.nan
+
+        # A trend change also joins the previous bar's line to the new one
+        arrays["TrendUp"][row - 1] = self.prev_trend_up
+        arrays["TrendDown"][row - 1] = self.prev_trend_down
+        if change_of_trend:
+            if trend == 1:
+                arrays["TrendUp"][row - 1] = self.prev_trend_down
+            elif trend == -1:
+                arrays["TrendDown"][row - 1] = self.prev_trend_up
+
+    def frame(self):
+        """Returns all bars with the columns of ``straddlecalculation.supertrend``."""
+        size = self.size
+        data = {column: self.arrays[column][:size].copy() for column in _ARRAYS}
+        data["TrendSL"] = np.where(data["Trend"] == 1, data["TrendUp"], data["TrendDown"])
+        return pd.DataFrame(data, index=pd.Index(self.index, name="date"), columns=OUTPUT_COLUMNS)
+
+
+SIGNAL_COLUMNS = ["LongSignal", "ShortSignal", "LongCoverSignal", "ShortCoverSignal"]
+
+
+class AmiPySignalEngine:
+    """
+    Incremental version of AmiPyLive's ``genSignals`` loop.
+
+    The loop walked every bar of the session on each tick. Its outcome is a
+    small state machine: the first bar of the day matching the long or
+    short rule opens the day's position, and the first later bar with the
+    opposite trend (or past square off) covers it; nothing happens after
+    that. Closed bars no longer change, so they are folded into the state
+    once, when they close. Each tick only evaluates the open bar on top of
+    that state, and the signals and ``trade_state`` come out the same as
+    from the full loop.
+
+    Args:
+        indicators (AmiPyIndicatorEngine): The bars and indicators to read.
+        entry_time, last_buy_time, sqroff_time (datetime.time): Strategy timings.
+        today (datetime.date): Session day, earlier bars never signal; today by default.
+    """
+
+    def __init__(self, indicators, entry_time, last_buy_time, sqroff_time, today=None):
+        self.indicators = indicators
+        self.entry_time = entry_time
+        self.last_buy_time = last_buy_time
+        self.sqroff_time = sqroff_time
+        self.today = today or dt.date.today()
+        # (position, entry row, cover row) after the closed bars, and with the open bar on top
+        self.closed_state = (None, None, None)
+        self.state = self.closed_state
+        self.closed_rows = 0
+
+    def _step(self, state, row):
+        position, entry_row, cover_row = state
+        if row == 0:
+            return state
+        timestamp = self.indicators.index[row]
+        if timestamp.date() != self.today:
+            return state
+        arrays = self.indicators.arrays
+        trend, close, bar_time = arrays["Trend"][row], arrays["close"][row], timestamp.time()
+        if position is None:
+            can_enter = self.entry_time < bar_time < self.sqroff_time and bar_time < self.last_buy_time
+            if can_enter and trend == 1 and close > arrays["EMA"][row]:
+                return ("Long", row, None)
+            if can_enter and trend == -1 and close < arrays["EMA"][row]:
+                return ("Short", row, None)
+            return state
+        if cover_row is None:
+            opposite_trend = -1 if position == "Long" else 1
+            if trend == opposite_trend or bar_time > self.sqroff_time:
+                return (position, entry_row, row)
+        return state
+
+    def update(self):
+        """Folds the newly closed bars into the state and evaluates the open bar; O(1) per tick."""
+        last_row = self.indicators.size - 1
+        while self.closed_rows < last_row:
+            self.closed_state = self._step(self.closed_state, self.closed_rows)
+            self.closed_rows += 1
+        self.state = self._step(self.closed_state, last_row) if last_row >= 0 else self.closed_state
+
+    def last_signal(self):
+        """Name of the signal on the open bar, None if it carries none."""
+        position, entry_row, cover_row = self.state
+        last_row = self.indicators.size - 1
+        if cover_row == last_row:
+            return f"{position}CoverSignal"
+        if entry_row == last_row:
+            return f"{position}Signal"
+        return None
+
+    def _trend_sl(self, row):
+        arrays = self.indicators.arrays
+        return arrays["TrendUp"][row] if arrays["Trend"][row] == 1 else arrays["TrendDown"][row]
+
+    def trade_state(self, strike_prc):
+        """The ``trade_state`` dict genSignals returned."""
+        position, entry_row, cover_row = self.state
+        trade_state = {
+            "in_trade": False,
+            "strike_price": strike_prc,
+            "trade_type": None,
+            "trade_points": 0,
+            "TrendSL": 0,
+            "close": 0,
+            "TradeEntryPrice": 0,
+            "SL_points": 0,
+        }
+        if position is None:
+            return trade_state
+        last_close = self.indicators.arrays["close"][self.indicators.size - 1]
+        trade_state["close"] = last_close
+        if cover_row is not None:
+            trade_state["strike_price"] = 0
+            return trade_state
+        entry_close = self.indicators.arrays["close"][entry_row]
+        trend_sl = self._trend_sl(entry_row)
+        trade_state.update(
+            {
+                "in_trade": True,
+                "trade_type": position,
+                "trade_points": entry_close - last_close,
+                "TrendSL": trend_sl,
+                "TradeEntryPrice": entry_close,
+                "SL_points": last_close - trend_sl if position == "Long" else trend_sl - last_close,
+            }
+        )
+        return trade_state
+
+    def frame(self):
+        """The indicator frame with the signal columns, as genSignals returned it; O(session)."""
+        frame = self.indicators.frame()
+        position, entry_row, cover_row = self.state
+        for column in SIGNAL_COLUMNS:
+            frame[column] = 0
+        if position is not None:
+            frame.iloc[entry_row, frame.columns.get_loc(f"{position}Signal")] = 1
+            if cover_row is not None:
+                frame.iloc[cover_row, frame.columns.get_loc(f"{position}CoverSignal")] = 1
+        return frame
@@ -0,0 +1,251 @@
+import datetime as dt
+import os
+import sys
+import time
+from collections import namedtuple
+
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+# Strikes resolved beyond the legs on each side: how far the index may move between pre-warm and entry
+LADDER_DRIFT_STEPS = int(os.getenv("LADDER_DRIFT_STEPS", "10"))
+# The pre-warm starts at most this long before the entry time, so its quote and user list stay fresh
+PREWARM_LEAD_SECONDS = float(os.getenv("PREWARM_LEAD_SECONDS", "60"))
+# The just-in-time phase starts this long before the entry time, about one quote round trip
+ENTRY_LEAD_SECONDS = float(os.getenv("ENTRY_LEAD_SECONDS", "0.1"))
+# The last second of the wait is slept in short slices, a long sleep can wake up late
+SPIN_SECONDS = 1.0
+SPIN_SLICE_SECONDS = 0.005
+
+Contract = namedtuple(
+    "Contract", ["strike", "option_type", "exchange_token", "kite_token", "trading_symbol", "lot_size"]
+)
+# offset is the distance of the leg from the ATM strike, in strike steps
+Leg = namedtuple("Leg", ["name", "option_type", "offset"])
+PickedLeg = namedtuple("PickedLeg", ["contract", "ltp"])
+
+
+def main_strike_offset(prediction, strategy_type, strike_prc_multiplier):
+    """Strike steps from the ATM to the main strike, the rule of ``calculate_current_atm_strike_prc``."""
+    if not strike_prc_multiplier:
+        return 0
+    directions = {
+        ("Bearish", "OB"): -1,
+        ("Bullish", "OB"): 1,
+        ("Bearish", "OS"): 1,
+        ("Bullish", "OS"): -1,
+    }
+    if (prediction, strategy_type) not in directions:
+        raise ValueError(f"Invalid prediction {prediction} for strategy type {strategy_type}")
+    return directions[(prediction, strategy_type)] * strike_prc_multiplier
+
+
+def hedge_strike_offset(prediction, hedge_multiplier):
+    """Strike steps from the ATM to the hedge strike, the rule of ``get_hedge_strikeprc``."""
+    return hedge_multiplier if prediction == "Bearish" else -hedge_multiplier
+
+
+def entry_datetime(entry_time_str, today=None):
+    """The "HH:MM:SS" entry time of a strategy as a datetime on ``today``."""
+    hour, minute, second = map(int, entry_time_str.split(":"))
+    today = today or dt.date.today()
+    return dt.datetime(today.year, today.month, today.day, hour, minute, second)
+
+
+def wait_until(target, lead_seconds=ENTRY_LEAD_SECONDS, now=dt.datetime.now, sleep=time.sleep):
+    """Sleeps until ``lead_seconds`` before ``target``; returns at once if that is already past."""
+    target = target - dt.timedelta(seconds=lead_seconds)
+    while True:
+        remaining = (target - now()).total_seconds()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_SECONDS:
+            sleep(remaining - SPIN_SECONDS)
+        else:
+            sleep(min(remaining, SPIN_SLICE_SECONDS))
+
+
+class StrikeLadder:
+    """
+    Contracts of one underlying and expiry, resolved ahead of the entry.
+
+    Args:
+        base_symbol (str): Underlying, e.g. "NIFTY".
+        expiry (str): Expiry of every contract.
+        strike_step: Distance between two strikes.
+        contracts (dict): :class:`Contract` per ``(strike, option_type)``.
+    """
+
+    def __init__(self, base_symbol, expiry, strike_step, contracts):
+        self.base_symbol = base_symbol
+        self.expiry = expiry
+        self.strike_step = strike_step
+        self.contracts = contracts
+
+    @classmethod
+    def build(cls, instrument, base_symbol, expiry, strike_step, center, steps, option_types):
+        """Resolves every strike within ``steps`` strike steps of ``center`` for each option type."""
+        contracts = {}
+        for offset in range(-steps, steps + 1):
+            strike = center + strike_step * offset
+            for option_type in option_types:
+                contract = resolve_contract(instrument, base_symbol, strike, option_type, expiry)
+                if contract is not None:
+                    contracts[(strike, option_type)] = contract
+        return cls(base_symbol, expiry, strike_step, contracts)
+
+    def atm(self, spot):
+        return round(spot / self.strike_step) * self.strike_step
+
+    def contract(self, strike, option_type):
+        return self.contracts.get((strike, option_type))
+
+    @property
+    def kite_tokens(self):
+        return [contract.kite_token for contract in self.contracts.values()]
+
+
+def resolve_contract(instrument, base_symbol, strike, option_type, expiry):
+    """Looks up one option contract in the instrument master, None if it is not listed."""
+    exchange_token = instrument.get_exchange_token_by_criteria(base_symbol, strike, option_type, expiry)
+    if exchange_token is None:
+        return None
+    return Contract(
+        strike,
+        option_type,
+        exchange_token,
+        instrument.get_kite_token_by_exchange_token(exchange_token),
+        instrument.get_trading_symbol_by_exchange_token(exchange_token),
+        instrument.get_lot_size_by_exchange_token(exchange_token),
+    )
+
+
+class OptionEntry:
+    """
+    Two phase entry of an option strategy.
+
+    :meth:`prewarm` runs ``PREWARM_LEAD_SECONDS`` before the entry time and does everything
+    that does not depend on the entry price: the strike step, the expiry and
+    the contracts of a ladder of strikes around the current ATM strike,
+    wide enough for every leg plus ``drift_steps`` strikes of index movement.
+
+    :meth:`resolve` runs at entry. It takes one batched quote of the index
+    and the whole ladder, rounds the fresh index price to the ATM strike and
+    picks each leg from the ladder, so the legs and their prices come from
+    the same moment and no lookup is left between the quote and the orders.
+    A strike beyond the ladder falls back to the instrument master.
+
+    Args:
+        strategy_obj (StrategyBase): The strategy, for its strike step.
+        base_symbol (str): Underlying, e.g. "NIFTY".
+        index_token: Kite token of the underlying.
+        legs (list): :class:`Leg` per option leg.
+        expiry_type (str): See ``Instrument.get_expiry_by_criteria``.
+        quote_source: Object with ``fetch_ltps(tokens) -> {token: ltp}``, Kite by default.
+        instrument: Instrument master lookups, ``InstrumentCenterUtils.Instrument()`` by default.
+        drift_steps (int): Extra strikes resolved on each side.
+    """
+
+    def __init__(
+        self,
+        strategy_obj,
+        base_symbol,
+        index_token,
+        legs,
+        expiry_type="current_week",
+        quote_source=None,
+        instrument=None,
+        drift_steps=LADDER_DRIFT_STEPS,
+    ):
+        self.strategy_obj = strategy_obj
+        self.base_symbol = base_symbol
+        self.index_token = str(index_token)
+        self.legs = legs
+        self.expiry_type = expiry_type
+        self._quote_source = quote_source
+        self._instrument = instrument
+        self.drift_steps = drift_steps
+        self.ladder = None
+        self.tokens = None
+        self.spot = None
+
+    @property
+    def quote_source(self):
+        if self._quote_source is None:
+            from Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter import get_primary_kite_obj
+            from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.quote_sources import KiteQuoteSource
+
+            self._quote_source = KiteQuoteSource(get_primary_kite_obj())
+        return self._quote_source
+
+    @property
+    def instrument(self):
+        if self._instrument is None:
+            from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import Instrument
+
+            self._instrument = Instrument()
+        return self._instrument
+
+    def prewarm(self):
+        """
+        Resolves the strike ladder.
+
+        Returns:
+            dict: :class:`PickedLeg` per leg name at the pre-warm prices, for
+            what can be sized ahead of the entry such as the user quantities.
+        """
+        started = time.perf_counter()
+        strike_step = self.strategy_obj.get_strike_step(self.base_symbol)
+        spot = self.quote_source.fetch_ltps([self.index_token])[self.index_token]
+        center = round(spot / strike_step) * strike_step
+        first_leg = self.legs[0]
+        expiry = self.instrument.get_expiry_by_criteria(
+            self.base_symbol, center + strike_step * first_leg.offset, first_leg.option_type, self.expiry_type
+        )
+        steps = max(abs(leg.offset) for leg in self.legs) + self.drift_steps
+        option_types = sorted({leg.option_type for leg in self.legs})
+        self.ladder = StrikeLadder.build(
+            self.instrument, self.base_symbol, expiry, strike_step, center, steps, option_types
+        )
+        self.tokens = [self.index_token] + [str(token) for token in self.ladder.kite_tokens]
+        picks = self.resolve()
+        logger.info(
+            f"Pre-warmed {len(self.ladder.contracts)} {self.base_symbol} {expiry} contracts around {center} "
+            f"in {time.perf_counter() - started:.2f} s"
+        )
+        return picks
+
+    def resolve(self):
+        """
+        Picks every leg at the current index price with one batched quote.
+
+        Returns:
+            dict: :class:`PickedLeg` per leg name.
+        """
+        ltps = self.quote_source.fetch_ltps(self.tokens)
+        self.spot = ltps[self.index_token]
+        atm = self.ladder.atm(self.spot)
+        picks = {}
+        for leg in self.legs:
+            strike = atm + self.ladder.strike_step * leg.offset
+            contract = self.ladder.contract(strike, leg.option_type)
+            if contract is None:
+                logger.warning(f"{self.base_symbol} {strike} {leg.option_type} is outside the pre-warmed ladder")
+                contract = resolve_contract(
+                    self.instrument, self.base_symbol, strike, leg.option_type, self.ladder.expiry
+                )
+                if contract is None:
+                    raise ValueError(f"No {self.base_symbol} {strike} {leg.option_type} contract for {self.ladder.expiry}")
+                ltp = self.quote_source.fetch_ltps([contract.kite_token])[str(contract.kite_token)]
+            else:
+                ltp = ltps[str(contract.kite_token)]
+            picks[leg.name] = PickedLeg(contract, ltp)
+        return picks
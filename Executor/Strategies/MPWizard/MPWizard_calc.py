@@ -60,6 +60,7 @@ def get_average_range_and_update_json(days):
     kite = create_kite_obj(
         api_key=primary_account_session_id["Broker"]["ApiKey"],
         access_token=primary_account_session_id["Broker"]["SessionId"],
+        username=primary_account_session_id["Broker"]["BrokerUsername"],
     )
 
     previous_dates = get_previous_dates(days)
@@ -137,6 +138,7 @@ def get_high_low_range_and_update_json():
     kite = create_kite_obj(
         api_key=primary_account_session_id["Broker"]["ApiKey"],
         access_token=primary_account_session_id["Broker"]["SessionId"],
+        username=primary_account_session_id["Broker"]["BrokerUsername"],
     )
     today = dt.datetime.now().date()
     start_time = dt.datetime.combine(today, dt.time(9, 15))
@@ -1,7 +1,6 @@
 import os
 import sys
 import datetime as dt
-from time import sleep
 from dotenv import load_dotenv
 
 DIR_PATH = os.getcwd()
@@ -26,11 +25,20 @@ from Executor.Strategies.StrategiesUtil import (
     calculate_transaction_type_sl,
     calculate_trigger_price,
     fetch_qty_amplifier,
-    fetch_strategy_amplifier
+    fetch_strategy_amplifier,
+    fetch_strategy_users,
+)
+from Executor.Strategies.EntryRuntime import (
+    OptionEntry,
+    Leg,
+    main_strike_offset,
+    hedge_strike_offset,
+    entry_datetime,
+    wait_until,
+    PREWARM_LEAD_SECONDS,
 )
 
 import Executor.ExecutorUtils.ExeUtils as ExeUtils
-import Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils as InstrumentCenterUtils
 from Executor.ExecutorUtils.NotificationCenter.Discord.discord_adapter import (
     discord_bot,
 )
@@ -49,7 +57,6 @@ class Namaha(StrategyBase):
         return super().get_raw_field(field_name)
 
 namaha_obj = Namaha.load_from_db("Namaha")
-instrument_obj = InstrumentCenterUtils.Instrument()
 
 def message_for_orders(trade_type, prediction, main_trade_symbol, hedge_trade_symbol):
     message = (
@@ -80,91 +87,81 @@ strategy_type = namaha_obj.GeneralParams.StrategyType
 
 logger.debug(f"Values from Firebase for {strategy_name}: {base_symbol}, {today_expiry_token}, {prediction}, {order_type}, {product_type}, {strike_prc_multiplier}, {hedge_multiplier}, {stoploss_multiplier}, {desired_start_time_str}, {strategy_type}")
 
-start_hour, start_minute, start_second = map(int, desired_start_time_str.split(":"))
-
-main_strikeprc = namaha_obj.calculate_current_atm_strike_prc(
-    base_symbol, today_expiry_token, prediction, strike_prc_multiplier,strategy_type
-)
-hedge_strikeprc = namaha_obj.get_hedge_strikeprc(
-    base_symbol, today_expiry_token, prediction, hedge_multiplier
-)
 main_option_type = namaha_obj.get_option_type(prediction, "OS")
 hedge_option_type = namaha_obj.get_hedge_option_type(prediction)
 
-today_expiry = instrument_obj.get_expiry_by_criteria(
-    base_symbol, main_strikeprc, main_option_type, "current_week"
-)
-hedge_exchange_token = instrument_obj.get_exchange_token_by_criteria(
-    base_symbol, hedge_strikeprc, hedge_option_type, today_expiry
-)
-main_exchange_token = instrument_obj.get_exchange_token_by_criteria(
-    base_symbol, main_strikeprc, main_option_type, today_expiry
+option_entry = OptionEntry(
+    namaha_obj,
+    base_symbol,
+    today_expiry_token,
+    [
+        Leg("main", main_option_type, main_strike_offset(prediction, strategy_type, strike_prc_multiplier)),
+        Leg("hedge", hedge_option_type, hedge_strike_offset(prediction, hedge_multiplier)),
+    ],
 )
 
-ltp = InstrumentCenterUtils.get_single_ltp(exchange_token=main_exchange_token)
-lot_size = instrument_obj.get_lot_size_by_exchange_token(main_exchange_token)
 
-qty_amplifier = fetch_qty_amplifier(strategy_name,strategy_type)
-strategy_amplifier = fetch_strategy_amplifier(strategy_name)
-update_qty_user_firebase(strategy_name, ltp, lot_size,qty_amplifier,strategy_amplifier)
+def prewarm():
+    """Resolves the strike ladder and sizes the users' quantities; returns the strategy users."""
+    main_leg = option_entry.prewarm()["main"]
+    qty_amplifier = fetch_qty_amplifier(strategy_name,strategy_type)
+    strategy_amplifier = fetch_strategy_amplifier(strategy_name)
+    update_qty_user_firebase(strategy_name, main_leg.ltp, main_leg.contract.lot_size,qty_amplifier,strategy_amplifier)
+    return fetch_strategy_users(strategy_name)
 
-main_trade_symbol = instrument_obj.get_trading_symbol_by_exchange_token(
-    main_exchange_token
-)
-hedge_trade_symbol = instrument_obj.get_trading_symbol_by_exchange_token(
-    hedge_exchange_token
-)
 
-stoploss_transaction_type = calculate_transaction_type_sl(main_transaction_type)
-limit_prc = calculate_stoploss(
-    ltp, main_transaction_type, stoploss_multiplier=stoploss_multiplier
-)
-logger.debug(f"stoploss_transaction_type: {stoploss_transaction_type}, limit_prc: {limit_prc}")
-trigger_prc = calculate_trigger_price(stoploss_transaction_type, limit_prc)
-
-orders_to_place = [
-    {
-        "strategy": strategy_name,
-        "signal": "Short",
-        "base_symbol": base_symbol,
-        "exchange_token": hedge_exchange_token,
-        "transaction_type": hedge_transaction_type,
-        "order_type": order_type,
-        "product_type": product_type,
-        "order_mode": "HedgeEntry",
-        "trade_id": next_trade_prefix,
-        "trade_mode": TRADE_MODE
-    },
-    {
-        "strategy": strategy_name,
-        "signal": "Short",
-        "base_symbol": base_symbol,
-        "exchange_token": main_exchange_token,
-        "transaction_type": main_transaction_type,
-        "order_type": order_type,
-        "product_type": product_type,
-        "order_mode": "Main",
-        "trade_id": next_trade_prefix,
-        "trade_mode": TRADE_MODE
-    },
-    {
-        "strategy": strategy_name,
-        "signal": "Short",
-        "base_symbol": base_symbol,
-        "exchange_token": main_exchange_token,
-        "transaction_type": stoploss_transaction_type,
-        "order_type": "Stoploss",
-        "product_type": product_type,
-        "limit_prc": limit_prc,
-        "trigger_prc": trigger_prc,
-        "order_mode": "SL",
-        "trade_id": next_trade_prefix,
-        "trade_mode": TRADE_MODE
-    },
-]
-
-orders_to_place = assign_trade_id(orders_to_place)
-logger.debug(f"orders_to_place for {strategy_name}: {orders_to_place}")
+def create_order_details(main_leg, hedge_leg):
+    stoploss_transaction_type = calculate_transaction_type_sl(main_transaction_type)
+    limit_prc = calculate_stoploss(
+        main_leg.ltp, main_transaction_type, stoploss_multiplier=stoploss_multiplier
+    )
+    logger.debug(f"stoploss_transaction_type: {stoploss_transaction_type}, limit_prc: {limit_prc}")
+    trigger_prc = calculate_trigger_price(stoploss_transaction_type, limit_prc)
+
+    orders_to_place = [
+        {
+            "strategy": strategy_name,
+            "signal": "Short",
+            "base_symbol": base_symbol,
+            "exchange_token": hedge_leg.contract.exchange_token,
+            "transaction_type": hedge_transaction_type,
+            "order_type": order_type,
+            "product_type": product_type,
+            "order_mode": "HedgeEntry",
+            "trade_id": next_trade_prefix,
+            "trade_mode": TRADE_MODE
+        },
+        {
+            "strategy": strategy_name,
+            "signal": "Short",
+            "base_symbol": base_symbol,
+            "exchange_token": main_leg.contract.exchange_token,
+            "transaction_type": main_transaction_type,
+            "order_type": order_type,
+            "product_type": product_type,
+            "order_mode": "Main",
+            "trade_id": next_trade_prefix,
+            "trade_mode": TRADE_MODE
+        },
+        {
+            "strategy": strategy_name,
+            "signal": "Short",
+            "base_symbol": base_symbol,
+            "exchange_token": main_leg.contract.exchange_token,
+            "transaction_type": stoploss_transaction_type,
+            "order_type": "Stoploss",
+            "product_type": product_type,
+            "limit_prc": limit_prc,
+            "trigger_prc": trigger_prc,
+            "order_mode": "SL",
+            "trade_id": next_trade_prefix,
+            "trade_mode": TRADE_MODE
+        },
+    ]
+
+    orders_to_place = assign_trade_id(orders_to_place)
+    logger.debug(f"orders_to_place for {strategy_name}: {orders_to_place}")
+    return orders_to_place
 
 def main():
     global strategy_name, prediction
@@ -177,13 +174,17 @@ def main():
     if now.time() < dt.time(9, 0):
         logger.info("Time is before 9:00 AM, Waiting to execute.")
     else:
-        wait_time = (
-            dt.datetime(now.year, now.month, now.day, start_hour, start_minute) - now
-        )
-
-        if wait_time.total_seconds() > 0:
-            logger.info(f"Waiting for {wait_time} before starting the bot")
-            sleep(wait_time.total_seconds())
+        entry_time = entry_datetime(desired_start_time_str)
+        if entry_time > now:
+            logger.info(f"Waiting for {entry_time - now} before starting the bot")
+        wait_until(entry_time, lead_seconds=PREWARM_LEAD_SECONDS)
+        strategy_users = prewarm()
+        wait_until(entry_time)
+
+        # Just in time: one quote, the legs from the ladder, then straight to the brokers
+        picks = option_entry.resolve()
+        orders_to_place = create_order_details(picks["main"], picks["hedge"])
+        place_order_strategy_users(strategy_name, orders_to_place, strategy_users=strategy_users)
 
         main_trade_id = None
         logger.info(f"orders_to_place{orders_to_place}")
@@ -210,9 +211,9 @@ def main():
 
         update_signal_firebase(strategy_name, signals_to_log, next_trade_prefix)
 
-        message_for_orders("Live", prediction, main_trade_symbol, hedge_trade_symbol)
-
-        place_order_strategy_users(strategy_name, orders_to_place)
+        message_for_orders(
+            "Live", prediction, picks["main"].contract.trading_symbol, picks["hedge"].contract.trading_symbol
+        )
 
 
 if __name__ == "__main__":
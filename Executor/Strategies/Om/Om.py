@@ -1,4 +1,4 @@
-import random, time
+import random
 import os, sys
 import datetime as dt
 from dotenv import load_dotenv
@@ -23,10 +23,18 @@ from Executor.Strategies.StrategiesUtil import (
     place_order_strategy_users,
     calculate_transaction_type_sl,
     fetch_qty_amplifier,
-    fetch_strategy_amplifier
+    fetch_strategy_amplifier,
+    fetch_strategy_users,
+)
+from Executor.Strategies.EntryRuntime import (
+    OptionEntry,
+    Leg,
+    main_strike_offset,
+    entry_datetime,
+    wait_until,
+    PREWARM_LEAD_SECONDS,
 )
 
-import Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils as InstrumentCenterUtils
 from Executor.ExecutorUtils.NotificationCenter.Discord.discord_adapter import (
     discord_bot,
 )
@@ -47,10 +55,8 @@ class Om(StrategyBase):
 
 
 om_strategy_obj = Om.load_from_db("Om")
-instrument_obj = InstrumentCenterUtils.Instrument()
 next_trade_prefix = om_strategy_obj.NextTradeId
 desired_start_time_str = om_strategy_obj.get_entry_params().EntryTime
-start_hour, start_minute, start_second = map(int, desired_start_time_str.split(":"))
 window = om_strategy_obj.get_raw_field("EntryParams").get("Window")
 strategy_name = om_strategy_obj.StrategyName
 strategy_type = om_strategy_obj.GeneralParams.StrategyType
@@ -65,41 +71,30 @@ def flip_coin():
 
 prediction = "Bullish" if flip_coin() == "Heads" else "Bearish"
 
-def determine_strike_and_option():
-    global prediction
-    strike_price_multiplier = om_strategy_obj.EntryParams.StrikeMultiplier
-    strategy_type = om_strategy_obj.GeneralParams.StrategyType
-    base_symbol, _ = om_strategy_obj.determine_expiry_index()
-    option_type = "CE" if prediction == "Bullish" else "PE"
-    strike_prc = om_strategy_obj.calculate_current_atm_strike_prc(
-        base_symbol=base_symbol,
-        prediction=prediction,
-        strike_prc_multiplier=strike_price_multiplier,
-        strategy_type=strategy_type,
-    )
-    return base_symbol, strike_prc, option_type
-
-
-def fetch_exchange_token(base_symbol, strike_prc, option_type):
-    today_expiry = instrument_obj.get_expiry_by_criteria(
-        base_symbol, strike_prc, option_type, "current_week"
-    )
-    exchange_token = instrument_obj.get_exchange_token_by_criteria(
-        base_symbol, strike_prc, option_type, today_expiry
-    )
-    return exchange_token
+base_symbol, _ = om_strategy_obj.determine_expiry_index()
+option_type = "CE" if prediction == "Bullish" else "PE"
+option_entry = OptionEntry(
+    om_strategy_obj,
+    base_symbol,
+    int(om_strategy_obj.get_token_from_info(base_symbol)),
+    [
+        Leg(
+            "main",
+            option_type,
+            main_strike_offset(prediction, strategy_type, om_strategy_obj.EntryParams.StrikeMultiplier),
+        )
+    ],
+)
 
 
-def update_qty(base_symbol, strike_prc, option_type):
+def prewarm():
+    """Resolves the strike ladder and sizes the users' quantities; returns the strategy users."""
     global strategy_name, strategy_type
-    exchange_token = fetch_exchange_token(base_symbol, strike_prc, option_type)
-    token = instrument_obj.get_kite_token_by_exchange_token(exchange_token)
-    ltp = InstrumentCenterUtils.get_single_ltp(token)
-    lot_size = instrument_obj.get_lot_size_by_exchange_token(exchange_token)
-    lot_size = instrument_obj.get_lot_size_by_exchange_token(exchange_token)
+    main_leg = option_entry.prewarm()["main"]
     qty_amplifier = fetch_qty_amplifier(strategy_name,strategy_type)
     strategy_amplifier = fetch_strategy_amplifier(strategy_name)
-    update_qty_user_firebase(om_strategy_obj.StrategyName, ltp, lot_size,qty_amplifier,strategy_amplifier)
+    update_qty_user_firebase(om_strategy_obj.StrategyName, main_leg.ltp, main_leg.contract.lot_size,qty_amplifier,strategy_amplifier)
+    return fetch_strategy_users(strategy_name)
 
 
 def create_order_details(exchange_token, base_symbol):
@@ -150,45 +145,35 @@ def send_signal_msg(base_symbol, strike_prc, option_type):
     discord_bot(message, om_strategy_obj.StrategyName)
 
 def main():
-    global start_hour, start_minute, window
-    hour = int(start_hour)
-    minute = int(start_minute)
+    global window
     window = int(window)
-
-    current_time = time.localtime()
-    seconds_since_midnight = current_time.tm_hour * 3600 + current_time.tm_min * 60 + current_time.tm_sec
-
-    # Calculate the total number of seconds until 11:30 AM
-    seconds_until_11_30_am = (hour * 3600 + minute * 60) - seconds_since_midnight
-
-    # The window is now from 11:30 AM to 11:35 AM, so it's 5 minutes long
-    seconds_in_window = window * 60  # 5 minutes
-
-    # Generate a random number of seconds to wait within this 5-minute window
-    random_seconds = random.randint(0, seconds_in_window)
-
-    # Check if today is the day after a holiday
     now = dt.datetime.now()
 
     if now.date() in holidays:
         logger.info("Skipping execution as today is a holiday.")
         return
 
-    # If it's already past 11:35 AM, no need to wait
-    if seconds_until_11_30_am < 0:
+    # Enter at a random moment of the window starting at the entry time
+    window_start = entry_datetime(desired_start_time_str)
+    entry_time = window_start + dt.timedelta(seconds=random.randint(0, window * 60))
+
+    # If the window has started already, no need to wait
+    if window_start < now:
         logger.warning("The window has already passed.")
+        strategy_users = prewarm()
     else:
-        # Wait until 11:30 AM, then an additional random amount of time within the 5-minute window
-        total_wait_seconds = max(seconds_until_11_30_am, 0) + random_seconds
-        logger.info(f"Waiting for {total_wait_seconds} seconds.")
-        time.sleep(total_wait_seconds)
-
-    base_symbol, strike_prc, option_type = determine_strike_and_option()
-    exchange_token = fetch_exchange_token(base_symbol, strike_prc, option_type)
-    update_qty(base_symbol, strike_prc, option_type)
-    send_signal_msg(base_symbol, strike_prc, option_type)
-    orders_to_place = create_order_details(exchange_token, base_symbol)
+        logger.info(f"Waiting for {(entry_time - now).total_seconds():.0f} seconds.")
+        # Pre-warm shortly before the entry, not at task start, so the quantities are sized at a recent price
+        wait_until(entry_time, lead_seconds=PREWARM_LEAD_SECONDS)
+        strategy_users = prewarm()
+        wait_until(entry_time)
+
+    # Just in time: one quote, the strike from the ladder, then straight to the brokers
+    main_leg = option_entry.resolve()["main"]
+    orders_to_place = create_order_details(main_leg.contract.exchange_token, base_symbol)
     orders_to_place = assign_trade_id(orders_to_place)
+    place_order_strategy_users(om_strategy_obj.StrategyName, orders_to_place, strategy_users=strategy_users)
+    send_signal_msg(base_symbol, main_leg.contract.strike, option_type)
     logger.info(orders_to_place)
 
     main_trade_id = None
@@ -213,7 +198,6 @@ def main():
     update_signal_firebase(
         om_strategy_obj.StrategyName, signals_to_log, next_trade_prefix
     )
-    place_order_strategy_users(om_strategy_obj.StrategyName, orders_to_place)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,305 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from dotenv import load_dotenv
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+ENV_PATH = os.path.join(DIR, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+PYSTOCKS_CACHE_DIR = os.getenv(
+    "PYSTOCKS_CACHE_DIR", os.path.join(os.getenv("DB_DIR") or DIR, "PyStocksCache")
+)
+SCREENER_BATCH_SIZE = int(os.getenv("SCREENER_BATCH_SIZE", "100"))
+SCREENER_WORKERS = int(os.getenv("SCREENER_WORKERS", "4"))
+YFINANCE_THREADS = int(os.getenv("YFINANCE_THREADS", "16"))
+
+# Daily bars are kept for the longest lookback of the screen, the 2y weekly bars
+CACHE_HISTORY = pd.DateOffset(years=2)
+DAILY_HISTORY = pd.DateOffset(years=1)
+WEEKLY_AGGREGATION = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+
+
+def _normalize_bars(frame):
+    """Sorted, de-duplicated daily bars with a tz-naive date index and no empty rows."""
+    frame = frame.dropna(how="all")
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = frame.set_axis(index.normalize().rename("Date"))
+    frame = frame[~frame.index.duplicated(keep="last")]
+    return frame.sort_index()
+
+
+def weekly_bars(daily):
+    """Resamples daily bars to weeks starting on Monday, the bars yfinance returns for "1wk"."""
+    if daily is None or daily.empty:
+        return daily
+    aggregation = {column: how for column, how in WEEKLY_AGGREGATION.items() if column in daily.columns}
+    weekly = daily.resample("W-MON", label="left", closed="left").agg(aggregation)
+    return weekly.dropna(subset=["Close"])
+
+
+class YFinanceProvider:
+    """
+    Daily bars from Yahoo Finance for NSE symbols.
+
+    ``yf.download`` keeps its results in module level state, so calls are
+    serialized with a lock; the tickers of one call are downloaded by
+    yfinance's own thread pool.
+    """
+
+    exchange_suffix = ".NS"
+    _lock = threading.Lock()
+
+    def __init__(self, threads=YFINANCE_THREADS):
+        self.threads = threads
+
+    def download(self, symbols, start):
+        """
+        Args:
+            symbols (list): NSE symbols without the exchange suffix.
+            start (pandas.Timestamp): First day to fetch.
+
+        Returns:
+            dict: Daily OHLCV DataFrame per symbol, symbols without data are left out.
+        """
+        import yfinance as yf
+
+        tickers = [symbol + self.exchange_suffix for symbol in symbols]
+        with self._lock:
+            data = yf.download(
+                tickers=tickers,
+                start=start.strftime("%Y-%m-%d"),
+                interval="1d",
+                group_by="ticker",
+                threads=self.threads,
+                progress=False,
+            )
+        frames = {}
+        if data is None or data.empty:
+            return frames
+        for symbol, ticker in zip(symbols, tickers):
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                frame = data[ticker]
+            else:
+                frame = data
+            frame = frame.dropna(how="all")
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
+
+
+class FakeProvider:
+    """
+    Offline provider serving fixed daily bars, for tests and dry runs.
+
+    Args:
+        frames (dict): Daily OHLCV DataFrame per symbol.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def download(self, symbols, start):
+        with self._lock:
+            self.calls.append((list(symbols), start))
+        return {
+            symbol: self.frames[symbol].loc[self.frames[symbol].index >= start]
+            for symbol in symbols
+            if symbol in self.frames
+        }
+
+
+class BarCache:
+    """Daily bars of each symbol in ``<root>/<symbol>.parquet``."""
+
+    def __init__(self, root=PYSTOCKS_CACHE_DIR):
+        self.root = root
+
+    def _path(self, symbol):
+        return os.path.join(self.root, f"{symbol}.parquet")
+
+    def load(self, symbol):
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            logger.error(f"Error reading the cached bars of {symbol}: {e}")
+            return None
+
+    def save(self, symbol, bars):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(symbol)
+        # Write next to the target and swap, a crash never leaves a partial file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        bars.to_parquet(temp_path)
+        os.replace(temp_path, path)
+
+
+class ScreenerData:
+    """
+    Daily and weekly bars of the screener universe.
+
+    Bars are cached per symbol; a run only downloads the days since the last
+    cached bar, in batches of ``batch_size`` symbols spread over ``workers``
+    threads. Only completed sessions (before ``today``) are cached, the
+    screen runs during market hours and today's bar is still moving. The
+    last cached bar is downloaded again and compared: if it changed (a split
+    or dividend adjustment), the whole history of that symbol is fetched
+    again. Weekly bars are resampled from the daily ones.
+
+    Args:
+        provider: Object with ``download(symbols, start) -> {symbol: DataFrame}``,
+            :class:`YFinanceProvider` by default.
+        cache (BarCache): Where the bars are kept between runs.
+        batch_size (int): Symbols per download call.
+        workers (int): Concurrent download calls.
+        today (pandas.Timestamp): Reference day, today by default.
+    """
+
+    def __init__(
+        self,
+        provider=None,
+        cache=None,
+        batch_size=SCREENER_BATCH_SIZE,
+        workers=SCREENER_WORKERS,
+        today=None,
+    ):
+        self.provider = provider or YFinanceProvider()
+        self.cache = cache or BarCache()
+        self.batch_size = batch_size
+        self.workers = workers
+        self.today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+
+    def _download(self, starts):
+        """Downloads ``{symbol: start}`` grouped by start day and batched; returns the bars per symbol."""
+        by_start = {}
+        for symbol, start in starts.items():
+            by_start.setdefault(start, []).append(symbol)
+        batches = [
+            (symbols[i : i + self.batch_size], start)
+            for start, symbols in by_start.items()
+            for i in range(0, len(symbols), self.batch_size)
+        ]
+
+        def fetch(batch):
+            symbols, start = batch
+            try:
+                return self.provider.download(symbols, start)
+            except Exception as e:
+                logger.error(f"Error fetching bars of {len(symbols)} symbols since {start.date()}: {e}")
+                return {}
+
+        downloaded = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for frames in executor.map(fetch, batches):
+                downloaded.update(frames)
+        return downloaded
+
+    @staticmethod
+    def _last_bar_changed(cached, fresh):
+        last_day = cached.index[-1]
+        if last_day not in fresh.index:
+            return False
+        old_close = float(cached["Close"].iloc[-1])
+        new_close = float(fresh.loc[last_day, "Close"])
+        return abs(new_close - old_close) > 1e-6 * max(abs(old_close), 1.0)
+
+    def refresh(self, symbols):
+        """
+        Brings the cached daily bars of ``symbols`` up to date.
+
+        Returns:
+            dict: Daily bars per symbol; symbols without any data are left out.
+        """
+        history_start = self.today - CACHE_HISTORY
+        cached = {}
+        starts = {}
+        for symbol in symbols:
+            bars = self.cache.load(symbol)
+            if bars is not None:
+                # Caches written by older versions may end with an unfinished session
+                bars = bars.loc[bars.index < self.today]
+            # A cache starting after history_start is a symbol listed since, not a miss
+            if bars is None or bars.empty:
+                starts[symbol] = history_start
+            else:
+                cached[symbol] = bars
+                starts[symbol] = bars.index[-1]
+
+        downloaded = self._download(starts)
+        # Symbols whose history was adjusted since the last run are downloaded in full
+        adjusted = {
+            symbol: history_start
+            for symbol, fresh in downloaded.items()
+            if symbol in cached and self._last_bar_changed(cached[symbol], _normalize_bars(fresh))
+        }
+        if adjusted:
+            logger.info(f"Refetching the adjusted history of {len(adjusted)} symbols")
+            for symbol in adjusted:
+                cached.pop(symbol)
+            downloaded.update(self._download(adjusted))
+
+        daily = {}
+        for symbol in symbols:
+            fresh = downloaded.get(symbol)
+            bars = cached.get(symbol)
+            if fresh is not None and not fresh.empty:
+                fresh = _normalize_bars(fresh)
+                bars = fresh if bars is None else _normalize_bars(pd.concat([bars, fresh]))
+                bars = bars.loc[bars.index >= history_start]
+                completed = bars.loc[bars.index < self.today]
+                try:
+                    if not completed.empty:
+                        self.cache.save(symbol, completed)
+                except Exception as e:
+                    logger.error(f"Error caching the bars of {symbol}: {e}")
+            if bars is not None and not bars.empty:
+                daily[symbol] = bars
+        return daily
+
+    def stock_data_dict(self, symbols):
+        """
+        Bars in the shape the PyStocks strategies read.
+
+        Returns:
+            dict: ``{symbol: {"daily_data": 1y daily bars, "weekly_data": 2y weekly bars}}``.
+        """
+        started = time.perf_counter()
+        daily = self.refresh(symbols)
+        daily_start = self.today - DAILY_HISTORY
+        stock_data = {
+            symbol: {
+                "daily_data": bars.loc[bars.index >= daily_start].copy(),
+                "weekly_data": weekly_bars(bars),
+            }
+            for symbol, bars in daily.items()
+        }
+        logger.info(
+            f"Loaded bars of {len(stock_data)}/{len(symbols)} symbols in {time.perf_counter() - started:.1f} s"
+        )
+        return stock_data
@@ -0,0 +1,249 @@
+import os
+import sys
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+DIR = os.getcwd()
+sys.path.append(DIR)
+
+PANEL_FIELDS = ["High", "Close", "Volume"]
+
+
+def _right_aligned(frames, symbols, field):
+    """
+    Stacks one column of every frame into a (bars x symbols) matrix.
+
+    Row -1 holds each symbol's last bar, row -2 the one before and so on;
+    shorter histories are padded with NaN at the top. Each column is
+    therefore exactly the symbol's own series, which keeps rolling windows
+    and EMAs identical to computing them symbol by symbol.
+    """
+    length = max((len(frames[symbol]) for symbol in symbols), default=0)
+    matrix = np.full((length, len(symbols)), np.nan)
+    for column, symbol in enumerate(symbols):
+        values = frames[symbol][field].to_numpy(dtype=np.float64)
+        if len(values):
+            matrix[length - len(values) :, column] = values
+    return pd.DataFrame(matrix, columns=symbols)
+
+
+class BarPanel:
+    """
+    Bars of one frequency for the whole universe, one column per symbol.
+
+    Indicators are computed once, over every symbol at the same time, and
+    cached; see :func:`_right_aligned` for the row layout.
+
+    Args:
+        frames (dict): OHLCV DataFrame per symbol.
+    """
+
+    def __init__(self, frames):
+        frames = {symbol: frame for symbol, frame in frames.items() if frame is not None and not frame.empty}
+        self.symbols = list(frames)
+        self.lengths = pd.Series([len(frames[symbol]) for symbol in self.symbols], index=self.symbols, dtype=np.int64)
+        for field in PANEL_FIELDS:
+            setattr(self, field.lower(), _right_aligned(frames, self.symbols, field))
+        # True from each symbol's first bar on, False on the padding
+        positions = np.arange(len(self.close))[:, None]
+        self.has_bar = pd.DataFrame(
+            positions >= len(self.close) - self.lengths.to_numpy()[None, :], columns=self.symbols
+        )
+
+    def last(self, frame, offset=1):
+        """Row ``-offset`` of ``frame`` as a Series per symbol, NaN where the symbol is too short."""
+        if len(frame) < offset:
+            return pd.Series(np.nan, index=self.symbols)
+        return frame.iloc[-offset]
+
+    def ema(self, span):
+        return self._cached(("ema", span), lambda: self.close.ewm(span=span, min_periods=0, adjust=False).mean())
+
+    def _cached(self, key, compute):
+        cache = self.__dict__.setdefault("_indicators", {})
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    def rsi(self, length=14):
+        """Simple moving average RSI, like ``indicator_RSI``."""
+
+        def compute():
+            delta = self.close.diff()
+            # The padding stays NaN so windows reaching before the first bar are NaN too
+            gain = delta.where(delta > 0, 0).where(self.has_bar)
+            loss = (-delta).where(delta < 0, 0).where(self.has_bar)
+            rs = gain.rolling(window=length).mean() / loss.rolling(window=length).mean()
+            return 100 - (100 / (1 + rs))
+
+        return self._cached(("rsi", length), compute)
+
+    def bollinger(self, window=20):
+        """Returns the moving average, upper and lower band, like ``indicator_bollinger_bands``."""
+
+        def compute():
+            ma = self.close.rolling(window=window).mean()
+            std_dev = self.close.rolling(window=window).std()
+            return ma, ma + std_dev * 2, ma - std_dev * 2
+
+        return self._cached(("bollinger", window), compute)
+
+    def macd(self, fast_length=12, slow_length=26, signal_length=9):
+        def compute():
+            macd = (
+                self.close.ewm(span=fast_length, adjust=False).mean()
+                - self.close.ewm(span=slow_length, adjust=False).mean()
+            )
+            return macd, macd.ewm(span=signal_length, adjust=False).mean()
+
+        return self._cached(("macd", fast_length, slow_length, signal_length), compute)
+
+    @cached_property
+    def ath_to_ltp(self):
+        """All time high of the panel's history over the last close."""
+        return self.high.max() / self.last(self.close)
+
+
+class ScreenerPanel:
+    """
+    Evaluates every PyStocks strategy over the whole universe as boolean masks.
+
+    Each ``*_stocks`` method returns ``[[symbol, ratio_ATH_LTP], ...]`` in
+    universe order, the same lists the per symbol ``strategy_*`` functions
+    of PyStocksUtils return.
+
+    Args:
+        stock_data_dict (dict): ``{symbol: {"daily_data": ..., "weekly_data": ...}}``.
+    """
+
+    def __init__(self, stock_data_dict):
+        self.daily = BarPanel({symbol: data.get("daily_data") for symbol, data in stock_data_dict.items()})
+        self.weekly = BarPanel({symbol: data.get("weekly_data") for symbol, data in stock_data_dict.items()})
+
+    def _selected(self, mask):
+        mask = mask.fillna(False).astype(bool)
+        ratios = self.daily.ath_to_ltp[mask[mask].index]
+        return [[symbol, ratio] for symbol, ratio in ratios.items()]
+
+    @cached_property
+    def above_50_ema(self):
+        daily = self.daily
+        return daily.last(daily.close) > daily.last(daily.ema(50))
+
+    @cached_property
+    def lower_band_turning_up(self):
+        """The lower band dipped on the previous bar and rose on the last one."""
+        daily = self.daily
+        lower_band = daily.bollinger(20)[2]
+        return (daily.last(lower_band, 2) < daily.last(lower_band, 3)) & (
+            daily.last(lower_band, 1) > daily.last(lower_band, 2)
+        )
+
+    def volume_breakout_stocks(self, volume_change_threshold=3):
+        daily = self.daily
+        volume_changes = (daily.volume / daily.volume.shift(1) - 1).iloc[-2:]
+        return self._selected(volume_changes.mean() > volume_change_threshold)
+
+    def golden_crossover_stocks(self):
+        daily = self.daily
+        ema5, ema13, ema26 = daily.ema(5), daily.ema(13), daily.ema(26)
+        crossed_below = (daily.last(ema5, 2) < daily.last(ema13, 2)) & (daily.last(ema13, 2) < daily.last(ema26, 2))
+        crossed_above = (daily.last(ema5) > daily.last(ema13)) & (daily.last(ema13) > daily.last(ema26))
+        return self._selected((daily.lengths >= 26) & crossed_below & crossed_above)
+
+    def momentum_stocks(self):
+        daily = self.daily
+        upper_band = daily.bollinger(20)[1]
+        macd, signal_line = daily.macd()
+        mask = (
+            (daily.last(daily.rsi(14)) > 50)
+            & self.above_50_ema
+            & (daily.last(upper_band) < daily.last(daily.close))
+            & (daily.last(macd) > daily.last(signal_line))
+        )
+        return self._selected(mask)
+
+    def mean_reversion_stocks(self):
+        daily, weekly = self.daily, self.weekly
+        weekly_ma = weekly.bollinger(20)[0]
+        weekly_above_ma = (weekly.last(weekly_ma) < weekly.last(weekly.close)).reindex(daily.symbols)
+        mask = (
+            (daily.last(daily.rsi(14)) < 40)
+            & self.above_50_ema
+            & weekly_above_ma.fillna(False).astype(bool)
+            & self.lower_band_turning_up
+        )
+        return self._selected(mask)
+
+    def ema_bb_confluence_stocks(self):
+        daily = self.daily
+        ma, _, lower_band = daily.bollinger(20)
+        ema50 = daily.last(daily.ema(50))
+        last_lower_band = daily.last(lower_band)
+        last_close = daily.last(daily.close)
+        mask = (
+            (ema50 <= last_lower_band)
+            & (last_close < daily.last(ma))
+            & self.lower_band_turning_up
+            & ((last_lower_band - ema50).abs() < 0.05 * last_close)
+        )
+        # strategy_EMA_BB_Confluence stops at the first match
+        return self._selected(mask)[:1]
+
+
+if __name__ == "__main__":
+    import time
+
+    from Executor.Strategies.PyStocks import PyStocksUtils
+
+    rng = np.random.default_rng(11)
+    symbols, days = 2000, 250
+    index = pd.bdate_range("2023-01-02", periods=days)
+    stock_data_dict = {}
+    for number in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+        daily = pd.DataFrame(
+            {
+                "Open": close,
+                "High": close * (1 + rng.uniform(0, 0.02, days)),
+                "Low": close * (1 - rng.uniform(0, 0.02, days)),
+                "Close": close,
+                "Volume": rng.lognormal(10, 1, days),
+            },
+            index=index,
+        )
+        weekly = daily.resample("W-MON", label="left", closed="left").agg(
+            {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+        )
+        stock_data_dict[f"SYM{number}"] = {"daily_data": daily, "weekly_data": weekly}
+
+    def copied():
+        return {s: {k: v.copy() for k, v in d.items()} for s, d in stock_data_dict.items()}
+
+    loop_data = copied()
+    started = time.perf_counter()
+    loop_results = [
+        PyStocksUtils.strategy_momentum(loop_data),
+        PyStocksUtils.strategy_mean_reversion(loop_data),
+        PyStocksUtils.strategy_EMA_BB_Confluence(loop_data),
+        PyStocksUtils.strategy_VolumeBreakout(loop_data),
+        PyStocksUtils.strategy_golden_crossover(loop_data),
+    ]
+    per_symbol = time.perf_counter() - started
+
+    started = time.perf_counter()
+    panel = ScreenerPanel(copied())
+    panel_results = [
+        panel.momentum_stocks(),
+        panel.mean_reversion_stocks(),
+        panel.ema_bb_confluence_stocks(),
+        panel.volume_breakout_stocks(),
+        panel.golden_crossover_stocks(),
+    ]
+    vectorized = time.perf_counter() - started
+
+    same = [[s for s, _ in a] == [s for s, _ in b] for a, b in zip(loop_results, panel_results)]
+    print(f"{symbols} symbols x {days} days: per symbol {per_symbol:.2f} s, panel {vectorized:.2f} s")
+    print(f"Selections per strategy: {[len(r) for r in panel_results]}, identical: {all(same)}")
@@ -1,7 +1,10 @@
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import datetime 
+import pandas as pd
 
 # Load holdings data
 DIR = os.getcwd()
@@ -12,10 +15,11 @@ load_dotenv(ENV_PATH)
 import Executor.ExecutorUtils.ExeUtils as ExeUtils
 from Executor.ExecutorUtils.BrokerCenter.BrokerCenterUtils import fetch_users_for_strategies_from_firebase as fetch_active_users
 from Executor.ExecutorUtils.ExeDBUtils.SQLUtils.exesql_adapter import fetch_sql_table_from_db as fetch_table_from_db
-from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import get_single_ltp
-
+from Executor.ExecutorUtils.BrokerCenter.Brokers.Zerodha.zerodha_adapter import get_primary_kite_obj
 from Executor.ExecutorUtils.InstrumentCenter.InstrumentCenterUtils import Instrument
-from Executor.Strategies.StrategiesUtil import StrategyBase,assign_trade_id,place_order_strategy_users
+from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.quote_sources import KiteQuoteSource
+from Executor.Strategies.PyStocks.PyStocksUtils import trailing_stoploss
+from Executor.Strategies.StrategiesUtil import StrategyBase,assign_trade_id,place_order_single_user
 from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
 
 logger = LoggerSetup()
@@ -48,50 +52,103 @@ to_date = datetime.date.today()
 # Calculate previous day's date
 from_date = to_date - datetime.timedelta(days=1)
 
+SL_ORDER_WORKERS = int(os.getenv("ORDER_DISPATCH_WORKERS", 8))
+
+def collect_ps_holdings(users):
+    """The PyStocks holdings of every user in one frame, with the user's index in ``users``."""
+    frames = []
+    for user_index, user in enumerate(users):
+        try:
+            holdings = fetch_table_from_db(user['Tr_No'], "Holdings")
+        except Exception as e:
+            logger.error(f"Error reading the holdings of {user['Tr_No']}: {e}")
+            continue
+        py_holdings = holdings[holdings['trade_id'].str.startswith('PS')]  #TODO Remove hardcoded PS
+        frames.append(py_holdings[['trade_id', 'trading_symbol', 'entry_price']].assign(user_index=user_index))
+    if not frames:
+        return pd.DataFrame(columns=['trade_id', 'trading_symbol', 'entry_price', 'user_index'])
+    return pd.concat(frames, ignore_index=True)
+
+def resolve_tokens(symbols):
+    """NSE exchange and kite tokens of each symbol, looked up once per symbol."""
+    instrument = Instrument()
+    tokens = {}
+    for symbol in symbols:
+        try:
+            exchange_token = instrument.get_exchange_token_by_name(symbol, "NSE")
+            tokens[symbol] = (exchange_token, instrument.get_kite_token_by_exchange_token(exchange_token, "NSE"))
+        except Exception as e:
+            logger.error(f"Error resolving the tokens of {symbol}: {e}")
+    return tokens
+
+def build_sl_order(symbol, exchange_token, trade_id, sl):
+    return {
+        "strategy": strategy_name,
+        "signal": "Long",
+        "base_symbol": symbol,
+        "exchange_token": exchange_token,
+        "transaction_type": transaction_type,
+        "order_type": order_type,
+        "product_type": product_type,
+        "order_mode": "SL",
+        "trade_id": trade_id.split('_')[0],
+        "trade_mode": trade_mode,
+        "limit_prc": sl,
+        "trigger_prc": sl+0.3,
+    }
+
 def main():
+    """
+    Trails the stoploss of every PyStocks holding of every user in one pass.
+
+    Tokens are resolved once per symbol, all LTPs come from one batched quote
+    call and the stops are computed over arrays; each user then gets the SL
+    orders of their own holdings in one batch.
+    """
     now = datetime.datetime.now()
     if now.date() in ExeUtils.holidays:
         logger.info("Skipping execution as today is a holiday.")
         return
 
-    for user in users:
-        holdings = fetch_table_from_db(user['Tr_No'], "Holdings")
-        py_holdings = holdings[holdings['trade_id'].str.startswith('PS')]  #TODO Remove hardcoded PS
-        for index, row in py_holdings.iterrows():
-            symbol = row['trading_symbol']
-            exchange_token = Instrument().get_exchange_token_by_name(symbol,"NSE")
-            ltp = get_single_ltp(exchange_token = exchange_token, segment = "NSE")
-            buy_price = float(row['entry_price'])
-            per_change = (ltp - buy_price) / buy_price * 100
-            sl = buy_price - (buy_price * stoploss_multiplier/100)
-
-            trade_id = row['trade_id']
-            trade_id =  trade_id.split('_')
-            trade_id = trade_id[0]
-
-            if per_change // stoploss_multiplier > 0 and per_change//stoploss_multiplier != 1:
-                for j in range(int(per_change // stoploss_multiplier)):
-                    sl = sl + (buy_price * stoploss_multiplier/100)
-                    
-                    sl = round(sl, 1)
-                    logger.debug('LTP', ltp, 'Buy Price', buy_price, 'SL', sl)
-                order_details = [{
-                    "strategy": strategy_name,
-                    "signal": "Long",
-                    "base_symbol": symbol,
-                    "exchange_token": exchange_token,
-                    "transaction_type": transaction_type,
-                    "order_type": order_type,
-                    "product_type": product_type,
-                    "order_mode": "SL",
-                    "trade_id": trade_id,
-                    "trade_mode": trade_mode,
-                    "limit_prc": sl,
-                    "trigger_prc": sl+0.3,
-                }]
-                order_to_place = assign_trade_id(order_details)
-                logger.debug(f"Orders to place: {order_to_place}")
-                place_order_strategy_users(strategy_name, order_to_place)
+    started = time.perf_counter()
+    holdings = collect_ps_holdings(users)
+    if holdings.empty:
+        logger.info("No PyStocks holdings to trail.")
+        return
+
+    tokens = resolve_tokens(holdings['trading_symbol'].unique())
+    kite_tokens = {symbol: str(kite_token) for symbol, (_, kite_token) in tokens.items() if kite_token is not None}
+    ltps = KiteQuoteSource(get_primary_kite_obj()).fetch_ltps(set(kite_tokens.values()))
+    holdings['ltp'] = holdings['trading_symbol'].map(kite_tokens).map(ltps)
+    missing = holdings['ltp'].isna()
+    if missing.any():
+        logger.error(f"No LTP for {sorted(holdings.loc[missing, 'trading_symbol'].unique())}")
+        holdings = holdings[~missing]
+
+    stoploss, trailing = trailing_stoploss(holdings['entry_price'].astype(float), holdings['ltp'], stoploss_multiplier)
+    holdings = holdings.assign(sl=stoploss)[trailing]
+    logger.info(
+        f"{len(holdings)} of {len(missing)} holdings trail their stoploss, computed in {time.perf_counter() - started:.2f} s"
+    )
+
+    orders_by_user = {}
+    for row in holdings.itertuples(index=False):
+        logger.debug(f"LTP {row.ltp} Buy Price {row.entry_price} SL {row.sl}")
+        order = build_sl_order(row.trading_symbol, tokens[row.trading_symbol][0], row.trade_id, float(row.sl))
+        orders_by_user.setdefault(row.user_index, []).append(order)
+
+    def place_user_orders(user_index):
+        order_to_place = assign_trade_id(orders_by_user[user_index])
+        logger.debug(f"Orders to place: {order_to_place}")
+        return place_order_single_user([users[user_index]], order_to_place)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(SL_ORDER_WORKERS, len(orders_by_user)))) as executor:
+        for user_index, future in [(i, executor.submit(place_user_orders, i)) for i in orders_by_user]:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error placing the SL orders of {users[user_index]['Tr_No']}: {e}")
+    logger.info(f"Trailing stoploss run done in {time.perf_counter() - started:.2f} s")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
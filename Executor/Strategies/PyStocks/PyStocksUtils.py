@@ -1,6 +1,6 @@
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +9,8 @@ ENV_PATH = os.path.join(DIR, "trademan.env")
 load_dotenv(ENV_PATH)
 
 from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+from Executor.Strategies.PyStocks.PyStocksData import ScreenerData
+from Executor.Strategies.PyStocks.PyStocksPanel import ScreenerPanel
 
 logger = LoggerSetup()
 
@@ -17,6 +19,8 @@ def get_stock_codes():
     return list(pd.read_csv(url)["SYMBOL"].values)
 
 def get_stock_data(stockCode, period, duration):
+    import yfinance as yf
+
     try:
         append_exchange = ".NS"
         data = yf.download(
@@ -76,6 +80,31 @@ def indicator_atr(stock_data, window):
     stock_data["ATR"] = stock_data["TR"].rolling(window=window).mean()
     return stock_data["ATR"]
 
+def trailing_stoploss(buy_prices, ltps, stoploss_multiplier):
+    """
+    Stepped trailing stoploss of many holdings at once.
+
+    The stop starts ``stoploss_multiplier`` percent below the buy price and
+    moves up one step of that size (rounded to 0.1) for every full
+    ``stoploss_multiplier`` percent the price gained. It only trails from
+    two steps of gain on.
+
+    Returns:
+        tuple: The stop levels and a mask of the holdings whose stop trails.
+    """
+    buy_prices = np.asarray(buy_prices, dtype=np.float64)
+    ltps = np.asarray(ltps, dtype=np.float64)
+    per_change = (ltps - buy_prices) / buy_prices * 100
+    steps = np.floor_divide(per_change, stoploss_multiplier)
+    step_size = buy_prices * stoploss_multiplier / 100
+    stoploss = buy_prices - step_size
+    trailing = (steps > 0) & (steps != 1)
+    max_steps = int(steps[trailing].max()) if trailing.any() else 0
+    for step in range(max_steps):
+        moving = trailing & (steps > step)
+        stoploss = np.where(moving, np.round(stoploss + step_size, 1), stoploss)
+    return stoploss, trailing
+
 selected_stocks = []
 
 def strategy_VolumeBreakout(stock_data_dict, volume_change_threshold=3):
@@ -257,6 +286,12 @@ ema_bb_confluence_stocks = []
 volume_breakout = []
 golden_crossover_stocks = []
 
+def as_screener_panel(stock_data):
+    """The pickers take a stock_data_dict or a ScreenerPanel built from one; sharing a panel shares its indicators."""
+    if isinstance(stock_data, ScreenerPanel):
+        return stock_data
+    return ScreenerPanel(stock_data)
+
 # Retrieves short term momentum, mean reversion and ema-bb confluence stocks
 # Combines and sorts stocks by ATH to LTP ratio
 # Exports sorted list to CSV and returns top picks
@@ -264,9 +299,10 @@ def shortTerm_pick(stock_data_dict):
     global momentum_stocks
     global mean_reversion_stocks
     global ema_bb_confluence_stocks
-    momentum_stocks = strategy_momentum(stock_data_dict)
-    mean_reversion_stocks = strategy_mean_reversion(stock_data_dict)
-    ema_bb_confluence_stocks = strategy_EMA_BB_Confluence(stock_data_dict)
+    panel = as_screener_panel(stock_data_dict)
+    momentum_stocks = panel.momentum_stocks()
+    mean_reversion_stocks = panel.mean_reversion_stocks()
+    ema_bb_confluence_stocks = panel.ema_bb_confluence_stocks()
 
     # Combine selected stocks from all strategies
     shortTerm_stocks = (
@@ -289,7 +325,7 @@ def shortTerm_pick(stock_data_dict):
 # Returns list of selected mid term stocks
 def midTerm_pick(stock_data_dict):
     global volume_breakout
-    volume_breakout = strategy_VolumeBreakout(stock_data_dict)
+    volume_breakout = as_screener_panel(stock_data_dict).volume_breakout_stocks()
     # Combine selected stocks from all strategies
     midTerm_stocks = momentum_stocks + volume_breakout
 
@@ -308,7 +344,7 @@ def midTerm_pick(stock_data_dict):
 # Returns list of selected long term stocks
 def longTerm_pick(stock_data_dict):
     global golden_crossover_stocks
-    golden_crossover_stocks = strategy_golden_crossover(stock_data_dict)
+    golden_crossover_stocks = as_screener_panel(stock_data_dict).golden_crossover_stocks()
     # Combine selected stocks from all strategies
     longTerm_stocks = golden_crossover_stocks
 
@@ -321,32 +357,23 @@ def longTerm_pick(stock_data_dict):
     df_long_selected_stocks.to_csv(os.getenv("longterm_path"), index=False)"""
     return longTerm_stocks
 
-# Initialize an empty dictionary to store the data
-
-def get_stockpicks_csv():
+def get_stockpicks_csv(screener_data=None):
+    """
+    Screens the ticker universe and writes the top short, mid and long term picks.
 
+    Args:
+        screener_data (ScreenerData): Bar source, the cached yfinance one by default.
+    """
     stock_symbols = get_stock_codes()
-    stock_data_dict = {}
-    for stock in stock_symbols:
-
-        # Assuming get_stock_data() function fetches data for the given stock symbol
-        stock_data_daily = get_stock_data(stock, period="1y", duration="1d")
-        stock_data_weekly = get_stock_data(stock, period="2y", duration="1wk")
-        
-        # Store the data in the dictionary
-        stock_data_dict[stock] = {
-            "daily_data": stock_data_daily,
-            "weekly_data": stock_data_weekly
-        }
-
-        #i += 1
-
+    stock_data_dict = (screener_data or ScreenerData()).stock_data_dict(stock_symbols)
+    # Indicators are computed once for the whole universe and shared by the pickers
+    panel = ScreenerPanel(stock_data_dict)
 
-    shortterm_top5 = shortTerm_pick(stock_data_dict)[1:11]
+    shortterm_top5 = shortTerm_pick(panel)[1:11]
 
-    midterm_top5 = midTerm_pick(stock_data_dict)[1:6]
+    midterm_top5 = midTerm_pick(panel)[1:6]
 
-    longterm_top5 = longTerm_pick(stock_data_dict)[1:6]
+    longterm_top5 = longTerm_pick(panel)[1:6]
 
     df_shortterm_selected_stocks = pd.DataFrame(
         shortterm_top5, columns=["Symbol", "ATH_to_LTP_Ratio"]
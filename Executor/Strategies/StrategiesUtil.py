@@ -452,12 +452,14 @@ def update_next_trade_id_firebase(strategy_name, trade_id):
     update_fields_firebase(STRATEGIES_DB, strategy_name, {"NextTradeId": trade_id})
 
 
-def place_order_strategy_users(strategy_name, orders_to_place, order_qty_mode=None):
+def place_order_strategy_users(strategy_name, orders_to_place, order_qty_mode=None, strategy_users=None):
+    """Places the orders for every user of the strategy; pass ``strategy_users`` fetched ahead of the entry to skip the lookup."""
     from Executor.ExecutorUtils.OrderCenter.OrderCenterUtils import (
         place_order_for_strategy,
     )
 
-    strategy_users = fetch_strategy_users(strategy_name)
+    if strategy_users is None:
+        strategy_users = fetch_strategy_users(strategy_name)
     place_order_for_strategy(strategy_users, orders_to_place, order_qty_mode)
     pass
 
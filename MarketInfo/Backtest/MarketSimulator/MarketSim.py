@@ -1,29 +1,37 @@
+import os
+import sys
+
 import pandas as pd
-import time
-import datetime
 
-# Load the csv file
-df = pd.read_csv("nifty_50.csv")
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+from MarketInfo.Backtest.MarketSimulator.ReplayEngine import ReplayEngine, TickStream
+
+
+class RowPrinter:
+    """Prints every replayed candle, the way the simulator always did."""
 
-# Convert the date column to datetime
-df["date"] = pd.to_datetime(df["date"])
+    def __init__(self, df):
+        self.rows = df.to_dict("records")
+        self.position = 0
 
-# Sort the dataframe by date
-df = df.sort_values("date")
+    def run(self, tick_price, tick_time):
+        print(self.rows[self.position])
+        self.position += 1
 
-# The time difference in seconds between each row (in real world, it's 60 seconds)
-time_difference = 60
 
-# The speed of simulation (5x speed)
-simulation_speed = 5
+def main(csv_path="nifty_50.csv", simulation_speed=5):
+    # Load the csv file sorted by date
+    df = pd.read_csv(csv_path)
+    df["date"] = pd.to_datetime(df["date"])
+    df = df.sort_values("date")
 
-# The actual sleep time in seconds between each row
-sleep_time = time_difference / simulation_speed
+    # A minute candle takes 60 / simulation_speed seconds, longer gaps are cut to a minute
+    engine = ReplayEngine(TickStream.from_frame(df, sort=False), speed=simulation_speed, max_gap=60)
+    stats = engine.run(RowPrinter(df))
+    print(f"Replayed {stats.events} candles in {stats.elapsed:.1f} s")
 
-# Iterate over each row in the dataframe
-for index, row in df.iterrows():
-    # Print the row data
-    print(row)
 
-    # Sleep for the required time
-    time.sleep(sleep_time)
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+import Executor.ExecutorUtils.IndicatorCenter.IndicatorCenterUtils as IndicatorCenterUtils
+
 
 def moving_average(df, HA_MA_period):
     MA_open = pd.Series(
@@ -24,13 +32,10 @@ def moving_average(df, HA_MA_period):
 
 
 def atr(df, period):
-    true_range = pd.Series(index=df.index)
-    for i in range(1, len(df)):
-        high_low = df["high"][i] - df["low"][i]
-        high_prev_close = abs(df["high"][i] - df["close"][i - 1])
-        low_prev_close = abs(df["low"][i] - df["close"][i - 1])
-        true_range[i] = max(high_low, high_prev_close, low_prev_close)
-    return true_range.ewm(span=period, adjust=False).mean()
+    return pd.Series(
+        IndicatorCenterUtils.atr(df["high"], df["low"], df["close"], period),
+        index=df.index,
+    )
 
 
 def heikin_ashi(df):
@@ -59,31 +64,18 @@ def heikin_ashi(df):
 
 def super_trend(df, period=9, multiplier=7):
     hl2 = (df["ha_high"] + df["ha_low"]) / 2
-    atr = df["ha_high"].rolling(period).apply(lambda x: np.max(x[:-1] - x[-1])) + df[
-        "ha_low"
-    ].rolling(period).apply(lambda x: np.min(x[:-1] - x[-1]))
+    # Largest/smallest distance of the previous period - 1 bars from the current one
+    atr = (
+        df["ha_high"].shift(1).rolling(period - 1).max() - df["ha_high"]
+        + df["ha_low"].shift(1).rolling(period - 1).min() - df["ha_low"]
+    )
     upper_band = hl2 + multiplier * atr
     lower_band = hl2 - multiplier * atr
 
-    supertrend = pd.Series(np.nan, index=df.index)
-    in_uptrend = True
-    for current in range(period, len(df)):
-        previous = current - 1
-        if df["ha_close"][current] > upper_band[previous]:
-            supertrend[current] = upper_band[previous]
-            in_uptrend = True
-        elif df["ha_close"][current] < lower_band[previous]:
-            supertrend[current] = lower_band[previous]
-            in_uptrend = False
-        else:
-            supertrend[current] = supertrend[previous]
-            if in_uptrend and df["ha_close"][current] < supertrend[previous]:
-                supertrend[current] = lower_band[previous]
-                in_uptrend = False
-            elif not in_uptrend and df["ha_close"][current] > supertrend[previous]:
-                supertrend[current] = upper_band[previous]
-                in_uptrend = True
-    return supertrend
+    supertrend = IndicatorCenterUtils.band_supertrend(
+        df["ha_close"], upper_band, lower_band, start=period
+    )
+    return pd.Series(supertrend, index=df.index)
 
 
 def ema(df, column, period):
@@ -92,59 +84,24 @@ def ema(df, column, period):
 
 ######## FOCUS HERE##############
 def supertrend_new(df, period=9, multiplier=7):
-    print("supertrend_new2222")
     # Calculate Average True Range (ATR)
     average_true_range = atr(df, period)
     df["ATR"] = average_true_range
-    print("ATR:", df["ATR"])
 
     # Calculate Heikin-Ashi values
-    ha_close = (df["open"] + df["high"] + df["low"] + df["close"]) / 4
-    ha_open = (df["open"].shift(1) + df["close"].shift(1)) / 2
-    ha_high = df[["high", "open", "close"]].max(axis=1)
-    ha_low = df[["low", "open", "close"]].min(axis=1)
-
-    print("HA:", df["ha_close"], df["ha_open"], df["ha_high"], df["ha_low"])
-    # Calculate Up and Dn lines
-    up = (ha_high + ha_low) / 2 + multiplier * average_true_range
-    dn = (ha_high + ha_low) / 2 - multiplier * average_true_range
-
-    print("UPDN:", up, dn)
-
-    # Initialize variables
-    trend = np.zeros(len(df))
-    trend[0] = 1
-    trend_up = pd.Series(index=df.index)
-    trend_down = pd.Series(index=df.index)
-
-    for i in range(1, len(df)):
-        if ha_close[i] > up[i - 1]:
-            trend[i] = 1
-        elif ha_close[i] < dn[i - 1]:
-            trend[i] = -1
-        else:
-            trend[i] = trend[i - 1]
-
-        if dn[i] < dn[i - 1]:
-            dn[i] = dn[i - 1]
-
-        if up[i] > up[i - 1]:
-            up[i] = up[i - 1]
-
-        trend_up[i] = dn[i] if trend[i] > 0 else np.nan
-        trend_down[i] = up[i] if trend[i] < 0 else np.nan
-
-    print("supertrend_new4")
-
-    # Fill NaN values
-    trend_up.fillna(method="ffill", inplace=True)
-    trend_down.fillna(method="ffill", inplace=True)
+    ha_close, mid = IndicatorCenterUtils.heikin_ashi_levels(
+        df["open"], df["high"], df["low"], df["close"]
+    )
 
-    print("supertrend_new5")
+    # Up and Dn lines, each only ever tightens
+    up, dn, trend, trend_up, trend_down = IndicatorCenterUtils.clamped_supertrend(
+        ha_close,
+        mid + multiplier * average_true_range.to_numpy(),
+        mid - multiplier * average_true_range.to_numpy(),
+    )
 
     # Create a new DataFrame with calculated values
     result = df.copy()
-    print("result: ", result.columns)
 
     result["ATR"] = average_true_range
     result["Up"] = up
@@ -162,29 +119,12 @@ def supertrend_new(df, period=9, multiplier=7):
 def supertrend1(df, factor, pd):
 
     hl2 = (df["High"] + df["Low"]) / 2
-    df["TrendUp"] = hl2 + (factor * atr)
-    df["TrendDown"] = hl2 - (factor * atr)
+    average_true_range = IndicatorCenterUtils.atr(df["High"], df["Low"], df["Close"], pd)
+    df["TrendUp"] = hl2 + (factor * average_true_range)
+    df["TrendDown"] = hl2 - (factor * average_true_range)
 
-    result = df.copy()
-    result["Trend"] = None
-    result["supertrend"] = None
-
-    for i in range(1, len(result)):
-        if result["Close"][i] > result["TrendUp"][i - 1]:
-            result.at[i, "Trend"] = 1
-        elif result["Close"][i] < result["TrendDown"][i - 1]:
-            result.at[i, "Trend"] = -1
-        else:
-            result.at[i, "Trend"] = result.at[i - 1, "Trend"]
-
-        if result.at[i, "Trend"] == 1:
-            result.at[i, "supertrend"] = min(
-                result.at[i, "TrendUp"], result.at[i - 1, "supertrend"]
-            )
-        else:
-            result.at[i, "supertrend"] = max(
-                result.at[i, "TrendDown"], result.at[i - 1, "supertrend"]
-            )
-
-    df["supertrend"] = result["supertrend"]
+    _, supertrend = IndicatorCenterUtils.flip_supertrend(
+        df["Close"], df["TrendUp"], df["TrendDown"]
+    )
+    df["supertrend"] = supertrend
     return df
@@ -1,6 +1,7 @@
 import os, sys
 import datetime as dt
 import psycopg2
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -26,6 +27,8 @@ from Executor.ExecutorUtils.ExeUtils import holidays
 from Executor.ExecutorUtils.NotificationCenter.Discord.discord_adapter import (
     discord_bot,
 )
+from Executor.ExecutorUtils.rate_limiter import BrokerRateLimiter
+from MarketInfo.DataCenter.EODCandleStore import PostgresCandleStore, store_candles
 
 strategy_obj = StrategyBase.load_from_db("ExpiryTrader")
 primary_account = os.getenv("ZERODHA_PRIMARY_ACCOUNT")
@@ -38,6 +41,11 @@ segments = ["NFO-OPT", "BFO-OPT"]
 
 instru_obj = InstrumentCenterUtils.Instrument()
 
+# Kite allows 3 historical data requests per second
+KITE_HISTORICAL_RATE_LIMIT = 3
+EOD_FETCH_WORKERS = int(os.getenv("EOD_FETCH_WORKERS", 6))
+historical_rate_limiter = BrokerRateLimiter(KITE_HISTORICAL_RATE_LIMIT)
+
 def connect_to_db(base_symbol):
     try:
         logger.info(f"Connecting to database {base_symbol.lower()}...")
@@ -52,32 +60,14 @@ def connect_to_db(base_symbol):
         logger.error(f"Error connecting to database {base_symbol.lower()}: {e}")
 
 
-def store_data_in_postgres(trading_symbol_list, all_data, cursor):
-    table_name = trading_symbol_list
-
-    if " " or "(" or ")" in table_name:
-        table_name = table_name.replace(" ", "").replace("(", "").replace(")", "")
-
-    logger.info(f"Storing data in table {table_name}...")
-    # table_name = trading_symbol_list[0].replace("-", "_").lower()
-    create_table_query = f"CREATE TABLE IF NOT EXISTS {table_name} (date TIMESTAMP, open REAL, high REAL, low REAL, close REAL, volume INT);"
-    cursor.execute(create_table_query)
-
-    for record in all_data:
-        date = record["date"].strftime("%Y-%m-%d %H:%M:%S")
-        open_price = record["open"]
-        high = record["high"]
-        low = record["low"]
-        close_price = record["close"]
-        volume = record["volume"]
+def store_data_in_postgres(base_symbol, rows, cursor):
+    """Upserts candle rows into the underlying's table, see :func:`store_candles`."""
+    store_candles(PostgresCandleStore(cursor), base_symbol, rows)
 
-        insert_query = f"INSERT INTO {table_name} (date, open, high, low, close, volume) VALUES ('{date}', {open_price}, {high}, {low}, {close_price}, {volume});"
-        try:
-            cursor.execute(insert_query)
-        except Exception as e:
-            logger.error(f"Error while inserting record {table_name}: {e}")
 
-    cursor.connection.commit()
+def load_candles(cursor, base_symbol, start, end, symbols=None):
+    """Returns the candles of an underlying between ``start`` and ``end``, optionally for some symbols only."""
+    return PostgresCandleStore(cursor).load(base_symbol, start, end, symbols)
 
 
 def fetch_token_and_name(base_symbol, strike_prc, option_type, expiry_date):
@@ -97,6 +87,30 @@ def calculate_expiry_date(
     )
 
 
+def fetch_candles(token, symbol, start_date, end_date):
+    """Fetches the minute candles of one instrument as rows for store_data_in_postgres."""
+    historical_rate_limiter.acquire()
+    data = kite.historical_data(
+        instrument_token=token,
+        from_date=start_date,
+        to_date=end_date,
+        interval="minute",
+        continuous=False,
+    )
+    return [
+        (
+            symbol,
+            record["date"].replace(tzinfo=None),
+            record["open"],
+            record["high"],
+            record["low"],
+            record["close"],
+            record["volume"],
+        )
+        for record in data
+    ]
+
+
 def fetch_and_store_historical_data(base_symbol, start_date, end_date, cursor):
     strike_prc = strategy_obj.calculate_current_atm_strike_prc(base_symbol)
     strike_step = strategy_obj.get_strike_step(base_symbol)
@@ -110,44 +124,29 @@ def fetch_and_store_historical_data(base_symbol, start_date, end_date, cursor):
     base_token = instru_obj.fetch_base_symbol_token(base_symbol)
     logger.info(base_token)
 
-    base_data = kite.historical_data(
-        instrument_token=base_token,
-        from_date=start_date,
-        to_date=end_date,
-        interval="minute",
-        continuous=False,
-    )
-    store_data_in_postgres(base_symbol, base_data, cursor)
-
-    future_token, future_symbol = fetch_token_and_name(
-        base_symbol, 0, "FUT", future_expiry
-    )
-    future_data = kite.historical_data(
-        instrument_token=future_token,
-        from_date=start_date,
-        to_date=end_date,
-        interval="minute",
-        continuous=False,
-    )
-    store_data_in_postgres(future_symbol, future_data, cursor)
-
+    instruments = [(base_token, base_symbol)]
+    instruments.append(fetch_token_and_name(base_symbol, 0, "FUT", future_expiry))
     for strike in all_strikes:
-        logger.info(strike)
         for option_type in ["CE", "PE"]:
-            token, name = fetch_token_and_name(
-                base_symbol, int(strike), option_type, option_expiry
+            instruments.append(
+                fetch_token_and_name(base_symbol, int(strike), option_type, option_expiry)
             )
+
+    # The requests overlap on the pool while the limiter keeps them within Kite's rate limit
+    rows = []
+    with ThreadPoolExecutor(max_workers=EOD_FETCH_WORKERS) as executor:
+        futures = {
+            executor.submit(fetch_candles, token, name, start_date, end_date): name
+            for token, name in instruments
+        }
+        for future in as_completed(futures):
             try:
-                option_data = kite.historical_data(
-                    instrument_token=token,
-                    from_date=start_date,
-                    to_date=end_date,
-                    interval="minute",
-                    continuous=False,
-                )
-                store_data_in_postgres(name, option_data, cursor)
+                rows.extend(future.result())
             except Exception as e:
-                logger.error(f"Error while fetching data for {name}: {e}")
+                logger.error(f"Error while fetching data for {futures[future]}: {e}")
+
+    store_data_in_postgres(base_symbol, rows, cursor)
+
 
 def main():
     today = dt.datetime.today()
@@ -0,0 +1,186 @@
+import datetime as dt
+import os
+import sqlite3
+import sys
+
+from dotenv import load_dotenv
+
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+ENV_PATH = os.path.join(DIR_PATH, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+EOD_INSERT_PAGE_SIZE = 5000
+CANDLE_COLUMNS = ["symbol", "ts", "open", "high", "low", "close", "volume"]
+UPSERT_SET = ", ".join(f"{column} = excluded.{column}" for column in CANDLE_COLUMNS[2:])
+
+
+def candle_table_name(base_symbol):
+    return f"{base_symbol.lower()}_candles"
+
+
+def month_partitions(base_symbol, timestamps):
+    """
+    Lists the monthly partitions covering ``timestamps``.
+
+    Returns:
+        list: ``(partition_name, start, end)`` per month, oldest first; ``end`` is exclusive.
+    """
+    table_name = candle_table_name(base_symbol)
+    months = {(ts.year, ts.month) for ts in timestamps}
+    partitions = []
+    for year, month in sorted(months):
+        start = dt.date(year, month, 1)
+        end = dt.date(year + month // 12, month % 12 + 1, 1)
+        partitions.append((f"{table_name}_{year}_{month:02d}", start, end))
+    return partitions
+
+
+def store_candles(store, base_symbol, rows):
+    """
+    Upserts candle rows ``(symbol, ts, open, high, low, close, volume)`` in one batch.
+
+    Re-fetching an overlapping window updates the candles instead of
+    duplicating them.
+    """
+    if not rows:
+        return
+    logger.info(f"Storing {len(rows)} candles in table {candle_table_name(base_symbol)}...")
+    store.upsert(base_symbol, rows)
+
+
+class PostgresCandleStore:
+    """Candle tables of the EOD databases, one per underlying, keyed by (symbol, ts)."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def ensure_table(self, base_symbol):
+        """
+        Creates the candle table of an underlying.
+
+        With the TimescaleDB extension the table becomes a hypertable with weekly
+        chunks, otherwise it is range partitioned by month (see ensure_partitions).
+
+        Returns:
+            bool: True if the table is a hypertable.
+        """
+        table_name = candle_table_name(base_symbol)
+        self.cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'timescaledb'")
+        timescale = self.cursor.fetchone() is not None
+        columns = """symbol TEXT NOT NULL,
+                     ts TIMESTAMP NOT NULL,
+                     open REAL,
+                     high REAL,
+                     low REAL,
+                     close REAL,
+                     volume BIGINT,
+                     PRIMARY KEY (symbol, ts)"""
+        if timescale:
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({columns});")
+            self.cursor.execute(
+                "SELECT create_hypertable(%s, 'ts', chunk_time_interval => INTERVAL '7 days', if_not_exists => TRUE);",
+                (table_name,),
+            )
+        else:
+            self.cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} ({columns}) PARTITION BY RANGE (ts);"
+            )
+        return timescale
+
+    def ensure_partitions(self, base_symbol, timestamps):
+        """Creates the monthly partitions covering ``timestamps``."""
+        table_name = candle_table_name(base_symbol)
+        for partition_name, start, end in month_partitions(base_symbol, timestamps):
+            self.cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {partition_name} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}');"
+            )
+
+    def upsert(self, base_symbol, rows):
+        from psycopg2.extras import execute_values
+
+        if not self.ensure_table(base_symbol):
+            self.ensure_partitions(base_symbol, [row[1] for row in rows])
+        execute_values(
+            self.cursor,
+            f"""INSERT INTO {candle_table_name(base_symbol)} ({", ".join(CANDLE_COLUMNS)}) VALUES %s
+                ON CONFLICT (symbol, ts) DO UPDATE SET {UPSERT_SET};""",
+            rows,
+            page_size=EOD_INSERT_PAGE_SIZE,
+        )
+        self.cursor.connection.commit()
+
+    def load(self, base_symbol, start, end, symbols=None):
+        """Returns the candles of an underlying between ``start`` and ``end``, optionally for some symbols only."""
+        query = (
+            f"SELECT {', '.join(CANDLE_COLUMNS)} FROM {candle_table_name(base_symbol)} "
+            "WHERE ts >= %s AND ts < %s"
+        )
+        params = [start, end]
+        if symbols:
+            query += " AND symbol = ANY(%s)"
+            params.append(list(symbols))
+        self.cursor.execute(query + " ORDER BY symbol, ts;", params)
+        return self.cursor.fetchall()
+
+
+def _sqlite_ts(value):
+    if isinstance(value, dt.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, dt.date):
+        return value.isoformat()
+    return str(value)
+
+
+class SQLiteCandleStore:
+    """Same layout as :class:`PostgresCandleStore` in a SQLite file, for tests and local runs."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+
+    def close(self):
+        self.conn.close()
+
+    def ensure_table(self, base_symbol):
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {candle_table_name(base_symbol)} (
+                    symbol TEXT NOT NULL,
+                    ts TIMESTAMP NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume INTEGER,
+                    PRIMARY KEY (symbol, ts)
+                )"""
+        )
+        return False
+
+    def upsert(self, base_symbol, rows):
+        self.ensure_table(base_symbol)
+        placeholders = ", ".join("?" for _ in CANDLE_COLUMNS)
+        with self.conn:
+            self.conn.executemany(
+                f"""INSERT INTO {candle_table_name(base_symbol)} ({", ".join(CANDLE_COLUMNS)}) VALUES ({placeholders})
+                    ON CONFLICT (symbol, ts) DO UPDATE SET {UPSERT_SET}""",
+                [(row[0], _sqlite_ts(row[1]), *row[2:]) for row in rows],
+            )
+
+    def load(self, base_symbol, start, end, symbols=None):
+        query = (
+            f"SELECT {', '.join(CANDLE_COLUMNS)} FROM {candle_table_name(base_symbol)} "
+            "WHERE ts >= ? AND ts < ?"
+        )
+        params = [_sqlite_ts(start), _sqlite_ts(end)]
+        if symbols:
+            symbols = list(symbols)
+            query += f" AND symbol IN ({', '.join('?' for _ in symbols)})"
+            params.extend(symbols)
+        rows = self.conn.execute(query + " ORDER BY symbol, ts", params).fetchall()
+        return [(row[0], dt.datetime.fromisoformat(row[1]), *row[2:]) for row in rows]
@@ -0,0 +1,241 @@
+import os
+import sqlite3
+import sys
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+ENV_PATH = os.path.join(DIR_PATH, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+PARQUET_ARCHIVE_DIR = os.getenv(
+    "PARQUET_ARCHIVE_DIR", os.path.join(os.getenv("DB_DIR") or DIR_PATH, "ParquetArchive")
+)
+ROW_GROUP_SIZE = 4096
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def _bounds(start, end):
+    """Start is inclusive; an end given as a plain date includes that whole day."""
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end)
+    if end == end.normalize():
+        end += pd.Timedelta(days=1)
+    return start, end
+
+
+class ParquetArchive:
+    """
+    Candles or ticks stored as Parquet files partitioned by symbol and date.
+
+    Every symbol/day lives in ``<root>/<kind>/symbol=<symbol>/date=<YYYY-MM-DD>/data.parquet``
+    with a ``ts`` column and the price columns. :meth:`load` only opens the
+    files of the requested days and reads just the requested columns; the
+    ``ts`` filter is pushed down to the row groups of the first and last day.
+
+    Args:
+        root (str): Directory of the archive.
+        kind (str): "candles" or "ticks", each kind has its own tree.
+    """
+
+    def __init__(self, root=PARQUET_ARCHIVE_DIR, kind="candles"):
+        self.root = root
+        self.kind = kind
+        self.base_dir = os.path.join(root, kind)
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.base_dir, f"symbol={symbol}")
+
+    def _day_path(self, symbol, day):
+        return os.path.join(self._symbol_dir(symbol), f"date={day}", "data.parquet")
+
+    def symbols(self):
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(self.base_dir) if name.startswith("symbol="))
+
+    def dates(self, symbol):
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(symbol_dir) if name.startswith("date="))
+
+    def write(self, symbol, df):
+        """
+        Stores rows of ``symbol``; ``df`` has a ``ts`` column or a DatetimeIndex.
+
+        Rows are merged into the existing day files, a timestamp that is
+        already archived is replaced, so importing the same data twice does
+        not duplicate it.
+
+        Returns:
+            int: The number of rows written.
+        """
+        if "ts" not in df.columns:
+            df = df.rename_axis("ts").reset_index()
+        df = df.assign(ts=pd.to_datetime(df["ts"]))
+        if df["ts"].dt.tz is not None:
+            df["ts"] = df["ts"].dt.tz_localize(None)
+
+        for day, day_rows in df.groupby(df["ts"].dt.date, sort=True):
+            path = self._day_path(symbol, day.isoformat())
+            if os.path.exists(path):
+                day_rows = pd.concat([pq.read_table(path).to_pandas(), day_rows], ignore_index=True)
+            day_rows = day_rows.drop_duplicates("ts", keep="last").sort_values("ts")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the target and swap, readers never see a partial file
+            temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            pq.write_table(
+                pa.Table.from_pandas(day_rows, preserve_index=False),
+                temp_path,
+                row_group_size=ROW_GROUP_SIZE,
+                compression="zstd",
+            )
+            os.replace(temp_path, path)
+        return len(df)
+
+    def load(self, symbol, start, end, columns=None, as_numpy=False):
+        """
+        Reads the rows of ``symbol`` between ``start`` and ``end``.
+
+        Args:
+            symbol (str): The archived symbol.
+            start: First timestamp (inclusive).
+            end: Last timestamp (exclusive); a plain date includes that day.
+            columns (list): Columns to read besides ``ts``, all by default.
+            as_numpy (bool): Return a dict of NumPy arrays instead of a DataFrame.
+
+        Returns:
+            pandas.DataFrame | dict: Rows indexed by ``ts``, oldest first.
+        """
+        start, end = _bounds(start, end)
+        first_day, last_day = start.date().isoformat(), (end - pd.Timedelta(1, "ns")).date().isoformat()
+        paths = [
+            self._day_path(symbol, day)
+            for day in self.dates(symbol)
+            if first_day <= day <= last_day
+        ]
+        read_columns = None if columns is None else ["ts"] + [c for c in columns if c != "ts"]
+
+        if paths:
+            dataset = ds.dataset(paths, format="parquet")
+            ts = ds.field("ts")
+            table = dataset.to_table(
+                columns=read_columns,
+                filter=(ts >= start.to_pydatetime()) & (ts < end.to_pydatetime()),
+            )
+        else:
+            table = None
+
+        if as_numpy:
+            if table is None:
+                return {column: np.empty(0) for column in (read_columns or ["ts"] + CANDLE_COLUMNS)}
+            return {name: table.column(name).to_numpy() for name in table.column_names}
+        if table is None:
+            return pd.DataFrame(columns=[c for c in (read_columns or ["ts"] + CANDLE_COLUMNS) if c != "ts"])
+        return table.to_pandas().set_index("ts")
+
+
+def import_csv(archive, csv_path, symbol, date_column="date"):
+    """Imports a candle csv such as ``nifty_50.csv`` (date, open, high, low, close, volume)."""
+    df = pd.read_csv(csv_path)
+    df = df.rename(columns={date_column: "ts"})
+    rows = archive.write(symbol, df)
+    logger.info(f"Archived {rows} rows of {symbol} from {csv_path}")
+    return rows
+
+
+def gfdl_tables(conn):
+    """Lists the per ticker/day tables of a GFDL database (see TimeScaleDBGFDLImport)."""
+    if isinstance(conn, sqlite3.Connection):
+        query = "SELECT name FROM sqlite_master WHERE type = 'table'"
+    else:
+        query = "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
+    cursor = conn.cursor()
+    cursor.execute(query)
+    return sorted(name for (name,) in cursor.fetchall() if name != "gfdl_ingested_files")
+
+
+def import_gfdl(archive, conn, tables=None):
+    """
+    Imports GFDL tables into the archive, the ticker becomes the symbol.
+
+    Args:
+        archive (ParquetArchive): Target archive.
+        conn: Connection to the GFDL database, PostgreSQL or SQLite.
+        tables (list): Table names to import, all GFDL tables by default.
+
+    Returns:
+        int: The number of rows archived.
+    """
+    total = 0
+    for table_name in tables or gfdl_tables(conn):
+        ticker = table_name.rsplit("_", 1)[0]
+        cursor = conn.cursor()
+        quoted = '"' + table_name.replace('"', '""') + '"'
+        cursor.execute(f"SELECT Date, Time, Open, High, Low, Close, Volume, OpenInterest FROM {quoted}")
+        df = pd.DataFrame(
+            cursor.fetchall(),
+            columns=["date", "time", "open", "high", "low", "close", "volume", "open_interest"],
+        )
+        if df.empty:
+            continue
+        df["ts"] = pd.to_datetime(df["date"].astype(str) + " " + df["time"].astype(str))
+        total += archive.write(ticker, df.drop(columns=["date", "time"]))
+    logger.info(f"Archived {total} GFDL rows")
+    return total
+
+
+def import_eod_candles(archive, conn, base_symbol, start, end):
+    """Imports the candles of one underlying from the DailyEODDB table, one symbol at a time."""
+    start, end = _bounds(start, end)
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT symbol, ts, open, high, low, close, volume FROM {base_symbol.lower()}_candles "
+        "WHERE ts >= %s AND ts < %s ORDER BY symbol, ts",
+        (start.to_pydatetime(), end.to_pydatetime()),
+    )
+    df = pd.DataFrame(cursor.fetchall(), columns=["symbol", "ts"] + CANDLE_COLUMNS)
+    total = 0
+    for symbol, rows in df.groupby("symbol"):
+        total += archive.write(symbol, rows.drop(columns="symbol"))
+    logger.info(f"Archived {total} candles of {base_symbol}")
+    return total
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    sessions = pd.bdate_range("2023-01-02", periods=250)
+    index = pd.DatetimeIndex(
+        np.concatenate([(day + pd.Timedelta(hours=9, minutes=15)) + pd.to_timedelta(np.arange(375), "min") for day in sessions])
+    )
+    close = 18000 + np.cumsum(np.random.default_rng(5).normal(0, 5, len(index)))
+    candles = pd.DataFrame(
+        {"open": close, "high": close + 3, "low": close - 3, "close": close, "volume": 100},
+        index=index,
+    )
+
+    with tempfile.TemporaryDirectory() as root:
+        archive = ParquetArchive(root)
+        started = time.perf_counter()
+        archive.write("NIFTY", candles)
+        written = time.perf_counter() - started
+
+        started = time.perf_counter()
+        arrays = archive.load("NIFTY", sessions[0], sessions[-1], columns=["close"], as_numpy=True)
+        loaded = time.perf_counter() - started
+        print(f"Wrote {len(candles)} candles in {written:.2f} s, loaded {len(arrays['close'])} closes in {loaded * 1000:.0f} ms")
@@ -1,100 +1,368 @@
+import io
 import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
-import psycopg2
-from psycopg2 import sql
-from Brokers import apikey
-
-# Connect to your postgres DB
-conn = psycopg2.connect(
-    dbname="GFDL_Daily",
-    user=apikey.postgres_username,
-    password=apikey.postgres_pass,
-    host="localhost",
-    port="5432",
-)
-cur = conn.cursor()
-
-# Directory where your CSV files are located
-csv_directory = r"C:\Users\user\Downloads\Omkar Hegde_NFO"
-
-# Get the list of csv files
-csv_files = [
-    os.path.join(csv_directory, f)
-    for f in os.listdir(csv_directory)
-    if f.endswith(".csv")
-]
-
-# Get the list of csv files
-csv_files = [
-    os.path.join(csv_directory, f)
-    for f in os.listdir(csv_directory)
-    if f.endswith(".csv")
-]
-
-# Loop through the list
-for csv_file in csv_files:
-    print(f"Processing file: {csv_file}")
-
-    # Load the CSV data into a pandas DataFrame
-    df = pd.read_csv(csv_file)
-
-    # Extract unique ticker names
-    unique_tickers = df["Ticker"].unique()
-
-    # Iterate over unique tickers
-    for ticker in unique_tickers:
-        print(f"Processing ticker: {ticker}")
-
-        # Filter rows for the current ticker
-        ticker_data = df[df["Ticker"] == ticker]
-
-        # Extract date from the first row of the ticker data and format it
-        date = pd.to_datetime(ticker_data.iloc[0]["Date"], format="%d/%m/%Y").strftime(
-            "%d%b%y"
-        )
+from dotenv import load_dotenv
+
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+ENV_PATH = os.path.join(DIR_PATH, "trademan.env")
+load_dotenv(ENV_PATH)
+
+from Executor.ExecutorUtils.LoggingCenter.logger_utils import LoggerSetup
+
+logger = LoggerSetup()
+
+GFDL_CSV_DIR = os.getenv("GFDL_CSV_DIR")
+GFDL_DB_NAME = os.getenv("GFDL_DB_NAME", "GFDL_Daily")
+GFDL_CHUNK_SIZE = int(os.getenv("GFDL_CHUNK_SIZE", 200000))
+GFDL_IMPORT_WORKERS = int(os.getenv("GFDL_IMPORT_WORKERS", 4))
+
+TABLE_COLUMNS = ["Date", "Time", "Open", "High", "Low", "Close", "Volume", "OpenInterest"]
+CSV_COLUMNS = {
+    "Ticker": str,
+    "Date": str,
+    "Time": str,
+    "Open": float,
+    "High": float,
+    "Low": float,
+    "Close": float,
+    "Volume": "Int64",
+    "Open Interest": "Int64",
+}
+LEDGER_TABLE = "gfdl_ingested_files"
+STAGING_TABLE = "gfdl_staging"
+
+
+def table_name_for(ticker, date):
+    """Per ticker and day table, e.g. NIFTY24JAN21500CE_04Jan24."""
+    return ticker.replace(".NFO", "_" + date.strftime("%d%b%y"))
+
+
+def file_signature(csv_file):
+    """Size and modification time of a file; a changed file is loaded again."""
+    stat = os.stat(csv_file)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class PostgresTarget:
+    """
+    Loads rows into PostgreSQL with ``COPY FROM STDIN``.
+
+    Only the connection parameters are kept until :meth:`connect`, so the
+    target can be handed to worker processes.
+    """
+
+    def __init__(self, dbname=GFDL_DB_NAME, user=None, password=None, host=None, port=None):
+        self.params = {
+            "dbname": dbname,
+            "user": user or os.getenv("POSTGRES_USER", "postgres"),
+            "password": password or os.getenv("POSTGRES_PASSWORD"),
+            "host": host or os.getenv("POSTGRES_HOST", "localhost"),
+            "port": port or os.getenv("POSTGRES_PORT", "5432"),
+        }
+        self.conn = None
+
+    def __getstate__(self):
+        return {"params": self.params, "conn": None}
 
-        # Format table name
-        table_name = ticker.replace(".NFO", "_" + date)
-
-        # Create table if it doesn't exist
-        create_table_query = sql.SQL(
-            """CREATE TABLE IF NOT EXISTS {} (
-                                            Date DATE,
-                                            Time TIME,
-                                            Open FLOAT,
-                                            High FLOAT,
-                                            Low FLOAT,
-                                            Close FLOAT,
-                                            Volume INT,
-                                            OpenInterest INT
-                                        )"""
-        ).format(sql.Identifier(table_name))
-
-        cur.execute(create_table_query)
-
-        conn.commit()
-
-        # Insert data into the table
-        for index, row in ticker_data.iterrows():
-            insert_data_query = sql.SQL(
-                """INSERT INTO {} (Date, Time, Open, High, Low, Close, Volume, OpenInterest) VALUES 
-                                        (%s, %s, %s, %s, %s, %s, %s, %s)"""
-            ).format(sql.Identifier(table_name))
-
-            data_to_insert = (
-                row["Date"],
-                row["Time"],
-                row["Open"],
-                row["High"],
-                row["Low"],
-                row["Close"],
-                row["Volume"],
-                row["Open Interest"],
+    def connect(self):
+        import psycopg2
+        from psycopg2 import sql
+
+        self.sql = sql
+        self.conn = psycopg2.connect(**self.params)
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"""CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+                        FileName TEXT PRIMARY KEY,
+                        Signature TEXT,
+                        Rows BIGINT,
+                        IngestedAt TIMESTAMP DEFAULT now()
+                    )"""
             )
-            cur.execute(insert_data_query, data_to_insert)
-            conn.commit()
+        self.conn.commit()
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def begin(self):
+        # psycopg2 opens the transaction with the first statement
+        pass
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def is_ingested(self, file_name, signature):
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT Signature FROM {LEDGER_TABLE} WHERE FileName = %s", (file_name,))
+            row = cur.fetchone()
+        return row is not None and row[0] == signature
+
+    def mark_ingested(self, file_name, signature, rows):
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"""INSERT INTO {LEDGER_TABLE} (FileName, Signature, Rows) VALUES (%s, %s, %s)
+                    ON CONFLICT (FileName) DO UPDATE
+                    SET Signature = EXCLUDED.Signature, Rows = EXCLUDED.Rows, IngestedAt = now()""",
+                (file_name, signature, rows),
+            )
+
+    def prepare(self, table_name):
+        """Creates the table if needed, with the (Date, Time) key that keeps every bar once."""
+        table = self.sql.Identifier(table_name)
+        with self.conn.cursor() as cur:
+            cur.execute(
+                self.sql.SQL(
+                    """CREATE TABLE IF NOT EXISTS {} (
+                            Date DATE,
+                            Time TIME,
+                            Open FLOAT,
+                            High FLOAT,
+                            Low FLOAT,
+                            Close FLOAT,
+                            Volume INT,
+                            OpenInterest INT
+                        )"""
+                ).format(table)
+            )
+            # Tables of earlier runs were created without the key
+            cur.execute(
+                self.sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {} ON {} (Date, Time)").format(
+                    self.sql.Identifier(f"{table_name}_date_time"), table
+                )
+            )
+            cur.execute(
+                self.sql.SQL("CREATE TEMP TABLE IF NOT EXISTS {} (LIKE {}) ON COMMIT DELETE ROWS").format(
+                    self.sql.Identifier(STAGING_TABLE), table
+                )
+            )
+
+    def copy(self, table_name, frame):
+        """COPYs ``frame`` into the staging table and inserts the bars the table does not have yet."""
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        columns = self.sql.SQL(", ").join(self.sql.SQL(column) for column in TABLE_COLUMNS)
+        staging = self.sql.Identifier(STAGING_TABLE)
+        query = self.sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(staging, columns)
+        with self.conn.cursor() as cur:
+            cur.execute(self.sql.SQL("TRUNCATE {}").format(staging))
+            cur.copy_expert(query.as_string(self.conn), buffer)
+            cur.execute(
+                self.sql.SQL(
+                    "INSERT INTO {} ({}) SELECT {} FROM {} ON CONFLICT (Date, Time) DO NOTHING"
+                ).format(self.sql.Identifier(table_name), columns, columns, staging)
+            )
+            return cur.rowcount
+
+
+class SQLiteTarget:
+    """Same layout as :class:`PostgresTarget` in a SQLite file, for tests and local runs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+
+    def __getstate__(self):
+        return {"path": self.path, "conn": None}
+
+    def connect(self):
+        # Explicit transactions; concurrent workers wait for the write lock
+        self.conn = sqlite3.connect(self.path, timeout=300, isolation_level=None)
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+                    FileName TEXT PRIMARY KEY,
+                    Signature TEXT,
+                    Rows INTEGER,
+                    IngestedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )"""
+        )
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def begin(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self.conn.execute("COMMIT")
+
+    def rollback(self):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+
+    def is_ingested(self, file_name, signature):
+        row = self.conn.execute(
+            f"SELECT Signature FROM {LEDGER_TABLE} WHERE FileName = ?", (file_name,)
+        ).fetchone()
+        return row is not None and row[0] == signature
+
+    def mark_ingested(self, file_name, signature, rows):
+        self.conn.execute(
+            f"""INSERT INTO {LEDGER_TABLE} (FileName, Signature, Rows) VALUES (?, ?, ?)
+                ON CONFLICT (FileName) DO UPDATE
+                SET Signature = excluded.Signature, Rows = excluded.Rows, IngestedAt = CURRENT_TIMESTAMP""",
+            (file_name, signature, rows),
+        )
+
+    @staticmethod
+    def _quote(name):
+        return '"' + name.replace('"', '""') + '"'
+
+    def prepare(self, table_name):
+        table = self._quote(table_name)
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {table} (
+                    Date DATE,
+                    Time TIME,
+                    Open REAL,
+                    High REAL,
+                    Low REAL,
+                    Close REAL,
+                    Volume INTEGER,
+                    OpenInterest INTEGER
+                )"""
+        )
+        self.conn.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {self._quote(table_name + '_date_time')} ON {table} (Date, Time)"
+        )
+
+    def copy(self, table_name, frame):
+        placeholders = ", ".join("?" for _ in TABLE_COLUMNS)
+        frame = frame.assign(Date=frame["Date"].astype(str))
+        rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        before = self.conn.total_changes
+        self.conn.executemany(
+            f"INSERT INTO {self._quote(table_name)} ({', '.join(TABLE_COLUMNS)}) VALUES ({placeholders}) "
+            "ON CONFLICT (Date, Time) DO NOTHING",
+            rows,
+        )
+        return self.conn.total_changes - before
+
+
+def read_chunks(csv_file, chunk_size=GFDL_CHUNK_SIZE):
+    """Streams a GFDL csv in chunks with the columns renamed to the table layout."""
+    for chunk in pd.read_csv(csv_file, dtype=CSV_COLUMNS, chunksize=chunk_size):
+        chunk = chunk.rename(columns={"Open Interest": "OpenInterest"})
+        chunk["Date"] = pd.to_datetime(chunk["Date"], format="%d/%m/%Y").dt.date
+        yield chunk
+
+
+def ingest_file(csv_file, target, chunk_size=GFDL_CHUNK_SIZE, force=False):
+    """
+    Loads one GFDL csv in a single transaction.
+
+    Rows are grouped by ticker and day and copied into the per ticker table
+    of that day. Every table is keyed by (Date, Time) and only the bars it
+    does not have yet are inserted, so loading a file again adds nothing,
+    and files sharing a ticker and day (split day files, a re-delivered
+    partial file) each keep their rows. Files already recorded in the ledger
+    with the same size and modification time are skipped unless ``force``
+    is set.
+
+    Args:
+        csv_file (str): Path of the csv file.
+        target (PostgresTarget | SQLiteTarget): Where the rows go.
+        chunk_size (int): Rows read from the csv at a time.
+        force (bool): Load the file even if the ledger has it.
+
+    Returns:
+        int: The number of rows inserted, or None if the file was skipped.
+    """
+    file_name = os.path.basename(csv_file)
+    signature = file_signature(csv_file)
+    target.connect()
+    try:
+        target.begin()
+        if not force and target.is_ingested(file_name, signature):
+            target.rollback()
+            logger.info(f"Skipping {file_name}, already ingested")
+            return None
+
+        prepared = set()
+        rows = 0
+        read = 0
+        for chunk in read_chunks(csv_file, chunk_size):
+            for (ticker, date), group in chunk.groupby(["Ticker", "Date"], sort=False):
+                table_name = table_name_for(ticker, date)
+                if table_name not in prepared:
+                    target.prepare(table_name)
+                    prepared.add(table_name)
+                rows += target.copy(table_name, group[TABLE_COLUMNS])
+                read += len(group)
+
+        target.mark_ingested(file_name, signature, rows)
+        target.commit()
+        logger.info(f"Ingested {rows} of {read} rows into {len(prepared)} tables from {file_name}")
+        return rows
+    except Exception as e:
+        target.rollback()
+        logger.error(f"Error while ingesting {file_name}: {e}")
+        raise
+    finally:
+        target.close()
+
+
+def list_csv_files(csv_directory):
+    return sorted(
+        os.path.join(csv_directory, f) for f in os.listdir(csv_directory) if f.endswith(".csv")
+    )
+
+
+def ingest_directory(csv_directory=GFDL_CSV_DIR, target=None, workers=GFDL_IMPORT_WORKERS, chunk_size=GFDL_CHUNK_SIZE, force=False):
+    """
+    Loads every csv of ``csv_directory``, one file per worker process.
+
+    Returns:
+        dict: Rows loaded per file name; None for skipped files and failed files are left out.
+    """
+    target = target or PostgresTarget()
+    csv_files = list_csv_files(csv_directory)
+    results = {}
+    if workers <= 1:
+        for csv_file in csv_files:
+            try:
+                results[os.path.basename(csv_file)] = ingest_file(csv_file, target, chunk_size, force)
+            except Exception:
+                continue
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(ingest_file, csv_file, target, chunk_size, force): os.path.basename(csv_file)
+            for csv_file in csv_files
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logger.error(f"Worker failed for {futures[future]}: {e}")
+    return results
+
+
+def main():
+    start = time.perf_counter()
+    results = ingest_directory()
+    loaded = sum(rows for rows in results.values() if rows)
+    logger.info(
+        f"Loaded {loaded} rows from {len(results)} files in {time.perf_counter() - start:.1f} s"
+    )
 
-        print(f"Data inserted for ticker: {ticker}")
 
-cur.close()
-conn.close()
+if __name__ == "__main__":
+    main()
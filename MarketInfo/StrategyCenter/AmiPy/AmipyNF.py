@@ -1,4 +1,10 @@
-from remove import StrategyTools
+import os
+import sys
+
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+from MarketInfo.Backtest import StrategyTools
 from kiteconnect import KiteConnect
 import pandas as pd
 
@@ -0,0 +1,196 @@
+from csv import writer
+
+import numpy as np
+
+ORDER_FIELDS = (
+    "trade_cycle",
+    "order_type",
+    "entry_point",
+    "entry_price",
+    "entry_time",
+    "exit_time",
+    "exit_price",
+    "exit_point",
+    "is_order_closed",
+    "quantity",
+)
+MARGIN_PER_LOT = 40000 / 25
+
+
+def order_pnl(order_types, entry_prices, exit_prices, quantities):
+    """PnL per order: long orders gain when the price rises, short orders when it falls."""
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    exit_prices = np.asarray(exit_prices, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    direction = np.where(np.asarray(order_types) == "Long", 1.0, -1.0)
+    return direction * (exit_prices - entry_prices) * quantities
+
+
+def order_margin(order_types, entry_prices, quantities):
+    """Margin per order: the premium for long orders, the per lot margin for short ones."""
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    return np.where(np.asarray(order_types) == "Long", entry_prices, MARGIN_PER_LOT) * quantities
+
+
+class LedgerOrder:
+    """One ZRM order; slots keep the record small and attribute access cheap."""
+
+    __slots__ = ORDER_FIELDS
+
+    def __init__(self, trade_cycle, order_type, entry_point, entry_price, entry_time, quantity):
+        self.trade_cycle = trade_cycle
+        self.order_type = order_type
+        self.entry_point = entry_point
+        self.entry_price = entry_price
+        self.entry_time = entry_time
+        self.exit_time = ""
+        self.exit_price = ""
+        self.exit_point = ""
+        self.is_order_closed = False
+        self.quantity = quantity
+
+    def as_row(self):
+        return [getattr(self, field) for field in ORDER_FIELDS]
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in ORDER_FIELDS}
+
+
+class OrderLedger:
+    """
+    Orders of the current ZRM trade cycle with an index of the open ones.
+
+    Exits only visit the open orders, and the PnL/margin of the cycle are
+    computed over arrays once the cycle is done instead of per order.
+    """
+
+    def __init__(self):
+        self.orders = []
+        self.open_orders = []
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __iter__(self):
+        return iter(self.orders)
+
+    @property
+    def open_count(self):
+        return len(self.open_orders)
+
+    def add(self, trade_cycle, order_type, entry_point, entry_price, entry_time, quantity):
+        order = LedgerOrder(trade_cycle, order_type, entry_point, entry_price, entry_time, quantity)
+        self.open_orders.append(len(self.orders))
+        self.orders.append(order)
+        return order
+
+    def close_open_orders(self, point, tick_price, tick_time):
+        """Closes every open order at ``tick_price`` and returns the closed orders."""
+        closed = [self.orders[index] for index in self.open_orders]
+        for order in closed:
+            order.exit_time = tick_time
+            order.exit_price = tick_price
+            order.exit_point = point
+            order.is_order_closed = True
+        self.open_orders = []
+        return closed
+
+    def rows(self):
+        """Orders as csv rows in ``ORDER_FIELDS`` order."""
+        return [order.as_row() for order in self.orders]
+
+    def as_dicts(self):
+        return [order.as_dict() for order in self.orders]
+
+    def pnl_and_margin(self):
+        """
+        Returns the PnL and margin arrays of the orders; open orders have a NaN PnL.
+        """
+        size = len(self.orders)
+        order_types = np.array([order.order_type for order in self.orders], dtype=object)
+        entry_prices = np.fromiter((order.entry_price for order in self.orders), np.float64, size)
+        exit_prices = np.fromiter(
+            (order.exit_price if order.is_order_closed else np.nan for order in self.orders), np.float64, size
+        )
+        quantities = np.fromiter((order.quantity for order in self.orders), np.float64, size)
+        return (
+            order_pnl(order_types, entry_prices, exit_prices, quantities),
+            order_margin(order_types, entry_prices, quantities),
+        )
+
+    def clear(self):
+        self.orders = []
+        self.open_orders = []
+
+
+class LedgerAlgo:
+    """
+    Order book handling shared by the ZRM ``Algo`` classes.
+
+    Subclasses call :meth:`init_ledger` from ``__init__``; the exits update
+    their ``open_order_counts``, ``is_trade_cycle_done`` and
+    ``trade_cycle_count`` attributes.
+    """
+
+    def init_ledger(self, verbose=True):
+        self.verbose = verbose
+        # Per instance, a class level ledger would be shared by every Algo of the process
+        self.order_book = OrderLedger()
+        # PnL and margin of every finished cycle
+        self.cycle_results = []
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def write_results_csv(self, file):
+        with open(file, "a", newline="", encoding="UTF8") as f_object:
+            writer(f_object).writerows(self.order_book.rows())
+
+    def record_cycle_results(self):
+        if not len(self.order_book):
+            return
+        trade_cycle = self.order_book.orders[0].trade_cycle
+        if self.cycle_results and self.cycle_results[-1]["trace_cycle"] == trade_cycle:
+            return
+        pnl, margin = self.order_book.pnl_and_margin()
+        self.cycle_results.append(
+            {
+                "trace_cycle": trade_cycle,
+                "orders": len(self.order_book),
+                "PnL": float(pnl.sum()),
+                "Margin Used": float(margin.sum()),
+            }
+        )
+
+    def add_item_order_book(
+        self,
+        trade_cycle,
+        order_type,
+        entry_point,
+        entry_price,
+        entry_time,
+        quantity,
+    ):
+        self.order_book.add(trade_cycle, order_type, entry_point, entry_price, entry_time, quantity)
+
+    def exit_all_open_orders(self, point, tick_price, tick_time):
+        try:
+            for order in self.order_book.close_open_orders(point, tick_price, tick_time):
+                if self.verbose:
+                    print(
+                        "Placed long sell order (exits)"
+                        if order.order_type == "Long"
+                        else "Placed short buy order (exits)"
+                    )
+                    print(
+                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
+                            order.entry_price, tick_price
+                        )
+                    )
+                self.open_order_counts -= 1
+                self.is_trade_cycle_done = True
+            self.trade_cycle_count += 1
+        except:
+            pass
@@ -1,16 +1,20 @@
 import json
 import csv
 import os
+import sys
 import argparse
-from csv import writer
 import time
 from datetime import datetime
 import pandas as pd
-import psycopg2
-import pandas.io.sql as sqlio
 
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
 
-class Algo:
+from MarketInfo.Backtest.MarketSimulator.ReplayEngine import ReplayEngine, TickStream
+from MarketInfo.StrategyCenter.ZRM.OrderLedger import LedgerAlgo, OrderLedger, order_margin, order_pnl
+
+
+class Algo(LedgerAlgo):
     base_entry_price = 0
     zone_width = 0
     quantity = 25
@@ -19,16 +23,17 @@ class Algo:
     short_entry = False
     long_entry_count = 0
     short_entry_count = 0
-    order_book = []
+    order_book = None
     trade_cycle_count = 1
     open_order_counts = 0
     init_timer = None  # int(time.perf_counter())
     one_print = False
     result_csv = ""
 
-    def __init__(self, csv, zone_width):
+    def __init__(self, csv, zone_width, verbose=True):
         self.result_csv = csv
         self.zone_width = zone_width
+        self.init_ledger(verbose)
 
     def reinit(self):
         self.base_entry_price = 0
@@ -37,95 +42,17 @@ class Algo:
         self.short_entry = False
         self.long_entry_count = 0
         self.short_entry_count = 0
-        self.order_book = []
+        self.order_book = OrderLedger()
         self.open_order_counts = 0
         self.init_timer = None  # int(time.perf_counter())
         self.one_print = False
 
-    def write_results_csv(self, file):
-        with open(file, "a", newline="", encoding="UTF8") as f_object:
-            # Pass this file object to csv.writer() and get a writer object
-            writer_object = writer(f_object)
-            # Pass the list as an argument into the writerow()
-            for trans in self.order_book:
-                row = [
-                    trans["trade_cycle"],
-                    trans["order_type"],
-                    trans["entry_point"],
-                    trans["entry_price"],
-                    trans["entry_time"],
-                    trans["exit_time"],
-                    trans["exit_price"],
-                    trans["exit_point"],
-                    trans["is_order_closed"],
-                    trans["quantity"],
-                ]
-                writer_object.writerow(row)
-            # Close the file object
-            f_object.close()
-
-    def add_item_order_book(
-        self,
-        trade_cycle,
-        order_type,
-        entry_point,
-        entry_price,
-        entry_time,
-        exit_time,
-        exit_price,
-        exit_point,
-        is_order_closed,
-        quantity,
-    ):
-        self.order_book.append(
-            {
-                "trade_cycle": trade_cycle,
-                "order_type": order_type,
-                "entry_point": entry_point,
-                "entry_price": entry_price,
-                "entry_time": entry_time,
-                "exit_time": exit_time,
-                "exit_price": exit_price,
-                "exit_point": exit_point,
-                "is_order_closed": is_order_closed,
-                "quantity": quantity,
-            }
-        )
-
-    def exit_all_open_orders(self, point, tick_price, tick_time):
-        try:
-            for idx, item in enumerate(self.order_book):
-                if self.order_book[idx]["order_type"] == "long":
-                    print("Placed long sell order (exits)")
-                    print(
-                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
-                            self.order_book[idx]["entry_price"], tick_price
-                        )
-                    )
-
-                else:
-                    print("Placed short buy order (exits)")
-                    print(
-                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
-                            self.order_book[idx]["entry_price"], tick_price
-                        )
-                    )
-                self.order_book[idx]["exit_time"] = tick_time
-                self.order_book[idx]["exit_price"] = tick_price
-                self.order_book[idx]["exit_point"] = point
-                self.order_book[idx]["is_order_closed"] = True
-                self.open_order_counts -= 1
-                self.is_trade_cycle_done = True
-            self.trade_cycle_count += 1
-        except:
-            pass
-
     def run(self, tick_price, tick_time):
         if self.init_timer is None:
             self.init_timer = tick_time / 1000
         elif (tick_time / 1000) - self.init_timer >= 60:
             if self.one_print is False:
-                print("#@# Base Entry Price is set to --> {}".format(tick_price))
+                self.log("#@# Base Entry Price is set to --> {}".format(tick_price))
                 self.base_entry_price = tick_price
                 self.one_print = True
             is_condition = False
@@ -137,7 +64,7 @@ class Algo:
                     and self.long_entry_count == 3
                     and is_condition is False
                 ):
-                    print("Placed exits orders.. ** With Loss")
+                    self.log("Placed exits orders.. ** With Loss")
                     is_condition = True
                     point = "S" + str(self.short_entry_count)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -152,7 +79,7 @@ class Algo:
                     and self.long_entry_count == self.short_entry_count
                     and is_condition is False
                 ):
-                    print("Placed long buy Order at {} (Long Entry)".format(tick_price))
+                    self.log("Placed long buy Order at {} (Long Entry)".format(tick_price))
                     point = "L" + str(self.long_entry_count)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
                         "%d-%m-%Y %H:%M:%S"
@@ -170,10 +97,6 @@ class Algo:
                         point,
                         tick_price,
                         m_time,
-                        "",
-                        "",
-                        "",
-                        False,
                         q,
                     )
                     self.open_order_counts += 1
@@ -185,7 +108,7 @@ class Algo:
                     and (self.short_entry_count == (self.long_entry_count - 1))
                     and is_condition is False
                 ):
-                    print(
+                    self.log(
                         "Placed short sell Order at {} (Short Entry)".format(tick_price)
                     )
                     point = "S" + str(self.short_entry_count)
@@ -203,10 +126,6 @@ class Algo:
                         point,
                         tick_price,
                         m_time,
-                        "",
-                        "",
-                        "",
-                        False,
                         q,
                     )
                     self.open_order_counts += 1
@@ -218,7 +137,7 @@ class Algo:
                     tick_price >= self.base_entry_price + self.zone_width
                     and is_condition is False
                 ):
-                    print("Closing all exits orders.. ** With Profits**")
+                    self.log("Closing all exits orders.. ** With Profits**")
                     is_condition = True
                     point = "P" + str(self.long_entry_count - 1)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -232,7 +151,7 @@ class Algo:
                     and self.open_order_counts > 0
                     and is_condition is False
                 ):
-                    print("Closing all exits orders.. ** With No Profits/Loss")
+                    self.log("Closing all exits orders.. ** With No Profits/Loss")
                     is_condition = True
                     point = "R" + str(self.short_entry_count - 1)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -241,9 +160,12 @@ class Algo:
                     self.exit_all_open_orders(point, tick_price, m_time)
 
             else:
-                print("*********** Order Logs ************")
-                print(json.dumps(self.order_book, indent=3))
-                self.write_results_csv(self.result_csv)
+                if self.verbose:
+                    print("*********** Order Logs ************")
+                    print(json.dumps(self.order_book.as_dicts(), indent=3))
+                self.record_cycle_results()
+                if self.result_csv:
+                    self.write_results_csv(self.result_csv)
                 self.reinit()
 
 
@@ -276,25 +198,15 @@ def main(zone_width):
     objalgo = Algo(file_path, zone_width)
 
 
+def pnl_columns(df):
+    """Adds the PnL and Margin Used of every order to a results frame."""
+    df["PnL"] = order_pnl(df["order_type"], df["entry_price"], df["exit_price"], df["quantity"])
+    df["Margin Used"] = order_margin(df["order_type"], df["entry_price"], df["quantity"])
+    return df
+
+
 def add_pnl_column(input_csv):
-    margin_per_lot = 40000 / 25
-    df = pd.read_csv(input_csv)
-    df["PnL"] = df.apply(
-        lambda row: (
-            (row["exit_price"] - row["entry_price"]) * row["quantity"]
-            if row["order_type"] == "Long"
-            else (row["entry_price"] - row["exit_price"]) * row["quantity"]
-        ),
-        axis=1,
-    )
-    df["Margin Used"] = df.apply(
-        lambda row: (
-            row["entry_price"] * row["quantity"]
-            if row["order_type"] == "Long"
-            else margin_per_lot * row["quantity"]
-        ),
-        axis=1,
-    )
+    df = pnl_columns(pd.read_csv(input_csv))
 
     # if df['Margin Used'] is same between two rows
 
@@ -325,18 +237,17 @@ def process_csv_data(file_path, zone_width, tokenName):
         writer = csv.writer(f)
         writer.writerow(header)
 
-    df = pd.read_csv(file_path)
     algo = Algo(results_file_path, zone_width)
-
-    for index, row in df.iterrows():
-        tick_price = row["close"]
-        tick_time = pd.Timestamp(row["date"]).timestamp() * 1000
-        algo.run(float(tick_price), tick_time)
+    stats = ReplayEngine(TickStream.from_csv(file_path, sort=False)).run(algo)
+    print(f"Replayed {stats.events} ticks at {stats.events_per_sec:,.0f} events/s")
 
     add_pnl_column(results_file_path)
 
 
 def process_tsdb_data(token, zone_width):
+    import psycopg2
+    import pandas.io.sql as sqlio
+
     connection = psycopg2.connect(
         dbname="ohlc_token",
         user="postgres",
@@ -373,11 +284,8 @@ def process_tsdb_data(token, zone_width):
         df = sqlio.read_sql_query(query, connection)
 
     algo = Algo(results_file_path, zone_width)
-
-    for index, row in df.iterrows():
-        tick_price = row["close"]
-        tick_time = pd.Timestamp(row["date"]).timestamp() * 1000
-        algo.run(float(tick_price), tick_time)
+    stats = ReplayEngine(TickStream.from_frame(df, sort=False)).run(algo)
+    print(f"Replayed {stats.events} ticks at {stats.events_per_sec:,.0f} events/s")
 
     add_pnl_column(results_file_path)
 
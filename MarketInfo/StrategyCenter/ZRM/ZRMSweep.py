@@ -0,0 +1,186 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+from MarketInfo.Backtest.MarketSimulator.ReplayEngine import ReplayEngine, TickStream
+from MarketInfo.StrategyCenter.ZRM.ZRMOm import Algo
+
+# Price arrays of the sweep, attached once per worker process
+_shared = {}
+
+
+class SharedStreams:
+    """
+    Tick streams of several tokens packed into two shared memory blocks.
+
+    The parent process creates the blocks once; every worker maps them
+    read-only through :meth:`attach`, so the prices are never copied or
+    re-read per run.
+    """
+
+    def __init__(self, streams):
+        self.offsets = {}
+        position = 0
+        for token, stream in streams.items():
+            self.offsets[token] = (position, position + len(stream))
+            position += len(stream)
+        self.size = position
+        self.timestamps_block = shared_memory.SharedMemory(create=True, size=max(position * 8, 1))
+        self.prices_block = shared_memory.SharedMemory(create=True, size=max(position * 8, 1))
+        timestamps = np.ndarray(position, dtype=np.int64, buffer=self.timestamps_block.buf)
+        prices = np.ndarray(position, dtype=np.float64, buffer=self.prices_block.buf)
+        for token, (start, end) in self.offsets.items():
+            timestamps[start:end] = streams[token].timestamps
+            prices[start:end] = streams[token].prices
+
+    def handle(self):
+        """What a worker needs to attach: block names, total size and token offsets."""
+        return self.timestamps_block.name, self.prices_block.name, self.size, self.offsets
+
+    @staticmethod
+    def attach(handle):
+        timestamps_name, prices_name, size, offsets = handle
+        timestamps_block = shared_memory.SharedMemory(name=timestamps_name)
+        prices_block = shared_memory.SharedMemory(name=prices_name)
+        timestamps = np.ndarray(size, dtype=np.int64, buffer=timestamps_block.buf)
+        prices = np.ndarray(size, dtype=np.float64, buffer=prices_block.buf)
+        timestamps.flags.writeable = False
+        prices.flags.writeable = False
+        streams = {
+            token: TickStream(timestamps[start:end], prices[start:end])
+            for token, (start, end) in offsets.items()
+        }
+        # The blocks stay referenced for as long as the views are used
+        return streams, (timestamps_block, prices_block)
+
+    def close(self):
+        for block in (self.timestamps_block, self.prices_block):
+            block.close()
+            block.unlink()
+
+
+def _init_worker(handle):
+    _shared["streams"], _shared["blocks"] = SharedStreams.attach(handle)
+
+
+def run_metrics(cycle_results):
+    """Summarizes the finished cycles of one run (``Algo.cycle_results``)."""
+    cycles = pd.DataFrame(cycle_results, columns=["trace_cycle", "orders", "PnL", "Margin Used"])
+    if cycles.empty:
+        return {"orders": 0, "cycles": 0, "net_pnl": 0.0, "max_margin": 0.0, "win_rate": 0.0, "worst_cycle": 0.0}
+    return {
+        "orders": int(cycles["orders"].sum()),
+        "cycles": len(cycles),
+        "net_pnl": float(cycles["PnL"].sum()),
+        "max_margin": float(cycles["Margin Used"].max()),
+        "win_rate": float((cycles["PnL"] > 0).mean()),
+        "worst_cycle": float(cycles["PnL"].min()),
+    }
+
+
+def run_backtest(stream, zone_width):
+    """Replays one stream into a fresh, quiet ZRM ``Algo`` and returns its metrics."""
+    algo = Algo(None, zone_width, verbose=False)
+    stats = ReplayEngine(stream).run(algo)
+    metrics = run_metrics(algo.cycle_results)
+    metrics["ticks"] = stats.events
+    return metrics
+
+
+def _run_task(task):
+    zone_width, token, start, end = task
+    stream = _shared["streams"][token]
+    if start is not None or end is not None:
+        stream = stream.between(start or "1970-01-01", end or "2200-01-01")
+    started = time.perf_counter()
+    metrics = run_backtest(stream, zone_width)
+    return {
+        "zone_width": zone_width,
+        "token": token,
+        "start": start,
+        "end": end,
+        **metrics,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def run_sweep(streams, zone_widths, date_ranges=((None, None),), tokens=None, workers=None):
+    """
+    Backtests every zone width x token x date range combination.
+
+    Args:
+        streams (dict): TickStream per token.
+        zone_widths (list): Zone widths to test.
+        date_ranges (list): ``(start, end)`` pairs, end exclusive; None for open ends.
+        tokens (list): Tokens to test, all of ``streams`` by default.
+        workers (int): Worker processes, the CPU count by default.
+
+    Returns:
+        pandas.DataFrame: One row of metrics per run.
+    """
+    tokens = list(streams) if tokens is None else tokens
+    tasks = [
+        (zone_width, token, start, end)
+        for zone_width, token, (start, end) in itertools.product(zone_widths, tokens, date_ranges)
+    ]
+    shared = SharedStreams({token: streams[token] for token in tokens})
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(shared.handle(),)
+        ) as executor:
+            chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count())))
+            rows = list(executor.map(_run_task, tasks, chunksize=chunksize))
+    finally:
+        shared.close()
+    return pd.DataFrame(rows)
+
+
+def load_csv_streams(csv_paths):
+    """Reads ``ohlc_<token>.csv`` files (date, close) into TickStreams keyed by token."""
+    return {
+        os.path.basename(path).split("_")[1].split(".")[0]: TickStream.from_csv(path, sort=False)
+        for path in csv_paths
+    }
+
+
+if __name__ == "__main__":
+    cmdLineParser = argparse.ArgumentParser("ZRM zone width sweep - ")
+    cmdLineParser.add_argument("csv_files", nargs="*", help="ohlc_<token>.csv files, synthetic data if omitted")
+    cmdLineParser.add_argument(
+        "-zw", "--zonewidths", type=int, nargs="+", dest="zonewidths", default=[15, 20, 25, 30, 40, 50],
+        help="Zone widths to test For eg: 20 25 30",
+    )
+    cmdLineParser.add_argument("-w", "--workers", type=int, dest="workers", default=None, help="Worker processes")
+    args = cmdLineParser.parse_args()
+
+    if args.csv_files:
+        streams = load_csv_streams(args.csv_files)
+    else:
+        rng = np.random.default_rng(3)
+        bars = 375 * 60
+        start_ms = TickStream.to_epoch_ms(["2024-01-01 09:15"])[0]
+        streams = {
+            str(token): TickStream(
+                start_ms + np.arange(bars, dtype=np.int64) * 60000,
+                45000 + np.cumsum(rng.normal(0, 10, bars)),
+            )
+            for token in range(8)
+        }
+
+    started = time.perf_counter()
+    results = run_sweep(streams, args.zonewidths, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    results_path = os.path.join(os.getcwd(), "zrm_sweep_" + time.strftime("%Y_%m_%d-%H-%M-%S") + ".csv")
+    results.to_csv(results_path, index=False)
+    print(results.groupby("zone_width")[["net_pnl", "max_margin", "win_rate"]].mean())
+    print(f"{len(results)} runs in {elapsed:.1f} s, results in {results_path}")
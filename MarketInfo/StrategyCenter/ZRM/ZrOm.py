@@ -1,15 +1,20 @@
 import json
 import csv
 import os
+import sys
 import argparse
 
-from csv import writer
 from datetime import datetime
 from kiteconnect import KiteConnect
 from ZrOm_calc import get_option_tokens, get_zrm_users, get_expiry_dates
 from place_order import *
 from time import sleep
 
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+from MarketInfo.StrategyCenter.ZRM.OrderLedger import LedgerAlgo
+
 script_dir = os.path.dirname(os.path.abspath(__file__))
 zerodha_omkar_filepath = os.path.join(script_dir, "..", "Utils", "users/omkar.json")
 broker_filepath = os.path.join(script_dir, "..", "Utils", "broker.json")
@@ -22,7 +27,7 @@ users_to_trade = get_zrm_users(broker_filepath)
 print(users_to_trade)
 
 
-class Algo:
+class Algo(LedgerAlgo):
     base_entry_price = 0
 
     zone_width = 50
@@ -32,102 +37,22 @@ class Algo:
     short_entry = False
     long_entry_count = 0
     short_entry_count = 0
-    order_book = []
+    order_book = None
     trade_cycle_count = 1
     open_order_counts = 0
     init_timer = None
     one_print = False
     result_csv = ""
 
-    def __init__(self, csv, zone_width, users):
+    def __init__(self, csv, zone_width, users, verbose=True):
         self.result_csv = csv
         self.zone_width = zone_width
         self.users = users
+        self.init_ledger(verbose)
 
     def is_trade_complete(self):
         return self.is_trade_cycle_done
 
-    # Same existing functions here
-    def exit_all_open_orders(self, point, tick_price, tick_time):
-        try:
-            for idx, item in enumerate(self.order_book):
-                if self.order_book[idx]["order_type"] == "long":
-                    print("Placed long sell order (exits)")
-                    print(
-                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
-                            self.order_book[idx]["entry_price"], tick_price
-                        )
-                    )
-
-                else:
-                    print("Placed short buy order (exits)")
-                    print(
-                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
-                            self.order_book[idx]["entry_price"], tick_price
-                        )
-                    )
-                self.order_book[idx]["exit_time"] = tick_time
-                self.order_book[idx]["exit_price"] = tick_price
-                self.order_book[idx]["exit_point"] = point
-                self.order_book[idx]["is_order_closed"] = True
-                self.open_order_counts -= 1
-                self.is_trade_cycle_done = True
-            self.trade_cycle_count += 1
-        except:
-            pass
-
-    def add_item_order_book(
-        self,
-        trade_cycle,
-        order_type,
-        entry_point,
-        entry_price,
-        entry_time,
-        exit_time,
-        exit_price,
-        exit_point,
-        is_order_closed,
-        quantity,
-    ):
-        self.order_book.append(
-            {
-                "trade_cycle": trade_cycle,
-                "order_type": order_type,
-                "entry_point": entry_point,
-                "entry_price": entry_price,
-                "entry_time": entry_time,
-                "exit_time": exit_time,
-                "exit_price": exit_price,
-                "exit_point": exit_point,
-                "is_order_closed": is_order_closed,
-                "quantity": quantity,
-            }
-        )
-
-    def write_results_csv(self, file):
-        with open(file, "a") as f_object:
-            # Pass this file object to csv.writer()
-            # and get a writer object
-            writer_object = writer(f_object)
-            # Pass the list as an argument into
-            # the writerow()
-            for trans in self.order_book:
-                row = [
-                    trans["trade_cycle"],
-                    trans["order_type"],
-                    trans["entry_point"],
-                    trans["entry_price"],
-                    trans["entry_time"],
-                    trans["exit_time"],
-                    trans["exit_price"],
-                    trans["exit_point"],
-                    trans["is_order_closed"],
-                    trans["quantity"],
-                ]
-                writer_object.writerow(row)
-            # Close the file object
-            f_object.close()
-
     str_prc = ""
 
     def run(self, tick_price, tick_time):
@@ -138,7 +63,7 @@ class Algo:
         # Check the base entry time constraint before entering the trades
         current_time = datetime.now().time()
         if current_time < base_entry_time:
-            print("Waiting for base entry time")
+            self.log("Waiting for base entry time")
             return
 
         # Rest of the existing 'run' function here
@@ -149,10 +74,10 @@ class Algo:
             (datetime.fromtimestamp(tick_time)) - self.init_timer
         ).total_seconds() >= 30:
             if self.one_print is False:
-                print("#@# Base Entry Price is set to --> {}".format(tick_price))
+                self.log("#@# Base Entry Price is set to --> {}".format(tick_price))
                 self.base_entry_price = tick_price
                 self.one_print = True
-                print("Base Entry Price is set to --> {}".format(self.base_entry_price))
+                self.log("Base Entry Price is set to --> {}".format(self.base_entry_price))
                 # Place entry order here
             is_condition = False
             if self.is_trade_cycle_done is False:
@@ -163,7 +88,7 @@ class Algo:
                     and self.long_entry_count == 3
                     and is_condition is False
                 ):
-                    print("Placed exits orders.. ** With Loss")
+                    self.log("Placed exits orders.. ** With Loss")
                     is_condition = True
                     point = "S" + str(self.short_entry_count)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -179,7 +104,7 @@ class Algo:
                     and self.long_entry_count == self.short_entry_count
                     and is_condition is False
                 ):
-                    print("Placed long buy Order at {} (Long Entry)".format(tick_price))
+                    self.log("Placed long buy Order at {} (Long Entry)".format(tick_price))
                     point = "L" + str(self.long_entry_count)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
                         "%d-%m-%Y %H:%M:%S"
@@ -225,10 +150,6 @@ class Algo:
                         point,
                         tick_price,
                         m_time,
-                        "",
-                        "",
-                        "",
-                        False,
                         q,
                     )
                     self.open_order_counts += 1
@@ -240,7 +161,7 @@ class Algo:
                     and (self.short_entry_count == (self.long_entry_count - 1))
                     and is_condition is False
                 ):
-                    print(
+                    self.log(
                         "Placed short sell Order at {} (Short Entry)".format(tick_price)
                     )
                     point = "S" + str(self.short_entry_count)
@@ -285,10 +206,6 @@ class Algo:
                         point,
                         tick_price,
                         m_time,
-                        "",
-                        "",
-                        "",
-                        False,
                         q,
                     )
                     self.open_order_counts += 1
@@ -300,7 +217,7 @@ class Algo:
                     tick_price >= self.base_entry_price + self.zone_width
                     and is_condition is False
                 ):
-                    print("Closing first order.. ** With Profits")
+                    self.log("Closing first order.. ** With Profits")
                     is_condition = True
                     point = "P" + str(self.long_entry_count - 1)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -315,7 +232,7 @@ class Algo:
                     and self.open_order_counts > 0
                     and is_condition is False
                 ):
-                    print("Closing all exits orders.. ** With No Profits/Loss")
+                    self.log("Closing all exits orders.. ** With No Profits/Loss")
                     is_condition = True
                     point = "R" + str(self.short_entry_count - 1)
                     m_time = datetime.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -325,9 +242,12 @@ class Algo:
                     # Squareoff ZrOm orders
 
             else:
-                print("*********** Order Logs ************")
-                print(json.dumps(self.order_book, indent=3))
-                self.write_results_csv(self.result_csv)
+                if self.verbose:
+                    print("*********** Order Logs ************")
+                    print(json.dumps(self.order_book.as_dicts(), indent=3))
+                self.record_cycle_results()
+                if self.result_csv:
+                    self.write_results_csv(self.result_csv)
 
 
 def main(zone_width):
@@ -1,8 +1,7 @@
 import pandas as pd
 import time
-import datetime
+import sys
 from datetime import datetime as dt
-from csv import writer
 from ZrOm_calc import get_option_tokens
 from place_order import *
 import json
@@ -11,12 +10,18 @@ import os
 import argparse
 from kiteconnect import KiteConnect
 
+DIR_PATH = os.getcwd()
+sys.path.append(DIR_PATH)
+
+from MarketInfo.Backtest.MarketSimulator.ReplayEngine import ReplayEngine, TickStream
+from MarketInfo.StrategyCenter.ZRM.OrderLedger import LedgerAlgo
+
 
 # Parsing the base entry time to a format which can be compared with current time
 base_entry_time = dt.strptime("09:26:00", "%H:%M:%S").time()
 
 
-class Algo:
+class Algo(LedgerAlgo):
     base_entry_price = 0
 
     zone_width = 25
@@ -26,101 +31,21 @@ class Algo:
     short_entry = False
     long_entry_count = 0
     short_entry_count = 0
-    order_book = []
+    order_book = None
     trade_cycle_count = 1
     open_order_counts = 0
     init_timer = None
     one_print = False
     result_csv = ""
 
-    def __init__(self, csv, zone_width):
+    def __init__(self, csv, zone_width, verbose=True):
         self.result_csv = csv
         self.zone_width = zone_width
+        self.init_ledger(verbose)
 
     def is_trade_complete(self):
         return self.is_trade_cycle_done
 
-    # Same existing functions here
-    def exit_all_open_orders(self, point, tick_price, tick_time):
-        try:
-            for idx, item in enumerate(self.order_book):
-                if self.order_book[idx]["order_type"] == "long":
-                    print("Placed long sell order (exits)")
-                    print(
-                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
-                            self.order_book[idx]["entry_price"], tick_price
-                        )
-                    )
-
-                else:
-                    print("Placed short buy order (exits)")
-                    print(
-                        "Transaction Details - \n\t entry_price {0} \n\t exit_price {1}".format(
-                            self.order_book[idx]["entry_price"], tick_price
-                        )
-                    )
-                self.order_book[idx]["exit_time"] = tick_time
-                self.order_book[idx]["exit_price"] = tick_price
-                self.order_book[idx]["exit_point"] = point
-                self.order_book[idx]["is_order_closed"] = True
-                self.open_order_counts -= 1
-                self.is_trade_cycle_done = True
-            self.trade_cycle_count += 1
-        except:
-            pass
-
-    def add_item_order_book(
-        self,
-        trade_cycle,
-        order_type,
-        entry_point,
-        entry_price,
-        entry_time,
-        exit_time,
-        exit_price,
-        exit_point,
-        is_order_closed,
-        quantity,
-    ):
-        self.order_book.append(
-            {
-                "trade_cycle": trade_cycle,
-                "order_type": order_type,
-                "entry_point": entry_point,
-                "entry_price": entry_price,
-                "entry_time": entry_time,
-                "exit_time": exit_time,
-                "exit_price": exit_price,
-                "exit_point": exit_point,
-                "is_order_closed": is_order_closed,
-                "quantity": quantity,
-            }
-        )
-
-    def write_results_csv(self, file):
-        with open(file, "a") as f_object:
-            # Pass this file object to csv.writer()
-            # and get a writer object
-            writer_object = writer(f_object)
-            # Pass the list as an argument into
-            # the writerow()
-            for trans in self.order_book:
-                row = [
-                    trans["trade_cycle"],
-                    trans["order_type"],
-                    trans["entry_point"],
-                    trans["entry_price"],
-                    trans["entry_time"],
-                    trans["exit_time"],
-                    trans["exit_price"],
-                    trans["exit_point"],
-                    trans["is_order_closed"],
-                    trans["quantity"],
-                ]
-                writer_object.writerow(row)
-            # Close the file object
-            f_object.close()
-
     def run(self, tick_price, tick_time):
         expiry_date = "2023-07-13"
         # Get the simulated current time from the tick_time
@@ -128,7 +53,7 @@ class Algo:
 
         # Check the base entry time constraint before entering the trades
         if current_time < base_entry_time:
-            print("Waiting for base entry time")
+            self.log("Waiting for base entry time")
             return
 
         # Rest of the existing 'run' function here
@@ -136,7 +61,7 @@ class Algo:
             self.init_timer = tick_time
         elif (tick_time) - self.init_timer >= 2:
             if self.one_print is False:
-                print("#@# Base Entry Price is set to --> {}".format(tick_price))
+                self.log("#@# Base Entry Price is set to --> {}".format(tick_price))
                 self.base_entry_price = tick_price
                 self.one_print = True
                 # str_prc = round(tick_price/100)*100
@@ -152,7 +77,7 @@ class Algo:
                     and self.long_entry_count == 3
                     and is_condition is False
                 ):
-                    print("Placed exits orders.. ** With Loss")
+                    self.log("Placed exits orders.. ** With Loss")
                     is_condition = True
                     point = "S" + str(self.short_entry_count)
                     m_time = dt.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -168,7 +93,7 @@ class Algo:
                     and self.long_entry_count == self.short_entry_count
                     and is_condition is False
                 ):
-                    print("Placed long buy Order at {} (Long Entry)".format(tick_price))
+                    self.log("Placed long buy Order at {} (Long Entry)".format(tick_price))
                     point = "L" + str(self.long_entry_count)
                     m_time = dt.fromtimestamp(int(tick_time) / 1000).strftime(
                         "%d-%m-%Y %H:%M:%S"
@@ -194,10 +119,6 @@ class Algo:
                         point,
                         tick_price,
                         m_time,
-                        "",
-                        "",
-                        "",
-                        False,
                         q,
                     )
                     self.open_order_counts += 1
@@ -209,7 +130,7 @@ class Algo:
                     and (self.short_entry_count == (self.long_entry_count - 1))
                     and is_condition is False
                 ):
-                    print(
+                    self.log(
                         "Placed short sell Order at {} (Short Entry)".format(tick_price)
                     )
                     point = "S" + str(self.short_entry_count)
@@ -236,10 +157,6 @@ class Algo:
                         point,
                         tick_price,
                         m_time,
-                        "",
-                        "",
-                        "",
-                        False,
                         q,
                     )
                     self.open_order_counts += 1
@@ -251,7 +168,7 @@ class Algo:
                     tick_price >= self.base_entry_price + self.zone_width
                     and is_condition is False
                 ):
-                    print("Closing first order.. ** With Profits")
+                    self.log("Closing first order.. ** With Profits")
                     is_condition = True
                     point = "P" + str(self.long_entry_count - 1)
                     m_time = dt.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -266,7 +183,7 @@ class Algo:
                     and self.open_order_counts > 0
                     and is_condition is False
                 ):
-                    print("Closing all exits orders.. ** With No Profits/Loss")
+                    self.log("Closing all exits orders.. ** With No Profits/Loss")
                     is_condition = True
                     point = "R" + str(self.short_entry_count - 1)
                     m_time = dt.fromtimestamp(int(tick_time) / 1000).strftime(
@@ -276,53 +193,39 @@ class Algo:
                     # Squareoff ZrOm orders
 
             else:
-                print("*********** Order Logs ************")
-                print(json.dumps(self.order_book, indent=3))
-                self.write_results_csv(self.result_csv)
+                if self.verbose:
+                    print("*********** Order Logs ************")
+                    print(json.dumps(self.order_book.as_dicts(), indent=3))
+                self.record_cycle_results()
+                if self.result_csv:
+                    self.write_results_csv(self.result_csv)
 
 
-# Load the csv file
-df = pd.read_csv("banknifty_50.csv")
+class TickPrinter:
+    def run(self, tick_price, tick_time):
+        formatted_tick_time = dt.fromtimestamp(tick_time).strftime("%d%b%y %I:%M:%S %p")
+        print("Tick Price: ", formatted_tick_time, ":", tick_price)
 
-# Convert the date column to datetime
-df["date"] = pd.to_datetime(df["date"])
 
-# Sort the dataframe by date
+# Load the csv file sorted by date
+df = pd.read_csv("banknifty_50.csv")
+df["date"] = pd.to_datetime(df["date"])
 df = df.sort_values("date")
 
-# The time difference in seconds between each row (in real world, it's 60 seconds)
-time_difference = 60
-
-# The speed of simulation (5x speed)
+# The speed of simulation, a minute candle (longer gaps are cut to a minute) takes 60 / speed seconds
 simulation_speed = 60
 
-# The actual sleep time in seconds between each row
-sleep_time = time_difference / simulation_speed
-
 # Initialize the Algo
 objalgo = Algo("results.csv", 15)
 
-# Iterate over each row in the dataframe
-for index, row in df.iterrows():
-    # Get the tick price and time from the row
-    tick_price = row["close"]
-    tick_time = row["date"].timestamp()
-
-    # Convert the Unix timestamp to a datetime object
-    tick_time_obj = datetime.fromtimestamp(tick_time)
-
-    # Format the datetime object as a string
-    formatted_tick_time = tick_time_obj.strftime("%d%b%y %I:%M:%S %p")
-
-    print("Tick Price: ", formatted_tick_time, ":", tick_price)
-
-    # Run the strategy
-    objalgo.run(tick_price, tick_time)
-
-    # Check if trade cycle is complete
-    if objalgo.is_trade_complete():
-        print("Trade cycle completed. Exiting...")
-        break
-
-    # Sleep for the required time
-    sleep(sleep_time)
+# The strategy gets the tick time in epoch seconds, the replay stops when the trade cycle completes
+engine = ReplayEngine(
+    TickStream.from_frame(df, sort=False),
+    speed=simulation_speed,
+    max_gap=60,
+    time_unit="s",
+    stop_when_complete=True,
+)
+stats = engine.run(TickPrinter(), objalgo)
+if stats.stopped_early:
+    print("Trade cycle completed. Exiting...")
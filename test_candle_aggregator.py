@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from Executor.ExecutorUtils.InstrumentCenter.CandleAggregator.candle_aggregator import (
+    MARKET_TZ,
+    CandleAggregator,
+)
+
+
+@pytest.mark.parametrize(
+    "interval, expected",
+    [
+        ("minute", ["09:15", "09:16"]),
+        ("5minute", ["09:15", "09:20"]),
+        ("10minute", ["09:15", "09:25"]),
+        ("30minute", ["09:15", "09:45"]),
+        ("60minute", ["09:15", "10:15"]),
+    ],
+)
+def test_bars_start_at_the_session_open(interval, expected):
+    aggregator = CandleAggregator(interval)
+    session_start = pd.Timestamp("2026-10-19 09:15", tz=MARKET_TZ)
+    seconds = aggregator.interval
+    for offset, price in [(0, 100.0), (seconds - 1, 101.0), (seconds, 99.0), (seconds + 1, 98.0)]:
+        aggregator.add_tick(256265, price, session_start.timestamp() + offset)
+
+    frame = aggregator.to_frame(256265)
+    assert list(frame.index.strftime("%H:%M")) == expected
+    assert frame["close"].tolist() == [101.0, 98.0]
@@ -0,0 +1,130 @@
+import datetime as dt
+
+import pytest
+
+
+class FakeStrategy:
+    def get_strike_step(self, base_symbol):
+        return 50
+
+
+class FakeInstrument:
+    """Weekly NIFTY options every 50 points from 20000 to 26000."""
+
+    expiry = "2026-10-22"
+
+    def __init__(self):
+        self.contracts = {}
+        for number, strike in enumerate(range(20000, 26001, 50)):
+            for option_type in ("CE", "PE"):
+                exchange_token = f"{strike}{option_type}"
+                self.contracts[exchange_token] = (strike, option_type, 1000 + 2 * number + (option_type == "PE"))
+        self.lookups = 0
+
+    def get_expiry_by_criteria(self, base_symbol, strike_price, option_type, expiry_type="current_week"):
+        return self.expiry
+
+    def get_exchange_token_by_criteria(self, base_symbol, strike_price, option_type, expiry):
+        self.lookups += 1
+        exchange_token = f"{strike_price}{option_type}"
+        return exchange_token if exchange_token in self.contracts else None
+
+    def get_kite_token_by_exchange_token(self, exchange_token):
+        return self.contracts[exchange_token][2]
+
+    def get_trading_symbol_by_exchange_token(self, exchange_token):
+        return f"NIFTY26OCT{exchange_token}"
+
+    def get_lot_size_by_exchange_token(self, exchange_token):
+        return 75
+
+
+class FakeQuotes:
+    def __init__(self, spot):
+        self.spot = spot
+        self.calls = []
+
+    def fetch_ltps(self, tokens):
+        tokens = [str(token) for token in tokens]
+        self.calls.append(tokens)
+        return {token: self.spot if token == "256265" else float(token) / 10 for token in tokens}
+
+
+@pytest.fixture
+def runtime(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Strategies import EntryRuntime
+
+    return EntryRuntime
+
+
+def test_offsets_follow_the_strategy_rules(runtime):
+    assert runtime.main_strike_offset("Bearish", "OS", 2) == 2
+    assert runtime.main_strike_offset("Bullish", "OS", 2) == -2
+    assert runtime.main_strike_offset("Bearish", "OB", 2) == -2
+    assert runtime.main_strike_offset("Bullish", "OB", 2) == 2
+    assert runtime.main_strike_offset("Sideways", "OS", None) == 0
+    assert runtime.hedge_strike_offset("Bearish", 6) == 6
+    assert runtime.hedge_strike_offset("Bullish", 6) == -6
+    with pytest.raises(ValueError):
+        runtime.main_strike_offset("Sideways", "OS", 2)
+
+
+def test_legs_are_picked_from_one_quote_at_entry(runtime):
+    quotes, instrument = FakeQuotes(24012.0), FakeInstrument()
+    entry = runtime.OptionEntry(
+        FakeStrategy(),
+        "NIFTY",
+        "256265",
+        [runtime.Leg("main", "PE", -2), runtime.Leg("hedge", "PE", -6)],
+        quote_source=quotes,
+        instrument=instrument,
+        drift_steps=4,
+    )
+    prewarm_picks = entry.prewarm()
+    assert prewarm_picks["main"].contract.strike == 23900
+    assert len(entry.ladder.contracts) == 2 * 10 + 1
+
+    # The index moved three strikes up, the legs follow without any lookup
+    quotes.spot, instrument.lookups, quotes.calls = 24160.0, 0, []
+    picks = entry.resolve()
+    assert len(quotes.calls) == 1 and instrument.lookups == 0
+    main, hedge = picks["main"], picks["hedge"]
+    assert (main.contract.strike, hedge.contract.strike) == (24050, 23850)
+    assert main.ltp == main.contract.kite_token / 10
+    assert main.contract.exchange_token == "24050PE" and main.contract.lot_size == 75
+
+    # Beyond the ladder the contract is looked up and quoted on its own
+    quotes.spot = 25000.0
+    assert entry.resolve()["hedge"].contract.strike == 24700
+    assert instrument.lookups == 2
+
+
+def test_wait_until_stops_the_lead_before_the_entry(runtime):
+    clock = [dt.datetime(2026, 10, 19, 10, 29, 0)]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += dt.timedelta(seconds=seconds)
+
+    entry_time = runtime.entry_datetime("10:30:00", dt.date(2026, 10, 19))
+    runtime.wait_until(entry_time, lead_seconds=0.1, now=lambda: clock[0], sleep=sleep)
+    assert entry_time - dt.timedelta(seconds=0.1) <= clock[0] < entry_time
+    assert sleeps[0] == pytest.approx(58.9)
+
+    sleeps.clear()
+    runtime.wait_until(entry_time - dt.timedelta(minutes=5), now=lambda: clock[0], sleep=sleep)
+    assert sleeps == []
+
+
+def test_prewarm_starts_a_bounded_lead_before_the_entry(runtime):
+    clock = [dt.datetime(2026, 10, 19, 9, 42, 0)]
+
+    def sleep(seconds):
+        clock[0] += dt.timedelta(seconds=seconds)
+
+    # A task started at 09:42 for a 10:30 entry pre-warms about a minute before the entry, not at 09:42
+    entry_time = runtime.entry_datetime("10:30:00", dt.date(2026, 10, 19))
+    runtime.wait_until(entry_time, lead_seconds=60, now=lambda: clock[0], sleep=sleep)
+    assert entry_time - dt.timedelta(seconds=60) <= clock[0] < entry_time - dt.timedelta(seconds=59)
@@ -0,0 +1,88 @@
+import datetime as dt
+
+import pytest
+
+
+@pytest.fixture
+def candle_store(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from MarketInfo.DataCenter import EODCandleStore
+
+    return EODCandleStore
+
+
+def _candles(symbol, day, minutes, close_offset=0):
+    start = dt.datetime.combine(day, dt.time(9, 15))
+    return [
+        (symbol, start + dt.timedelta(minutes=minute), 100.0, 101.0, 99.0, 100.0 + minute + close_offset, 50)
+        for minute in range(minutes)
+    ]
+
+
+def test_overlapping_fetches_update_instead_of_duplicating(candle_store, tmp_path):
+    store = candle_store.SQLiteCandleStore(str(tmp_path / "nifty.sqlite"))
+    first_day, second_day = dt.date(2024, 5, 2), dt.date(2024, 5, 3)
+    candle_store.store_candles(
+        store, "NIFTY", _candles("NIFTY", first_day, 10) + _candles("NIFTY24MAY22500CE", first_day, 10)
+    )
+    # The next run fetches a window overlapping the first one, with revised closes
+    candle_store.store_candles(
+        store,
+        "NIFTY",
+        _candles("NIFTY", first_day, 10, close_offset=0.5) + _candles("NIFTY", second_day, 5),
+    )
+
+    candles = store.load("NIFTY", first_day, dt.date(2024, 5, 4))
+    assert len(candles) == 25
+    assert len({(symbol, ts) for symbol, ts, *_ in candles}) == 25
+
+    nifty = store.load("NIFTY", first_day, second_day, symbols=["NIFTY"])
+    assert [candle[1] for candle in nifty] == [row[1] for row in _candles("NIFTY", first_day, 10)]
+    assert [candle[5] for candle in nifty] == [100.5 + minute for minute in range(10)]
+    options = store.load("NIFTY", first_day, dt.date(2024, 5, 4), symbols=["NIFTY24MAY22500CE"])
+    assert options == _candles("NIFTY24MAY22500CE", first_day, 10)
+    store.close()
+
+
+def test_empty_fetch_writes_nothing(candle_store, tmp_path):
+    store = candle_store.SQLiteCandleStore(str(tmp_path / "nifty.sqlite"))
+    candle_store.store_candles(store, "NIFTY", [])
+
+    assert store.conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    store.close()
+
+
+def test_month_partitions_cover_the_fetched_candles(candle_store):
+    timestamps = [
+        dt.datetime(2024, 12, 30, 9, 15),
+        dt.datetime(2024, 12, 31, 15, 29),
+        dt.datetime(2025, 1, 1, 9, 15),
+        dt.datetime(2024, 11, 29, 9, 15),
+    ]
+
+    assert candle_store.month_partitions("BANKNIFTY", timestamps) == [
+        ("banknifty_candles_2024_11", dt.date(2024, 11, 1), dt.date(2024, 12, 1)),
+        ("banknifty_candles_2024_12", dt.date(2024, 12, 1), dt.date(2025, 1, 1)),
+        ("banknifty_candles_2025_01", dt.date(2025, 1, 1), dt.date(2025, 2, 1)),
+    ]
+
+
+def test_postgres_partitions_are_created_for_each_month(candle_store):
+    class RecordingCursor:
+        def __init__(self):
+            self.statements = []
+
+        def execute(self, statement, params=None):
+            self.statements.append(" ".join(statement.split()))
+
+    cursor = RecordingCursor()
+    candle_store.PostgresCandleStore(cursor).ensure_partitions(
+        "NIFTY", [dt.datetime(2024, 5, 2, 9, 15), dt.datetime(2024, 6, 3, 9, 15)]
+    )
+
+    assert cursor.statements == [
+        "CREATE TABLE IF NOT EXISTS nifty_candles_2024_05 PARTITION OF nifty_candles "
+        "FOR VALUES FROM ('2024-05-01') TO ('2024-06-01');",
+        "CREATE TABLE IF NOT EXISTS nifty_candles_2024_06 PARTITION OF nifty_candles "
+        "FOR VALUES FROM ('2024-06-01') TO ('2024-07-01');",
+    ]
@@ -0,0 +1,169 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _legacy_trade_details(trade_data, multileg, trading_symbol_lookup):
+    """``calculate_trade_details`` of the per-trade EOD log, the instrument lookup passed in."""
+    try:
+        entry_orders = trade_data["entry_orders"]
+        exit_orders = trade_data["exit_orders"]
+        if not entry_orders or not exit_orders:
+            return None
+        hedge_orders = trade_data["hedge_orders"]
+
+        if multileg:
+            entry_price = sum([float(o["avg_prc"]) for o in entry_orders]) if entry_orders else 0
+            exit_price = sum([float(o["avg_prc"]) for o in exit_orders]) if exit_orders else 0
+            hedge_entry_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EN" in o["trade_id"]]) if hedge_orders else 0
+            hedge_exit_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EX" in o["trade_id"]]) if hedge_orders else 0
+        else:
+            entry_price = sum([float(o["avg_prc"]) for o in entry_orders]) / len(entry_orders) if entry_orders else 0
+            exit_price = sum([float(o["avg_prc"]) for o in exit_orders]) / len(exit_orders) if exit_orders else 0
+            hedge_entry_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EN" in o["trade_id"]]) / len([o for o in hedge_orders if "EN" in o["trade_id"]]) if hedge_orders else 0
+            hedge_exit_price = sum([float(o["avg_prc"]) for o in hedge_orders if "EX" in o["trade_id"]]) / len([o for o in hedge_orders if "EX" in o["trade_id"]]) if hedge_orders else 0
+
+        trade_id_prefix = entry_orders[0]["trade_id"].split("_")[0]
+        exchange_token = [o["exchange_token"] for o in entry_orders if "MO" in o["trade_id"]][0]
+        trading_symbol = trading_symbol_lookup(str(exchange_token))
+        signal = "Short" if "_SH_" in entry_orders[0]["trade_id"] else "Long"
+        entry_time = min([o["time_stamp"] for o in entry_orders])
+        exit_time = max([o["time_stamp"] for o in exit_orders])
+        short_trade = (entry_price - exit_price) + (hedge_exit_price - hedge_entry_price)
+        long_trade = (exit_price - entry_price) + (hedge_exit_price - hedge_entry_price)
+        trade_points = short_trade if signal == "Short" else long_trade
+        for order in entry_orders:
+            if order["exchange_token"] == exchange_token:
+                qty = sum([o["qty"] for o in entry_orders if o["exchange_token"] == exchange_token])
+            else:
+                qty = order["qty"]
+        pnl = trade_points * qty
+        tax = sum(o["tax"] for o in entry_orders) + sum(o["tax"] for o in exit_orders) + sum(o["tax"] for o in hedge_orders)
+        return {
+            "trade_id": trade_id_prefix,
+            "trading_symbol": trading_symbol,
+            "signal": signal,
+            "entry_time": datetime.strptime(entry_time, "%Y-%m-%d %H:%M"),
+            "exit_time": datetime.strptime(exit_time, "%Y-%m-%d %H:%M"),
+            "entry_price": float(entry_price),
+            "exit_price": float(exit_price),
+            "hedge_entry_price": float(hedge_entry_price),
+            "hedge_exit_price": float(hedge_exit_price),
+            "trade_points": float(trade_points),
+            "qty": qty,
+            "pnl": float(pnl),
+            "tax": float(tax),
+            "net_pnl": float(pnl - tax),
+        }
+    except Exception:
+        return None
+
+
+def _legacy_trades(strategy_orders):
+    """``process_orders_for_strategy``: the orders of one strategy grouped by trade prefix."""
+    trades = {}
+    for order in strategy_orders:
+        if order is None or "trade_id" not in order:
+            continue
+        group = trades.setdefault(
+            order["trade_id"].split("_")[0], {"entry_orders": [], "exit_orders": [], "hedge_orders": []}
+        )
+        if "EN" in order["trade_id"] and "HO" not in order["trade_id"]:
+            group["entry_orders"].append(order)
+        elif "EX" in order["trade_id"] and "HO" not in order["trade_id"]:
+            group["exit_orders"].append(order)
+        elif "HO" in order["trade_id"]:
+            group["hedge_orders"].append(order)
+    return trades
+
+
+def _order(rng, trade_id, token, time_stamp, qty=None):
+    return {
+        "order_id": f"{trade_id}-{rng.integers(1e9)}",
+        "trade_id": trade_id,
+        "exchange_token": token,
+        "avg_prc": round(float(rng.uniform(5, 400)), 2),
+        "qty": int(qty if qty is not None else 25 * rng.integers(1, 8)),
+        "tax": round(float(rng.uniform(0, 60)), 2),
+        "time_stamp": time_stamp,
+    }
+
+
+def _synthetic_book(rng, strategy_name, trades):
+    orders = []
+    for number in range(trades):
+        prefix = f"{strategy_name[:2].upper()}{number}"
+        signal = "SH" if rng.random() < 0.5 else "LG"
+        main_token, other_token, hedge_token = (int(token) for token in rng.integers(1000, 9999, 3))
+        entry_minute, exit_minute = sorted(rng.integers(15, 59, 2))
+        entry_at, exit_at = f"2026-10-16 09:{entry_minute:02d}", f"2026-10-16 14:{exit_minute:02d}"
+        shape = rng.integers(0, 8)
+
+        orders.append(_order(rng, f"{prefix}_{signal}_MO_EN", main_token, entry_at))
+        if shape in (1, 2):
+            # Scaled into the main leg, a second leg, or both
+            orders.append(_order(rng, f"{prefix}_{signal}_MO_EN", main_token, entry_at))
+        if shape in (2, 3):
+            orders.append(_order(rng, f"{prefix}_{signal}_SO_EN", other_token, entry_at))
+        if shape != 4:  # shape 4 is still open
+            orders.append(_order(rng, f"{prefix}_{signal}_MO_EX", main_token, exit_at))
+        if shape in (2, 5, 6):
+            orders.append(_order(rng, f"{prefix}_{signal}_HO_EN", hedge_token, entry_at))
+            if shape != 6:  # shape 6 has a hedge entry without its exit
+                orders.append(_order(rng, f"{prefix}_{signal}_HO_EX", hedge_token, exit_at))
+        if shape == 7:
+            # Unusable values are skipped by both versions
+            orders[-1]["avg_prc" if rng.random() < 0.5 else "tax"] = None
+        orders.insert(int(rng.integers(0, len(orders) + 1)), None)
+    return orders
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_aggregated_trades_match_the_per_trade_math(seed, monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.ReportUtils.EodTradeLogUtils import (
+        TRADE_COLUMNS,
+        aggregate_trades,
+        order_record,
+        orders_frame,
+    )
+
+    rng = np.random.default_rng(seed)
+    multileg_flags = {"ExpiryTrader": True, "GoldenCoin": False, "Namaha": False}
+    books = {
+        (tr_no, strategy_name): _synthetic_book(rng, strategy_name, 30)
+        for tr_no in ("Tr01", "Tr02")
+        for strategy_name in multileg_flags
+    }
+
+    def lookup(token):
+        return f"SYM{token}"
+
+    records = [
+        order_record(tr_no, strategy_name, position, order)
+        for (tr_no, strategy_name), book in books.items()
+        for position, order in enumerate(book)
+    ]
+    trades = aggregate_trades(orders_frame([record for record in records if record]), multileg_flags, lookup)
+    actual = {(row.Tr_No, row.strategy, row.trade_id): row for row in trades.itertuples(index=False)}
+
+    expected = {}
+    for (tr_no, strategy_name), book in books.items():
+        for prefix, trade_data in _legacy_trades(book).items():
+            details = _legacy_trade_details(trade_data, multileg_flags[strategy_name], lookup)
+            if details is not None:
+                expected[(tr_no, strategy_name, prefix)] = details
+
+    assert 0 < len(expected) < sum(len(_legacy_trades(book)) for book in books.values())
+    assert actual.keys() == expected.keys()
+    for key, details in expected.items():
+        row = actual[key]._asdict()
+        for column in TRADE_COLUMNS:
+            if isinstance(details[column], float):
+                assert row[column] == pytest.approx(details[column], abs=1e-9), (key, column)
+            elif column in ("entry_time", "exit_time"):
+                assert pd.Timestamp(row[column]) == pd.Timestamp(details[column]), (key, column)
+            else:
+                assert row[column] == details[column], (key, column)
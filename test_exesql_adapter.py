@@ -0,0 +1,71 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    monkeypatch.setenv("DB_DIR", str(tmp_path))
+    from Executor.ExecutorUtils.ExeDBUtils.SQLUtils import exesql_adapter
+
+    yield exesql_adapter
+    exesql_adapter.connection_cache.close_all()
+
+
+def _holdings():
+    return pd.DataFrame(
+        {
+            "trade_id": ["AM1_SH_MO_EN", "AM2_LG_MO_EN"],
+            "entry_time": pd.to_datetime(["2024-01-01 09:20", "2024-01-01 10:05"]),
+            "qty": [25, 50],
+            "margin_utilized": [1000.5, 2000.25],
+        }
+    )
+
+
+def test_append_matches_to_sql_and_the_fetch_helpers_read_it(adapter, tmp_path):
+    conn = adapter.get_db_connection(adapter.user_db_path("Tr01"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    adapter.append_df_to_sqlite(conn, _holdings(), "Holdings", ["margin_utilized"])
+    adapter.append_df_to_sqlite(conn, _holdings().iloc[:1], "Holdings", ["margin_utilized"])
+
+    expected = sqlite3.connect(tmp_path / "expected.db")
+    formatted = _holdings().assign(margin_utilized=lambda df: df["margin_utilized"].map("{:.2f}".format))
+    formatted.to_sql("Holdings", expected, index=False)
+    formatted.iloc[:1].to_sql("Holdings", expected, index=False, if_exists="append")
+    assert conn.execute("SELECT * FROM Holdings").fetchall() == expected.execute("SELECT * FROM Holdings").fetchall()
+    conn.close()
+
+    assert adapter.fetch_qty_for_holdings_sqldb("Tr01", "AM2_LG_MO_EX") == 50
+    assert adapter.fetch_qty_for_holdings_sqldb("Tr01", "AM9_LG_MO_EX") == 0
+    assert adapter.fetch_holdings_value_for_user_sqldb({"Tr_No": "Tr01"}) == pytest.approx(4001.25)
+    assert len(adapter.fetch_sql_table_from_db("Tr01", "Holdings")) == 3
+
+
+def test_failed_batch_leaves_no_table_behind(adapter):
+    conn = adapter.get_db_connection(adapter.user_db_path("Tr02"))
+    frames = {"Good": _holdings(), "Bad": _holdings().assign(margin_utilized=["x", 1.0])}
+    assert not adapter.write_frames_to_sqlite(conn, frames, ["margin_utilized"])
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+    with pytest.raises(ZeroDivisionError):
+        with adapter.transaction(conn):
+            conn.execute("CREATE TABLE Scratch (a)")
+            1 / 0
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+
+def test_worker_threads_share_one_connection_per_database(adapter):
+    conn = adapter.get_db_connection(adapter.user_db_path("Tr03"))
+    adapter.append_df_to_sqlite(conn, _holdings(), "Holdings", ["margin_utilized"])
+    conn.close()
+
+    # A fresh pool per dispatch, like place_order_for_strategy in Holdings mode
+    for _ in range(5):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            qtys = list(executor.map(lambda _: adapter.fetch_qty_for_holdings_sqldb("Tr03", "AM2_LG_MO_EX"), range(40)))
+        assert qtys == [50] * 40
+    assert list(adapter.connection_cache.connections) == [adapter.user_db_path("Tr03")]
@@ -0,0 +1,115 @@
+import pytest
+
+
+def _users(count):
+    return {
+        f"Tr{number:02d}": {
+            "Tr_No": f"Tr{number:02d}",
+            "Broker": {"BrokerName": "zerodha", "BrokerUsername": f"user{number}"},
+        }
+        for number in range(count)
+    }
+
+
+@pytest.fixture
+def cache_module(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter import exefirebase_cache
+
+    return exefirebase_cache
+
+
+@pytest.fixture
+def clock(cache_module, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock["now"])
+    return clock
+
+
+def test_snapshot_is_refetched_after_the_ttl(cache_module, clock):
+    backend = cache_module.FakeCacheBackend({"new_clients": _users(3)})
+    cache = cache_module.FirebaseDocumentCache(backend=backend, ttl=60, use_listeners=False)
+
+    assert cache.get_document("new_clients", "Tr01")["Broker"]["BrokerUsername"] == "user1"
+    # Written behind the cache's back, e.g. by another process
+    backend.write("new_clients/Tr01/Broker/BrokerUsername", "renamed")
+    clock["now"] += 59
+    assert cache.get_document("new_clients", "Tr01")["Broker"]["BrokerUsername"] == "user1"
+    assert backend.get_calls == 1
+
+    clock["now"] += 2
+    assert cache.get_document("new_clients", "Tr01")["Broker"]["BrokerUsername"] == "renamed"
+    assert backend.get_calls == 2
+
+
+def test_invalidated_document_is_refetched_alone(cache_module):
+    backend = cache_module.FakeCacheBackend({"new_clients": _users(5)})
+    cache = cache_module.FirebaseDocumentCache(backend=backend, ttl=60, use_listeners=False)
+    assert cache.find_document("new_clients", "Broker/BrokerUsername", "user2")["Tr_No"] == "Tr02"
+
+    # What the Firebase adapter does after update_fields_firebase
+    backend.write("new_clients/Tr02/Broker/BrokerUsername", "user22")
+    cache.invalidate("new_clients", "Tr02/Broker")
+    backend.write("new_clients/Tr04", None)
+    cache.invalidate("new_clients", "Tr04")
+
+    assert cache.find_document("new_clients", "Broker/BrokerUsername", "user2") is None
+    assert cache.find_document("new_clients", "Broker/BrokerUsername", "user22")["Tr_No"] == "Tr02"
+    assert "Tr04" not in cache.get_collection("new_clients")
+    # One collection snapshot, then one read per dirty document
+    assert backend.get_calls == 3
+
+
+def test_invalidating_a_collection_drops_its_snapshot(cache_module):
+    backend = cache_module.FakeCacheBackend({"new_clients": _users(2), "strategies": {"Demo": {"Qty": 25}}})
+    cache = cache_module.FirebaseDocumentCache(backend=backend, ttl=60, use_listeners=False)
+    cache.get_collection("new_clients")
+    cache.get_collection("strategies")
+
+    backend.write("new_clients/Tr05", {"Tr_No": "Tr05"})
+    cache.invalidate("new_clients")
+
+    assert sorted(cache.get_collection("new_clients")) == ["Tr00", "Tr01", "Tr05"]
+    assert cache.get_document("strategies", "Demo") == {"Qty": 25}
+    assert backend.get_calls == 3
+
+
+def test_returned_documents_are_copies(cache_module):
+    backend = cache_module.FakeCacheBackend({"new_clients": _users(1)})
+    cache = cache_module.FirebaseDocumentCache(backend=backend, ttl=60, use_listeners=False)
+
+    cache.get_document("new_clients", "Tr00")["Broker"]["BrokerUsername"] = "mutated"
+
+    assert cache.get_document("new_clients", "Tr00")["Broker"]["BrokerUsername"] == "user0"
+
+
+def test_stats_count_hits_and_misses(cache_module):
+    backend = cache_module.FakeCacheBackend({"new_clients": _users(3)})
+    cache = cache_module.FirebaseDocumentCache(backend=backend, ttl=60, use_listeners=False)
+    assert cache.stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "collections": []}
+
+    for number in range(3):
+        cache.find_document("new_clients", "Broker/BrokerUsername", f"user{number}")
+    cache.invalidate("new_clients", "Tr01")
+    cache.get_document("new_clients", "Tr01")
+
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 2,
+        "hit_rate": 0.5,
+        "collections": ["new_clients"],
+    }
+
+
+def test_listener_keeps_the_snapshot_fresh_without_refetching(cache_module, clock):
+    backend = cache_module.FakeCacheBackend({"new_clients": _users(2)})
+    cache = cache_module.FirebaseDocumentCache(backend=backend, ttl=60, use_listeners=True)
+    cache.get_collection("new_clients")
+
+    backend.write("new_clients/Tr01/Broker/SessionId", "abc")
+    clock["now"] += 3600
+
+    assert cache.get_document("new_clients", "Tr01")["Broker"]["SessionId"] == "abc"
+    assert backend.get_calls == 1
+    cache.close()
+    assert backend.listeners == []
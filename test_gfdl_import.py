@@ -0,0 +1,64 @@
+import sqlite3
+
+import pandas as pd
+
+
+def _write_gfdl_csv(path, days=("04/01/2024", "05/01/2024"), minutes=30, first_minute=0):
+    rows = []
+    for day in days:
+        for ticker in ("NIFTY24JAN21500CE.NFO", "NIFTY24JAN21500PE.NFO", "BANKNIFTY-I.NFO"):
+            for minute in range(first_minute, first_minute + minutes):
+                price = 100 + minute
+                rows.append(
+                    [ticker, day, f"09:{15 + minute // 60:02d}:{minute % 60:02d}", price, price + 1, price - 1, price, 50, 1000]
+                )
+    frame = pd.DataFrame(
+        rows, columns=["Ticker", "Date", "Time", "Open", "High", "Low", "Close", "Volume", "Open Interest"]
+    )
+    frame.to_csv(path, index=False)
+    return len(frame)
+
+
+def test_ingest_is_chunked_grouped_and_idempotent(tmp_path, monkeypatch):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from MarketInfo.DataCenter import TimeScaleDBGFDLImport as gfdl
+
+    csv_directory = tmp_path / "csv"
+    csv_directory.mkdir()
+    expected_rows = _write_gfdl_csv(csv_directory / "GFDL_NFO_1.csv")
+    _write_gfdl_csv(csv_directory / "GFDL_NFO_2.csv", days=("08/01/2024",))
+    target = gfdl.SQLiteTarget(str(tmp_path / "gfdl.sqlite"))
+
+    results = gfdl.ingest_directory(str(csv_directory), target, workers=2, chunk_size=7)
+    assert results["GFDL_NFO_1.csv"] == expected_rows
+
+    # Unchanged files are skipped, forced reloads add nothing
+    assert gfdl.ingest_directory(str(csv_directory), target, workers=1)["GFDL_NFO_1.csv"] is None
+    assert gfdl.ingest_file(str(csv_directory / "GFDL_NFO_1.csv"), target, chunk_size=11, force=True) == 0
+
+    conn = sqlite3.connect(tmp_path / "gfdl.sqlite")
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"NIFTY24JAN21500CE_04Jan24", "BANKNIFTY-I_05Jan24", "NIFTY24JAN21500PE_08Jan24"} <= tables
+    count, opening = conn.execute('SELECT COUNT(*), MIN(Open) FROM "NIFTY24JAN21500CE_04Jan24"').fetchone()
+    assert (count, opening) == (30, 100)
+
+
+def test_files_sharing_a_ticker_day_keep_each_others_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from MarketInfo.DataCenter import TimeScaleDBGFDLImport as gfdl
+
+    # The day split over two files, the second one re-delivered with an overlap
+    morning, afternoon = tmp_path / "GFDL_NFO_am.csv", tmp_path / "GFDL_NFO_pm.csv"
+    _write_gfdl_csv(morning, days=("04/01/2024",), minutes=30)
+    _write_gfdl_csv(afternoon, days=("04/01/2024",), minutes=30, first_minute=20)
+    target = gfdl.SQLiteTarget(str(tmp_path / "gfdl.sqlite"))
+
+    assert gfdl.ingest_file(str(morning), target) == 3 * 30
+    assert gfdl.ingest_file(str(afternoon), target) == 3 * 20
+    assert gfdl.ingest_file(str(morning), target, force=True) == 0
+
+    conn = sqlite3.connect(tmp_path / "gfdl.sqlite")
+    count, first, last = conn.execute(
+        'SELECT COUNT(*), MIN(Time), MAX(Time) FROM "NIFTY24JAN21500CE_04Jan24"'
+    ).fetchone()
+    assert (count, first, last) == (50, "09:15:00", "09:15:49")
@@ -0,0 +1,295 @@
+import numpy as np
+import pandas as pd
+
+
+def _ohlc(bars=600, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 200 + np.cumsum(rng.normal(0, 1.5, bars))
+    open_ = close + rng.normal(0, 0.5, bars)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 1, bars))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 1, bars))
+    index = pd.date_range("2024-01-01 09:15", periods=bars, freq="min")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close}, index=index)
+
+
+# Row by row implementations the kernels replaced, kept here as the reference
+def _legacy_atr(df, period):
+    true_range = pd.Series(index=df.index, dtype="float64")
+    for i in range(1, len(df)):
+        high_low = df["high"].iloc[i] - df["low"].iloc[i]
+        high_prev_close = abs(df["high"].iloc[i] - df["close"].iloc[i - 1])
+        low_prev_close = abs(df["low"].iloc[i] - df["close"].iloc[i - 1])
+        true_range.iloc[i] = max(high_low, high_prev_close, low_prev_close)
+    return true_range.ewm(span=period, adjust=False).mean()
+
+
+def _legacy_amipy_supertrend(df, period, multiplier):
+    average_true_range = _legacy_atr(df, period)
+    ha_close = (df["open"] + df["high"] + df["low"] + df["close"]) / 4
+    ha_high = df[["high", "open", "close"]].max(axis=1)
+    ha_low = df[["low", "open", "close"]].min(axis=1)
+    up = (ha_high + ha_low) / 2 + multiplier * average_true_range
+    dn = (ha_high + ha_low) / 2 - multiplier * average_true_range
+    trend = np.zeros(len(df))
+    trend[0] = 1
+    trend_up = pd.Series(index=df.index, dtype="float64")
+    trend_down = pd.Series(index=df.index, dtype="float64")
+    for i in range(1, len(df)):
+        change_of_trend = 0
+        if ha_close.iloc[i] > up.iloc[i - 1]:
+            trend[i] = 1
+            if trend[i - 1] == -1:
+                change_of_trend = 1
+        elif ha_close.iloc[i] < dn.iloc[i - 1]:
+            trend[i] = -1
+            if trend[i - 1] == 1:
+                change_of_trend = 1
+        else:
+            trend[i] = trend[i - 1]
+        flag = trend[i] < 0 and trend[i - 1] > 0
+        flagh = trend[i] > 0 and trend[i - 1] < 0
+        if trend[i] > 0 and dn.iloc[i] < dn.iloc[i - 1]:
+            dn.iloc[i] = dn.iloc[i - 1]
+        if trend[i] < 0 and up.iloc[i] > up.iloc[i - 1]:
+            up.iloc[i] = up.iloc[i - 1]
+        if flag:
+            up.iloc[i] = (ha_high.iloc[i] + ha_low.iloc[i]) / 2 + multiplier * average_true_range.iloc[i]
+        if flagh:
+            dn.iloc[i] = (ha_high.iloc[i] + ha_low.iloc[i]) / 2 - multiplier * average_true_range.iloc[i]
+        trend_up.iloc[i] = dn.iloc[i] if trend[i] > 0 else np.nan
+        trend_down.iloc[i] = up.iloc[i] if trend[i] < 0 else np.nan
+        if change_of_trend == 1:
+            if trend[i] == 1:
+                trend_up.iloc[i - 1] = trend_down.iloc[i - 1]
+            elif trend[i] == -1:
+                trend_down.iloc[i - 1] = trend_up.iloc[i - 1]
+    return {
+        "ATR": average_true_range,
+        "Up": up,
+        "Dn": dn,
+        "Trend": trend,
+        "TrendUp": trend_up,
+        "TrendDown": trend_down,
+    }
+
+
+def _legacy_supertrend_new(df, period, multiplier):
+    average_true_range = _legacy_atr(df, period)
+    ha_close = (df["open"] + df["high"] + df["low"] + df["close"]) / 4
+    ha_high = df[["high", "open", "close"]].max(axis=1)
+    ha_low = df[["low", "open", "close"]].min(axis=1)
+    up = (ha_high + ha_low) / 2 + multiplier * average_true_range
+    dn = (ha_high + ha_low) / 2 - multiplier * average_true_range
+    trend = np.zeros(len(df))
+    trend[0] = 1
+    trend_up = pd.Series(index=df.index, dtype="float64")
+    trend_down = pd.Series(index=df.index, dtype="float64")
+    for i in range(1, len(df)):
+        if ha_close.iloc[i] > up.iloc[i - 1]:
+            trend[i] = 1
+        elif ha_close.iloc[i] < dn.iloc[i - 1]:
+            trend[i] = -1
+        else:
+            trend[i] = trend[i - 1]
+        if dn.iloc[i] < dn.iloc[i - 1]:
+            dn.iloc[i] = dn.iloc[i - 1]
+        if up.iloc[i] > up.iloc[i - 1]:
+            up.iloc[i] = up.iloc[i - 1]
+        trend_up.iloc[i] = dn.iloc[i] if trend[i] > 0 else np.nan
+        trend_down.iloc[i] = up.iloc[i] if trend[i] < 0 else np.nan
+    return {
+        "Up": up,
+        "Dn": dn,
+        "Trend": trend,
+        "TrendUp": trend_up.ffill(),
+        "TrendDown": trend_down.ffill(),
+    }
+
+
+def _legacy_super_trend(df, period, multiplier):
+    hl2 = (df["ha_high"] + df["ha_low"]) / 2
+    atr = df["ha_high"].rolling(period).apply(lambda x: np.max(x[:-1] - x[-1]), raw=True) + df[
+        "ha_low"
+    ].rolling(period).apply(lambda x: np.min(x[:-1] - x[-1]), raw=True)
+    upper_band = hl2 + multiplier * atr
+    lower_band = hl2 - multiplier * atr
+    supertrend = pd.Series(np.nan, index=df.index)
+    in_uptrend = True
+    for current in range(period, len(df)):
+        previous = current - 1
+        if df["ha_close"].iloc[current] > upper_band.iloc[previous]:
+            supertrend.iloc[current] = upper_band.iloc[previous]
+            in_uptrend = True
+        elif df["ha_close"].iloc[current] < lower_band.iloc[previous]:
+            supertrend.iloc[current] = lower_band.iloc[previous]
+            in_uptrend = False
+        else:
+            supertrend.iloc[current] = supertrend.iloc[previous]
+            if in_uptrend and df["ha_close"].iloc[current] < supertrend.iloc[previous]:
+                supertrend.iloc[current] = lower_band.iloc[previous]
+                in_uptrend = False
+            elif not in_uptrend and df["ha_close"].iloc[current] > supertrend.iloc[previous]:
+                supertrend.iloc[current] = upper_band.iloc[previous]
+                in_uptrend = True
+    return supertrend
+
+
+def _assert_same(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, float), np.asarray(expected, float), rtol=1e-12, equal_nan=True)
+
+
+def test_atr_and_ema_match_pandas():
+    from Executor.ExecutorUtils.IndicatorCenter import IndicatorCenterUtils
+
+    df = _ohlc()
+    _assert_same(IndicatorCenterUtils.atr(df["high"], df["low"], df["close"], 10), _legacy_atr(df, 10))
+    _assert_same(
+        IndicatorCenterUtils.ewm_mean(df["close"], 20),
+        df["close"].ewm(span=20, adjust=False).mean(),
+    )
+    _assert_same(
+        IndicatorCenterUtils.rolling_mean(df["close"], 13),
+        df["close"].rolling(13, min_periods=13).mean(),
+    )
+
+
+def test_supertrend_kernels_match_legacy_loops():
+    from Executor.ExecutorUtils.IndicatorCenter import IndicatorCenterUtils
+
+    df = _ohlc()
+    expected = _legacy_amipy_supertrend(df, 10, 3)
+    actual = IndicatorCenterUtils.amipy_supertrend(df["open"], df["high"], df["low"], df["close"], 10, 3)
+    assert (np.diff(expected["Trend"]) != 0).sum() > 5
+    for column, values in expected.items():
+        _assert_same(actual[column], values)
+
+    expected = _legacy_supertrend_new(df, 9, 7)
+    atr = IndicatorCenterUtils.atr(df["high"], df["low"], df["close"], 9)
+    ha_close, mid = IndicatorCenterUtils.heikin_ashi_levels(df["open"], df["high"], df["low"], df["close"])
+    actual = IndicatorCenterUtils.clamped_supertrend(ha_close, mid + 7 * atr, mid - 7 * atr)
+    for values, column in zip(actual, ("Up", "Dn", "Trend", "TrendUp", "TrendDown")):
+        _assert_same(values, expected[column])
+
+
+def test_band_supertrend_matches_legacy_loop():
+    from MarketInfo.Backtest import StrategyTools
+
+    df = _ohlc()
+    ha = pd.DataFrame(
+        {
+            "ha_close": (df["open"] + df["high"] + df["low"] + df["close"]) / 4,
+            "ha_high": df["high"],
+            "ha_low": df["low"],
+        }
+    )
+    _assert_same(StrategyTools.super_trend(ha, 9, 2), _legacy_super_trend(ha, 9, 2))
+
+
+def test_streaming_engine_matches_batch():
+    from Executor.ExecutorUtils.IndicatorCenter import IndicatorCenterUtils
+    from Executor.Strategies.AmiPy.streaming_indicators import AmiPyIndicatorEngine
+
+    df = _ohlc(bars=300)
+    engine = AmiPyIndicatorEngine(5, 10, 3, 20, capacity=16)
+    engine.extend(df.iloc[:100])
+    for timestamp, row in df.iloc[100:].iterrows():
+        # Revise the open bar a few times before its final values arrive
+        engine.update(timestamp, row["open"], row["open"], row["open"], row["open"])
+        engine.update(timestamp, row["open"], row["high"], row["low"], row["close"])
+    frame = engine.frame()
+
+    expected = IndicatorCenterUtils.amipy_supertrend(df["open"], df["high"], df["low"], df["close"], 10, 3)
+    for column, values in expected.items():
+        _assert_same(frame[column], values)
+    _assert_same(frame["EMA"], df["close"].ewm(span=20, adjust=False).mean())
+    _assert_same(frame["MA_close"], df["close"].rolling(5).mean())
+
+
+def _legacy_gen_signals(resultdf, entry_time, last_buy_time, sqroff_time, strike_prc, today):
+    """The per tick loop of AmiPyLive's genSignals, without the csv writes."""
+    current_position = None
+    cover_position_check = None
+    trade_state = {
+        "in_trade": False, "strike_price": strike_prc, "trade_type": None, "trade_points": 0,
+        "TrendSL": 0, "close": 0, "TradeEntryPrice": 0, "SL_points": 0,
+    }
+    indices = {column: [] for column in ("LongSignal", "ShortSignal", "LongCoverSignal", "ShortCoverSignal")}
+
+    def can_enter(i):
+        bar_time = resultdf.index[i].time()
+        return bar_time > entry_time and bar_time < sqroff_time and bar_time < last_buy_time
+
+    for i in range(1, len(resultdf)):
+        current_time = resultdf.index[i]
+        row = resultdf.loc[current_time]
+        if current_time.date() != today:
+            continue
+        last_close = resultdf["close"].iloc[-1]
+        if current_position is None:
+            cover_position_check = None
+            for position, trend in (("Long", 1), ("Short", -1)):
+                beats_ema = row["close"] > row["EMA"] if trend == 1 else row["close"] < row["EMA"]
+                if row["Trend"] == trend and beats_ema and can_enter(i):
+                    current_position = position
+                    indices[f"{position}Signal"].append(current_time)
+                    trade_state.update(
+                        in_trade=True, strike_price=strike_prc, trade_type=position,
+                        trade_points=row["close"] - last_close, TrendSL=row["TrendSL"], close=last_close,
+                        TradeEntryPrice=row["close"],
+                        SL_points=last_close - row["TrendSL"] if trend == 1 else row["TrendSL"] - last_close,
+                    )
+                    break
+        else:
+            opposite = -1 if current_position == "Long" else 1
+            cover_column = f"{current_position}Cover"
+            if current_time.floor("min") not in indices[f"{cover_column}Signal"] and (
+                row["Trend"] == opposite or current_time.time() > sqroff_time
+            ):
+                if cover_position_check != cover_column:
+                    indices[f"{cover_column}Signal"].append(current_time)
+                    cover_position_check = cover_column
+                trade_state.update(
+                    in_trade=False, strike_price=0, trade_type=None, trade_points=0, TrendSL=0,
+                    SL_points=0, TradeEntryPrice=0,
+                )
+    for column, rows in indices.items():
+        resultdf[column] = 0
+        resultdf.loc[rows, column] = 1
+    return resultdf, trade_state
+
+
+def test_streaming_signals_match_the_per_tick_loop():
+    import datetime as dt
+
+    from Executor.Strategies.AmiPy.streaming_indicators import AmiPyIndicatorEngine, AmiPySignalEngine
+
+    today = dt.date(2024, 1, 2)
+    entries = set()
+    for seed in range(6):
+        # Odd seeds square off early, before the trend turns
+        sqroff_time = dt.time(9, 45) if seed % 2 else dt.time(11, 0)
+        timings = dict(entry_time=dt.time(9, 20), last_buy_time=dt.time(9, 40), sqroff_time=sqroff_time)
+        df = _ohlc(bars=240, seed=seed)
+        df.index = pd.DatetimeIndex(
+            list(pd.date_range("2024-01-01 09:15", periods=120, freq="min"))
+            + list(pd.date_range("2024-01-02 09:15", periods=120, freq="min"))
+        )
+        indicators = AmiPyIndicatorEngine(5, 10, 3, 20)
+        indicators.extend(df.iloc[:125])
+        signals = AmiPySignalEngine(indicators, today=today, **timings)
+        signals.update()
+        for number, (timestamp, row) in enumerate(df.iloc[125:].iterrows()):
+            for high, low, close in ((row["open"], row["open"], row["open"]), (row["high"], row["low"], row["close"])):
+                indicators.update(timestamp, row["open"], high, low, close)
+                signals.update()
+                if number % 9 and number != 114:
+                    continue
+                expected, trade_state = _legacy_gen_signals(indicators.frame(), strike_prc=21500, today=today, **timings)
+                assert signals.trade_state(21500) == trade_state
+                frame = signals.frame()
+                pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+                fired = [column for column in expected.columns[-4:] if expected[column].iloc[-1] == 1]
+                assert signals.last_signal() == (fired[0] if fired else None)
+        entries.update(column for column in frame.columns[-4:] if frame[column].any())
+    # The seeds cover entries and covers on both sides
+    assert entries == {"LongSignal", "ShortSignal", "LongCoverSignal", "ShortCoverSignal"}
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def instrument_monitor(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor import instrument_monitor
+
+    # A fresh singleton per test
+    monkeypatch.setattr(instrument_monitor.InstrumentMonitor, "_instance", None)
+    return instrument_monitor
+
+
+def _tick(token, price):
+    return {"instrument_token": token, "last_price": price}
+
+
+def test_replayed_ticks_fire_each_ib_level_once_off_the_ticker_thread(instrument_monitor):
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.tick_sources import ReplayTickSource
+
+    batches = [
+        [_tick(101, 100.0), _tick(202, 200.0)],
+        [_tick(101, 111.0)],
+        # Still inside IBHigh while the first event is being handled
+        [_tick(101, 113.0)],
+        [_tick(101, 112.0), _tick(202, 189.0)],
+        [_tick(101, 89.0), _tick(999, 500.0)],
+        [_tick(101, 115.0), _tick(202, 185.0)],
+    ]
+    monitor = instrument_monitor.InstrumentMonitor()
+    monitor.configure(backend="ticker", tick_source=ReplayTickSource(batches))
+    monitor.add_token("101", {"IBHigh": 110.0, "IBLow": 90.0}, ib_level="IB1")
+    monitor.add_token("202", {"IBHigh": 210.0, "IBLow": 190.0}, ib_level="IB2")
+
+    fired, threads = [], set()
+    first_event_held = threading.Event()
+
+    def callback(token, data, order_details=None):
+        # Hold the worker on the first event so the next batches arrive while it is pending
+        first_event_held.wait(1)
+        fired.append((token, data["name"], data["value"], data["ib_level"]))
+        threads.add(threading.current_thread())
+
+    monitor.set_callback(callback)
+    monitor.start_monitoring()  # The replay runs on this thread like the ticker's on_ticks
+    first_event_held.set()
+    monitor.stop_monitoring()
+
+    assert fired == [
+        ("101", "IBHigh", 111.0, "IB1"),
+        ("202", "IBLow", 189.0, "IB2"),
+        ("101", "IBLow", 89.0, "IB1"),
+    ]
+    assert threading.current_thread() not in threads
+    assert monitor.tokens_to_monitor["101"]["IBHigh_triggered"]
+    assert monitor.tokens_to_monitor["101"]["ltp"] == 115.0
+
+
+class FakeKite:
+    """Kite's ``ltp`` backed by a FakeQuoteSource, one REST call per invocation."""
+
+    def __init__(self, quote_source):
+        self.quote_source = quote_source
+        self.chunk_sizes = []
+
+    def ltp(self, tokens):
+        self.chunk_sizes.append(len(tokens))
+        return {token: {"last_price": ltp} for token, ltp in self.quote_source.fetch_ltps(tokens).items()}
+
+
+def test_batch_cycle_makes_one_ltp_call_per_500_tokens(instrument_monitor):
+    from Executor.ExecutorUtils.InstrumentCenter.InstrumentMonitor.quote_sources import (
+        FakeQuoteSource,
+        KiteQuoteSource,
+    )
+
+    tokens = [str(token) for token in range(1200)]
+    quotes = FakeQuoteSource({token: 100.0 for token in tokens}, volatility=0.0)
+    kite = FakeKite(quotes)
+    monitor = instrument_monitor.InstrumentMonitor()
+    monitor.configure(quote_source=KiteQuoteSource(kite), polling_mode="batch", backend="poll")
+    for token in tokens:
+        trigger_points = {"IBHigh": 150.0, "IBLow": 50.0}
+        if token == "5":
+            trigger_points["IBHigh"] = 99.0
+        elif token == "700":
+            trigger_points["IBLow"] = 101.0
+        monitor.add_token(token, trigger_points, ib_level=f"IB{token}")
+
+    fired = []
+    monitor.set_callback(lambda token, data, order_details=None: fired.append((token, data["name"], data["value"])))
+    for _ in range(2):
+        stats = monitor.run_cycle()
+        assert stats["tokens"] == 1200
+
+    assert quotes.calls == 2 * 3
+    assert kite.chunk_sizes == [500, 500, 200] * 2
+    assert fired == [("5", "IBHigh", 100.0), ("700", "IBLow", 100.0)]
+    assert all(monitor.tokens_to_monitor[token]["ltp"] == 100.0 for token in tokens)
@@ -0,0 +1,96 @@
+import threading
+import time
+
+
+def _dispatch_module(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.OrderCenter import order_dispatch
+
+    return order_dispatch
+
+
+def _user(broker, username):
+    return {"Broker": {"BrokerName": broker, "BrokerUsername": username}}
+
+
+def test_parallel_dispatch_keeps_each_users_legs_in_order(monkeypatch, tmp_path):
+    order_dispatch = _dispatch_module(monkeypatch, tmp_path)
+    limiters = order_dispatch.BrokerRateLimiters({"zerodha": 50}, 20)
+    users = [
+        _user("zerodha", "ZR01"),
+        _user("zerodha", "ZR02"),
+        _user("aliceblue", "AB01"),
+        _user("aliceblue", "AB02"),
+    ]
+    legs = ["HedgeEntry", "MainEntry"]
+    # Every user has to be in flight at once, a sequential dispatch would time out here
+    all_started = threading.Barrier(len(users), timeout=5)
+    placed = []
+    placed_lock = threading.Lock()
+
+    def place_for_user(user):
+        all_started.wait()
+        statuses = []
+        for leg in legs:
+            limiters.get(user["Broker"]["BrokerName"], user["Broker"]["BrokerUsername"]).acquire()
+            with placed_lock:
+                placed.append((user["Broker"]["BrokerUsername"], leg))
+            statuses.append({"username": user["Broker"]["BrokerUsername"], "order_mode": leg})
+            time.sleep(0.01)
+        return statuses
+
+    results, latencies = order_dispatch.dispatch_users(users, place_for_user, "parallel", max_workers=8)
+
+    assert [result[0]["username"] for result in results] == ["ZR01", "ZR02", "AB01", "AB02"]
+    assert sorted(latencies) == ["AB01", "AB02", "ZR01", "ZR02"]
+    for user in users:
+        username = user["Broker"]["BrokerUsername"]
+        assert [leg for name, leg in placed if name == username] == legs
+    # The limiters are per account, the first leg of every user went out without waiting
+    assert len(limiters.limiters) == len(users)
+    assert max(latencies.values()) < 1
+
+
+def test_sequential_dispatch_places_users_one_after_another(monkeypatch, tmp_path):
+    order_dispatch = _dispatch_module(monkeypatch, tmp_path)
+    placed = []
+
+    def place_for_user(user):
+        placed.append((user["Broker"]["BrokerUsername"], "HedgeEntry"))
+        placed.append((user["Broker"]["BrokerUsername"], "MainEntry"))
+        return [user["Broker"]["BrokerUsername"]]
+
+    users = [_user("zerodha", "ZR01"), _user("zerodha", "ZR02")]
+    results, _ = order_dispatch.dispatch_users(users, place_for_user)
+
+    assert results == [["ZR01"], ["ZR02"]]
+    assert placed == [
+        ("ZR01", "HedgeEntry"),
+        ("ZR01", "MainEntry"),
+        ("ZR02", "HedgeEntry"),
+        ("ZR02", "MainEntry"),
+    ]
+
+
+def test_rate_limiters_are_keyed_by_broker_and_username(monkeypatch, tmp_path):
+    order_dispatch = _dispatch_module(monkeypatch, tmp_path)
+    limiters = order_dispatch.BrokerRateLimiters({"zerodha": 10}, 4)
+
+    limiter = limiters.get("zerodha", "ZR01")
+    assert limiters.get("zerodha", "ZR01") is limiter
+    assert limiters.get("zerodha", "ZR02") is not limiter
+    assert limiters.get("aliceblue", "ZR01") is not limiter
+    assert limiter.rate == 10
+    assert limiters.get("firstock", "FS01").rate == 4
+
+    # A full bucket serves its rate at once, the next request waits for a token
+    throttled = limiters.get("firstock", "FS02")
+    start = time.monotonic()
+    for _ in range(5):
+        throttled.acquire()
+    assert time.monotonic() - start >= 0.2
+    # Another account of the same broker has its own tokens
+    start = time.monotonic()
+    for _ in range(4):
+        limiters.get("firstock", "FS03").acquire()
+    assert time.monotonic() - start < 0.1
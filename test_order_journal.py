@@ -0,0 +1,85 @@
+import os
+import threading
+
+
+def _journal_module(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter import order_journal
+
+    return order_journal
+
+
+def test_only_the_logs_of_dead_processes_are_recovered(monkeypatch, tmp_path):
+    order_journal = _journal_module(monkeypatch, tmp_path)
+    journal_dir = str(tmp_path / "journal")
+    orders_path = "Strategies/Demo/TradeState/orders"
+
+    live = order_journal.OrderJournal(order_journal.InMemoryJournalBackend(), journal_dir, pid=1001)
+    dead = order_journal.OrderJournal(order_journal.InMemoryJournalBackend(), journal_dir, pid=1002)
+    live.append("new_clients", "Tr01", {"order_id": "live"}, orders_path)
+    dead.append("new_clients", "Tr02", {"order_id": "dead-1"}, orders_path)
+    dead.append("new_clients", "Tr02", {"order_id": "dead-2"}, orders_path)
+    # The process of "dead" exits without flushing, the OS drops its lock
+    dead._lock_file.close()
+
+    backend = order_journal.InMemoryJournalBackend()
+    starting = order_journal.OrderJournal(backend, journal_dir, pid=1003)
+    assert [entry["order"]["order_id"] for entry in starting.pending] == ["dead-1", "dead-2"]
+    assert sorted(os.listdir(journal_dir)) == [
+        "order_journal.1001.jsonl",
+        "order_journal.1001.jsonl.lock",
+        "order_journal.1003.jsonl",
+        "order_journal.1003.jsonl.lock",
+    ]
+
+    assert starting.flush() == 2
+    assert backend.get(f"new_clients/Tr02/{orders_path}") == [{"order_id": "dead-1"}, {"order_id": "dead-2"}]
+    # The live process keeps its own entries and log
+    assert [entry["order"]["order_id"] for entry in live.pending] == ["live"]
+    with open(os.path.join(journal_dir, "order_journal.1001.jsonl")) as file:
+        assert "live" in file.read()
+    assert os.path.getsize(os.path.join(journal_dir, "order_journal.1003.jsonl")) == 0
+
+
+def test_concurrent_flushes_never_share_an_index(monkeypatch, tmp_path):
+    order_journal = _journal_module(monkeypatch, tmp_path)
+    orders_path = "Strategies/Demo/TradeState/orders"
+    backend = order_journal.InMemoryJournalBackend()
+    backend.append(f"new_clients/Tr01/{orders_path}", [{"order_id": "morning"}])
+
+    journals = [
+        order_journal.OrderJournal(backend, str(tmp_path / "journal"), pid=2000 + number) for number in range(4)
+    ]
+    for number, journal in enumerate(journals):
+        for order in range(25):
+            journal.append("new_clients", "Tr01", {"order_id": f"{number}-{order}"}, orders_path)
+
+    threads = [threading.Thread(target=journal.flush) for journal in journals]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    orders = backend.get(f"new_clients/Tr01/{orders_path}")
+    assert isinstance(orders, list) and len(orders) == 1 + 4 * 25
+    assert orders[0] == {"order_id": "morning"}
+    assert {order["order_id"] for order in orders[1:]} == {f"{n}-{o}" for n in range(4) for o in range(25)}
+
+
+def test_sparse_orders_are_appended_without_renumbering(monkeypatch, tmp_path):
+    order_journal = _journal_module(monkeypatch, tmp_path)
+    current = {"7": {"order_id": "overnight"}, "-NxPushId": {"order_id": "legacy"}}
+
+    appended = order_journal.appended_orders(current, [{"order_id": "a"}, {"order_id": "b"}])
+    assert appended == {
+        "7": {"order_id": "overnight"},
+        "-NxPushId": {"order_id": "legacy"},
+        "8": {"order_id": "a"},
+        "9": {"order_id": "b"},
+    }
+    assert order_journal.appended_orders(None, [{"order_id": "a"}]) == [{"order_id": "a"}]
+    assert order_journal.appended_orders([None, {"order_id": "x"}], [{"order_id": "a"}]) == [
+        None,
+        {"order_id": "x"},
+        {"order_id": "a"},
+    ]
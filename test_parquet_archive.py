@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _candles(days=3):
+    sessions = pd.bdate_range("2024-01-01", periods=days)
+    index = pd.DatetimeIndex(
+        np.concatenate([(day + pd.Timedelta(hours=9, minutes=15)) + pd.to_timedelta(np.arange(375), "min") for day in sessions])
+    )
+    close = np.arange(len(index), dtype=float)
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10}, index=index)
+
+
+def test_load_reads_only_the_requested_range(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from MarketInfo.DataCenter.ParquetArchive import ParquetArchive
+
+    archive = ParquetArchive(str(tmp_path))
+    candles = _candles()
+    archive.write("NIFTY", candles)
+    # Writing again replaces the archived timestamps
+    archive.write("NIFTY", candles.iloc[:10].assign(close=-1.0))
+    assert archive.dates("NIFTY") == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+    day = archive.load("NIFTY", "2024-01-02", "2024-01-02", columns=["close"])
+    assert list(day.columns) == ["close"]
+    pd.testing.assert_series_equal(day["close"], candles.loc["2024-01-02", "close"], check_names=False, check_freq=False, check_index_type=False)
+
+    window = archive.load("NIFTY", "2024-01-01 09:15", "2024-01-01 09:30", as_numpy=True)
+    assert len(window["close"]) == 15 and (window["close"][:10] == -1).all()
+    assert archive.load("NIFTY", "2024-02-01", "2024-02-05").empty
+
+
+def test_import_gfdl_tables(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    import sqlite3
+
+    from MarketInfo.DataCenter.ParquetArchive import ParquetArchive, import_gfdl
+
+    conn = sqlite3.connect(tmp_path / "gfdl.sqlite")
+    conn.execute('CREATE TABLE "NIFTY-I_04Jan24" (Date DATE, Time TIME, Open REAL, High REAL, Low REAL, Close REAL, Volume INTEGER, OpenInterest INTEGER)')
+    conn.executemany(
+        'INSERT INTO "NIFTY-I_04Jan24" VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        [("2024-01-04", f"09:{15 + i}:59", 100 + i, 101 + i, 99 + i, 100 + i, 5, 50) for i in range(5)],
+    )
+    archive = ParquetArchive(str(tmp_path / "archive"))
+    assert import_gfdl(archive, conn) == 5
+    loaded = archive.load("NIFTY-I", "2024-01-04", "2024-01-04", columns=["close", "open_interest"])
+    assert loaded["close"].tolist() == [100, 101, 102, 103, 104]
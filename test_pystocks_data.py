@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+
+def _bars(start, days, seed=0):
+    index = pd.bdate_range(start, periods=days, name="Date")
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, days))
+    return pd.DataFrame(
+        {"Open": close - 0.5, "High": close + 1, "Low": close - 1, "Close": close, "Adj Close": close, "Volume": 1000.0},
+        index=index,
+    )
+
+
+def test_second_run_only_fetches_the_tail(tmp_path, monkeypatch):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Strategies.PyStocks.PyStocksData import BarCache, FakeProvider, ScreenerData, weekly_bars
+
+    first_day = pd.Timestamp("2024-03-01")
+    next_day = pd.Timestamp("2024-03-08")
+    full = {symbol: _bars("2022-01-03", 600, seed).loc[:next_day] for seed, symbol in enumerate(["INFY", "TCS", "SBIN"])}
+    provider = FakeProvider({symbol: bars.loc[:first_day] for symbol, bars in full.items()})
+    cache = BarCache(str(tmp_path / "cache"))
+    data = ScreenerData(provider, cache, batch_size=2, workers=2, today=first_day).stock_data_dict(list(full) + ["MISSING"])
+
+    assert sorted(data) == ["INFY", "SBIN", "TCS"]
+    assert len(provider.calls) == 2  # 4 symbols in batches of 2
+    daily = data["INFY"]["daily_data"]
+    assert daily.index[0] >= first_day - pd.DateOffset(years=1)
+    pd.testing.assert_frame_equal(data["TCS"]["weekly_data"], weekly_bars(full["TCS"].loc[first_day - pd.DateOffset(years=2) : first_day]))
+
+    provider = FakeProvider(full)
+    data = ScreenerData(provider, cache, batch_size=10, today=next_day).stock_data_dict(list(full))
+    # Today's bar of the first run was unfinished and not cached
+    assert provider.calls == [(list(full), pd.Timestamp("2024-02-29"))]
+    pd.testing.assert_frame_equal(
+        data["SBIN"]["daily_data"], full["SBIN"].loc[next_day - pd.DateOffset(years=1) :], check_freq=False
+    )
+
+    # An adjusted history (the cached last bar changed) is fetched again in full
+    adjusted = {symbol: bars.assign(Close=bars["Close"] / 2) for symbol, bars in full.items()}
+    provider = FakeProvider(adjusted)
+    data = ScreenerData(provider, cache, batch_size=10, today=next_day).stock_data_dict(["INFY"])
+    assert [start for _, start in provider.calls] == [pd.Timestamp("2024-03-07"), next_day - pd.DateOffset(years=2)]
+    assert data["INFY"]["daily_data"]["Close"].equals(adjusted["INFY"].loc[next_day - pd.DateOffset(years=1) :, "Close"])
+
+
+def test_unfinished_bars_and_short_histories_stay_cached(tmp_path, monkeypatch):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Strategies.PyStocks.PyStocksData import BarCache, FakeProvider, ScreenerData
+
+    today, next_day = pd.Timestamp("2024-03-07"), pd.Timestamp("2024-03-08")
+    # Listed two months ago, far less than the two years of history kept
+    final = _bars("2024-01-08", 45, seed=4).loc[:next_day]
+    intraday = final.copy()
+    intraday.loc[today, "Close"] += 3  # the 09:35 screen sees a moving last bar
+    cache = BarCache(str(tmp_path / "cache"))
+
+    data = ScreenerData(FakeProvider({"IPO": intraday.loc[:today]}), cache, today=today).stock_data_dict(["IPO"])
+    assert data["IPO"]["daily_data"].index[-1] == today
+    assert cache.load("IPO").index[-1] == pd.Timestamp("2024-03-06")
+
+    provider = FakeProvider({"IPO": final})
+    data = ScreenerData(provider, cache, today=next_day).stock_data_dict(["IPO"])
+    assert provider.calls == [(["IPO"], pd.Timestamp("2024-03-06"))]
+    assert data["IPO"]["daily_data"]["Close"].equals(final["Close"])
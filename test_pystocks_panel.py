@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _universe(symbols, seed):
+    rng = np.random.default_rng(seed)
+    stock_data_dict = {}
+    for number in range(symbols):
+        # Some symbols listed recently, so the panel holds histories of different lengths
+        days = int(rng.choice([12, 30, 120, 250]))
+        index = pd.bdate_range(end="2024-06-28", periods=days)
+        drift = rng.choice([-0.005, 0.0, 0.008])
+        close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.02, days)))
+        daily = pd.DataFrame(
+            {
+                "Open": close,
+                "High": close * (1 + rng.uniform(0, 0.02, days)),
+                "Low": close * (1 - rng.uniform(0, 0.02, days)),
+                "Close": close,
+                "Volume": rng.lognormal(8, 1.5, days),
+            },
+            index=index,
+        )
+        weekly = daily.resample("W-MON", label="left", closed="left").agg(
+            {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+        )
+        stock_data_dict[f"SYM{number}"] = {"daily_data": daily, "weekly_data": weekly}
+    return stock_data_dict
+
+
+def _copy(stock_data_dict):
+    return {symbol: {key: frame.copy() for key, frame in data.items()} for symbol, data in stock_data_dict.items()}
+
+
+# Seeds under which each strategy selects at least one symbol
+@pytest.mark.parametrize(
+    "strategy, method, seed",
+    [
+        ("strategy_momentum", "momentum_stocks", 4),
+        ("strategy_VolumeBreakout", "volume_breakout_stocks", 4),
+        ("strategy_golden_crossover", "golden_crossover_stocks", 12),
+        ("strategy_EMA_BB_Confluence", "ema_bb_confluence_stocks", 6),
+    ],
+)
+def test_panel_selects_what_the_per_symbol_strategies_select(strategy, method, seed, monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Strategies.PyStocks import PyStocksUtils
+    from Executor.Strategies.PyStocks.PyStocksPanel import ScreenerPanel
+
+    universe = _universe(600, seed)
+    expected = getattr(PyStocksUtils, strategy)(_copy(universe))
+    selected = getattr(ScreenerPanel(_copy(universe)), method)()
+    assert selected
+    assert [symbol for symbol, _ in selected] == [symbol for symbol, _ in expected]
+    assert [ratio for _, ratio in selected] == pytest.approx([ratio for _, ratio in expected])
+
+
+def test_mean_reversion_matches_on_full_histories(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Strategies.PyStocks import PyStocksUtils
+    from Executor.Strategies.PyStocks.PyStocksPanel import ScreenerPanel
+
+    # The per symbol version needs three daily bars and a weekly frame for every symbol
+    universe = {s: d for s, d in _universe(600, seed=9).items() if len(d["daily_data"]) >= 120}
+    expected = PyStocksUtils.strategy_mean_reversion(_copy(universe))
+    selected = ScreenerPanel(_copy(universe)).mean_reversion_stocks()
+    assert selected
+    assert [symbol for symbol, _ in selected] == [symbol for symbol, _ in expected]
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+
+def _per_holding_stoploss(buy_price, ltp, stoploss_multiplier):
+    """The loop PyStocksStoploss ran for each holding row."""
+    per_change = (ltp - buy_price) / buy_price * 100
+    sl = buy_price - (buy_price * stoploss_multiplier / 100)
+    if per_change // stoploss_multiplier > 0 and per_change // stoploss_multiplier != 1:
+        for _ in range(int(per_change // stoploss_multiplier)):
+            sl = sl + (buy_price * stoploss_multiplier / 100)
+            sl = round(sl, 1)
+        return sl, True
+    return sl, False
+
+
+@pytest.mark.parametrize("stoploss_multiplier", [2, 5, 7.5])
+def test_trailing_stoploss_matches_the_per_holding_loop(stoploss_multiplier, monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Strategies.PyStocks.PyStocksUtils import trailing_stoploss
+
+    rng = np.random.default_rng(2)
+    buy_prices = rng.uniform(20, 3000, 500).round(2)
+    ltps = (buy_prices * rng.uniform(0.7, 1.8, 500)).round(2)
+    stoploss, trailing = trailing_stoploss(buy_prices, ltps, stoploss_multiplier)
+
+    expected = [_per_holding_stoploss(b, l, stoploss_multiplier) for b, l in zip(buy_prices, ltps)]
+    assert trailing.tolist() == [trails for _, trails in expected]
+    assert trailing.any() and not trailing.all()
+    np.testing.assert_allclose(stoploss[trailing], [sl for sl, trails in expected if trails], atol=1e-9)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from MarketInfo.Backtest.MarketSimulator import ReplayEngine as replay_engine
+from MarketInfo.Backtest.MarketSimulator.ReplayEngine import ReplayEngine, TickStream
+
+
+class RecordingStrategy:
+    def __init__(self, complete_after=None):
+        self.ticks = []
+        self.complete_after = complete_after
+
+    def run(self, tick_price, tick_time):
+        self.ticks.append((tick_price, tick_time))
+
+    def is_trade_complete(self):
+        return self.complete_after is not None and len(self.ticks) >= self.complete_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_from_frame_converts_naive_and_aware_times_to_utc_epoch_ms():
+    naive = pd.DataFrame(
+        {"date": ["2024-01-01 09:16:00", "2024-01-01 09:15:00"], "close": [101.0, 100.0]}
+    )
+    stream = TickStream.from_frame(naive)
+    # Naive times are taken as UTC and the rows come out sorted
+    expected = pd.to_datetime(["2024-01-01 09:15:00", "2024-01-01 09:16:00"], utc=True)
+    assert stream.timestamps.tolist() == [int(ts.timestamp() * 1000) for ts in expected]
+    assert stream.prices.tolist() == [100.0, 101.0]
+
+    aware = pd.DataFrame(
+        {"close": [100.0, 101.0]},
+        index=pd.DatetimeIndex(["2024-01-01 09:15:00", "2024-01-01 09:16:00"]).tz_localize("Asia/Kolkata"),
+    )
+    stream = TickStream.from_frame(aware, time_column=None)
+    assert stream.timestamps.tolist() == [1704080700000, 1704080760000]  # 03:45 and 03:46 UTC
+
+
+def test_stop_when_complete_ends_the_replay():
+    stream = TickStream(np.arange(10, dtype=np.int64) * 60000, np.arange(10, dtype=float))
+    strategy = RecordingStrategy(complete_after=4)
+
+    stats = ReplayEngine(stream, stop_when_complete=True).run(strategy)
+    assert (stats.events, stats.stopped_early) == (4, True)
+    assert [price for price, _ in strategy.ticks] == [0.0, 1.0, 2.0, 3.0]
+
+    stats = ReplayEngine(stream).run(RecordingStrategy(complete_after=4))
+    assert (stats.events, stats.stopped_early) == (10, False)
+
+
+def test_scaled_replay_sleeps_the_gaps_capped_at_max_gap(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(replay_engine.time, "perf_counter", clock.perf_counter)
+    monkeypatch.setattr(replay_engine.time, "sleep", clock.sleep)
+
+    # A minute bar, another one, then an overnight gap
+    timestamps = np.array([0, 60000, 120000, 120000 + 18 * 3600 * 1000], dtype=np.int64)
+    stream = TickStream(timestamps, [1.0, 2.0, 3.0, 4.0])
+    strategy = RecordingStrategy()
+
+    stats = ReplayEngine(stream, speed=5, max_gap=300, time_unit="s").run(strategy)
+    assert stats.events == 4
+    assert clock.sleeps == pytest.approx([12.0, 12.0, 60.0])
+    assert stats.elapsed == pytest.approx(84.0)
+    assert [tick_time for _, tick_time in strategy.ticks] == [0.0, 60.0, 120.0, 120.0 + 18 * 3600]
@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.BrokerCenter.session_pool import session_pool
+
+    session_pool.clear()
+    yield session_pool
+    session_pool.clear()
+
+
+def test_invalidating_a_user_keeps_the_other_sessions(pool):
+    # Two accounts logged in through the same Kite app share its API key
+    first = pool.get_client("kite", "ZR01", "session-1", lambda: object())
+    second = pool.get_client("kite", "ZR02", "session-2", lambda: object())
+    assert first is not second
+    assert pool.get_client("kite", "ZR02", "session-2", lambda: object()) is second
+
+    pool.get_account("ZR01", lambda: {"Broker": {"BrokerUsername": "ZR01", "SessionId": "session-1"}})
+    pool.get_account("primary", lambda: {"Broker": {"BrokerUsername": "ZR02", "SessionId": "session-2"}})
+    pool.invalidate("kite", "ZR01")
+
+    assert pool.get_client("kite", "ZR02", "session-2", lambda: object()) is second
+    assert pool.get_client("kite", "ZR01", "session-1", lambda: object()) is not first
+    assert sorted(pool.accounts) == ["primary"]
+
+
+def test_a_new_session_id_replaces_the_client(pool):
+    stale = pool.get_client("kite", "ZR01", "session-1", lambda: object())
+
+    fresh = pool.get_client("kite", "ZR01", "session-2", lambda: object())
+
+    assert fresh is not stale
+    assert pool.get_client("kite", "ZR01", "session-2", lambda: object()) is fresh
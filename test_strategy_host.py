@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def host(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.Scripts.CeleryScripts.strategy_host import StrategyHost
+
+    def failing_step():
+        raise RuntimeError("no broker session yet")
+
+    return StrategyHost(warm_up_steps=[("broker_sessions", failing_step)])
+
+
+def _script(tmp_path, name, body):
+    path = tmp_path / name
+    path.write_text(body)
+    return str(path)
+
+
+def test_jobs_run_as_main_and_are_isolated(host, tmp_path):
+    counter = _script(
+        tmp_path,
+        "counter.py",
+        "runs = globals().get('runs', 0) + 1\n"
+        "if __name__ == '__main__':\n"
+        "    print(f'run {runs}')\n",
+    )
+    assert host.run_job(counter).status == "success"
+    # A failing warm up step does not stop the host
+    assert list(host.warm_up_seconds) == ["broker_sessions"]
+
+    # Every job starts from fresh globals
+    import io
+
+    out = io.StringIO()
+    host.run_job(counter, stdout=out)
+    assert out.getvalue() == "run 1\n"
+
+    assert host.run_job(_script(tmp_path, "done.py", "import sys\nsys.exit(0)\n")).status == "success"
+    failed = host.run_job(_script(tmp_path, "exit.py", "import sys\nsys.exit(3)\n"))
+    assert (failed.status, failed.error) == ("failed", "exit code 3")
+    crashed = host.run_job(_script(tmp_path, "crash.py", "raise ValueError('bad params')\n"))
+    assert (crashed.status, crashed.error) == ("failed", "ValueError: bad params")
+    assert [job.status for job in host.history] == ["success", "success", "success", "failed", "failed"]
+
+
+def test_modules_imported_by_a_job_are_loaded_again_by_the_next(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    monkeypatch.setenv("JOBPKG_LOADS", "0")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    from Executor.Scripts.CeleryScripts.strategy_host import StrategyHost
+
+    package = tmp_path / "jobpkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    # Import time state, like a strategy loading its params from Firebase
+    (package / "state.py").write_text(
+        "import os\nos.environ['JOBPKG_LOADS'] = str(int(os.environ['JOBPKG_LOADS']) + 1)\n"
+    )
+    script = _script(tmp_path, "uses_state.py", "from jobpkg import state\n")
+
+    import sys
+
+    host = StrategyHost(warm_up_steps=[], code_root=str(tmp_path))
+    assert host.run_job(script).new_modules == 2
+    assert host.run_job(script).status == "success"
+    assert os.environ["JOBPKG_LOADS"] == "2"
+    assert "jobpkg" not in sys.modules and "jobpkg.state" not in sys.modules
@@ -0,0 +1,75 @@
+import pytest
+
+TODAY = "2024-05-02"
+
+
+@pytest.fixture
+def validator_utils(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.ReportUtils import TradebookValidatorUtils
+
+    return TradebookValidatorUtils
+
+
+def _order(order_id, day=TODAY):
+    return {"order_id": order_id, "time_stamp": f"{day} 09:20:00", "qty": 25}
+
+
+def _user(strategies):
+    return {"Tr_No": "Tr01", "Broker": {"BrokerName": "zerodha", "BrokerUsername": "user1"}, "Strategies": strategies}
+
+
+def test_strategy_orders_are_iterated_for_list_and_dict_nodes(monkeypatch, tmp_path):
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    from Executor.ExecutorUtils.ExeDBUtils.ExeFirebaseAdapter.exefirebase_utils import (
+        iter_strategy_orders,
+    )
+
+    assert list(iter_strategy_orders([{"a": 1}, None])) == [(0, {"a": 1}), (1, None)]
+    assert list(iter_strategy_orders({"0": {"a": 1}, "3": {"b": 2}})) == [("0", {"a": 1}), ("3", {"b": 2})]
+    assert list(iter_strategy_orders(None)) == []
+    assert list(iter_strategy_orders("unexpected")) == []
+
+
+def test_order_index_points_at_todays_orders(validator_utils):
+    strategies = {
+        "AmiPy": {"TradeState": {"orders": [_order(101), _order(102, "2024-05-01"), None, {"qty": 5}, _order(103)]}},
+        # A node with deleted entries comes back as a dict with string keys
+        "MPWizard": {"TradeState": {"orders": {"2": _order(201), "7": _order(101)}}},
+        "OvernightFutures": {"TradeState": {"orders": []}},
+        "Inactive": None,
+    }
+
+    order_index = validator_utils.build_order_index(_user(strategies), strategies, TODAY)
+
+    assert order_index == {
+        "101": ("AmiPy", 0),
+        "103": ("AmiPy", 4),
+        "201": ("MPWizard", "2"),
+    }
+
+
+def test_matched_trades_become_one_batched_update(validator_utils):
+    strategies = {
+        "AmiPy": {"TradeState": {"orders": [_order(101), _order(102)]}},
+        "MPWizard": {"TradeState": {"orders": {"4": _order(201)}}},
+    }
+    order_index = validator_utils.build_order_index(_user(strategies), strategies, TODAY)
+    tradebook = [
+        {"order_id": 102, "average_price": 98.5},
+        {"order_id": "201", "average_price": 12.25},
+        {"order_id": 999, "average_price": 7.0},
+        {"order_id": 101, "average_price": 101.0},
+    ]
+
+    updates, matched, unmatched = validator_utils.match_tradebook(
+        tradebook, order_index, "order_id", "average_price"
+    )
+
+    assert updates == {
+        "Strategies/AmiPy/TradeState/orders/1/avg_prc": 98.5,
+        "Strategies/MPWizard/TradeState/orders/4/avg_prc": 12.25,
+        "Strategies/AmiPy/TradeState/orders/0/avg_prc": 101.0,
+    }
+    assert matched == {"101", "102", "201"}
+    assert unmatched == [{"order_id": 999, "average_price": 7.0}]
@@ -0,0 +1,21 @@
+import numpy as np
+
+
+def test_sweep_matches_single_runs():
+    from MarketInfo.Backtest.MarketSimulator.ReplayEngine import TickStream
+    from MarketInfo.StrategyCenter.ZRM.ZRMSweep import run_backtest, run_sweep
+
+    rng = np.random.default_rng(4)
+    start_ms = TickStream.to_epoch_ms(["2024-01-01 09:15"])[0]
+    streams = {
+        token: TickStream(start_ms + np.arange(3000, dtype=np.int64) * 60000, 45000 + np.cumsum(rng.normal(0, 10, 3000)))
+        for token in ("256265", "260105")
+    }
+    date_ranges = [(None, "2024-01-02"), ("2024-01-02", None)]
+    results = run_sweep(streams, [20, 40], date_ranges, workers=2)
+
+    assert len(results) == 8
+    row = results[(results["zone_width"] == 40) & (results["token"] == "260105") & (results["end"].isna())].iloc[0]
+    expected = run_backtest(streams["260105"].between("2024-01-02", "2200-01-01"), 40)
+    assert row["orders"] == expected["orders"] > 0
+    assert row["net_pnl"] == expected["net_pnl"]